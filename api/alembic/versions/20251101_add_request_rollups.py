@@ -0,0 +1,54 @@
+"""Add request rollup columns and processing watermarks
+
+Revision ID: 20251101_request_rollups
+Revises: 20250203_add_log_id_emp
+Create Date: 2025-11-01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20251101_request_rollups'
+down_revision = '20250203_add_log_id_emp'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Watermarks for incremental background jobs
+    op.create_table(
+        'processing_watermarks',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('watermark_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('watermark_id', sa.String(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+    # Columns needed to merge hourly/daily buckets
+    op.add_column('api_request_summaries', sa.Column('method', sa.String(), nullable=True))
+    op.add_column('api_request_summaries', sa.Column('total_response_time_ms', sa.BigInteger(), nullable=True))
+    op.add_column('api_request_summaries', sa.Column('last_request_at', sa.DateTime(timezone=True), nullable=True))
+    op.alter_column(
+        'api_request_summaries', 'total_response_size_bytes',
+        type_=sa.BigInteger(), existing_type=sa.Integer(), existing_nullable=True
+    )
+
+    op.create_index(
+        'ix_api_request_summaries_type_start',
+        'api_request_summaries',
+        ['period_type', 'period_start']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_api_request_summaries_type_start', table_name='api_request_summaries')
+    op.alter_column(
+        'api_request_summaries', 'total_response_size_bytes',
+        type_=sa.Integer(), existing_type=sa.BigInteger(), existing_nullable=True
+    )
+    op.drop_column('api_request_summaries', 'last_request_at')
+    op.drop_column('api_request_summaries', 'total_response_time_ms')
+    op.drop_column('api_request_summaries', 'method')
+    op.drop_table('processing_watermarks')
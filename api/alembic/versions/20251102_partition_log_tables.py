@@ -0,0 +1,152 @@
+"""Partition wathq_call_logs and api_request_counters by month
+
+Revision ID: 20251102_partition_logs
+Revises: 20251101_request_rollups
+Create Date: 2025-11-02
+
+Both tables are rebuilt as native range-partitioned tables (one partition per
+month plus a default partition) and their rows copied across. The copy holds
+an exclusive lock on the old tables, so run it in a maintenance window.
+
+A partitioned table's primary key must include the partition key, so the
+primary keys become (id, fetched_at) / (id, created_at), and the log_id
+foreign keys from the wathq.* tables to wathq_call_logs are dropped (the
+log_id columns and their indexes are kept).
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20251102_partition_logs'
+down_revision = '20251101_request_rollups'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+TABLES = {
+    'wathq_call_logs': {
+        'column': 'fetched_at',
+        'indexes': ['id', 'tenant_id', 'user_id', 'management_user_id', 'service_slug', 'fetched_at'],
+        'foreign_keys': [
+            ('tenant_id', 'tenants'),
+            ('user_id', 'users'),
+            ('management_user_id', 'management_users'),
+        ],
+    },
+    'api_request_counters': {
+        'column': 'created_at',
+        'indexes': [
+            'id', 'request_type', 'endpoint', 'user_id', 'tenant_id',
+            'management_user_id', 'service_id', 'service_slug', 'created_at',
+        ],
+        'foreign_keys': [
+            ('user_id', 'users'),
+            ('tenant_id', 'tenants'),
+            ('management_user_id', 'management_users'),
+            ('service_id', 'services'),
+        ],
+    },
+}
+
+# (constraint, table in wathq schema, ON DELETE)
+LOG_ID_FOREIGN_KEYS = [
+    ('fk_commercial_registrations_log_id', 'commercial_registrations', 'SET NULL'),
+    ('fk_corporate_contracts_log_id', 'corporate_contracts', None),
+    ('fk_power_of_attorney_log_id', 'power_of_attorney', None),
+    ('fk_deeds_log_id', 'deeds', None),
+    ('fk_addresses_log_id', 'addresses', None),
+    ('fk_employees_log_id', 'employees', None),
+]
+
+
+def _add_months(dt, months):
+    index = dt.year * 12 + dt.month - 1 + months
+    return dt.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _create_indexes_and_fks(table, spec):
+    for column in spec['indexes']:
+        op.create_index(f'ix_{table}_{column}', table, [column], unique=False)
+    for column, referent in spec['foreign_keys']:
+        op.create_foreign_key(f'{table}_{column}_fkey', table, referent, [column], ['id'])
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    # Per-tenant retention policy (NULL = global default)
+    op.add_column('tenants', sa.Column('log_retention_days', sa.Integer(), nullable=True))
+
+    # Partitioned tables cannot be referenced by id alone
+    for name, table, _ in LOG_ID_FOREIGN_KEYS:
+        op.execute(f'ALTER TABLE wathq.{table} DROP CONSTRAINT IF EXISTS {name}')
+
+    now = datetime.now(timezone.utc)
+    current_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    for table, spec in TABLES.items():
+        column = spec['column']
+        old = f'{table}_unpartitioned'
+
+        op.execute(f'UPDATE {table} SET {column} = now() WHERE {column} IS NULL')
+        op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+        op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+
+        op.execute(
+            f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ({column})'
+        )
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {column})')
+
+        # One partition per month from the oldest row to a few months ahead
+        oldest = conn.execute(sa.text(f'SELECT min({column}) FROM {old}')).scalar()
+        month = current_month
+        if oldest is not None:
+            month = oldest.astimezone(timezone.utc).replace(
+                day=1, hour=0, minute=0, second=0, microsecond=0
+            )
+        last = _add_months(current_month, MONTHS_AHEAD)
+        while month <= last:
+            upper = _add_months(month, 1)
+            op.execute(
+                f'CREATE TABLE {table}_y{month.year:04d}m{month.month:02d} '
+                f'PARTITION OF {table} '
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+            month = upper
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+        op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+        op.execute(f'DROP TABLE {old}')
+
+        _create_indexes_and_fks(table, spec)
+
+
+def downgrade():
+    for table, spec in TABLES.items():
+        column = spec['column']
+        plain = f'{table}_unpartitioned'
+
+        op.execute(f'CREATE TABLE {plain} (LIKE {table} INCLUDING DEFAULTS)')
+        op.execute(f'INSERT INTO {plain} SELECT * FROM {table}')
+        op.execute(f'DROP TABLE {table}')  # drops every partition
+        op.execute(f'ALTER TABLE {plain} RENAME TO {table}')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL')
+
+        _create_indexes_and_fks(table, spec)
+
+    # Retention may have removed logs still referenced, so don't validate old rows
+    for name, table, on_delete in LOG_ID_FOREIGN_KEYS:
+        action = f' ON DELETE {on_delete}' if on_delete else ''
+        op.execute(
+            f'ALTER TABLE wathq.{table} ADD CONSTRAINT {name} FOREIGN KEY (log_id) '
+            f'REFERENCES public.wathq_call_logs (id){action} NOT VALID'
+        )
+
+    op.drop_column('tenants', 'log_retention_days')
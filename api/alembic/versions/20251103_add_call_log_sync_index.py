@@ -0,0 +1,27 @@
+"""Add keyset index for incremental call log sync
+
+Revision ID: 20251103_call_log_sync_idx
+Revises: 20251102_partition_logs
+Create Date: 2025-11-03
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20251103_call_log_sync_idx'
+down_revision = '20251102_partition_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves "WHERE service_slug = ? AND (fetched_at, id) > (?, ?) ORDER BY fetched_at, id"
+    op.create_index(
+        'ix_wathq_call_logs_sync_keyset',
+        'wathq_call_logs',
+        ['service_slug', 'fetched_at', 'id']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_wathq_call_logs_sync_keyset', table_name='wathq_call_logs')
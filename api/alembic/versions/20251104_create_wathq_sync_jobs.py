@@ -0,0 +1,49 @@
+"""Create wathq_sync_jobs table for background syncs
+
+Revision ID: 20251104_wathq_sync_jobs
+Revises: 20251103_call_log_sync_idx
+Create Date: 2025-11-04
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20251104_wathq_sync_jobs'
+down_revision = '20251103_call_log_sync_idx'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'wathq_sync_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('service_slug', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('full_resync', sa.Boolean(), nullable=False),
+        sa.Column('requested_by', sa.Integer(), nullable=True),
+        sa.Column('total_logs', sa.Integer(), nullable=False),
+        sa.Column('total_chunks', sa.Integer(), nullable=False),
+        sa.Column('processed_logs', sa.Integer(), nullable=False),
+        sa.Column('completed_chunks', sa.Integer(), nullable=False),
+        sa.Column('synced_count', sa.Integer(), nullable=False),
+        sa.Column('error_count', sa.Integer(), nullable=False),
+        sa.Column('errors', postgresql.JSONB(), server_default=sa.text("'[]'::jsonb"), nullable=False),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['requested_by'], ['management_users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_wathq_sync_jobs_service_slug', 'wathq_sync_jobs', ['service_slug'], unique=False)
+    op.create_index('ix_wathq_sync_jobs_status', 'wathq_sync_jobs', ['status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_wathq_sync_jobs_status', table_name='wathq_sync_jobs')
+    op.drop_index('ix_wathq_sync_jobs_service_slug', table_name='wathq_sync_jobs')
+    op.drop_table('wathq_sync_jobs')
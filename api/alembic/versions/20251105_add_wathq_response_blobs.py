@@ -0,0 +1,120 @@
+"""Store WATHQ response bodies as content-addressed blobs
+
+Revision ID: 20251105_response_blobs
+Revises: 20251104_wathq_sync_jobs
+Create Date: 2025-11-05
+
+wathq_call_logs and wathq_offline_data each stored a full copy of every
+response body, and repeat lookups of unchanged records stored identical
+bodies again. Bodies move to wathq_response_blobs, keyed by the SHA-256 of
+their canonical JSON, and both tables keep only the hash.
+
+Existing rows are backfilled in batches (bodies hashed here, in Python, the
+same way as app.crud.crud_wathq_response_blob.hash_body), then the
+response_body columns are dropped. Run VACUUM (FULL) afterwards to return the
+space. Detached log partitions are left untouched.
+
+"""
+import hashlib
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20251105_response_blobs'
+down_revision = '20251104_wathq_sync_jobs'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# Table -> keyset columns (partition key first for wathq_call_logs)
+TABLES = {
+    'wathq_call_logs': ('fetched_at', 'id'),
+    'wathq_offline_data': ('id',),
+}
+
+
+def _canonical_json(body):
+    return json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _backfill(conn, table, keys):
+    key_list = ", ".join(keys)
+    after = None
+    while True:
+        query = f"SELECT {key_list}, response_body FROM {table}"
+        params = {"limit": BATCH_SIZE}
+        if after is not None:
+            query += f" WHERE ({key_list}) > ({', '.join(f':k{i}' for i in range(len(keys)))})"
+            params.update({f"k{i}": value for i, value in enumerate(after)})
+        query += f" ORDER BY {key_list} LIMIT :limit"
+        rows = conn.execute(sa.text(query), params).fetchall()
+        if not rows:
+            return
+
+        blobs = {}
+        updates = []
+        for row in rows:
+            body = row[len(keys)]
+            canonical = _canonical_json(body)
+            body_hash = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+            blobs.setdefault(
+                body_hash, {"hash": body_hash, "body": canonical, "size_bytes": len(canonical)}
+            )
+            updates.append({"hash": body_hash, **{key: row[i] for i, key in enumerate(keys)}})
+
+        conn.execute(
+            sa.text(
+                "INSERT INTO wathq_response_blobs (hash, body, size_bytes) "
+                "VALUES (:hash, CAST(:body AS json), :size_bytes) ON CONFLICT (hash) DO NOTHING"
+            ),
+            list(blobs.values()),
+        )
+        conn.execute(
+            sa.text(
+                f"UPDATE {table} SET response_body_hash = :hash "
+                f"WHERE {' AND '.join(f'{key} = :{key}' for key in keys)}"
+            ),
+            updates,
+        )
+        after = tuple(rows[-1][:len(keys)])
+
+
+def upgrade():
+    op.create_table(
+        'wathq_response_blobs',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('body', sa.JSON(), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('last_referenced_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('hash')
+    )
+    op.create_index(
+        'ix_wathq_response_blobs_last_referenced_at', 'wathq_response_blobs', ['last_referenced_at']
+    )
+
+    conn = op.get_bind()
+    for table, keys in TABLES.items():
+        op.add_column(table, sa.Column('response_body_hash', sa.String(length=64), nullable=True))
+        _backfill(conn, table, keys)
+        op.alter_column(table, 'response_body_hash', nullable=False)
+        op.create_index(f'ix_{table}_response_body_hash', table, ['response_body_hash'])
+        op.drop_column(table, 'response_body')
+
+
+def downgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('response_body', sa.JSON(), nullable=True))
+        op.execute(
+            f"UPDATE {table} t SET response_body = b.body "
+            f"FROM wathq_response_blobs b WHERE b.hash = t.response_body_hash"
+        )
+        op.alter_column(table, 'response_body', nullable=False)
+        op.drop_index(f'ix_{table}_response_body_hash', table_name=table)
+        op.drop_column(table, 'response_body_hash')
+
+    op.drop_index('ix_wathq_response_blobs_last_referenced_at', table_name='wathq_response_blobs')
+    op.drop_table('wathq_response_blobs')
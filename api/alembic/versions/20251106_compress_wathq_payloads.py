@@ -0,0 +1,76 @@
+"""Compressed storage for large WATHQ payload columns
+
+Revision ID: 20251106_compressed_payloads
+Revises: 20251105_response_blobs
+Create Date: 2025-11-06
+
+- wathq_call_logs.request_data: json -> jsonb. It is filtered on (dossier
+  language), which jsonb serves without re-parsing every row.
+- wathq_response_blobs.body and cr_requests.response: json(b) -> bytea in the
+  app.db.types.CompressedJSON format (one codec tag byte, then the payload).
+  Both are only ever read back whole, never queried inside.
+
+Existing payloads are converted in SQL with the "none" tag, i.e. stored
+uncompressed; scripts/compress_wathq_payloads.py then re-encodes them with the
+configured codec in batches, without holding this migration's lock.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20251106_compressed_payloads'
+down_revision = '20251105_response_blobs'
+branch_labels = None
+depends_on = None
+
+# Table -> (column, nullable, original type)
+COMPRESSED_COLUMNS = {
+    'wathq_response_blobs': ('body', False, 'json'),
+    'cr_requests': ('response', True, 'jsonb'),
+}
+
+
+def _swap_column(table, column, nullable, new_type, expression):
+    """Replace a column by one of another type, filled from ``expression``."""
+    tmp = f'{column}_new'
+    op.add_column(table, sa.Column(tmp, new_type, nullable=True))
+    op.execute(f"UPDATE {table} SET {tmp} = {expression.format(column=column)}")
+    op.drop_column(table, column)
+    op.alter_column(table, tmp, new_column_name=column, nullable=nullable)
+
+
+def upgrade():
+    op.execute(
+        "ALTER TABLE wathq_call_logs ALTER COLUMN request_data TYPE jsonb USING request_data::jsonb"
+    )
+
+    for table, (column, nullable, _) in COMPRESSED_COLUMNS.items():
+        _swap_column(
+            table, column, nullable, sa.LargeBinary(),
+            "'\\x00'::bytea || convert_to({column}::text, 'UTF8')",
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    for table, (column, nullable, original_type) in COMPRESSED_COLUMNS.items():
+        # Compressed values cannot be decoded in SQL; decompress them first
+        compressed = bind.execute(
+            sa.text(f"SELECT count(*) FROM {table} WHERE get_byte({column}, 0) <> 0")
+        ).scalar()
+        if compressed:
+            raise RuntimeError(
+                f"{table}.{column} has {compressed} compressed rows; run "
+                "WATHQ_PAYLOAD_CODEC=none python scripts/compress_wathq_payloads.py first"
+            )
+        _swap_column(
+            table, column, nullable,
+            postgresql.JSONB() if original_type == 'jsonb' else sa.JSON(),
+            f"convert_from(substring({{column}} from 2), 'UTF8')::{original_type}",
+        )
+
+    op.execute(
+        "ALTER TABLE wathq_call_logs ALTER COLUMN request_data TYPE json USING request_data::json"
+    )
@@ -0,0 +1,49 @@
+"""Indexed business identifiers on WATHQ offline data
+
+Revision ID: 20251107_offline_identifiers
+Revises: 20251106_compressed_payloads
+Create Date: 2025-11-07
+
+Offline copies could only be found by business identifier with a substring
+scan over full_external_url. The CR number, unified national number, deed
+number and POA code are now extracted when a row is written into nullable
+columns, each with a partial (identifier, fetched_at) index.
+
+Existing rows are filled by scripts/backfill_offline_identifiers.py, which
+extracts from the response bodies with the application code (the bodies are
+compressed blobs that cannot be read in SQL here).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20251107_offline_identifiers'
+down_revision = '20251106_compressed_payloads'
+branch_labels = None
+depends_on = None
+
+# Column -> length
+IDENTIFIER_COLUMNS = {
+    'cr_number': 20,
+    'cr_national_number': 20,
+    'deed_number': 50,
+    'poa_code': 50,
+}
+
+
+def upgrade():
+    for column, length in IDENTIFIER_COLUMNS.items():
+        op.add_column('wathq_offline_data', sa.Column(column, sa.String(length=length), nullable=True))
+        op.create_index(
+            f'ix_wathq_offline_data_{column}_fetched_at',
+            'wathq_offline_data',
+            [column, 'fetched_at'],
+            postgresql_where=sa.text(f'{column} IS NOT NULL'),
+        )
+
+
+def downgrade():
+    for column in IDENTIFIER_COLUMNS:
+        op.drop_index(f'ix_wathq_offline_data_{column}_fetched_at', table_name='wathq_offline_data')
+        op.drop_column('wathq_offline_data', column)
@@ -11,6 +11,9 @@ from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.core.config import settings
+from app.core.wathq_logger import wathq_log_pipeline
+from app.core.wathq_metadata import wathq_metadata
+from app.core.wathq_resilience import wathq_resilience
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -48,3 +51,23 @@ def health_check_db(db: Session = Depends(deps.get_db)) -> Any:
             "database": "disconnected",
             "error": str(e),
         }
+
+
+@router.get("/wathq")
+def health_check_wathq() -> Any:
+    """
+    WATHQ upstream health: circuit state, trip counts and concurrency limit
+    per service, the service metadata memo and the WATHQ file log queue, as
+    seen by this worker.
+    """
+    services = wathq_resilience.stats()
+    open_services = [
+        slug for slug, stats in services.items() if stats["breaker"]["state"] == "open"
+    ]
+    return {
+        "status": "degraded" if open_services else "healthy",
+        "open_circuits": open_services,
+        "services": services,
+        "metadata_cache": wathq_metadata.stats(),
+        "file_log": wathq_log_pipeline.stats(),
+    }
@@ -16,6 +16,7 @@ from app.api.management_deps import (
     get_current_super_admin,
 )
 from app.core.config import settings
+from app.core.wathq_metadata import wathq_metadata
 from app.models.management_user import ManagementUser
 from app.models.management_user_profile import ManagementUserProfile
 
@@ -1194,6 +1195,7 @@ def approve_tenant_service(
     db.add(tenant_service)
     db.commit()
     db.refresh(tenant_service)
+    wathq_metadata.invalidate(tenant_id)
     return tenant_service
 
 
@@ -1220,6 +1222,7 @@ def update_tenant_service(
     tenant_service = crud.tenant_service.update(
         db, db_obj=tenant_service, obj_in=tenant_service_in
     )
+    wathq_metadata.invalidate(tenant_service.tenant_id)
     return tenant_service
 
 
@@ -1241,6 +1244,7 @@ def delete_tenant_service(
         )
     # Delete tenant service
     tenant_service = crud.tenant_service.remove(db, id=service_id)
+    wathq_metadata.invalidate(tenant_service.tenant_id)
     return {
         "message": "Service deleted successfully",
         "service": tenant_service,
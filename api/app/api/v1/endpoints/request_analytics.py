@@ -13,6 +13,11 @@ from sqlalchemy.orm import Session
 from app import models
 from app.api import deps
 from app.api.management_deps import get_current_active_management_user
+from app.core.config import settings
+from app.core.wathq_quota import wathq_quota
+from app.core.wathq_single_flight import wathq_single_flight
+from app.core.wathq_tracker import WathqCallTracker
+from app.crud.crud_wathq_response_blob import wathq_response_blob
 from app.schemas.api_request_counter import (
     ApiRequestStats,
     DashboardStats,
@@ -23,6 +28,8 @@ from app.schemas.api_request_counter import (
     UserRequestStats,
 )
 from app.services.request_counter_service import request_counter_service
+from app.services.request_counter_writer import request_counter_writer
+from app.services.wathq_outbox import wathq_outbox
 
 router = APIRouter()
 
@@ -40,6 +47,101 @@ def get_analytics_dashboard(
     return request_counter_service.get_dashboard_stats(db)
 
 
+@router.get("/writer")
+def get_request_counter_writer_stats(
+    *,
+    current_user: models.ManagementUser = Depends(get_current_active_management_user),
+) -> Any:
+    """
+    Get batched request counter writer metrics.
+    Shows queue depth, rows written, and rows dropped under backpressure.
+    """
+    return request_counter_writer.stats()
+
+
+@router.get("/outbox")
+async def get_wathq_outbox_stats(
+    *,
+    current_user: models.ManagementUser = Depends(get_current_active_management_user),
+) -> Any:
+    """
+    Get WATHQ call log outbox metrics.
+    Shows entries still waiting to be written, and this worker's appends,
+    batched writes and synchronous fallbacks.
+    """
+    try:
+        backlog = await wathq_outbox.pending()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Outbox stream unavailable: {e}")
+    return {
+        "backlog": backlog,
+        "worker": wathq_outbox.stats(),
+    }
+
+
+@router.get("/response-blobs")
+def get_wathq_response_blob_stats(
+    *,
+    db: Session = Depends(deps.get_db),
+    current_user: models.ManagementUser = Depends(get_current_active_management_user),
+) -> Any:
+    """
+    Get WATHQ response body storage metrics.
+    Compares the distinct bodies stored with the bodies call logs and offline
+    rows reference, i.e. what storing a copy per row would take.
+    """
+    stats = wathq_response_blob.storage_stats(db)
+    saved = stats["referenced_bytes"] - stats["blob_bytes"]
+    return {
+        **stats,
+        "saved_bytes": saved,
+        "dedup_ratio": round(stats["referenced_bytes"] / stats["blob_bytes"], 2) if stats["blob_bytes"] else None,
+    }
+
+
+@router.get("/coalescing")
+def get_wathq_coalescing_stats(
+    *,
+    current_user: models.ManagementUser = Depends(get_current_active_management_user),
+) -> Any:
+    """
+    Get WATHQ request coalescing metrics of this worker.
+    Shows calls answered by an identical in-flight call (not billed, not
+    logged as call logs), per service, next to the single-flight counters.
+    """
+    return {
+        "coalesced_calls": WathqCallTracker.coalesced_stats(),
+        "single_flight": wathq_single_flight.stats(),
+    }
+
+
+@router.get("/quota")
+async def get_wathq_quota_levels(
+    *,
+    current_user: models.ManagementUser = Depends(get_current_active_management_user),
+) -> Any:
+    """
+    Get live WATHQ quota bucket levels.
+    Shows the tokens left per API key (hashed; "system" for the shared key)
+    and per tenant on the system key, plus this worker's wait/reject counters.
+    """
+    try:
+        buckets = await wathq_quota.levels()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Quota store unavailable: {e}")
+    return {
+        "limits": {
+            "key_rate_per_second": settings.WATHQ_QUOTA_KEY_RATE,
+            "key_burst": settings.WATHQ_QUOTA_KEY_BURST,
+            "tenant_rate_per_second": settings.WATHQ_QUOTA_TENANT_RATE,
+            "tenant_burst": settings.WATHQ_QUOTA_TENANT_BURST,
+            "max_wait_seconds": settings.WATHQ_QUOTA_MAX_WAIT,
+        },
+        "buckets": buckets,
+        "worker": wathq_quota.stats(),
+    }
+
+
 @router.get("/stats", response_model=ApiRequestStats)
 def get_request_statistics(
     *,
@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 from app import crud, models, schemas
 from app.api import deps, management_deps
 from app.core.permissions import require_permission
+from app.core.wathq_metadata import wathq_metadata
 
 router = APIRouter()
 
@@ -236,6 +237,7 @@ def update_tenant_service_api_key(
     tenant_service.wathq_api_key = new_api_key
     db.commit()
     db.refresh(tenant_service)
+    wathq_metadata.invalidate(tenant_service.tenant_id)
     
     return tenant_service
 
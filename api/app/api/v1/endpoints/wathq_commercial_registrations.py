@@ -14,6 +14,7 @@ from app.schemas.wathq_commercial_registration import (
     CommercialRegistrationCreate,
     CommercialRegistrationUpdate,
 )
+from app.services.rendered_artifact_cache import rendered_artifact_cache
 
 router = APIRouter()
 
@@ -187,6 +188,7 @@ def update_commercial_registration(
         )
     
     cr = commercial_registration.update(db, db_obj=cr, obj_in=cr_in)
+    rendered_artifact_cache.invalidate_record("commercial_registration", [id])
     return cr
 
 
@@ -207,4 +209,5 @@ def delete_commercial_registration(
     
     db.delete(cr)
     db.commit()
+    rendered_artifact_cache.invalidate_record("commercial_registration", [id])
     return {"message": "Commercial registration deleted successfully"}
@@ -14,6 +14,7 @@ from app.schemas.wathq_corporate_contract import (
     CorporateContractCreate,
     CorporateContractUpdate,
 )
+from app.services.rendered_artifact_cache import rendered_artifact_cache
 
 router = APIRouter()
 
@@ -79,6 +80,7 @@ def update_corporate_contract(
             detail="Corporate contract not found",
         )
     contract = corporate_contract.update(db, db_obj=contract, obj_in=contract_in)
+    rendered_artifact_cache.invalidate_record("corporate_contract", [id])
     return contract
 
 
@@ -98,3 +100,4 @@ def delete_corporate_contract(
             detail="Corporate contract not found",
         )
     corporate_contract.remove(db, id=id)
+    rendered_artifact_cache.invalidate_record("corporate_contract", [id])
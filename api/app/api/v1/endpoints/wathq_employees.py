@@ -13,6 +13,7 @@ from app.schemas.wathq_employee import (
     EmployeeCreate,
     EmployeeUpdate,
 )
+from app.services.rendered_artifact_cache import rendered_artifact_cache
 
 router = APIRouter()
 
@@ -92,6 +93,7 @@ def update_employee(
         )
     
     employee_obj = employee.update(db, db_obj=employee_obj, obj_in=employee_in)
+    rendered_artifact_cache.invalidate_record("employee", [employee_id])
     return employee_obj
 
 
@@ -111,3 +113,4 @@ def delete_employee(
             detail="Employee not found",
         )
     employee.remove(db, id=employee_id)
+    rendered_artifact_cache.invalidate_record("employee", [employee_id])
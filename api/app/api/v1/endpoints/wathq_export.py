@@ -2,11 +2,12 @@
 WATHQ export endpoints for downloading data in various formats.
 """
 
-from typing import Any, List
+from datetime import datetime
+from typing import Any, List, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, Query, HTTPException
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app import crud, models
 from app.api import deps
@@ -90,6 +91,8 @@ def export_offline_data_batch_xls(
     offline_data_list = db.query(models.WathqOfflineData).filter(
         models.WathqOfflineData.service_id == service_id,
         models.WathqOfflineData.tenant_id == current_user.tenant_id
+    ).options(
+        selectinload(models.WathqOfflineData.response_blob)
     ).offset(skip).limit(limit).all()
     
     if not offline_data_list:
@@ -112,6 +115,8 @@ def export_offline_data_batch_xls(
 def export_call_logs_xls(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fetched_from: Optional[datetime] = Query(None, description="Only logs fetched at or after this time"),
+    fetched_to: Optional[datetime] = Query(None, description="Only logs fetched before this time"),
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_active_user),
 ):
@@ -123,7 +128,9 @@ def export_call_logs_xls(
         db=db, 
         user_id=current_user.id, 
         skip=skip, 
-        limit=limit
+        limit=limit,
+        fetched_from=fetched_from,
+        fetched_to=fetched_to
     )
     
     if not call_logs:
@@ -158,6 +165,8 @@ def export_call_logs_xls(
 def export_tenant_call_logs_xls(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fetched_from: Optional[datetime] = Query(None, description="Only logs fetched at or after this time"),
+    fetched_to: Optional[datetime] = Query(None, description="Only logs fetched before this time"),
     db: Session = Depends(deps.get_db),
     current_user: models.User = Depends(deps.get_current_active_user),
 ):
@@ -169,7 +178,9 @@ def export_tenant_call_logs_xls(
         db=db, 
         tenant_id=current_user.tenant_id, 
         skip=skip, 
-        limit=limit
+        limit=limit,
+        fetched_from=fetched_from,
+        fetched_to=fetched_to
     )
     
     if not call_logs:
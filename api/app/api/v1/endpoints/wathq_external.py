@@ -4,13 +4,14 @@ Separate endpoints for tenant users and management users.
 """
 
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app import models
 from app.api import deps
 from app.crud.crud_wathq_external_data import wathq_external_data
+from app.services.wathq_external_cache import wathq_external_cache
 from app.services.wathq_external_service import wathq_external_service
 from app.schemas.wathq_external_data import (
     WathqServiceRequest,
@@ -25,11 +26,18 @@ tenant_router = APIRouter()
 management_router = APIRouter()
 
 
+def set_cache_status_header(response: Response, result: dict) -> None:
+    """Expose how a service result was served: fresh, stale, negative or miss."""
+    if result.get("cache_status"):
+        response.headers["X-Cache-Status"] = result["cache_status"]
+
+
 # ============== TENANT USER ENDPOINTS ==============
 
 @tenant_router.post("/call", response_model=WathqServiceResponse)
 async def call_wathq_service_tenant(
     *,
+    response: Response,
     db: Session = Depends(deps.get_db),
     request: WathqServiceRequest,
     current_user: models.User = Depends(deps.get_current_active_user),
@@ -77,6 +85,7 @@ async def call_wathq_service_tenant(
         params=request.params,
         force_refresh=request.force_refresh
     )
+    set_cache_status_header(response, result)
     
     return result
 
@@ -91,11 +100,14 @@ async def call_bulk_wathq_services_tenant(
     """
     Call multiple WATHQ services at once (for tenant users).
     """
-    # Validate all services first
+    # Resolve all services in one query, then validate them
+    slugs = {service_request.service_slug for service_request in request.services}
+    services = {
+        service.slug: service
+        for service in db.query(models.Service).filter(models.Service.slug.in_(slugs)).all()
+    }
     for service_request in request.services:
-        service = db.query(models.Service).filter(
-            models.Service.slug == service_request.service_slug
-        ).first()
+        service = services.get(service_request.service_slug)
         
         if not service:
             raise HTTPException(
@@ -115,7 +127,8 @@ async def call_bulk_wathq_services_tenant(
     result = await wathq_external_service.get_bulk_service_data(
         db=db,
         user=current_user,
-        service_requests=[r.dict() for r in request.services]
+        service_requests=[r.dict() for r in request.services],
+        services=services
     )
     
     return result
@@ -146,7 +159,7 @@ def get_my_cached_data(
 
 
 @tenant_router.delete("/cache")
-def clear_my_cache(
+async def clear_my_cache(
     *,
     db: Session = Depends(deps.get_db),
     service_id: Optional[UUID] = Query(None, description="Service ID to clear"),
@@ -155,7 +168,7 @@ def clear_my_cache(
     """
     Clear my cached WATHQ data (for tenant users).
     """
-    count = wathq_external_data.clear_user_cache(
+    count = await wathq_external_cache.clear_user(
         db=db,
         user_id=current_user.id,
         service_id=service_id
@@ -169,6 +182,7 @@ def clear_my_cache(
 @management_router.get("/call", response_model=WathqServiceResponse)
 async def call_wathq_service_management_get(
     *,
+    response: Response,
     db: Session = Depends(deps.get_db),
     service_slug: str = Query(..., description="Service slug to call"),
     tenant_id: Optional[int] = Query(None, description="Tenant ID for context"),
@@ -200,6 +214,7 @@ async def call_wathq_service_management_get(
             params={},
             force_refresh=force_refresh
         )
+        set_cache_status_header(response, result)
         
         return result
     except Exception as e:
@@ -215,6 +230,7 @@ async def call_wathq_service_management_get(
 @management_router.post("/call", response_model=WathqServiceResponse)
 async def call_wathq_service_management(
     *,
+    response: Response,
     db: Session = Depends(deps.get_db),
     request: WathqServiceRequest,
     tenant_id: Optional[int] = Query(None, description="Tenant ID for context"),
@@ -245,6 +261,7 @@ async def call_wathq_service_management(
             params=request.params,
             force_refresh=request.force_refresh
         )
+        set_cache_status_header(response, result)
         
         return result
     except Exception as e:
@@ -335,7 +352,7 @@ def get_cached_data_management(
 
 
 @management_router.delete("/cache")
-def clear_cache_management(
+async def clear_cache_management(
     *,
     db: Session = Depends(deps.get_db),
     tenant_id: Optional[int] = Query(None, description="Tenant ID to clear"),
@@ -349,11 +366,12 @@ def clear_cache_management(
     Can clear cache for any tenant/user or all expired entries.
     """
     if expired_only:
+        # Expired entries have already left the Redis tier (same TTL)
         count = wathq_external_data.clear_expired_cache(db=db)
         return {"message": f"Cleared {count} expired cache entries"}
     
     if user_id:
-        count = wathq_external_data.clear_user_cache(
+        count = await wathq_external_cache.clear_user(
             db=db,
             user_id=user_id,
             service_id=service_id
@@ -361,7 +379,7 @@ def clear_cache_management(
         return {"message": f"Cleared {count} cache entries for user {user_id}"}
     
     if tenant_id:
-        count = wathq_external_data.clear_tenant_cache(
+        count = await wathq_external_cache.clear_tenant(
             db=db,
             tenant_id=tenant_id,
             service_id=service_id
@@ -372,6 +390,7 @@ def clear_cache_management(
     count = db.query(models.wathq_external_data.WathqExternalData).count()
     db.query(models.wathq_external_data.WathqExternalData).delete()
     db.commit()
+    await wathq_external_cache.invalidate()
     
     return {"message": f"Cleared all {count} cache entries"}
 
@@ -428,5 +447,8 @@ def get_cache_statistics(
         "top_cached_services": [
             {"name": s.name, "slug": s.slug, "count": s.cache_count}
             for s in top_services
-        ]
+        ],
+        # This worker's hits per tier
+        "tiers": wathq_external_cache.stats(),
+        "cache_efficiency": wathq_external_service.cache_efficiency(db)
     }
@@ -13,6 +13,7 @@ from app.schemas.wathq_national_address import (
     AddressCreate,
     AddressUpdate,
 )
+from app.services.rendered_artifact_cache import rendered_artifact_cache
 
 router = APIRouter()
 
@@ -139,6 +140,7 @@ def update_address(
         )
     
     address_obj = address.update(db, db_obj=address_obj, obj_in=address_in)
+    rendered_artifact_cache.invalidate_record("national_address", [pk_address_id])
     return address_obj
 
 
@@ -158,3 +160,4 @@ def delete_address(
             detail="Address not found",
         )
     address.remove(db, id=pk_address_id)
+    rendered_artifact_cache.invalidate_record("national_address", [pk_address_id])
@@ -2,7 +2,7 @@
 WATHQ offline data API endpoints.
 """
 
-from typing import Any, List
+from typing import Any, List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api import deps
+from app.crud.crud_wathq_offline_data import IDENTIFIER_COLUMNS
 
 router = APIRouter()
 
@@ -52,7 +53,11 @@ def get_my_offline_data(
 
 @router.get("/search", response_model=List[schemas.WathqOfflineData])
 def search_offline_data(
-    url_pattern: str = Query(..., description="URL pattern to search for"),
+    url_pattern: Optional[str] = Query(None, description="URL pattern to search for"),
+    cr_number: Optional[str] = Query(None, description="Commercial registration number"),
+    cr_national_number: Optional[str] = Query(None, description="Unified national number (7xxxxxxxxx)"),
+    deed_number: Optional[str] = Query(None, description="Real estate deed number"),
+    poa_code: Optional[str] = Query(None, description="Power of attorney code"),
     db: Session = Depends(deps.get_db),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -61,11 +66,40 @@ def search_offline_data(
     ),
 ) -> Any:
     """
-    Search offline WATHQ data by URL pattern.
+    Search offline WATHQ data by business identifier or URL pattern.
+    Identifiers are matched exactly through their indexes and take precedence;
+    url_pattern is a substring scan, kept for anything else.
     Works for both tenant users and management users.
     """
+    identifiers = {
+        column: value
+        for column, value in {
+            "cr_number": cr_number,
+            "cr_national_number": cr_national_number,
+            "deed_number": deed_number,
+            "poa_code": poa_code,
+        }.items()
+        if value
+    }
+    is_management = isinstance(current_user, models.ManagementUser)
+
+    if identifiers:
+        return crud.wathq_offline_data.search_by_identifiers(
+            db=db,
+            identifiers=identifiers,
+            tenant_id=None if is_management else current_user.tenant_id,
+            management_user_id=current_user.id if is_management else None,
+            skip=skip,
+            limit=limit,
+        )
+
+    if not url_pattern:
+        raise HTTPException(
+            status_code=400, detail="Provide an identifier or url_pattern to search for"
+        )
+
     # Check if it's a management user
-    if isinstance(current_user, models.ManagementUser):
+    if is_management:
         # Search data fetched by this management user
         offline_data = (
             db.query(models.WathqOfflineData)
@@ -161,9 +195,11 @@ def get_offline_data_by_identifier(
 ) -> Any:
     """
     Get offline WATHQ data by flexible identifier.
-    identifier can be either a UUID (for specific record) or a service slug (e.g., 'commercial-registration').
+    identifier can be a UUID (for specific record), a service slug (e.g., 'commercial-registration')
+    or a business identifier (CR number, national number, deed number or POA code).
     - If UUID: returns single record if found
     - If service slug: returns list of records for that service
+    - Otherwise: returns list of records carrying that identifier (index lookup)
     Works for both tenant users and management users.
     """
 
@@ -201,7 +237,20 @@ def get_offline_data_by_identifier(
             db.query(models.Service).filter(models.Service.slug == identifier).first()
         )
         if not service:
-            raise HTTPException(status_code=404, detail="Service not found")
+            # Not a service either, treat as business identifier
+            is_management = isinstance(current_user, models.ManagementUser)
+            offline_data = crud.wathq_offline_data.search_by_identifiers(
+                db=db,
+                identifiers={column: identifier for column in IDENTIFIER_COLUMNS},
+                tenant_id=None if is_management else current_user.tenant_id,
+                management_user_id=current_user.id if is_management else None,
+                match_any=True,
+                skip=skip,
+                limit=limit,
+            )
+            if not offline_data:
+                raise HTTPException(status_code=404, detail="Offline data not found")
+            return offline_data
 
         service_id = service.id
 
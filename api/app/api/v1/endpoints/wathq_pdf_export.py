@@ -12,11 +12,26 @@ from app.api import deps
 from app.core.config import settings
 from app.core.wathq_utils import get_tenant_wathq_key_by_slug
 from app.models.wathq_pdf_data import WathqPDFData
+from app.services.pdf_render_pool import pdf_render_pool
+from app.services.rendered_artifact_cache import rendered_artifact_cache
 from app.services.wathq_pdf_service import pdf_service
 from app.wathq.commercial_registration.client import WathqClient
 
 router = APIRouter()
 
+# wkhtmltopdf options of the database record exports (part of the render cache key)
+DATABASE_PDF_OPTIONS = {
+    "page-size": "A4",
+    "margin-top": "0mm",
+    "margin-right": "0mm",
+    "margin-bottom": "0mm",
+    "margin-left": "0mm",
+    "encoding": "UTF-8",
+    "enable-local-file-access": None,
+    "print-media-type": None,
+    "orientation": "portrait",
+}
+
 
 def get_wathq_client_for_user(
     service_slug: str,
@@ -192,7 +207,7 @@ async def export_commercial_registration_pdf(
         else:
             template_name = template or "commercial_registration_pdf.html"
 
-        return pdf_service.generate_pdf_response(
+        return await pdf_service.generate_pdf_response_async(
             pdf_data, filename=filename, template_name=template_name
         )
 
@@ -215,7 +230,7 @@ async def create_custom_pdf(
     """
     try:
         filename = f"{pdf_data.document_title or 'document'}.pdf"
-        return pdf_service.generate_pdf_response(
+        return await pdf_service.generate_pdf_response_async(
             pdf_data, filename=filename, template_name=template
         )
     except Exception as e:
@@ -349,7 +364,6 @@ async def export_database_cr_pdf(
         from app.models.wathq_commercial_registration import CommercialRegistration
         from jinja2 import Template
         from datetime import datetime
-        import pdfkit
 
         # Fetch CR from database with all relationships
         cr = (
@@ -371,6 +385,24 @@ async def export_database_cr_pdf(
                 status_code=500, detail="Database CR template not found"
             )
 
+        cache_key = rendered_artifact_cache.make_key(
+            "pdf",
+            "commercial_registration",
+            cr_id,
+            cr,
+            template_path,
+            DATABASE_PDF_OPTIONS,
+        )
+        filename = f"commercial_registration_{cr.cr_number}_{cr_id}.pdf"
+        headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+        # Repeat exports of an unchanged record are served from the cache
+        pdf_bytes = await rendered_artifact_cache.get(cache_key)
+        if pdf_bytes is not None:
+            return Response(
+                content=pdf_bytes, media_type="application/pdf", headers=headers
+            )
+
         with open(template_path, "r", encoding="utf-8") as f:
             template_content = f.read()
 
@@ -514,26 +546,13 @@ async def export_database_cr_pdf(
         html_content = template.render(**template_data)
 
         # Generate PDF
-        pdf_options = {
-            "page-size": "A4",
-            "margin-top": "0mm",
-            "margin-right": "0mm",
-            "margin-bottom": "0mm",
-            "margin-left": "0mm",
-            "encoding": "UTF-8",
-            "enable-local-file-access": None,
-            "print-media-type": None,
-            "orientation": "portrait",
-        }
-
-        pdf_bytes = pdfkit.from_string(html_content, False, options=pdf_options)
-
-        filename = f"commercial_registration_{cr.cr_number}_{cr_id}.pdf"
+        pdf_bytes = await pdf_render_pool.render_wkhtmltopdf(
+            html_content, DATABASE_PDF_OPTIONS
+        )
+        await rendered_artifact_cache.put(cache_key, pdf_bytes)
 
         return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            content=pdf_bytes, media_type="application/pdf", headers=headers
         )
 
     except HTTPException:
@@ -580,6 +599,13 @@ async def preview_database_cr_html(
                 status_code=500, detail="Database CR template not found"
             )
 
+        cache_key = rendered_artifact_cache.make_key(
+            "html", "commercial_registration", cr_id, cr, template_path
+        )
+        cached = await rendered_artifact_cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="text/html")
+
         with open(template_path, "r", encoding="utf-8") as f:
             template_content = f.read()
 
@@ -706,6 +732,7 @@ async def preview_database_cr_html(
         }
 
         html_content = template.render(**template_data)
+        await rendered_artifact_cache.put(cache_key, html_content.encode("utf-8"))
 
         return Response(content=html_content, media_type="text/html")
 
@@ -731,7 +758,6 @@ async def export_database_corporate_contract_pdf(
         from jinja2 import Template
         from datetime import datetime as dt
         from sqlalchemy.orm import joinedload
-        import pdfkit
 
         # Fetch contract from database with all relationships using eager loading
         contract = (
@@ -765,6 +791,24 @@ async def export_database_corporate_contract_pdf(
                 status_code=500, detail="Corporate Contract template not found"
             )
 
+        cache_key = rendered_artifact_cache.make_key(
+            "pdf",
+            "corporate_contract",
+            contract_id,
+            contract,
+            template_path,
+            DATABASE_PDF_OPTIONS,
+        )
+        filename = f"corporate_contract_{contract.cr_number}_{contract_id}.pdf"
+        headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+        # Repeat exports of an unchanged record are served from the cache
+        pdf_bytes = await rendered_artifact_cache.get(cache_key)
+        if pdf_bytes is not None:
+            return Response(
+                content=pdf_bytes, media_type="application/pdf", headers=headers
+            )
+
         with open(template_path, "r", encoding="utf-8") as f:
             template_content = f.read()
 
@@ -915,26 +959,13 @@ async def export_database_corporate_contract_pdf(
         html_content = template.render(**template_data)
 
         # Generate PDF
-        pdf_options = {
-            "page-size": "A4",
-            "margin-top": "0mm",
-            "margin-right": "0mm",
-            "margin-bottom": "0mm",
-            "margin-left": "0mm",
-            "encoding": "UTF-8",
-            "enable-local-file-access": None,
-            "print-media-type": None,
-            "orientation": "portrait",
-        }
-
-        pdf_bytes = pdfkit.from_string(html_content, False, options=pdf_options)
-
-        filename = f"corporate_contract_{contract.cr_number}_{contract_id}.pdf"
+        pdf_bytes = await pdf_render_pool.render_wkhtmltopdf(
+            html_content, DATABASE_PDF_OPTIONS
+        )
+        await rendered_artifact_cache.put(cache_key, pdf_bytes)
 
         return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+            content=pdf_bytes, media_type="application/pdf", headers=headers
         )
 
     except HTTPException:
@@ -992,6 +1023,13 @@ async def preview_database_corporate_contract_html(
                 status_code=500, detail="Corporate Contract template not found"
             )
 
+        cache_key = rendered_artifact_cache.make_key(
+            "html", "corporate_contract", contract_id, contract, template_path
+        )
+        cached = await rendered_artifact_cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="text/html")
+
         with open(template_path, "r", encoding="utf-8") as f:
             template_content = f.read()
 
@@ -1150,6 +1188,7 @@ async def preview_database_corporate_contract_html(
 
         html_content = template.render(**template_data)
         html_content = html_content.replace("</body>", f"{export_script}</body>")
+        await rendered_artifact_cache.put(cache_key, html_content.encode("utf-8"))
 
         return Response(content=html_content, media_type="text/html")
 
@@ -1213,7 +1252,6 @@ async def export_database_employee_pdf(
         from jinja2 import Template
         from datetime import datetime as dt
         from sqlalchemy.orm import joinedload
-        import pdfkit
 
         # Fetch employee from database with employment details
         employee = (
@@ -1233,6 +1271,30 @@ async def export_database_employee_pdf(
         if not template_path.exists():
             raise HTTPException(status_code=500, detail="Employee template not found")
 
+        from urllib.parse import quote
+
+        cache_key = rendered_artifact_cache.make_key(
+            "pdf",
+            "employee",
+            employee_id,
+            employee,
+            template_path,
+            DATABASE_PDF_OPTIONS,
+        )
+        # Use only employee_id in filename to avoid encoding issues
+        filename = f"employee_{employee_id}.pdf"
+        encoded_filename = quote(filename)
+        headers = {
+            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
+        }
+
+        # Repeat exports of an unchanged record are served from the cache
+        pdf_bytes = await rendered_artifact_cache.get(cache_key)
+        if pdf_bytes is not None:
+            return Response(
+                content=pdf_bytes, media_type="application/pdf", headers=headers
+            )
+
         with open(template_path, "r", encoding="utf-8") as f:
             template_content = f.read()
 
@@ -1288,32 +1350,13 @@ async def export_database_employee_pdf(
         html_content = template.render(**template_data)
 
         # Generate PDF
-        pdf_options = {
-            "page-size": "A4",
-            "margin-top": "0mm",
-            "margin-right": "0mm",
-            "margin-bottom": "0mm",
-            "margin-left": "0mm",
-            "encoding": "UTF-8",
-            "enable-local-file-access": None,
-            "print-media-type": None,
-            "orientation": "portrait",
-        }
-
-        pdf_bytes = pdfkit.from_string(html_content, False, options=pdf_options)
-
-        # Use only employee_id in filename to avoid encoding issues
-        from urllib.parse import quote
-
-        filename = f"employee_{employee_id}.pdf"
-        encoded_filename = quote(filename)
+        pdf_bytes = await pdf_render_pool.render_wkhtmltopdf(
+            html_content, DATABASE_PDF_OPTIONS
+        )
+        await rendered_artifact_cache.put(cache_key, pdf_bytes)
 
         return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
-            },
+            content=pdf_bytes, media_type="application/pdf", headers=headers
         )
 
     except HTTPException:
@@ -1359,6 +1402,13 @@ async def preview_database_employee_html(
         if not template_path.exists():
             raise HTTPException(status_code=500, detail="Employee template not found")
 
+        cache_key = rendered_artifact_cache.make_key(
+            "html", "employee", employee_id, employee, template_path
+        )
+        cached = await rendered_artifact_cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="text/html")
+
         with open(template_path, "r", encoding="utf-8") as f:
             template_content = f.read()
 
@@ -1434,6 +1484,7 @@ async def preview_database_employee_html(
 
         html_content = template.render(**template_data)
         html_content = html_content.replace("</body>", f"{export_script}</body>")
+        await rendered_artifact_cache.put(cache_key, html_content.encode("utf-8"))
 
         return Response(content=html_content, media_type="text/html")
 
@@ -1826,7 +1877,6 @@ async def export_database_national_address_pdf(
         from jinja2 import Template
         from datetime import datetime as dt
         from urllib.parse import quote
-        import pdfkit
 
         address = db.query(Address).filter(Address.pk_address_id == address_id).first()
 
@@ -1843,6 +1893,27 @@ async def export_database_national_address_pdf(
                 status_code=500, detail="National address template not found"
             )
 
+        cache_key = rendered_artifact_cache.make_key(
+            "pdf",
+            "national_address",
+            address_id,
+            address,
+            template_path,
+            DATABASE_PDF_OPTIONS,
+        )
+        filename = f"national_address_{address_id}.pdf"
+        encoded_filename = quote(filename)
+        headers = {
+            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
+        }
+
+        # Repeat exports of an unchanged record are served from the cache
+        pdf_bytes = await rendered_artifact_cache.get(cache_key)
+        if pdf_bytes is not None:
+            return Response(
+                content=pdf_bytes, media_type="application/pdf", headers=headers
+            )
+
         with open(template_path, "r", encoding="utf-8") as f:
             template_content = f.read()
 
@@ -1885,29 +1956,13 @@ async def export_database_national_address_pdf(
 
         html_content = template.render(**template_data)
 
-        pdf_options = {
-            "page-size": "A4",
-            "margin-top": "0mm",
-            "margin-right": "0mm",
-            "margin-bottom": "0mm",
-            "margin-left": "0mm",
-            "encoding": "UTF-8",
-            "enable-local-file-access": None,
-            "print-media-type": None,
-            "orientation": "portrait",
-        }
-
-        pdf_bytes = pdfkit.from_string(html_content, False, options=pdf_options)
-
-        filename = f"national_address_{address_id}.pdf"
-        encoded_filename = quote(filename)
+        pdf_bytes = await pdf_render_pool.render_wkhtmltopdf(
+            html_content, DATABASE_PDF_OPTIONS
+        )
+        await rendered_artifact_cache.put(cache_key, pdf_bytes)
 
         return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
-            },
+            content=pdf_bytes, media_type="application/pdf", headers=headers
         )
 
     except HTTPException:
@@ -1947,6 +2002,13 @@ async def preview_database_national_address_html(
                 status_code=500, detail="National address template not found"
             )
 
+        cache_key = rendered_artifact_cache.make_key(
+            "html", "national_address", address_id, address, template_path
+        )
+        cached = await rendered_artifact_cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="text/html")
+
         with open(template_path, "r", encoding="utf-8") as f:
             template_content = f.read()
 
@@ -1988,6 +2050,7 @@ async def preview_database_national_address_html(
         }
 
         html_content = template.render(**template_data)
+        await rendered_artifact_cache.put(cache_key, html_content.encode("utf-8"))
 
         return Response(content=html_content, media_type="text/html")
 
@@ -2284,7 +2347,6 @@ async def export_database_real_estate_deed_pdf(
         from jinja2 import Template
         from datetime import datetime as dt
         from urllib.parse import quote
-        import pdfkit
 
         deed = db.query(Deed).filter(Deed.id == deed_id).first()
 
@@ -2301,6 +2363,27 @@ async def export_database_real_estate_deed_pdf(
                 status_code=500, detail="Real estate deed template not found"
             )
 
+        cache_key = rendered_artifact_cache.make_key(
+            "pdf",
+            "real_estate_deed",
+            deed_id,
+            deed,
+            template_path,
+            DATABASE_PDF_OPTIONS,
+        )
+        filename = f"real_estate_deed_{deed_id}.pdf"
+        encoded_filename = quote(filename)
+        headers = {
+            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
+        }
+
+        # Repeat exports of an unchanged record are served from the cache
+        pdf_bytes = await rendered_artifact_cache.get(cache_key)
+        if pdf_bytes is not None:
+            return Response(
+                content=pdf_bytes, media_type="application/pdf", headers=headers
+            )
+
         with open(template_path, "r", encoding="utf-8") as f:
             template_content = f.read()
 
@@ -2395,29 +2478,13 @@ async def export_database_real_estate_deed_pdf(
 
         html_content = template.render(**template_data)
 
-        pdf_options = {
-            "page-size": "A4",
-            "margin-top": "0mm",
-            "margin-right": "0mm",
-            "margin-bottom": "0mm",
-            "margin-left": "0mm",
-            "encoding": "UTF-8",
-            "enable-local-file-access": None,
-            "print-media-type": None,
-            "orientation": "portrait",
-        }
-
-        pdf_bytes = pdfkit.from_string(html_content, False, options=pdf_options)
-
-        filename = f"real_estate_deed_{deed_id}.pdf"
-        encoded_filename = quote(filename)
+        pdf_bytes = await pdf_render_pool.render_wkhtmltopdf(
+            html_content, DATABASE_PDF_OPTIONS
+        )
+        await rendered_artifact_cache.put(cache_key, pdf_bytes)
 
         return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
-            },
+            content=pdf_bytes, media_type="application/pdf", headers=headers
         )
 
     except HTTPException:
@@ -2457,6 +2524,13 @@ async def preview_database_real_estate_deed_html(
                 status_code=500, detail="Real estate deed template not found"
             )
 
+        cache_key = rendered_artifact_cache.make_key(
+            "html", "real_estate_deed", deed_id, deed, template_path
+        )
+        cached = await rendered_artifact_cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="text/html")
+
         with open(template_path, "r", encoding="utf-8") as f:
             template_content = f.read()
 
@@ -2550,6 +2624,7 @@ async def preview_database_real_estate_deed_html(
         }
 
         html_content = template.render(**template_data)
+        await rendered_artifact_cache.put(cache_key, html_content.encode("utf-8"))
 
         return Response(content=html_content, media_type="text/html")
 
@@ -2945,7 +3020,6 @@ async def export_database_poa_pdf(
         from jinja2 import Template
         from datetime import datetime as dt
         from urllib.parse import quote
-        import pdfkit
 
         poa = db.query(PowerOfAttorney).filter(PowerOfAttorney.id == poa_id).first()
 
@@ -2962,6 +3036,22 @@ async def export_database_poa_pdf(
                 status_code=500, detail="Power of attorney template not found"
             )
 
+        cache_key = rendered_artifact_cache.make_key(
+            "pdf", "power_of_attorney", poa_id, poa, template_path, DATABASE_PDF_OPTIONS
+        )
+        filename = f"power_of_attorney_{poa_id}.pdf"
+        encoded_filename = quote(filename)
+        headers = {
+            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
+        }
+
+        # Repeat exports of an unchanged record are served from the cache
+        pdf_bytes = await rendered_artifact_cache.get(cache_key)
+        if pdf_bytes is not None:
+            return Response(
+                content=pdf_bytes, media_type="application/pdf", headers=headers
+            )
+
         with open(template_path, "r", encoding="utf-8") as f:
             template_content = f.read()
 
@@ -3057,29 +3147,13 @@ async def export_database_poa_pdf(
 
         html_content = template.render(**template_data)
 
-        pdf_options = {
-            "page-size": "A4",
-            "margin-top": "0mm",
-            "margin-right": "0mm",
-            "margin-bottom": "0mm",
-            "margin-left": "0mm",
-            "encoding": "UTF-8",
-            "enable-local-file-access": None,
-            "print-media-type": None,
-            "orientation": "portrait",
-        }
-
-        pdf_bytes = pdfkit.from_string(html_content, False, options=pdf_options)
-
-        filename = f"power_of_attorney_{poa_id}.pdf"
-        encoded_filename = quote(filename)
+        pdf_bytes = await pdf_render_pool.render_wkhtmltopdf(
+            html_content, DATABASE_PDF_OPTIONS
+        )
+        await rendered_artifact_cache.put(cache_key, pdf_bytes)
 
         return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
-            },
+            content=pdf_bytes, media_type="application/pdf", headers=headers
         )
 
     except HTTPException:
@@ -3120,6 +3194,13 @@ async def preview_database_poa_html(
                 status_code=500, detail="Power of attorney template not found"
             )
 
+        cache_key = rendered_artifact_cache.make_key(
+            "html", "power_of_attorney", poa_id, poa, template_path
+        )
+        cached = await rendered_artifact_cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="text/html")
+
         with open(template_path, "r", encoding="utf-8") as f:
             template_content = f.read()
 
@@ -3214,6 +3295,7 @@ async def preview_database_poa_html(
         }
 
         html_content = template.render(**template_data)
+        await rendered_artifact_cache.put(cache_key, html_content.encode("utf-8"))
 
         return Response(content=html_content, media_type="text/html")
 
@@ -13,6 +13,7 @@ from app.schemas.wathq_power_of_attorney import (
     PowerOfAttorneyCreate,
     PowerOfAttorneyUpdate,
 )
+from app.services.rendered_artifact_cache import rendered_artifact_cache
 
 router = APIRouter()
 
@@ -114,6 +115,7 @@ def update_power_of_attorney(
             )
     
     poa = power_of_attorney.update(db, db_obj=poa, obj_in=poa_in)
+    rendered_artifact_cache.invalidate_record("power_of_attorney", [id])
     return poa
 
 
@@ -133,3 +135,4 @@ def delete_power_of_attorney(
             detail="Power of attorney not found",
         )
     power_of_attorney.remove(db, id=id)
+    rendered_artifact_cache.invalidate_record("power_of_attorney", [id])
@@ -13,6 +13,7 @@ from app.schemas.wathq_real_estate_deed import (
     DeedCreate,
     DeedUpdate,
 )
+from app.services.rendered_artifact_cache import rendered_artifact_cache
 
 router = APIRouter()
 
@@ -115,6 +116,7 @@ def update_deed(
         )
     
     deed_obj = deed.update(db, db_obj=deed_obj, obj_in=deed_in)
+    rendered_artifact_cache.invalidate_record("real_estate_deed", [id])
     return deed_obj
 
 
@@ -134,3 +136,4 @@ def delete_deed(
             detail="Deed not found",
         )
     deed.remove(db, id=id)
+    rendered_artifact_cache.invalidate_record("real_estate_deed", [id])
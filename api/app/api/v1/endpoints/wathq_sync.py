@@ -2,20 +2,72 @@
 WATHQ data sync endpoints - sync data from wathq_call_logs to structured tables.
 """
 
-from typing import Any, Dict, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.exc import SQLAlchemyError
 
 from app import models, schemas
 from app.api import deps
 from app.crud import crud_wathq_commercial_registration
+from app.services.cr_normalizer import cr_normalizer
+from app.services.wathq_sync_engine import SyncDataError, WathqSyncEngine
+from app.services.wathq_sync_job_service import wathq_sync_job_service
 
 router = APIRouter()
 
 
-@router.post("/commercial-registration/sync", response_model=Dict[str, Any])
+def _enqueue_sync(
+    db: Session,
+    service_slug: str,
+    full_resync: bool,
+    current_user: models.ManagementUser
+) -> Dict[str, Any]:
+    """Create a background sync job for one service and queue it on Celery."""
+    from app.celery_worker.tasks import run_wathq_sync_job
+
+    try:
+        # One job per service at a time: return the one already in progress
+        active = wathq_sync_job_service.get_active_job(db, service_slug)
+        job = active or wathq_sync_job_service.create_job(
+            db, service_slug, full_resync, current_user.id
+        )
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    if active is None:
+        run_wathq_sync_job.delay(str(job.id))
+
+    return {
+        "success": True,
+        "message": (
+            "A sync job for this service is already in progress"
+            if active is not None else "Sync job queued"
+        ),
+        "job": wathq_sync_job_service.to_dict(job, include_errors=False),
+    }
+
+
+def _response_data(
+    log: models.WathqCallLog, missing_message: str = "No data found in response_body"
+) -> Dict:
+    """Return the payload of a call log, unwrapping an optional "data" envelope."""
+    response_body = log.response_body
+    if not response_body or not isinstance(response_body, dict):
+        raise SyncDataError("Invalid response_body structure")
+
+    data = response_body.get("data", response_body)
+    if not data or not isinstance(data, dict):
+        raise SyncDataError(missing_message)
+    return data
+
+
+@router.post("/commercial-registration/sync", response_model=Dict[str, Any], status_code=202)
 def sync_commercial_registration_from_logs(
+    full_resync: bool = False,
     db: Session = Depends(deps.get_db),
     current_user: models.ManagementUser = Depends(deps.get_current_management_user),
 ) -> Any:
@@ -37,407 +89,54 @@ def sync_commercial_registration_from_logs(
     - cr_stocks
     - cr_estores
     - cr_liquidators
-    """
-
-    try:
-        # First, let's check what we have in the database
-        all_cr_logs = (
-            db.query(models.WathqCallLog)
-            .filter(models.WathqCallLog.service_slug == "commercial-registration")
-            .all()
-        )
-
-        print(f"Found {len(all_cr_logs)} commercial-registration logs in database")
-        for log in all_cr_logs[:5]:  # Print first 5 for debugging
-            print(f"  - endpoint: {log.endpoint}, status: {log.status_code}")
-
-        # Query wathq_call_logs with filters - match /fullinfo/* pattern
-        call_logs = (
-            db.query(models.WathqCallLog)
-            .filter(
-                and_(
-                    models.WathqCallLog.status_code == 200,
-                    models.WathqCallLog.service_slug == "commercial-registration",
-                    models.WathqCallLog.endpoint.like("/fullinfo/%"),
-                )
-            )
-            .all()
-        )
-
-        print(f"Found {len(call_logs)} logs matching /fullinfo/% pattern")
-    except Exception as e:
-        print(f"Error querying database: {str(e)}")
-        import traceback
-
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Database query error: {str(e)}")
-
-    if not call_logs:
-        # Try without the fullinfo filter to see what endpoints we have
-        any_success_logs = (
-            db.query(models.WathqCallLog)
-            .filter(
-                and_(
-                    models.WathqCallLog.status_code == 200,
-                    models.WathqCallLog.service_slug == "commercial-registration",
-                )
-            )
-            .limit(10)
-            .all()
-        )
-
-        endpoints_found = [log.endpoint for log in any_success_logs]
-
-        return {
-            "success": True,
-            "message": f"No call logs found matching criteria. Found {len(all_cr_logs)} CR logs total, but none with endpoint like 'fullinfo/%'. Endpoints found: {endpoints_found}",
-            "synced_count": 0,
-            "total_logs": 0,
-            "errors": [],
-        }
-
-    synced_count = 0
-    errors = []
-
-    for log in call_logs:
-        # Use a savepoint for each record so errors don't abort the whole transaction
-        savepoint = db.begin_nested()
-
-        try:
-            print(f"Processing log {log.id}...")
-            response_body = log.response_body
-
-            # Check if response has the expected structure
-            if not response_body or not isinstance(response_body, dict):
-                error_msg = "Invalid response_body structure"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            # Extract CR data from response_body
-            # The structure might be: {"data": {...}} or direct data
-            cr_data = response_body.get("data", response_body)
-
-            if not cr_data or not isinstance(cr_data, dict):
-                error_msg = "No data found in response_body"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            # Extract cr_number
-            cr_number = cr_data.get("crNumber") or cr_data.get("cr_number")
-            if not cr_number:
-                error_msg = "No cr_number found in data"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            print(f"  Processing CR: {cr_number}")
-
-            # Always create new records to maintain historical data
-            # Check if we already synced this specific log by log_id
-            existing_cr = (
-                db.query(models.CommercialRegistration)
-                .filter(models.CommercialRegistration.log_id == log.id)
-                .first()
-            )
-
-            if existing_cr:
-                print(f"  Skipping CR {cr_number} - already synced from log {log.id}")
-                savepoint.commit()
-                continue
-
-            print(
-                f"  Creating new historical record for CR: {cr_number} from log {log.id}"
-            )
-            # Always create new record to maintain history
-            _create_commercial_registration(db, cr_data, log)
-
-            # Commit the savepoint
-            savepoint.commit()
-            synced_count += 1
-            print(f"  Successfully synced CR: {cr_number}")
-
-        except Exception as e:
-            error_msg = f"{type(e).__name__}: {str(e)}"
-            print(f"  Error processing log {log.id}: {error_msg}")
-            import traceback
-
-            traceback.print_exc()
-            errors.append({"log_id": str(log.id), "error": error_msg})
-            # Rollback this record's changes
-            savepoint.rollback()
-            continue
-
-    try:
-        db.commit()
-        print(f"Successfully committed {synced_count} records")
-    except Exception as e:
-        print(f"Error committing to database: {str(e)}")
-        import traceback
-
-        traceback.print_exc()
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Database commit error: {str(e)}")
-
-    return {
-        "success": True,
-        "message": f"Synced {synced_count} records from {len(call_logs)} call logs",
-        "synced_count": synced_count,
-        "total_logs": len(call_logs),
-        "errors": errors,
-    }
-
-
-def _create_commercial_registration(
-    db: Session, cr_data: Dict, log: models.WathqCallLog
-) -> models.CommercialRegistration:
-    """Create a new commercial registration record with all related data."""
-
-    # Extract nested objects
-    entity_type = cr_data.get("entityType", {}) or {}
-    status = cr_data.get("status", {}) or {}
-    contact_info = cr_data.get("contactInfo", {}) or {}
-    fiscal_year = cr_data.get("fiscalYear", {}) or {}
-    management = cr_data.get("management", {}) or {}
-
-    # Create main CR record
-    cr = models.CommercialRegistration(
-        log_id=log.id,  # Link to the source call log
-        cr_number=cr_data.get("crNumber") or cr_data.get("cr_number"),
-        cr_national_number=cr_data.get("crNationalNumber"),
-        version_no=cr_data.get("versionNo"),
-        fetched_at=log.fetched_at,  # Track when this data was fetched
-        name=cr_data.get("name"),
-        name_lang_id=cr_data.get("nameLangId"),
-        name_lang_desc=cr_data.get("nameLangDesc"),
-        cr_capital=cr_data.get("crCapital"),
-        company_duration=cr_data.get("companyDuration"),
-        is_main=cr_data.get("isMain"),
-        issue_date_gregorian=cr_data.get("issueDateGregorian"),
-        issue_date_hijri=cr_data.get("issueDateHijri"),
-        main_cr_national_number=cr_data.get("mainCrNationalNumber"),
-        main_cr_number=cr_data.get("mainCrNumber"),
-        in_liquidation_process=cr_data.get("inLiquidationProcess"),
-        has_ecommerce=cr_data.get("hasEcommerce"),
-        headquarter_city_id=cr_data.get("headquarterCityId"),
-        headquarter_city_name=cr_data.get("headquarterCityName"),
-        is_license_based=cr_data.get("isLicenseBased"),
-        license_issuer_national_number=cr_data.get("licenseIssuerNationalNumber"),
-        license_issuer_name=cr_data.get("licenseIssuerName"),
-        partners_nationality_id=cr_data.get("partnersNationalityId"),
-        partners_nationality_name=cr_data.get("partnersNationalityName"),
-        # Extract from entityType object
-        entity_type_id=entity_type.get("id"),
-        entity_type_name=entity_type.get("name"),
-        entity_form_id=entity_type.get("formId"),
-        entity_form_name=entity_type.get("formName"),
-        # Extract from status object
-        status_id=status.get("id"),
-        status_name=status.get("name"),
-        confirmation_date_gregorian=(
-            status.get("confirmationDate", {}).get("gregorian")
-            if status.get("confirmationDate")
-            else None
-        ),
-        confirmation_date_hijri=(
-            status.get("confirmationDate", {}).get("hijri")
-            if status.get("confirmationDate")
-            else None
-        ),
-        reactivation_date_gregorian=(
-            status.get("reactivationDate", {}).get("gregorian")
-            if status.get("reactivationDate")
-            else None
-        ),
-        reactivation_date_hijri=(
-            status.get("reactivationDate", {}).get("hijri")
-            if status.get("reactivationDate")
-            else None
-        ),
-        suspension_date_gregorian=(
-            status.get("suspensionDate", {}).get("gregorian")
-            if status.get("suspensionDate")
-            else None
-        ),
-        suspension_date_hijri=(
-            status.get("suspensionDate", {}).get("hijri")
-            if status.get("suspensionDate")
-            else None
-        ),
-        deletion_date_gregorian=(
-            status.get("deletionDate", {}).get("gregorian")
-            if status.get("deletionDate")
-            else None
-        ),
-        deletion_date_hijri=(
-            status.get("deletionDate", {}).get("hijri")
-            if status.get("deletionDate")
-            else None
-        ),
-        # Extract from contactInfo object
-        contact_phone=contact_info.get("phoneNo"),
-        contact_mobile=contact_info.get("mobileNo"),
-        contact_email=contact_info.get("email"),
-        contact_website=contact_info.get("websiteUrl"),
-        # Extract from fiscalYear object
-        fiscal_is_first=fiscal_year.get("isFirst"),
-        fiscal_calendar_type_id=fiscal_year.get("calendarTypeId"),
-        fiscal_calendar_type_name=fiscal_year.get("calendarTypeName"),
-        fiscal_end_month=fiscal_year.get("endMonth"),
-        fiscal_end_day=fiscal_year.get("endDay"),
-        fiscal_end_year=fiscal_year.get("endYear"),
-        # Extract from management object
-        mgmt_structure_id=management.get("structureId"),
-        mgmt_structure_name=management.get("structureName"),
-        request_body=log.request_data,
-    )
-
-    db.add(cr)
-    db.flush()  # Get the ID
-
-    # Create related records
-    _create_capital_info(db, cr.id, cr_data.get("capitalInfo"))
-    _create_activities(db, cr.id, cr_data.get("activities", []))
-    _create_parties(db, cr.id, cr_data.get("parties", []))
-    _create_managers(db, cr.id, cr_data.get("managers", []))
-    _create_entity_characters(db, cr.id, cr_data.get("entityCharacters", []))
-    _create_stocks(db, cr.id, cr_data.get("stocks", []))
-    _create_estores(db, cr.id, cr_data.get("estores", []))
-    _create_liquidators(db, cr.id, cr_data.get("liquidators", []))
 
-    return cr
+    Each chunk of logs is written with one multi-row INSERT per table; a
+    chunk that fails is retried log by log.
 
+    Only logs newer than the service's sync watermark are read; pass
+    full_resync=true to rescan the whole history (already synced logs are
+    still skipped).
 
-def _create_capital_info(db: Session, cr_id: int, capital_data: Dict):
-    """Create capital info record."""
-    if not capital_data:
-        return
+    Runs as a background job; poll GET /jobs/{job_id} for progress.
+    """
+    return _enqueue_sync(db, "commercial-registration", full_resync, current_user)
 
-    capital = models.CapitalInfo(
-        cr_id=cr_id,
-        capital_amount=capital_data.get("capitalAmount"),
-        capital_currency_id=capital_data.get("capitalCurrencyId"),
-        capital_currency_name=capital_data.get("capitalCurrencyName"),
-        paid_amount=capital_data.get("paidAmount"),
-        remaining_amount=capital_data.get("remainingAmount"),
-    )
-    db.add(capital)
 
+def _commercial_registration_data(log: models.WathqCallLog) -> Dict:
+    """Validate and return the /fullinfo payload of a call log."""
+    cr_data = _response_data(log)
 
-def _create_activities(db: Session, cr_id: int, activities: List[Dict]):
-    """Create activity records."""
-    for activity_data in activities:
-        activity = models.CRActivity(
-            cr_id=cr_id,
-            activity_id=activity_data.get("activityId"),
-            activity_name=activity_data.get("activityName"),
-            is_main=activity_data.get("isMain"),
-        )
-        db.add(activity)
+    cr_number = cr_data.get("crNumber") or cr_data.get("cr_number")
+    if not cr_number:
+        raise SyncDataError("No cr_number found in data")
+    return cr_data
 
 
-def _create_parties(db: Session, cr_id: int, parties: List[Dict]):
-    """Create party records."""
-    for party_data in parties:
-        party = models.CRParty(
-            cr_id=cr_id,
-            cr_number=party_data.get("crNumber"),
-            name=party_data.get("name"),
-            type_id=party_data.get("typeId"),
-            type_name=party_data.get("typeName"),
-            identity_id=party_data.get("identityId"),
-            identity_type_id=party_data.get("identityTypeId"),
-            identity_type_name=party_data.get("identityTypeName"),
-            share_cash_count=party_data.get("shareCashCount"),
-            share_in_kind_count=party_data.get("shareInKindCount"),
-            share_total_count=party_data.get("shareTotalCount"),
-        )
-        db.add(party)
+def _sync_commercial_registration_log(db: Session, log: models.WathqCallLog) -> None:
+    """Map one /fullinfo call log into the CR tables."""
+    # Always create a new record to maintain history
+    cr_normalizer.write_batch(db, [(log, _commercial_registration_data(log))])
 
 
-def _create_managers(db: Session, cr_id: int, managers: List[Dict]):
-    """Create manager records."""
-    for manager_data in managers:
-        manager = models.CRManager(
-            cr_id=cr_id,
-            cr_number=manager_data.get("crNumber"),
-            name=manager_data.get("name"),
-            type_id=manager_data.get("typeId"),
-            type_name=manager_data.get("typeName"),
-            is_licensed=manager_data.get("isLicensed"),
-            identity_id=manager_data.get("identityId"),
-            identity_type_id=manager_data.get("identityTypeId"),
-            identity_type_name=manager_data.get("identityTypeName"),
-            nationality_id=manager_data.get("nationalityId"),
-            nationality_name=manager_data.get("nationalityName"),
-        )
-        db.add(manager)
-
-
-def _create_entity_characters(db: Session, cr_id: int, characters: List[Dict]):
-    """Create entity character records."""
-    for char_data in characters:
-        character = models.CREntityCharacter(
-            cr_id=cr_id,
-            cr_number=char_data.get("crNumber"),
-            character_id=char_data.get("id"),
-            character_name=char_data.get("name"),
-        )
-        db.add(character)
-
-
-def _create_stocks(db: Session, cr_id: int, stocks: List[Dict]):
-    """Create stock records."""
-    for stock_data in stocks:
-        stock = models.CRStock(
-            cr_id=cr_id,
-            cr_number=stock_data.get("crNumber"),
-            type_id=stock_data.get("typeId"),
-            type_name=stock_data.get("typeName"),
-            count=stock_data.get("count"),
-            value=stock_data.get("value"),
-        )
-        db.add(stock)
+def _sync_commercial_registration_batch(
+    db: Session, logs: List[models.WathqCallLog]
+) -> List[Dict[str, str]]:
+    """Map a chunk of /fullinfo call logs into the CR tables in bulk."""
+    items = []
+    errors = []
+    for log in logs:
+        try:
+            items.append((log, _commercial_registration_data(log)))
+        except SyncDataError as e:
+            errors.append({"log_id": str(log.id), "error": str(e)})
 
+    cr_normalizer.write_batch(db, items)
+    return errors
 
-def _create_estores(db: Session, cr_id: int, estores: List[Dict]):
-    """Create estore records."""
-    for estore_data in estores:
-        estore = models.CREstore(
-            cr_id=cr_id,
-            cr_number=estore_data.get("crNumber"),
-            name=estore_data.get("name"),
-            url=estore_data.get("url"),
-            type_id=estore_data.get("typeId"),
-            type_name=estore_data.get("typeName"),
-        )
-        db.add(estore)
-
-
-def _create_liquidators(db: Session, cr_id: int, liquidators: List[Dict]):
-    """Create liquidator records."""
-    for liquidator_data in liquidators:
-        liquidator = models.CRLiquidator(
-            cr_id=cr_id,
-            cr_number=liquidator_data.get("crNumber"),
-            name=liquidator_data.get("name"),
-            type_id=liquidator_data.get("typeId"),
-            type_name=liquidator_data.get("typeName"),
-            identity_id=liquidator_data.get("identityId"),
-            identity_type_id=liquidator_data.get("identityTypeId"),
-            identity_type_name=liquidator_data.get("identityTypeName"),
-            nationality_id=liquidator_data.get("nationalityId"),
-            nationality_name=liquidator_data.get("nationalityName"),
-        )
-        db.add(liquidator)
 
-
-@router.post("/corporate-contract/sync", response_model=Dict[str, Any])
+@router.post("/corporate-contract/sync", response_model=Dict[str, Any], status_code=202)
 def sync_corporate_contract_from_logs(
+    full_resync: bool = False,
     db: Session = Depends(deps.get_db),
     current_user: models.ManagementUser = Depends(deps.get_current_management_user),
 ) -> Any:
@@ -459,164 +158,37 @@ def sync_corporate_contract_from_logs(
     - contract_articles
     - contract_decisions
     - notification_channels
-    """
-
-    try:
-        # Query wathq_call_logs with filters - match /info/* pattern
-        call_logs = (
-            db.query(models.WathqCallLog)
-            .filter(
-                and_(
-                    models.WathqCallLog.status_code == 200,
-                    models.WathqCallLog.service_slug == "company-contract",
-                    models.WathqCallLog.endpoint.like("/info/%"),
-                )
-            )
-            .all()
-        )
-
-        print(
-            f"Found {len(call_logs)} logs matching /info/% pattern for company-contract"
-        )
-    except Exception as e:
-        print(f"Error querying database: {str(e)}")
-        import traceback
-
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Database query error: {str(e)}")
-
-    if not call_logs:
-        # Try without the info filter to see what endpoints we have
-        any_success_logs = (
-            db.query(models.WathqCallLog)
-            .filter(
-                and_(
-                    models.WathqCallLog.status_code == 200,
-                    models.WathqCallLog.service_slug == "company-contract",
-                )
-            )
-            .limit(10)
-            .all()
-        )
-
-        endpoints_found = [log.endpoint for log in any_success_logs]
-
-        return {
-            "success": True,
-            "message": f"No call logs found matching criteria. Endpoints found: {endpoints_found}",
-            "synced_count": 0,
-            "total_logs": 0,
-            "errors": [],
-        }
-
-    synced_count = 0
-    errors = []
-
-    for log in call_logs:
-        savepoint = db.begin_nested()
 
-        try:
-            print(f"Processing log {log.id}...")
-            response_body = log.response_body
-
-            if not response_body or not isinstance(response_body, dict):
-                error_msg = "Invalid response_body structure"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            # Extract contract data from response_body
-            contract_data = response_body.get("data", response_body)
-
-            if not contract_data or not isinstance(contract_data, dict):
-                error_msg = "No data found in response_body"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            # Extract contract identifier - WATHQ API uses contractCopyNumber and entity.crNationalNumber
-            # The data may be nested in 'entity' object or at root level
-            entity_data = contract_data.get("entity", {}) or {}
-
-            contract_copy_number = contract_data.get(
-                "contractCopyNumber"
-            ) or contract_data.get("contract_copy_number")
-            cr_national_number = (
-                entity_data.get("crNationalNumber")
-                or contract_data.get("crNationalNumber")
-                or contract_data.get("cr_national_number")
-            )
-
-            # Use cr_national_number as primary identifier, fall back to contract_copy_number
-            contract_identifier = cr_national_number or contract_copy_number
-            if not contract_identifier:
-                error_msg = (
-                    "No cr_national_number or contract_copy_number found in data"
-                )
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            print(
-                f"  Processing Contract: cr_national_number={cr_national_number}, copy_number={contract_copy_number}"
-            )
-
-            # Check if we already synced this specific log using log_id column
-            from app.models.wathq_corporate_contract import CorporateContract
-
-            existing_contract = (
-                db.query(CorporateContract)
-                .filter(CorporateContract.log_id == log.id)
-                .first()
-            )
-
-            if existing_contract:
-                print(
-                    f"  Skipping Contract {contract_identifier} - already synced from log {log.id}"
-                )
-                savepoint.commit()
-                continue
+    Only logs newer than the service's sync watermark are read; pass
+    full_resync=true to rescan the whole history (already synced logs are
+    still skipped).
 
-            print(
-                f"  Creating new record for Contract: {contract_identifier} from log {log.id}"
-            )
-            _create_corporate_contract(db, contract_data, log)
+    Runs as a background job; poll GET /jobs/{job_id} for progress.
+    """
+    return _enqueue_sync(db, "company-contract", full_resync, current_user)
 
-            savepoint.commit()
-            synced_count += 1
-            print(f"  Successfully synced Contract: {contract_identifier}")
 
-        except Exception as e:
-            error_msg = f"{type(e).__name__}: {str(e)}"
-            print(f"  Error processing log {log.id}: {error_msg}")
-            import traceback
+def _sync_corporate_contract_log(db: Session, log: models.WathqCallLog) -> None:
+    """Map one company-contract /info call log into the contract tables."""
+    contract_data = _response_data(log)
 
-            traceback.print_exc()
-            errors.append({"log_id": str(log.id), "error": error_msg})
-            savepoint.rollback()
-            continue
+    # Extract contract identifier - WATHQ API uses contractCopyNumber and entity.crNationalNumber
+    # The data may be nested in 'entity' object or at root level
+    entity_data = contract_data.get("entity", {}) or {}
 
-    try:
-        db.commit()
-        print(f"Successfully committed {synced_count} records")
-    except Exception as e:
-        print(f"Error committing to database: {str(e)}")
-        import traceback
+    contract_copy_number = contract_data.get(
+        "contractCopyNumber"
+    ) or contract_data.get("contract_copy_number")
+    cr_national_number = (
+        entity_data.get("crNationalNumber")
+        or contract_data.get("crNationalNumber")
+        or contract_data.get("cr_national_number")
+    )
 
-        traceback.print_exc()
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Database commit error: {str(e)}")
+    if not (cr_national_number or contract_copy_number):
+        raise SyncDataError("No cr_national_number or contract_copy_number found in data")
 
-    return {
-        "success": True,
-        "message": f"Synced {synced_count} records from {len(call_logs)} call logs",
-        "synced_count": synced_count,
-        "total_logs": len(call_logs),
-        "errors": errors,
-    }
+    _create_corporate_contract(db, contract_data, log)
 
 
 def _create_corporate_contract(
@@ -868,8 +440,9 @@ def _create_notification_channels(db: Session, contract_id: int, channels: List[
         db.add(channel)
 
 
-@router.post("/power-of-attorney/sync", response_model=Dict[str, Any])
+@router.post("/power-of-attorney/sync", response_model=Dict[str, Any], status_code=202)
 def sync_power_of_attorney_from_logs(
+    full_resync: bool = False,
     db: Session = Depends(deps.get_db),
     current_user: models.ManagementUser = Depends(deps.get_current_management_user),
 ) -> Any:
@@ -887,148 +460,30 @@ def sync_power_of_attorney_from_logs(
     - poa_principals
     - poa_agents
     - poa_text_list_items
-    """
-
-    try:
-        # Query wathq_call_logs with filters
-        call_logs = (
-            db.query(models.WathqCallLog)
-            .filter(
-                and_(
-                    models.WathqCallLog.status_code == 200,
-                    models.WathqCallLog.service_slug == "attorney-services",
-                    models.WathqCallLog.endpoint.like("/info/%"),
-                )
-            )
-            .all()
-        )
-
-        print(
-            f"Found {len(call_logs)} logs matching /info/% pattern for attorney-services"
-        )
-    except Exception as e:
-        print(f"Error querying database: {str(e)}")
-        import traceback
-
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Database query error: {str(e)}")
-
-    if not call_logs:
-        # Try without the info filter to see what endpoints we have
-        any_success_logs = (
-            db.query(models.WathqCallLog)
-            .filter(
-                and_(
-                    models.WathqCallLog.status_code == 200,
-                    models.WathqCallLog.service_slug == "attorney-services",
-                )
-            )
-            .limit(10)
-            .all()
-        )
-
-        endpoints_found = [log.endpoint for log in any_success_logs]
 
-        return {
-            "success": True,
-            "message": f"No call logs found matching criteria. Endpoints found: {endpoints_found}",
-            "synced_count": 0,
-            "total_logs": 0,
-            "errors": [],
-        }
+    Only logs newer than the service's sync watermark are read; pass
+    full_resync=true to rescan the whole history (already synced logs are
+    still skipped).
 
-    synced_count = 0
-    errors = []
-
-    for log in call_logs:
-        savepoint = db.begin_nested()
-
-        try:
-            print(f"Processing log {log.id}...")
-            response_body = log.response_body
-
-            if not response_body or not isinstance(response_body, dict):
-                error_msg = "Invalid response_body structure"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            # Extract POA data from response_body
-            poa_data = response_body.get("data", response_body)
-
-            if not poa_data or not isinstance(poa_data, dict):
-                error_msg = "No data found in response_body"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            # Extract POA code/number as identifier
-            # API response uses 'code' field
-            poa_code = (
-                poa_data.get("code")
-                or poa_data.get("attorneyNumber")
-                or poa_data.get("attorney_number")
-            )
-            if not poa_code:
-                error_msg = "No attorney code/number found in data"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            print(f"  Processing POA: {poa_code}")
-
-            # Check if we already synced this specific log using log_id column
-            from app.models.wathq_power_of_attorney import PowerOfAttorney
-
-            existing_poa = (
-                db.query(PowerOfAttorney)
-                .filter(PowerOfAttorney.log_id == log.id)
-                .first()
-            )
-
-            if existing_poa:
-                print(f"  Skipping POA {poa_code} - already synced from log {log.id}")
-                savepoint.commit()
-                continue
-
-            print(f"  Creating new record for POA: {poa_code} from log {log.id}")
-            _create_power_of_attorney(db, poa_data, log)
-
-            savepoint.commit()
-            synced_count += 1
-            print(f"  Successfully synced POA: {poa_code}")
-
-        except Exception as e:
-            error_msg = f"{type(e).__name__}: {str(e)}"
-            print(f"  Error processing log {log.id}: {error_msg}")
-            import traceback
+    Runs as a background job; poll GET /jobs/{job_id} for progress.
+    """
+    return _enqueue_sync(db, "attorney-services", full_resync, current_user)
 
-            traceback.print_exc()
-            errors.append({"log_id": str(log.id), "error": error_msg})
-            savepoint.rollback()
-            continue
 
-    try:
-        db.commit()
-        print(f"Successfully committed {synced_count} records")
-    except Exception as e:
-        print(f"Error committing to database: {str(e)}")
-        import traceback
+def _sync_power_of_attorney_log(db: Session, log: models.WathqCallLog) -> None:
+    """Map one attorney-services /info call log into the POA tables."""
+    poa_data = _response_data(log)
 
-        traceback.print_exc()
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Database commit error: {str(e)}")
+    # API response uses 'code' field
+    poa_code = (
+        poa_data.get("code")
+        or poa_data.get("attorneyNumber")
+        or poa_data.get("attorney_number")
+    )
+    if not poa_code:
+        raise SyncDataError("No attorney code/number found in data")
 
-    return {
-        "success": True,
-        "message": f"Synced {synced_count} records from {len(call_logs)} call logs",
-        "synced_count": synced_count,
-        "total_logs": len(call_logs),
-        "errors": errors,
-    }
+    _create_power_of_attorney(db, poa_data, log)
 
 
 def _create_power_of_attorney(db: Session, poa_data: Dict, log: models.WathqCallLog):
@@ -1173,8 +628,9 @@ def _create_poa_text_list_items(db: Session, poa_id: int, items: List[Dict]):
         db.add(item)
 
 
-@router.post("/real-estate/sync", response_model=Dict[str, Any])
+@router.post("/real-estate/sync", response_model=Dict[str, Any], status_code=202)
 def sync_real_estate_from_logs(
+    full_resync: bool = False,
     db: Session = Depends(deps.get_db),
     current_user: models.ManagementUser = Depends(deps.get_current_management_user),
 ) -> Any:
@@ -1190,147 +646,32 @@ def sync_real_estate_from_logs(
     - deeds
     - deed_owners
     - deed_real_estates
-    """
 
-    try:
-        # Query wathq_call_logs with filters
-        # API endpoint pattern is /deed/{cr_number}/{deed_number}/{copy_number}
-        call_logs = (
-            db.query(models.WathqCallLog)
-            .filter(
-                and_(
-                    models.WathqCallLog.status_code == 200,
-                    models.WathqCallLog.service_slug == "real-estate",
-                    models.WathqCallLog.endpoint.like("/deed/%"),
-                )
-            )
-            .all()
-        )
-
-        print(f"Found {len(call_logs)} logs matching /deed/% pattern for real-estate")
-    except Exception as e:
-        print(f"Error querying database: {str(e)}")
-        import traceback
-
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Database query error: {str(e)}")
-
-    if not call_logs:
-        # Try without the info filter to see what endpoints we have
-        any_success_logs = (
-            db.query(models.WathqCallLog)
-            .filter(
-                and_(
-                    models.WathqCallLog.status_code == 200,
-                    models.WathqCallLog.service_slug == "real-estate",
-                )
-            )
-            .limit(10)
-            .all()
-        )
-
-        endpoints_found = [log.endpoint for log in any_success_logs]
-
-        return {
-            "success": True,
-            "message": f"No call logs found matching criteria. Endpoints found: {endpoints_found}",
-            "synced_count": 0,
-            "total_logs": 0,
-            "errors": [],
-        }
-
-    synced_count = 0
-    errors = []
-
-    for log in call_logs:
-        savepoint = db.begin_nested()
-
-        try:
-            print(f"Processing log {log.id}...")
-            response_body = log.response_body
-
-            if not response_body or not isinstance(response_body, dict):
-                error_msg = "Invalid response_body structure"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            # Extract deed data from response_body
-            # API response structure has nested objects: deedDetails, courtDetails, deedInfo, etc.
-            deed_data = response_body.get("data", response_body)
-
-            if not deed_data or not isinstance(deed_data, dict):
-                error_msg = "No data found in response_body"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            # Extract deed identifier from nested deedDetails
-            deed_details = deed_data.get("deedDetails", {}) or {}
-            deed_number = (
-                deed_details.get("deedNumber")
-                or deed_details.get("deedSerial")
-                or deed_data.get("deedNumber")
-                or deed_data.get("deedSerial")
-            )
-            if not deed_number:
-                error_msg = "No deed number/serial found in data"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            print(f"  Processing Deed: {deed_number}")
-
-            # Check if we already synced this specific log using log_id column
-            from app.models.wathq_real_estate_deed import Deed
+    Only logs newer than the service's sync watermark are read; pass
+    full_resync=true to rescan the whole history (already synced logs are
+    still skipped).
 
-            existing_deed = db.query(Deed).filter(Deed.log_id == log.id).first()
-
-            if existing_deed:
-                print(
-                    f"  Skipping Deed {deed_number} - already synced from log {log.id}"
-                )
-                savepoint.commit()
-                continue
-
-            print(f"  Creating new record for Deed: {deed_number} from log {log.id}")
-            _create_deed(db, deed_data, log)
-
-            savepoint.commit()
-            synced_count += 1
-            print(f"  Successfully synced Deed: {deed_number}")
-
-        except Exception as e:
-            error_msg = f"{type(e).__name__}: {str(e)}"
-            print(f"  Error processing log {log.id}: {error_msg}")
-            import traceback
+    Runs as a background job; poll GET /jobs/{job_id} for progress.
+    """
+    return _enqueue_sync(db, "real-estate", full_resync, current_user)
 
-            traceback.print_exc()
-            errors.append({"log_id": str(log.id), "error": error_msg})
-            savepoint.rollback()
-            continue
 
-    try:
-        db.commit()
-        print(f"Successfully committed {synced_count} records")
-    except Exception as e:
-        print(f"Error committing to database: {str(e)}")
-        import traceback
+def _sync_deed_log(db: Session, log: models.WathqCallLog) -> None:
+    """Map one real-estate /deed call log into the deed tables."""
+    # API response structure has nested objects: deedDetails, courtDetails, deedInfo, etc.
+    deed_data = _response_data(log)
 
-        traceback.print_exc()
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Database commit error: {str(e)}")
+    deed_details = deed_data.get("deedDetails", {}) or {}
+    deed_number = (
+        deed_details.get("deedNumber")
+        or deed_details.get("deedSerial")
+        or deed_data.get("deedNumber")
+        or deed_data.get("deedSerial")
+    )
+    if not deed_number:
+        raise SyncDataError("No deed number/serial found in data")
 
-    return {
-        "success": True,
-        "message": f"Synced {synced_count} records from {len(call_logs)} call logs",
-        "synced_count": synced_count,
-        "total_logs": len(call_logs),
-        "errors": errors,
-    }
+    _create_deed(db, deed_data, log)
 
 
 def _create_deed(db: Session, deed_data: Dict, log: models.WathqCallLog):
@@ -1483,8 +824,9 @@ def _create_deed_real_estates(db: Session, deed_id: int, real_estates: List[Dict
         db.add(real_estate)
 
 
-@router.post("/national-address/sync", response_model=Dict[str, Any])
+@router.post("/national-address/sync", response_model=Dict[str, Any], status_code=202)
 def sync_national_address_from_logs(
+    full_resync: bool = False,
     db: Session = Depends(deps.get_db),
     current_user: models.ManagementUser = Depends(deps.get_current_management_user),
 ) -> Any:
@@ -1498,138 +840,46 @@ def sync_national_address_from_logs(
 
     Parses response_body and creates records in:
     - addresses
-    """
-
-    try:
-        # Query wathq_call_logs with filters
-        call_logs = (
-            db.query(models.WathqCallLog)
-            .filter(
-                and_(
-                    models.WathqCallLog.status_code == 200,
-                    models.WathqCallLog.service_slug == "national-address",
-                )
-            )
-            .all()
-        )
-
-        print(f"Found {len(call_logs)} logs for national-address")
-    except Exception as e:
-        print(f"Error querying database: {str(e)}")
-        import traceback
-
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Database query error: {str(e)}")
 
-    if not call_logs:
-        return {
-            "success": True,
-            "message": "No call logs found matching criteria",
-            "synced_count": 0,
-            "total_logs": 0,
-            "errors": [],
-        }
+    Only logs newer than the service's sync watermark are read; pass
+    full_resync=true to rescan the whole history (already synced logs are
+    still skipped).
 
-    synced_count = 0
-    errors = []
-
-    for log in call_logs:
-        savepoint = db.begin_nested()
-
-        try:
-            print(f"Processing log {log.id}...")
-            response_body = log.response_body
-
-            if not response_body:
-                error_msg = "Empty response_body"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            # Handle response_body being an array directly (API returns array of addresses)
-            if isinstance(response_body, list):
-                addresses_list = response_body
-            elif isinstance(response_body, dict):
-                # Extract address data from response_body
-                address_data = response_body.get("data", response_body)
-                # Handle case where data is a list of addresses
-                if isinstance(address_data, list):
-                    addresses_list = address_data
-                elif isinstance(address_data, dict):
-                    # Could be single address or have addresses nested
-                    addresses_list = address_data.get("addresses", [address_data])
-                else:
-                    error_msg = "No valid address data found in response_body"
-                    print(f"  Error: {error_msg}")
-                    errors.append({"log_id": str(log.id), "error": error_msg})
-                    savepoint.rollback()
-                    continue
-            else:
-                error_msg = "Invalid response_body structure"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            if not addresses_list:
-                error_msg = "Empty address data"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            # Check if we already synced this specific log using log_id column
-            from app.models.wathq_national_address import Address
-
-            existing_address = (
-                db.query(Address).filter(Address.log_id == log.id).first()
-            )
+    Runs as a background job; poll GET /jobs/{job_id} for progress.
+    """
+    return _enqueue_sync(db, "national-address", full_resync, current_user)
 
-            if existing_address:
-                print(f"  Skipping - already synced from log {log.id}")
-                savepoint.commit()
-                continue
 
-            # Create address records for each address in the response
-            for addr_data in addresses_list:
-                if isinstance(addr_data, dict):
-                    _create_address(db, addr_data, log)
+def _sync_national_address_log(db: Session, log: models.WathqCallLog) -> None:
+    """Map one national-address call log into address rows."""
+    response_body = log.response_body
 
-            savepoint.commit()
-            synced_count += 1
-            print(
-                f"  Successfully synced {len(addresses_list)} address(es) from log {log.id}"
-            )
+    if not response_body:
+        raise SyncDataError("Empty response_body")
 
-        except Exception as e:
-            error_msg = f"{type(e).__name__}: {str(e)}"
-            print(f"  Error processing log {log.id}: {error_msg}")
-            import traceback
+    # Handle response_body being an array directly (API returns array of addresses)
+    if isinstance(response_body, list):
+        addresses_list = response_body
+    elif isinstance(response_body, dict):
+        address_data = response_body.get("data", response_body)
+        # Handle case where data is a list of addresses
+        if isinstance(address_data, list):
+            addresses_list = address_data
+        elif isinstance(address_data, dict):
+            # Could be single address or have addresses nested
+            addresses_list = address_data.get("addresses", [address_data])
+        else:
+            raise SyncDataError("No valid address data found in response_body")
+    else:
+        raise SyncDataError("Invalid response_body structure")
 
-            traceback.print_exc()
-            errors.append({"log_id": str(log.id), "error": error_msg})
-            savepoint.rollback()
-            continue
+    if not addresses_list:
+        raise SyncDataError("Empty address data")
 
-    try:
-        db.commit()
-        print(f"Successfully committed {synced_count} records")
-    except Exception as e:
-        print(f"Error committing to database: {str(e)}")
-        import traceback
-
-        traceback.print_exc()
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Database commit error: {str(e)}")
-
-    return {
-        "success": True,
-        "message": f"Synced {synced_count} records from {len(call_logs)} call logs",
-        "synced_count": synced_count,
-        "total_logs": len(call_logs),
-        "errors": errors,
-    }
+    # Create address records for each address in the response
+    for addr_data in addresses_list:
+        if isinstance(addr_data, dict):
+            _create_address(db, addr_data, log)
 
 
 def _create_address(db: Session, addr_data: Dict, log: models.WathqCallLog):
@@ -1676,8 +926,9 @@ def _create_address(db: Session, addr_data: Dict, log: models.WathqCallLog):
     return address
 
 
-@router.post("/employee/sync", response_model=Dict[str, Any])
+@router.post("/employee/sync", response_model=Dict[str, Any], status_code=202)
 def sync_employee_from_logs(
+    full_resync: bool = False,
     db: Session = Depends(deps.get_db),
     current_user: models.ManagementUser = Depends(deps.get_current_management_user),
 ) -> Any:
@@ -1691,125 +942,25 @@ def sync_employee_from_logs(
     Parses response_body and creates records in:
     - employees
     - employment_details
-    """
-
-    try:
-        # Query wathq_call_logs with filters
-        call_logs = (
-            db.query(models.WathqCallLog)
-            .filter(
-                and_(
-                    models.WathqCallLog.status_code == 200,
-                    models.WathqCallLog.service_slug == "employee-verification",
-                )
-            )
-            .all()
-        )
-
-        print(f"Found {len(call_logs)} logs for employee-verification")
-    except Exception as e:
-        print(f"Error querying database: {str(e)}")
-        import traceback
 
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Database query error: {str(e)}")
-
-    if not call_logs:
-        return {
-            "success": True,
-            "message": "No call logs found matching criteria",
-            "synced_count": 0,
-            "total_logs": 0,
-            "errors": [],
-        }
-
-    synced_count = 0
-    errors = []
-
-    for log in call_logs:
-        savepoint = db.begin_nested()
-
-        try:
-            print(f"Processing log {log.id}...")
-            response_body = log.response_body
-
-            if not response_body or not isinstance(response_body, dict):
-                error_msg = "Invalid response_body structure"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            # Extract employee data from response_body
-            emp_data = response_body.get("data", response_body)
-
-            if not emp_data or not isinstance(emp_data, dict):
-                error_msg = "No valid employee data found in response_body"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            # Get employee identifier
-            emp_name = emp_data.get("name") or emp_data.get("employeeName")
-            if not emp_name:
-                error_msg = "No employee name found in data"
-                print(f"  Error: {error_msg}")
-                errors.append({"log_id": str(log.id), "error": error_msg})
-                savepoint.rollback()
-                continue
-
-            print(f"  Processing Employee: {emp_name}")
-
-            # Check if we already synced this specific log using log_id column
-            from app.models.wathq_employee import Employee
-
-            existing_employee = (
-                db.query(Employee).filter(Employee.log_id == log.id).first()
-            )
+    Only logs newer than the service's sync watermark are read; pass
+    full_resync=true to rescan the whole history (already synced logs are
+    still skipped).
 
-            if existing_employee:
-                print(
-                    f"  Skipping Employee {emp_name} - already synced from log {log.id}"
-                )
-                savepoint.commit()
-                continue
-
-            print(f"  Creating new record for Employee: {emp_name} from log {log.id}")
-            _create_employee(db, emp_data, log)
-
-            savepoint.commit()
-            synced_count += 1
-            print(f"  Successfully synced Employee: {emp_name}")
+    Runs as a background job; poll GET /jobs/{job_id} for progress.
+    """
+    return _enqueue_sync(db, "employee-verification", full_resync, current_user)
 
-        except Exception as e:
-            error_msg = f"{type(e).__name__}: {str(e)}"
-            print(f"  Error processing log {log.id}: {error_msg}")
-            import traceback
 
-            traceback.print_exc()
-            errors.append({"log_id": str(log.id), "error": error_msg})
-            savepoint.rollback()
-            continue
+def _sync_employee_log(db: Session, log: models.WathqCallLog) -> None:
+    """Map one employee-verification call log into the employee tables."""
+    emp_data = _response_data(log, "No valid employee data found in response_body")
 
-    try:
-        db.commit()
-        print(f"Successfully committed {synced_count} records")
-    except Exception as e:
-        print(f"Error committing to database: {str(e)}")
-        import traceback
+    emp_name = emp_data.get("name") or emp_data.get("employeeName")
+    if not emp_name:
+        raise SyncDataError("No employee name found in data")
 
-        traceback.print_exc()
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Database commit error: {str(e)}")
-
-    return {
-        "success": True,
-        "message": f"Synced {synced_count} records from {len(call_logs)} call logs",
-        "synced_count": synced_count,
-        "total_logs": len(call_logs),
-        "errors": errors,
-    }
+    _create_employee(db, emp_data, log)
 
 
 def _create_employee(db: Session, emp_data: Dict, log: models.WathqCallLog):
@@ -1866,3 +1017,82 @@ def _create_employee(db: Session, emp_data: Dict, log: models.WathqCallLog):
             db.add(detail)
 
     return employee
+
+
+def _sync_specs() -> Dict[str, Dict[str, Any]]:
+    """Sync engine arguments for every syncable WATHQ service, by service slug."""
+    from app.models.wathq_corporate_contract import CorporateContract
+    from app.models.wathq_employee import Employee
+    from app.models.wathq_national_address import Address
+    from app.models.wathq_power_of_attorney import PowerOfAttorney
+    from app.models.wathq_real_estate_deed import Deed
+
+    return {
+        "commercial-registration": {
+            "endpoint_pattern": "/fullinfo/%",
+            "target_model": models.CommercialRegistration,
+            "process_log": _sync_commercial_registration_log,
+            "process_batch": _sync_commercial_registration_batch,
+        },
+        "company-contract": {
+            "endpoint_pattern": "/info/%",
+            "target_model": CorporateContract,
+            "process_log": _sync_corporate_contract_log,
+        },
+        "attorney-services": {
+            "endpoint_pattern": "/info/%",
+            "target_model": PowerOfAttorney,
+            "process_log": _sync_power_of_attorney_log,
+        },
+        "real-estate": {
+            "endpoint_pattern": "/deed/%",
+            "target_model": Deed,
+            "process_log": _sync_deed_log,
+        },
+        "national-address": {
+            "target_model": Address,
+            "process_log": _sync_national_address_log,
+        },
+        "employee-verification": {
+            "target_model": Employee,
+            "process_log": _sync_employee_log,
+        },
+    }
+
+
+def build_sync_engine(db: Session, service_slug: str) -> WathqSyncEngine:
+    """Sync engine for one service (used by the background sync tasks)."""
+    spec = _sync_specs().get(service_slug)
+    if spec is None:
+        raise ValueError(f"Unknown sync service: {service_slug}")
+    return WathqSyncEngine(db, service_slug=service_slug, **spec)
+
+
+@router.get("/jobs", response_model=List[Dict[str, Any]])
+def list_sync_jobs(
+    service_slug: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(deps.get_db),
+    current_user: models.ManagementUser = Depends(deps.get_current_management_user),
+) -> Any:
+    """List recent sync jobs, newest first."""
+    jobs = wathq_sync_job_service.list_jobs(db, service_slug=service_slug, limit=limit)
+    return [wathq_sync_job_service.to_dict(job, include_errors=False) for job in jobs]
+
+
+@router.get("/jobs/{job_id}", response_model=Dict[str, Any])
+def get_sync_job(
+    job_id: UUID,
+    db: Session = Depends(deps.get_db),
+    current_user: models.ManagementUser = Depends(deps.get_current_management_user),
+) -> Any:
+    """
+    Status of a sync job: progress counts and per-log errors.
+
+    Progress is also pushed to the requesting management user over the
+    notifications WebSocket as {"type": "sync_progress", "data": {...}}.
+    """
+    job = wathq_sync_job_service.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Sync job not found")
+    return wathq_sync_job_service.to_dict(job)
@@ -36,6 +36,18 @@ celery_app.conf.update(
             "task": "app.celery_worker.tasks.send_pending_notifications",
             "schedule": 60.0,  # Every minute
         },
+        "rollup-request-counters": {
+            "task": "app.celery_worker.tasks.rollup_request_counters",
+            "schedule": 300.0,  # Every 5 minutes
+        },
+        "maintain-log-partitions": {
+            "task": "app.celery_worker.tasks.maintain_log_partitions",
+            "schedule": 86400.0,  # Daily
+        },
+        "refresh-reference-data": {
+            "task": "app.celery_worker.tasks.refresh_reference_data",
+            "schedule": settings.REFERENCE_DATA_REFRESH_INTERVAL,  # Daily
+        },
     },
 
     # Task routing
@@ -5,6 +5,7 @@ Celery tasks for WATHQ notifications system.
 import logging
 from datetime import datetime, timezone
 from typing import Optional
+from uuid import UUID
 
 from app.celery_worker.celery_app import celery_app
 from app.db.session import SessionLocal
@@ -235,3 +236,233 @@ def process_security_notification(
         user_id=user_id,
         management_user_id=management_user_id,
     ).id
+
+
+@celery_app.task
+def rollup_request_counters() -> int:
+    """
+    Roll raw API request counters into hourly and daily summaries.
+
+    Returns number of hours rolled up.
+    """
+    from app.services.request_rollup_service import request_rollup_service
+
+    db = SessionLocal()
+    try:
+        hours = request_rollup_service.roll_up(db)
+        if hours:
+            logger.info(f"Rolled up {hours} hours of API request counters")
+        return hours
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to roll up API request counters: {e}")
+        return 0
+    finally:
+        db.close()
+
+
+@celery_app.task
+def maintain_log_partitions() -> dict:
+    """
+    Create upcoming monthly log partitions and apply retention policies.
+
+    Returns a per-table summary.
+    """
+    from app.services.partition_maintenance_service import partition_maintenance_service
+
+    db = SessionLocal()
+    try:
+        summary = partition_maintenance_service.run_maintenance(db)
+        logger.info(f"Log partition maintenance: {summary}")
+        return summary
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to maintain log partitions: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+@celery_app.task
+def compress_wathq_payloads(batch_size: int = 500) -> dict:
+    """
+    Re-encode stored WATHQ payloads with the configured WATHQ_PAYLOAD_CODEC.
+
+    Returns a per-table summary.
+    """
+    from app.services.payload_compression_service import payload_compression_service
+
+    db = SessionLocal()
+    try:
+        summary = payload_compression_service.recompress_all(db, batch_size=batch_size)
+        logger.info(f"WATHQ payload compression: {summary}")
+        return summary
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to compress WATHQ payloads: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+@celery_app.task
+def refresh_reference_data() -> dict:
+    """
+    Re-fetch the WATHQ lookup lists and publish the changed ones to the
+    reference data snapshot the API workers follow.
+
+    Returns the outcome per lookup.
+    """
+    import asyncio
+
+    from app.core.wathq_transport import wathq_transport
+    from app.services.reference_data import reference_data
+
+    async def refresh(db) -> dict:
+        try:
+            return await reference_data.refresh(db)
+        finally:
+            # Pools are bound to this task's event loop
+            await wathq_transport.aclose()
+            await reference_data.aclose()
+
+    db = SessionLocal()
+    try:
+        outcome = asyncio.run(refresh(db))
+        changed = [name for name, result in outcome.items() if result == "changed"]
+        logger.info(f"Refreshed reference data: {len(changed)} lookups changed {changed}")
+        return outcome
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to refresh reference data: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+@celery_app.task
+def run_wathq_sync_job(job_id: str) -> dict:
+    """
+    Plan a WATHQ sync job and fan its chunks out to the workers.
+
+    The pending call logs are split into keyset ranges that are synced in
+    parallel by sync_wathq_log_chunk; finish_wathq_sync_job runs once all of
+    them are done. Returns the planned totals.
+    """
+    from celery import chord
+
+    from app.api.v1.endpoints.wathq_sync import build_sync_engine
+    from app.services.wathq_sync_engine import encode_log_key
+    from app.services.wathq_sync_job_service import wathq_sync_job_service
+
+    db = SessionLocal()
+    try:
+        job = wathq_sync_job_service.get_job(db, UUID(job_id))
+        if job is None:
+            logger.error(f"Sync job {job_id} not found")
+            return {}
+
+        if wathq_sync_job_service.get_active_job(db, job.service_slug, exclude_id=job.id):
+            wathq_sync_job_service.finish(
+                db, job.id, "failed", "Another sync job for this service is in progress"
+            )
+            return {}
+
+        engine = build_sync_engine(db, job.service_slug)
+        chunks, total = engine.plan_chunks(full_resync=job.full_resync)
+        wathq_sync_job_service.mark_running(db, job.id, total, len(chunks))
+
+        if not chunks:
+            wathq_sync_job_service.finish(db, job.id, "completed", "No new call logs to sync")
+            return {"total_logs": 0, "total_chunks": 0}
+
+        chord(
+            sync_wathq_log_chunk.s(
+                job_id, job.service_slug, encode_log_key(after), encode_log_key(upto), count
+            )
+            for after, upto, count in chunks
+        )(finish_wathq_sync_job.s(job_id, job.service_slug, encode_log_key(chunks[-1][1])))
+
+        logger.info(f"Sync job {job_id}: {total} {job.service_slug} logs in {len(chunks)} chunks")
+        return {"total_logs": total, "total_chunks": len(chunks)}
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to start sync job {job_id}: {e}")
+        wathq_sync_job_service.finish(db, UUID(job_id), "failed", f"Failed to start: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+@celery_app.task
+def sync_wathq_log_chunk(
+    job_id: str, service_slug: str, after: Optional[list], upto: list, count: int
+) -> dict:
+    """
+    Sync one keyset range of a job's call logs.
+
+    Never raises, so the job's chord always reaches its callback.
+    """
+    from app.api.v1.endpoints.wathq_sync import build_sync_engine
+    from app.services.wathq_sync_engine import decode_log_key
+    from app.services.wathq_sync_job_service import wathq_sync_job_service
+
+    db = SessionLocal()
+    try:
+        engine = build_sync_engine(db, service_slug)
+        result = engine.run_range(decode_log_key(after), decode_log_key(upto))
+        wathq_sync_job_service.record_chunk(db, UUID(job_id), count, result["synced"], result["errors"])
+        return {"failed": False, "synced": result["synced"]}
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Sync job {job_id}: chunk ending at {upto} failed: {e}")
+        wathq_sync_job_service.record_chunk(
+            db, UUID(job_id), count, 0, [{"log_id": None, "error": f"Chunk failed: {type(e).__name__}: {e}"}]
+        )
+        return {"failed": True, "synced": 0}
+    finally:
+        db.close()
+
+
+@celery_app.task
+def finish_wathq_sync_job(results: list, job_id: str, service_slug: str, watermark: list) -> str:
+    """
+    Complete a sync job once every chunk has run.
+
+    The watermark only moves when all chunks succeeded; otherwise the next
+    run rescans the range (logs already synced are skipped).
+    """
+    from app.api.v1.endpoints.wathq_sync import build_sync_engine
+    from app.services.wathq_sync_engine import decode_log_key
+    from app.services.wathq_sync_job_service import wathq_sync_job_service
+
+    failed = sum(1 for result in results if result.get("failed"))
+    synced = sum(result.get("synced", 0) for result in results)
+
+    db = SessionLocal()
+    try:
+        if failed:
+            status = "failed"
+            message = f"Synced {synced} records; {failed} of {len(results)} chunks failed"
+        else:
+            build_sync_engine(db, service_slug).advance_watermark(decode_log_key(watermark))
+            status = "completed"
+            message = f"Synced {synced} records in {len(results)} chunks"
+
+        wathq_sync_job_service.finish(db, UUID(job_id), status, message)
+        logger.info(f"Sync job {job_id} {status}: {message}")
+        return status
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to finish sync job {job_id}: {e}")
+        wathq_sync_job_service.finish(db, UUID(job_id), "failed", f"Failed to finish: {e}")
+        return "failed"
+    finally:
+        db.close()
@@ -2,13 +2,52 @@
 Redis caching utilities.
 """
 
-from aioredis import Redis
+import asyncio
+from typing import Dict, List
+
+import redis.asyncio as aredis
+
 from app.core.config import settings
 
-redis = Redis.from_url(settings.REDIS_URL)
+# One client per event loop: connections are bound to the loop that opened them
+_clients: Dict[int, aredis.Redis] = {}
+
+
+def get_redis() -> aredis.Redis:
+    """redis.asyncio client for the running event loop."""
+    loop_id = id(asyncio.get_running_loop())
+    client = _clients.get(loop_id)
+    if client is None:
+        client = aredis.Redis.from_url(settings.REDIS_URL)
+        _clients[loop_id] = client
+    return client
+
 
 async def get_cached(key: str):
-    return await redis.get(key)
+    return await get_redis().get(key)
+
 
 async def set_cached(key: str, value: str, ttl: int = 300):
-    await redis.setex(key, ttl, value)
\ No newline at end of file
+    await get_redis().setex(key, ttl, value)
+
+
+async def delete_cached(pattern: str) -> int:
+    """Delete every key matching a glob pattern (SCAN based, never blocks Redis)."""
+    redis = get_redis()
+    deleted = 0
+    batch = []
+    async for key in redis.scan_iter(match=pattern, count=500):
+        batch.append(key)
+        if len(batch) >= 500:
+            deleted += await redis.unlink(*batch)
+            batch = []
+    if batch:
+        deleted += await redis.unlink(*batch)
+    return deleted
+
+
+async def delete_keys(keys: List[str]) -> int:
+    """Delete the given keys."""
+    if not keys:
+        return 0
+    return await get_redis().unlink(*keys)
@@ -92,9 +92,30 @@ class Settings(BaseSettings):
     # Redis settings (for caching)
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+    # Request counter analytics (batched writer)
+    REQUEST_COUNTER_QUEUE_SIZE: int = 10000  # Rows buffered before new ones are dropped
+    REQUEST_COUNTER_BATCH_SIZE: int = 500
+    REQUEST_COUNTER_FLUSH_INTERVAL: float = 2.0  # seconds
+    REQUEST_ROLLUP_GRACE_SECONDS: int = 300  # Closed hours younger than this are not rolled up yet
+
+    # Partitioned log tables (wathq_call_logs, api_request_counters)
+    LOG_PARTITION_MONTHS_AHEAD: int = 3  # Monthly partitions created in advance
+    LOG_RETENTION_DAYS: int = 365  # Default for tenants without their own policy
+    LOG_RETENTION_ACTION: str = "detach"  # detach (keep as standalone table) or drop
+
     # Logging
     LOG_LEVEL: str = "DEBUG" if DEBUG else "INFO"
 
+    # WATHQ API file log (app/core/wathq_logger.py, written by a background thread)
+    WATHQ_LOG_LEVEL: str = "DEBUG" if DEBUG else "INFO"  # DEBUG adds the request/response payloads
+    WATHQ_LOG_FILE: str = "logs/wathq_api.log"
+    WATHQ_LOG_MAX_BYTES: int = 50 * 1024 * 1024  # Rotate (and gzip) past this size
+    WATHQ_LOG_BACKUP_COUNT: int = 10
+    WATHQ_LOG_QUEUE_SIZE: int = 10000  # Records buffered before new ones are dropped
+    WATHQ_LOG_MAX_BODY_CHARS: int = 1000  # Longer response bodies are logged as a preview
+    WATHQ_LOG_PAYLOAD_SAMPLE_RATE: float = 1.0  # Share of successful calls whose payloads are logged
+    WATHQ_LOG_PROPAGATE: bool = False  # Also pass records to the root handlers (stdout, app.log)
+
     # Email settings (for notifications)
     SMTP_TLS: bool = True
     SMTP_PORT: int | None = None
@@ -114,6 +135,106 @@ class Settings(BaseSettings):
     # Wathq API
     WATHQ_API_KEY: str = os.getenv("WATHQ_API_KEY", "PnxjlQkR1Rfx3qVoPWWUXJUzaNKxNIj6")
 
+    # Wathq HTTP transport (shared keep-alive pool)
+    WATHQ_HTTP_TIMEOUT: float = 30.0  # seconds
+    WATHQ_HTTP_CONNECT_TIMEOUT: float = 5.0  # seconds
+    WATHQ_HTTP_POOL_TIMEOUT: float = 5.0  # seconds to wait for a free connection
+    WATHQ_HTTP_MAX_CONNECTIONS: int = 100
+    WATHQ_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    WATHQ_HTTP_KEEPALIVE_EXPIRY: float = 60.0  # seconds
+    WATHQ_HTTP2: bool = True  # Used only when the optional h2 package is installed
+
+    # Coalescing of identical concurrent WATHQ calls (single flight)
+    WATHQ_SINGLE_FLIGHT_REDIS: bool = False  # Also coalesce across API workers (Redis lock)
+    WATHQ_SINGLE_FLIGHT_LOCK_TTL: float = 35.0  # seconds; longer than WATHQ_HTTP_TIMEOUT
+    WATHQ_SINGLE_FLIGHT_RESULT_TTL: float = 10.0  # seconds a leader's result stays readable
+    WATHQ_SINGLE_FLIGHT_POLL_INTERVAL: float = 0.05  # seconds between follower checks
+
+    # Per-service circuit breaker and adaptive concurrency limit
+    WATHQ_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures that open the circuit
+    WATHQ_BREAKER_OPEN_SECONDS: float = 30.0  # Fast-fail period before probing again
+    WATHQ_BREAKER_HALF_OPEN_PROBES: int = 1  # Calls let through while probing
+    WATHQ_LIMIT_INITIAL: int = 20  # Concurrent calls per service
+    WATHQ_LIMIT_MIN: int = 1
+    WATHQ_LIMIT_MAX: int = 100  # Matches WATHQ_HTTP_MAX_CONNECTIONS
+    WATHQ_LIMIT_LATENCY_TARGET: float = 5.0  # seconds; slower successes shrink the limit
+    WATHQ_LIMIT_QUEUE_TIMEOUT: float = 2.0  # seconds to wait for a slot before failing fast
+
+    # Per-API-key token-bucket quota (Redis, shared by all workers)
+    WATHQ_QUOTA_ENABLED: bool = True
+    WATHQ_QUOTA_KEY_RATE: float = 10.0  # Sustained calls per second per API key
+    WATHQ_QUOTA_KEY_BURST: int = 20  # Calls per API key allowed at once
+    WATHQ_QUOTA_TENANT_RATE: float = 3.0  # Sustained calls per second per tenant on the system key
+    WATHQ_QUOTA_TENANT_BURST: int = 10  # Calls per tenant on the system key allowed at once
+    # Per-tenant overrides of the two above, e.g. {7: {"rate": 10.0, "burst": 30}}; an
+    # overridden tenant is limited on its own API keys too
+    WATHQ_QUOTA_TENANT_LIMITS: dict[int, dict[str, float]] = {}
+    WATHQ_QUOTA_MAX_WAIT: float = 5.0  # seconds a call may queue for a token before failing
+
+    # Bulk WATHQ service calls (/wathq/.../bulk)
+    WATHQ_BULK_MAX_CONCURRENCY: int = 5  # External calls in flight per bulk request
+    WATHQ_BULK_CALL_TIMEOUT: float = 20.0  # seconds per external call
+
+    # WATHQ external data cache policy (seconds): fresh until soft_ttl, served
+    # stale while refreshing until hard_ttl; not-found answers kept negative_ttl
+    WATHQ_CACHE_DEFAULT_POLICY: dict[str, int] = {"soft_ttl": 3600, "hard_ttl": 86400, "negative_ttl": 300}
+    WATHQ_CACHE_POLICIES: dict[str, dict[str, int]] = {
+        "commercial-registration": {"soft_ttl": 3600, "hard_ttl": 86400, "negative_ttl": 600},
+        "national-address": {"soft_ttl": 86400, "hard_ttl": 604800, "negative_ttl": 600},
+        "real-estate": {"soft_ttl": 3600, "hard_ttl": 43200, "negative_ttl": 600},
+        "employee-verification": {"soft_ttl": 900, "hard_ttl": 3600, "negative_ttl": 120},
+    }
+    # Who shares a service's cache entries: "user", "tenant" or "api_key" (every caller on the same key)
+    WATHQ_CACHE_DEFAULT_SCOPE: str = "tenant"
+    WATHQ_CACHE_SCOPES: dict[str, str] = {
+        "national-address": "api_key",
+        "employee-verification": "user",  # personal data stays with whoever looked it up
+    }
+
+    # Commercial registration dossier (/commercial-registration/dossier)
+    WATHQ_DOSSIER_MAX_AGE: int = 3600  # seconds a logged sub-resource response is served as fresh
+
+    # WATHQ call log / offline data outbox (Redis stream, app/services/wathq_outbox.py)
+    WATHQ_OUTBOX_ENABLED: bool = True  # False: write call logs synchronously
+    WATHQ_OUTBOX_STREAM: str = "wathq:outbox"
+    WATHQ_OUTBOX_BATCH_SIZE: int = 200  # Entries per multi-row insert
+    WATHQ_OUTBOX_BLOCK_MS: int = 1000  # Consumer wait for new entries
+    WATHQ_OUTBOX_CLAIM_IDLE_MS: int = 60000  # Retry entries unacknowledged this long
+    WATHQ_OUTBOX_REDIS_TIMEOUT: float = 0.5  # seconds before append falls back to a direct write
+
+    # Memoized WATHQ service IDs and tenant API keys (app/core/wathq_metadata.py)
+    WATHQ_METADATA_TTL: int = 300  # seconds an entry is trusted without a broadcast
+    WATHQ_METADATA_CHANNEL: str = "wathq_metadata_invalidate"  # Redis pub/sub channel
+
+    # Compressed WATHQ payload columns (app/db/types.py CompressedJSON)
+    WATHQ_PAYLOAD_CODEC: str = "zstd"  # zstd (zlib when zstandard is not installed), zlib or none
+    WATHQ_PAYLOAD_COMPRESSION_LEVEL: int = 3  # zstd 1-22 / zlib 1-9
+    WATHQ_PAYLOAD_MIN_COMPRESS_BYTES: int = 256  # Smaller payloads are stored uncompressed
+
+    # WATHQ lookup lists (reference data)
+    REFERENCE_DATA_REFRESH_INTERVAL: float = 86400.0  # seconds between WATHQ refreshes (Celery beat)
+    REFERENCE_DATA_CHECK_INTERVAL: float = 60.0  # seconds between snapshot version checks per API worker
+
+    # Call log -> normalized table sync
+    WATHQ_SYNC_CHUNK_SIZE: int = 500  # Logs per keyset page / commit
+    WATHQ_SYNC_SETTLE_SECONDS: int = 30  # Leave very recent logs for the next run
+    WATHQ_SYNC_JOB_MAX_ERRORS: int = 1000  # Per-log errors kept on a sync job
+    WATHQ_SYNC_PROGRESS_CHANNEL: str = "wathq_sync_progress"  # Redis pub/sub channel
+
+    # PDF rendering pool
+    PDF_RENDER_WORKERS: int = int(os.getenv("PDF_RENDER_WORKERS", "2"))  # WeasyPrint processes per API worker
+    PDF_RENDER_MAX_CONCURRENCY: int = 4  # Renders in flight (WeasyPrint + wkhtmltopdf) per API worker
+    PDF_RENDER_MAX_TASKS_PER_WORKER: int = 200  # Recycle render processes to cap memory growth
+    PDF_RENDER_PRELOAD_URLS: list[str] = [
+        "https://fonts.googleapis.com/css2?family=Almarai:wght@300;400;700;800&display=swap",
+        "https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&family=Roboto:wght@300;400;500;700&display=swap",
+    ]
+
+    # Rendered PDF / HTML preview cache
+    RENDER_CACHE_DIR: str = os.getenv("RENDER_CACHE_DIR", "cache/renders")
+    RENDER_CACHE_MEMORY_MAX_BYTES: int = 64 * 1024 * 1024  # LRU tier, per API worker
+    RENDER_CACHE_DISK_MAX_BYTES: int = int(os.getenv("RENDER_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024)))
+
     # Sentry
     SENTRY_DSN: str = os.getenv("SENTRY_DSN", "")
 
@@ -1,32 +1,195 @@
 """
 Dedicated logging system for WATHQ external API calls.
 Tracks all external API requests to WATHQ services with detailed metrics.
+
+Records are handed to a bounded in-memory queue (QueueHandler) and written by
+a dedicated thread (QueueListener) to a size-rotated file whose rotated
+copies are gzip-compressed, so file I/O never runs on the event loop. The
+DEBUG payload records are built only when DEBUG is enabled for the logger,
+serialized (and their response body truncated) by the writer thread, and
+can be sampled per request with WATHQ_LOG_PAYLOAD_SAMPLE_RATE. When the
+queue is full, records are dropped and counted rather than blocking.
 """
 
-import logging
+import atexit
+import gzip
 import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import zlib
 from datetime import datetime
-from typing import Optional, Dict, Any
 from enum import Enum
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
 
 # Create WATHQ-specific logger
 wathq_logger = logging.getLogger("wathq_api")
-wathq_logger.setLevel(logging.DEBUG)
+wathq_logger.setLevel(getattr(logging, settings.WATHQ_LOG_LEVEL))
+wathq_logger.propagate = settings.WATHQ_LOG_PROPAGATE
+
+
+def _rotate_compressed(source: str, dest: str) -> None:
+    """Gzip a rotated log file (runs on the writer thread)."""
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+class _LazyPayload:
+    """Log message serialized to JSON only when the writer thread formats it."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+
+    def __str__(self) -> str:
+        data = self.data
+        body = data.get("response_body")
+        if body and isinstance(body, dict):
+            # Truncate large responses
+            body_str = json.dumps(body, default=str)
+            if len(body_str) > settings.WATHQ_LOG_MAX_BODY_CHARS:
+                data = {
+                    **data,
+                    "response_body": {
+                        "truncated": True,
+                        "size": len(body_str),
+                        "preview": body_str[:settings.WATHQ_LOG_MAX_BODY_CHARS // 2] + "...",
+                    },
+                }
+        return json.dumps(data, default=str)
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks nor formats on the calling thread."""
+
+    def __init__(self, pipeline: "WathqLogPipeline"):
+        super().__init__(pipeline.queue)
+        self.pipeline = pipeline
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The record stays in this process; message formatting (and payload
+        # serialization) is left to the writer thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.pipeline.ensure_started()
+        try:
+            self.pipeline.queue.put_nowait(record)
+        except queue.Full:
+            self.pipeline.dropped += 1
 
-# Create file handler for WATHQ logs
-wathq_handler = logging.FileHandler("logs/wathq_api.log")
-wathq_handler.setLevel(logging.DEBUG)
 
-# Create formatter
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-wathq_handler.setFormatter(formatter)
+class _BlockingStopListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # The writer is still draining, so waiting for room cannot deadlock
+        self.queue.put(self._sentinel)
+
+
+class WathqLogPipeline:
+    """The queue between wathq_logger and the file writer thread."""
+
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue(maxsize=settings.WATHQ_LOG_QUEUE_SIZE)
+        self._listener: Optional[QueueListener] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.dropped = 0
+        self.sampled_out = 0
+
+    def _file_handler(self) -> logging.Handler:
+        path = Path(settings.WATHQ_LOG_FILE)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=settings.WATHQ_LOG_MAX_BYTES,
+            backupCount=settings.WATHQ_LOG_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+        handler.namer = lambda name: f"{name}.gz"
+        handler.rotator = _rotate_compressed
+        handler.setFormatter(
+            logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S',
+                defaults={"request_id": "-"},
+            )
+        )
+        return handler
+
+    def ensure_started(self) -> None:
+        """Start the writer thread in this process (again after a fork)."""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked: the parent's thread and queue contents are not ours
+                self.queue = queue.Queue(maxsize=settings.WATHQ_LOG_QUEUE_SIZE)
+            self._listener = _BlockingStopListener(
+                self.queue, self._file_handler(), respect_handler_level=True
+            )
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def start(self) -> None:
+        """Start the writer thread now rather than on the first record."""
+        self.ensure_started()
+
+    def stop(self) -> None:
+        """Write out the queued records and stop the writer thread."""
+        with self._lock:
+            if self._listener is None or self._pid != os.getpid():
+                return
+            self._listener.stop()
+            for file_handler in self._listener.handlers:
+                file_handler.close()
+            self._listener = None
+            self._pid = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "writing": self._pid == os.getpid(),
+            "queued": self.queue.qsize(),
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+        }
+
+
+# Singleton instance
+wathq_log_pipeline = WathqLogPipeline()
 
 # Add handler to logger
 if not wathq_logger.handlers:
-    wathq_logger.addHandler(wathq_handler)
+    wathq_logger.addHandler(_DroppingQueueHandler(wathq_log_pipeline))
+atexit.register(wathq_log_pipeline.stop)
+
+
+def _log_payload(request_id: Optional[str], data: Dict[str, Any], sampled: bool = True) -> None:
+    """
+    Queue a DEBUG payload record, to be serialized by the writer thread.
+
+    ``sampled`` payloads are kept for WATHQ_LOG_PAYLOAD_SAMPLE_RATE of the
+    requests, decided per request id so a call's request and response
+    records are kept or dropped together.
+    """
+    rate = settings.WATHQ_LOG_PAYLOAD_SAMPLE_RATE
+    if sampled and rate < 1.0 and request_id is not None:
+        if zlib.crc32(request_id.encode()) >= rate * 2**32:
+            wathq_log_pipeline.sampled_out += 1
+            return
+    extra = {"request_id": request_id} if request_id is not None else None
+    wathq_logger.debug(_LazyPayload(data), extra=extra)
 
 
 class WathqRequestStatus(str, Enum):
@@ -71,6 +234,13 @@ class WathqAPILogger:
             params: Request parameters
             headers: Request headers (sensitive data redacted)
         """
+        wathq_logger.info(
+            "Outgoing request to %s/%s", service, endpoint,
+            extra={"request_id": request_id},
+        )
+        if not wathq_logger.isEnabledFor(logging.DEBUG):
+            return
+
         log_data = {
             "event": "wathq_request_sent",
             "request_id": request_id,
@@ -93,11 +263,7 @@ class WathqAPILogger:
             }
             log_data["headers"] = redacted_headers
 
-        wathq_logger.info(
-            f"Outgoing request to {service}/{endpoint}",
-            extra={"request_id": request_id},
-        )
-        wathq_logger.debug(json.dumps(log_data), extra={"request_id": request_id})
+        _log_payload(request_id, log_data)
 
     @staticmethod
     def log_response(
@@ -131,16 +297,28 @@ class WathqAPILogger:
             tenant_id: Tenant ID
             management_user_id: Management user ID
         """
-        # Truncate large responses
-        truncated_body = response_body
-        if response_body and isinstance(response_body, dict):
-            body_str = json.dumps(response_body)
-            if len(body_str) > 1000:
-                truncated_body = {
-                    "truncated": True,
-                    "size": len(body_str),
-                    "preview": body_str[:500] + "..."
-                }
+        # Log level based on status
+        if status == WathqRequestStatus.SUCCESS:
+            log_level = logging.INFO
+            message, args = "✓ %s/%s - %s (%sms)", (service, endpoint, status_code, response_time_ms)
+        elif status == WathqRequestStatus.UNAUTHORIZED:
+            log_level = logging.WARNING
+            message, args = "✗ %s/%s - 401 Unauthorized", (service, endpoint)
+        elif status == WathqRequestStatus.TIMEOUT:
+            log_level = logging.WARNING
+            message, args = "✗ %s/%s - Timeout after %sms", (service, endpoint, response_time_ms)
+        else:
+            log_level = logging.ERROR
+            message, args = "✗ %s/%s - %s %s", (service, endpoint, status_code, status.value)
+
+        wathq_logger.log(
+            log_level,
+            message,
+            *args,
+            extra={"request_id": request_id},
+        )
+        if not wathq_logger.isEnabledFor(logging.DEBUG):
+            return
 
         log_data = {
             "event": "wathq_response_received",
@@ -155,30 +333,12 @@ class WathqAPILogger:
             "tenant_id": tenant_id,
             "management_user_id": management_user_id,
             "error_message": error_message,
-            "response_body": truncated_body,
+            "response_body": response_body,  # Truncated when written
             "timestamp": datetime.utcnow().isoformat(),
         }
 
-        # Log level based on status
-        if status == WathqRequestStatus.SUCCESS:
-            log_level = logging.INFO
-            message = f"✓ {service}/{endpoint} - {status_code} ({response_time_ms}ms)"
-        elif status == WathqRequestStatus.UNAUTHORIZED:
-            log_level = logging.WARNING
-            message = f"✗ {service}/{endpoint} - 401 Unauthorized"
-        elif status == WathqRequestStatus.TIMEOUT:
-            log_level = logging.WARNING
-            message = f"✗ {service}/{endpoint} - Timeout after {response_time_ms}ms"
-        else:
-            log_level = logging.ERROR
-            message = f"✗ {service}/{endpoint} - {status_code} {status.value}"
-
-        wathq_logger.log(
-            log_level,
-            message,
-            extra={"request_id": request_id},
-        )
-        wathq_logger.debug(json.dumps(log_data), extra={"request_id": request_id})
+        # Failed calls are always kept
+        _log_payload(request_id, log_data, sampled=status == WathqRequestStatus.SUCCESS)
 
     @staticmethod
     def log_error(
@@ -204,6 +364,13 @@ class WathqAPILogger:
             tenant_id: Tenant ID
             management_user_id: Management user ID
         """
+        wathq_logger.error(
+            "Error in %s/%s: %s - %s", service, endpoint, error_type, error_message,
+            extra={"request_id": request_id},
+        )
+        if not wathq_logger.isEnabledFor(logging.DEBUG):
+            return
+
         log_data = {
             "event": "wathq_error",
             "request_id": request_id,
@@ -217,11 +384,7 @@ class WathqAPILogger:
             "timestamp": datetime.utcnow().isoformat(),
         }
 
-        wathq_logger.error(
-            f"Error in {service}/{endpoint}: {error_type} - {error_message}",
-            extra={"request_id": request_id},
-        )
-        wathq_logger.debug(json.dumps(log_data), extra={"request_id": request_id})
+        _log_payload(request_id, log_data, sampled=False)
 
     @staticmethod
     def log_performance_summary(
@@ -245,6 +408,13 @@ class WathqAPILogger:
         """
         success_rate = (successful_requests / total_requests * 100) if total_requests > 0 else 0
 
+        wathq_logger.info(
+            "Performance Summary - %s: %.1f%% success rate, avg %.0fms, %.2fMB transferred",
+            service, success_rate, avg_response_time_ms, total_data_transferred_mb,
+        )
+        if not wathq_logger.isEnabledFor(logging.DEBUG):
+            return
+
         log_data = {
             "event": "wathq_performance_summary",
             "service": service,
@@ -257,8 +427,4 @@ class WathqAPILogger:
             "timestamp": datetime.utcnow().isoformat(),
         }
 
-        wathq_logger.info(
-            f"Performance Summary - {service}: {success_rate:.1f}% success rate, "
-            f"avg {avg_response_time_ms:.0f}ms, {total_data_transferred_mb:.2f}MB transferred"
-        )
-        wathq_logger.debug(json.dumps(log_data))
+        _log_payload(None, log_data, sampled=False)
@@ -0,0 +1,234 @@
+"""
+In-process memo of WATHQ service metadata for the request hot path.
+
+Every WATHQ call needs the service ID for its slug and the tenant's API key
+for that service. Both live in the database and almost never change, so they
+are memoized per worker for WATHQ_METADATA_TTL seconds:
+
+- slug -> service ID and active flag;
+- (tenant, slug) -> service ID, API key and active/approved flags. A tenant
+  without its own assignment is memoized too, so system-key tenants stop
+  querying as well.
+
+Endpoints that change TenantService rows call ``invalidate``, which drops the
+local entries at once and broadcasts the change on a Redis pub/sub channel.
+API workers follow the channel with a small background listener; other
+processes (Celery workers, scripts) rely on the TTL alone.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.service import Service, TenantService
+
+logger = logging.getLogger(__name__)
+
+
+class WathqMetadataCache:
+    """TTL'd service IDs and tenant API keys by slug, shared by every route of a worker."""
+
+    _redis = None
+
+    def __init__(self, channel: str = settings.WATHQ_METADATA_CHANNEL):
+        self.channel = channel
+        # slug -> (expires at, {"service_id", "is_active"} or None)
+        self._services: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        # (tenant, slug) -> (expires at, {"service_id", "api_key", "is_active", "is_approved"} or None)
+        self._tenant_services: Dict[Tuple[int, str], Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def service(self, db: Session, service_slug: str) -> Optional[Dict[str, Any]]:
+        """``{"service_id", "is_active"}`` of a service, or None when there is no such slug."""
+        cached = self._services.get(service_slug)
+        if cached is not None and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        service = db.query(Service).filter(Service.slug == service_slug).first()
+        meta = {"service_id": service.id, "is_active": service.is_active} if service else None
+        self._services[service_slug] = (time.monotonic() + settings.WATHQ_METADATA_TTL, meta)
+        return meta
+
+    def tenant_service(
+        self, db: Session, tenant_id: int, service_slug: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        The tenant's assignment of a service, or None when it has none.
+
+        ``{"service_id", "api_key", "is_active", "is_approved"}``; callers
+        check the flags.
+        """
+        key = (tenant_id, service_slug)
+        cached = self._tenant_services.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        tenant_service = (
+            db.query(TenantService)
+            .join(Service)
+            .filter(
+                TenantService.tenant_id == tenant_id,
+                Service.slug == service_slug
+            )
+            # Prefer the usable row should a tenant have several
+            .order_by(TenantService.is_active.desc(), TenantService.is_approved.desc())
+            .first()
+        )
+        meta = None
+        if tenant_service:
+            meta = {
+                "service_id": tenant_service.service_id,
+                "api_key": tenant_service.wathq_api_key,
+                "is_active": tenant_service.is_active,
+                "is_approved": tenant_service.is_approved,
+            }
+        self._tenant_services[key] = (time.monotonic() + settings.WATHQ_METADATA_TTL, meta)
+        return meta
+
+    def tenant_services(
+        self, db: Session, tenant_id: int, service_slugs: List[str]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        The tenant's assignments of several services by slug (see
+        tenant_service); the ones not memoized are loaded in one query.
+        """
+        now = time.monotonic()
+        result: Dict[str, Optional[Dict[str, Any]]] = {}
+        missing = []
+        for slug in dict.fromkeys(service_slugs):
+            cached = self._tenant_services.get((tenant_id, slug))
+            if cached is not None and cached[0] > now:
+                self.hits += 1
+                result[slug] = cached[1]
+            else:
+                missing.append(slug)
+        if not missing:
+            return result
+
+        self.misses += len(missing)
+        rows = (
+            db.query(TenantService, Service.slug)
+            .join(Service)
+            .filter(
+                TenantService.tenant_id == tenant_id,
+                Service.slug.in_(missing)
+            )
+            # Usable rows last, so they win should a tenant have several
+            .order_by(TenantService.is_active.asc(), TenantService.is_approved.asc())
+            .all()
+        )
+        loaded: Dict[str, Dict[str, Any]] = {}
+        for tenant_service, slug in rows:
+            loaded[slug] = {
+                "service_id": tenant_service.service_id,
+                "api_key": tenant_service.wathq_api_key,
+                "is_active": tenant_service.is_active,
+                "is_approved": tenant_service.is_approved,
+            }
+        expires = time.monotonic() + settings.WATHQ_METADATA_TTL
+        for slug in missing:
+            result[slug] = loaded.get(slug)
+            self._tenant_services[(tenant_id, slug)] = (expires, result[slug])
+        return result
+
+    def forget(self, tenant_id: Optional[int] = None) -> None:
+        """Drop this worker's entries for a tenant (every entry when None)."""
+        if tenant_id is None:
+            self._services.clear()
+            self._tenant_services.clear()
+        else:
+            for key in [key for key in self._tenant_services if key[0] == tenant_id]:
+                self._tenant_services.pop(key, None)
+        self.invalidations += 1
+
+    def invalidate(self, tenant_id: Optional[int] = None) -> None:
+        """
+        Drop the entries for a tenant (every entry when None) in every worker.
+
+        Call after committing a change to the tenant's service assignments.
+        A Redis outage only delays the other workers until the TTL.
+        """
+        self.forget(tenant_id)
+        try:
+            if WathqMetadataCache._redis is None:
+                import redis
+
+                WathqMetadataCache._redis = redis.Redis.from_url(settings.REDIS_URL)
+            WathqMetadataCache._redis.publish(self.channel, json.dumps({"tenant_id": tenant_id}))
+        except Exception as e:
+            logger.warning(f"Failed to broadcast WATHQ metadata invalidation: {e}")
+
+    # ------------------------------------------------------------------
+    # Invalidation listener (API workers)
+    # ------------------------------------------------------------------
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Follow invalidations from other workers on the running event loop."""
+        if self.is_running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self.is_running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        import redis.asyncio as aredis
+
+        while True:
+            client = aredis.Redis.from_url(settings.REDIS_URL)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Anything may have changed while we were not listening
+                self.forget()
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    self.forget(json.loads(message["data"]).get("tenant_id"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"WATHQ metadata invalidation listener failed, reconnecting: {e}")
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "services": len(self._services),
+            "tenant_services": len(self._tenant_services),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "listening": self.is_running,
+        }
+
+
+# Singleton instance
+wathq_metadata = WathqMetadataCache()
@@ -0,0 +1,220 @@
+"""
+Distributed token-bucket quota for WATHQ calls, per API key.
+
+WATHQ rate-limits each API key. Tenants with their own key only compete with
+themselves, but every tenant without one shares the system key
+(settings.WATHQ_API_KEY), so a burst from one tenant could exhaust it and
+cause 429s for everyone. Every outgoing WATHQ request therefore takes a token
+from Redis-backed buckets shared by all API and Celery workers:
+
+- one bucket per API key (hashed), sized to the key's upstream allowance;
+- on the shared system key, one more bucket per tenant, so a single tenant
+  only gets its own share of it. Tenants listed in WATHQ_QUOTA_TENANT_LIMITS
+  get their own rate and burst, and that bucket on every key they use.
+
+A request that finds a bucket empty waits until it refills instead of failing,
+up to WATHQ_QUOTA_MAX_WAIT; only past that deadline is it rejected with
+WathqQuotaExceeded. If Redis is unreachable, calls go out unlimited.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.wathq_resilience import WathqUpstreamUnavailable, wathq_resilience
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "wathq:quota"
+
+# Take one token from every bucket, or none of them.
+# KEYS: bucket keys; ARGV: (rate, burst) per bucket.
+# Returns 0 when granted, else milliseconds until every bucket has a token.
+_TAKE_SCRIPT = """
+local now_parts = redis.call("TIME")
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[2 * i - 1])
+    local burst = tonumber(ARGV[2 * i])
+    local bucket = redis.call("HMGET", key, "tokens", "ts")
+    local tokens = tonumber(bucket[1]) or burst
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < 1 then
+        wait = math.max(wait, (1 - tokens) / rate)
+    end
+end
+if wait == 0 then
+    for i, key in ipairs(KEYS) do
+        local rate = tonumber(ARGV[2 * i - 1])
+        local burst = tonumber(ARGV[2 * i])
+        redis.call("HSET", key, "tokens", levels[i] - 1, "ts", now, "rate", rate, "burst", burst)
+        redis.call("PEXPIRE", key, math.ceil(burst / rate * 2000) + 1000)
+    end
+    return 0
+end
+return math.ceil(wait * 1000)
+"""
+
+
+def hash_api_key(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+class WathqQuotaExceeded(WathqUpstreamUnavailable):
+    """No quota token became available before the deadline."""
+
+
+class WathqQuota:
+    """Redis token buckets shared by every worker, one per API key (and tenant on the system key)."""
+
+    def __init__(self):
+        self._redis: Dict[int, Any] = {}
+        self._system_key_hash = hash_api_key(settings.WATHQ_API_KEY)
+
+        # Metrics
+        self.granted = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.rejected = 0
+        self.unlimited = 0
+
+    @staticmethod
+    def tenant_limit(tenant_id: int) -> Tuple[float, int]:
+        """(rate per second, burst) of a tenant's bucket: its override or the defaults."""
+        override = settings.WATHQ_QUOTA_TENANT_LIMITS.get(tenant_id, {})
+        return (
+            float(override.get("rate", settings.WATHQ_QUOTA_TENANT_RATE)),
+            int(override.get("burst", settings.WATHQ_QUOTA_TENANT_BURST)),
+        )
+
+    def buckets(self, api_key: str, tenant_id: Optional[int]) -> List[Tuple[str, float, int]]:
+        """(Redis key, rate per second, burst) of every bucket a call draws from."""
+        key_hash = hash_api_key(api_key)
+        buckets = [
+            (f"{KEY_PREFIX}:{key_hash}", settings.WATHQ_QUOTA_KEY_RATE, settings.WATHQ_QUOTA_KEY_BURST)
+        ]
+        if tenant_id and (
+            key_hash == self._system_key_hash or tenant_id in settings.WATHQ_QUOTA_TENANT_LIMITS
+        ):
+            rate, burst = self.tenant_limit(tenant_id)
+            buckets.append((f"{KEY_PREFIX}:{key_hash}:tenant:{tenant_id}", rate, burst))
+        return buckets
+
+    async def acquire(
+        self, api_key: str, tenant_id: Optional[int] = None, service_slug: str = "wathq"
+    ) -> None:
+        """Take a token for one call, waiting for a refill up to WATHQ_QUOTA_MAX_WAIT."""
+        if not settings.WATHQ_QUOTA_ENABLED or not api_key:
+            return
+
+        buckets = self.buckets(api_key, tenant_id)
+        keys = [key for key, _, _ in buckets]
+        args = [value for _, rate, burst in buckets for value in (rate, burst)]
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + settings.WATHQ_QUOTA_MAX_WAIT
+        while True:
+            try:
+                wait_ms = await self._get_redis().eval(_TAKE_SCRIPT, len(keys), *keys, *args)
+            except Exception as e:
+                # Fail open: a Redis outage must not stop WATHQ traffic
+                self.unlimited += 1
+                logger.warning(f"WATHQ quota unavailable, calling without limit: {e}")
+                return
+
+            if wait_ms == 0:
+                self.granted += 1
+                waited = loop.time() - start
+                if waited > 0.001:
+                    self.waited += 1
+                    self.wait_seconds += waited
+                return
+
+            wait = wait_ms / 1000
+            if loop.time() + wait > deadline:
+                self.rejected += 1
+                raise WathqQuotaExceeded(service_slug, "API key quota exhausted")
+            await asyncio.sleep(wait)
+
+    async def levels(self) -> List[Dict[str, Any]]:
+        """Live level of every bucket, refilled to now."""
+        redis = self._get_redis()
+        now = time.time()
+        levels = []
+        async for raw_key in redis.scan_iter(match=f"{KEY_PREFIX}:*", count=500):
+            bucket = await redis.hgetall(raw_key)
+            if not bucket:
+                continue
+            bucket = {k.decode(): float(v) for k, v in bucket.items()}
+            tokens = min(
+                bucket["burst"], bucket["tokens"] + max(0.0, now - bucket["ts"]) * bucket["rate"]
+            )
+            parts = raw_key.decode().split(":")
+            key_hash = parts[2]
+            levels.append(
+                {
+                    "api_key": "system" if key_hash == self._system_key_hash else key_hash[:12],
+                    "tenant_id": int(parts[4]) if len(parts) > 4 else None,
+                    "tokens": round(tokens, 2),
+                    "burst": int(bucket["burst"]),
+                    "rate_per_second": bucket["rate"],
+                }
+            )
+        return sorted(levels, key=lambda level: (level["api_key"], level["tenant_id"] or 0))
+
+    def _get_redis(self):
+        """redis.asyncio client for the running event loop."""
+        import redis.asyncio as aredis
+
+        loop_id = id(asyncio.get_running_loop())
+        client = self._redis.get(loop_id)
+        if client is None:
+            client = aredis.Redis.from_url(settings.REDIS_URL)
+            self._redis[loop_id] = client
+        return client
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.WATHQ_QUOTA_ENABLED,
+            "granted": self.granted,
+            "waited": self.waited,
+            "wait_seconds": round(self.wait_seconds, 3),
+            "rejected": self.rejected,
+            "unlimited": self.unlimited,
+        }
+
+
+class QuotaTransport(httpx.AsyncBaseTransport):
+    """httpx transport that takes a quota token before sending a WATHQ request."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        guard = wathq_resilience.guard_for(request.url)
+        api_key = request.headers.get("apiKey") or request.headers.get(
+            "Authorization", ""
+        ).removeprefix("Bearer ")
+        await wathq_quota.acquire(
+            api_key,
+            tenant_id=request.extensions.get("wathq_tenant_id"),
+            service_slug=guard.service_slug,
+        )
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# Singleton instance
+wathq_quota = WathqQuota()
@@ -0,0 +1,297 @@
+"""
+Per-service circuit breaker and adaptive concurrency limit for WATHQ calls.
+
+Every WATHQ service (one base URL on api.wathq.sa) gets its own guard, applied
+by the shared HTTP transport to every request, so no client can bypass it.
+Clients on other paths register theirs (register_prefix); requests matching
+no prefix share one default guard rather than going out unguarded:
+
+- A circuit breaker. After WATHQ_BREAKER_FAILURE_THRESHOLD consecutive
+  failures (transport errors, timeouts, 5xx, 429) the circuit opens and calls
+  fail immediately for WATHQ_BREAKER_OPEN_SECONDS. After that a limited
+  number of probe calls is let through (half-open). A successful probe
+  closes the circuit; a failed one opens it again.
+- An AIMD concurrency limit. Each success below the latency target raises
+  the limit by 1/limit (about +1 per round of calls). A failure or a slow
+  call halves it. Requests above the limit wait briefly for a slot, then fail
+  fast instead of piling up behind a slow upstream.
+
+Rejected calls raise WathqUpstreamUnavailable before anything is sent.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# api.wathq.sa path prefix -> service slug
+SERVICE_PREFIXES = {
+    "/commercial-registration": "commercial-registration",
+    "/company-contract": "company-contract",
+    "/moj/real-estate": "real-estate",
+    "/spl/national/address": "national-address",
+    "/masdr/employee": "employee-verification",
+    "/v1/attorney": "attorney-services",
+}
+
+# Guard of requests matching no service prefix
+DEFAULT_GUARD = "wathq"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class WathqUpstreamUnavailable(httpx.TransportError):
+    """A WATHQ call was rejected locally: circuit open or concurrency limit reached."""
+
+    def __init__(self, service_slug: str, reason: str, request: Optional[httpx.Request] = None):
+        super().__init__(f"WATHQ {service_slug} unavailable: {reason}", request=request)
+        self.service_slug = service_slug
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing."""
+
+    def __init__(
+        self,
+        failure_threshold: int = settings.WATHQ_BREAKER_FAILURE_THRESHOLD,
+        open_seconds: float = settings.WATHQ_BREAKER_OPEN_SECONDS,
+        half_open_probes: int = settings.WATHQ_BREAKER_HALF_OPEN_PROBES,
+    ):
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probes_in_flight = 0
+
+        # Metrics
+        self.trips = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (reserves a probe slot when half-open)."""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self._probes_in_flight = 0
+
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= self.half_open_probes:
+                self.rejected += 1
+                return False
+            self._probes_in_flight += 1
+        return True
+
+    def record(self, success: bool) -> None:
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+        if success:
+            self.consecutive_failures = 0
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+            return
+
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """A call ended without an outcome (cancelled): free its probe slot."""
+        if self.state == HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: additive increase on fast successes, halving on trouble."""
+
+    def __init__(
+        self,
+        initial: int = settings.WATHQ_LIMIT_INITIAL,
+        minimum: int = settings.WATHQ_LIMIT_MIN,
+        maximum: int = settings.WATHQ_LIMIT_MAX,
+        latency_target: float = settings.WATHQ_LIMIT_LATENCY_TARGET,
+        queue_timeout: float = settings.WATHQ_LIMIT_QUEUE_TIMEOUT,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.queue_timeout = queue_timeout
+
+        self.in_flight = 0
+        # Requests waiting for a slot, oldest first
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        # Metrics
+        self.rejected = 0
+        self.decreases = 0
+
+    def _has_slot(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting up to queue_timeout; False if none freed up."""
+        if self._has_slot() and not self._waiters:
+            self.in_flight += 1
+            return True
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot just as we were cancelled: pass it on
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        # The releasing request handed its slot over (in_flight already counts us)
+        return True
+
+    def release(self, success: Optional[bool] = None, latency: float = 0.0) -> None:
+        """Free a slot and adapt the limit (no adaptation when success is None)."""
+        self.in_flight -= 1
+        if success is True and latency <= self.latency_target:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        elif success is not None:
+            self.limit = max(self.minimum, self.limit / 2)
+            self.decreases += 1
+
+        while self._waiters and self._has_slot():
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "rejected": self.rejected,
+            "decreases": self.decreases,
+        }
+
+
+class ServiceGuard:
+    """Circuit breaker plus concurrency limit of one WATHQ service."""
+
+    def __init__(self, service_slug: str):
+        self.service_slug = service_slug
+        self.breaker = CircuitBreaker()
+        self.limiter = AdaptiveLimiter()
+
+    async def send(self, request: httpx.Request, send) -> httpx.Response:
+        if not self.breaker.allow():
+            raise WathqUpstreamUnavailable(self.service_slug, "circuit open", request)
+        if not await self.limiter.acquire():
+            self.breaker.release()
+            raise WathqUpstreamUnavailable(self.service_slug, "concurrency limit reached", request)
+
+        start = time.monotonic()
+        try:
+            response = await send(request)
+        except httpx.TransportError:
+            self._record(False, time.monotonic() - start)
+            raise
+        except BaseException:
+            # Cancelled, or a bug on our side: not the upstream's fault
+            self.breaker.release()
+            self.limiter.release()
+            raise
+
+        success = response.status_code < 500 and response.status_code != 429
+        self._record(success, time.monotonic() - start)
+        return response
+
+    def _record(self, success: bool, latency: float) -> None:
+        previous = self.breaker.state
+        self.breaker.record(success)
+        self.limiter.release(success, latency)
+        if self.breaker.state != previous:
+            log = logger.warning if self.breaker.state == OPEN else logger.info
+            log(f"WATHQ {self.service_slug} circuit {previous} -> {self.breaker.state}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"breaker": self.breaker.stats(), "limiter": self.limiter.stats()}
+
+
+class WathqResilience:
+    """Registry of service guards, one per WATHQ base URL."""
+
+    def __init__(self):
+        self._prefixes: Dict[str, str] = dict(SERVICE_PREFIXES)
+        self._guards: Dict[str, ServiceGuard] = {
+            slug: ServiceGuard(slug) for slug in [*SERVICE_PREFIXES.values(), DEFAULT_GUARD]
+        }
+
+    def register_prefix(self, prefix: str, service_slug: str) -> None:
+        """Guard requests under another path prefix as ``service_slug``."""
+        self._prefixes[prefix] = service_slug
+        if service_slug not in self._guards:
+            self._guards[service_slug] = ServiceGuard(service_slug)
+
+    def guard_for(self, url: httpx.URL) -> ServiceGuard:
+        """The guard of the service a URL belongs to (the default guard if none)."""
+        for prefix, slug in self._prefixes.items():
+            if url.path.startswith(prefix):
+                return self._guards[slug]
+        return self._guards[DEFAULT_GUARD]
+
+    def is_available(self, service_slug: str) -> bool:
+        """Whether the service's circuit is closed (or probing)."""
+        guard = self._guards.get(service_slug)
+        return guard is None or guard.breaker.state != OPEN
+
+    def stats(self) -> Dict[str, Any]:
+        return {slug: guard.stats() for slug, guard in self._guards.items()}
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """httpx transport that sends WATHQ requests through their service guard."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        guard = wathq_resilience.guard_for(request.url)
+        return await guard.send(request, self._transport.handle_async_request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# Singleton instance
+wathq_resilience = WathqResilience()
@@ -0,0 +1,217 @@
+"""
+Single-flight coalescing of identical concurrent WATHQ calls.
+
+When several users open the same record at once, only the first request
+(the leader) calls WATHQ; identical requests arriving while it is in flight
+wait for its result instead of paying for, and logging, a call of their own.
+
+Calls are identical when they share the API key (so tenants never share
+results), service, endpoint, parameters and language. Within a worker the
+followers await the leader's future. With WATHQ_SINGLE_FLIGHT_REDIS enabled,
+workers also elect one leader per call through a Redis lock and followers in
+other workers pick the leader's result up from Redis.
+
+This is not a cache: results are only shared with requests that overlap the
+leader's call.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LOCAL = "local"
+REDIS = "redis"
+
+# Delete the lock only if this leader still holds it
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class WathqSingleFlight:
+    """Coalesces identical in-flight WATHQ calls, per worker and (optionally) across workers."""
+
+    def __init__(self):
+        # (event loop id, key) -> leader's future; futures are bound to their loop
+        self._flights: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._redis: Dict[int, Any] = {}
+
+        # Metrics
+        self.leaders = 0
+        self.coalesced_local = 0
+        self.coalesced_redis = 0
+
+    @staticmethod
+    def make_key(
+        api_key: str,
+        service_slug: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Key of a call: (API key, service, endpoint, params incl. language)."""
+        params = params or {}
+        material = json.dumps(
+            {
+                "api_key": hashlib.sha256(api_key.encode("utf-8")).hexdigest(),
+                "service": service_slug,
+                "endpoint": endpoint,
+                "language": params.get("language"),
+                "params": params,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def run(
+        self, key: str, call: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """
+        Run ``call`` unless an identical call is already in flight.
+
+        Returns the result and how it was coalesced: None when this request
+        called WATHQ itself, ``"local"`` or ``"redis"`` when it reused the
+        result of a call made by another request. Followers get their own
+        copy of the result and see the leader's exception if it fails.
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+
+        while True:
+            flight = self._flights.get(flight_key)
+            if flight is None:
+                break
+            try:
+                result = await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                if flight.cancelled():
+                    # The leader's request was cancelled; take over
+                    continue
+                raise
+            self.coalesced_local += 1
+            return copy.deepcopy(result), LOCAL
+
+        future = loop.create_future()
+        self._flights[flight_key] = future
+        try:
+            result, coalesced = await self._call(key, call)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark as retrieved: nobody may be waiting on this flight
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._flights.pop(flight_key, None)
+
+        if coalesced:
+            self.coalesced_redis += 1
+        else:
+            self.leaders += 1
+        return result, coalesced
+
+    async def _call(
+        self, key: str, call: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Call WATHQ, or wait for another worker's identical call (Redis)."""
+        if not settings.WATHQ_SINGLE_FLIGHT_REDIS:
+            return await call(), None
+
+        lock_key = f"wathq:single_flight:lock:{key}"
+        token = uuid.uuid4().hex
+        try:
+            redis = self._get_redis()
+            acquired = await redis.set(
+                lock_key, token, nx=True, px=int(settings.WATHQ_SINGLE_FLIGHT_LOCK_TTL * 1000)
+            )
+            leader_token = None if acquired else await redis.get(lock_key)
+        except Exception as e:
+            # A Redis outage only costs the cross-worker coalescing
+            logger.warning(f"Single-flight lock unavailable, calling WATHQ directly: {e}")
+            return await call(), None
+
+        if acquired or leader_token is None:
+            return await self._lead(redis, lock_key, token, call), None
+
+        result = await self._follow(redis, lock_key, leader_token.decode())
+        if result is not None:
+            return result, REDIS
+        # The leader failed or timed out without a result to share
+        return await call(), None
+
+    async def _lead(self, redis, lock_key: str, token: str, call) -> Dict[str, Any]:
+        try:
+            result = await call()
+            try:
+                await redis.set(
+                    f"wathq:single_flight:result:{token}",
+                    json.dumps(result),
+                    px=int(settings.WATHQ_SINGLE_FLIGHT_RESULT_TTL * 1000),
+                )
+            except Exception as e:
+                logger.warning(f"Failed to share WATHQ result through Redis: {e}")
+            return result
+        finally:
+            try:
+                await redis.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+            except Exception as e:
+                logger.warning(f"Failed to release single-flight lock: {e}")
+
+    async def _follow(self, redis, lock_key: str, leader_token: str) -> Optional[Dict[str, Any]]:
+        """Wait for the leader in another worker; None if it produced no result."""
+        result_key = f"wathq:single_flight:result:{leader_token}"
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.WATHQ_SINGLE_FLIGHT_LOCK_TTL
+        try:
+            while loop.time() < deadline:
+                await asyncio.sleep(settings.WATHQ_SINGLE_FLIGHT_POLL_INTERVAL)
+                raw = await redis.get(result_key)
+                if raw is not None:
+                    return json.loads(raw)
+                current = await redis.get(lock_key)
+                if current is None or current.decode() != leader_token:
+                    # Released: one last look in case the result landed in between
+                    raw = await redis.get(result_key)
+                    return json.loads(raw) if raw is not None else None
+        except Exception as e:
+            logger.warning(f"Lost single-flight leader result: {e}")
+        return None
+
+    def _get_redis(self):
+        """redis.asyncio client for the running event loop."""
+        import redis.asyncio as aredis
+
+        loop_id = id(asyncio.get_running_loop())
+        client = self._redis.get(loop_id)
+        if client is None:
+            client = aredis.Redis.from_url(settings.REDIS_URL)
+            self._redis[loop_id] = client
+        return client
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "redis_enabled": settings.WATHQ_SINGLE_FLIGHT_REDIS,
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced_local": self.coalesced_local,
+            "coalesced_redis": self.coalesced_redis,
+        }
+
+
+# Singleton instance
+wathq_single_flight = WathqSingleFlight()
@@ -2,13 +2,19 @@
 WATHQ API call tracking utility.
 """
 
+import logging
 import time
+import uuid
+from collections import Counter
 from typing import Any, Dict, Optional
 from uuid import UUID
 from sqlalchemy.orm import Session
 
+from app.crud.crud_wathq_response_blob import wathq_response_blob
 from app.models.wathq_call_log import WathqCallLog
-from app.crud.crud_wathq_offline_data import wathq_offline_data
+from app.services.wathq_outbox import wathq_outbox
+
+logger = logging.getLogger(__name__)
 
 
 class WathqCallTracker:
@@ -16,6 +22,10 @@ class WathqCallTracker:
     Utility class to track WATHQ API calls.
     """
 
+    # Calls answered with another request's in-flight result (no call log
+    # row, no WATHQ charge), per (service, coalescing scope); per worker
+    _coalesced: Counter = Counter()
+
     @staticmethod
     def log_call(
         db: Session,
@@ -40,7 +50,7 @@ class WathqCallTracker:
             method=method,
             status_code=status_code,
             request_data=request_data,
-            response_body=response_body,
+            response_body_hash=wathq_response_blob.store(db, response_body),
             duration_ms=duration_ms
         )
         
@@ -50,6 +60,32 @@ class WathqCallTracker:
         
         return call_log
 
+    @staticmethod
+    def record_coalesced(
+        tenant_id: Optional[int],
+        user_id: Optional[int],
+        service_slug: str,
+        endpoint: str,
+        scope: str
+    ) -> None:
+        """
+        Count a call that was coalesced into an identical in-flight call
+        instead of reaching WATHQ (see wathq_single_flight).
+        """
+        WathqCallTracker._coalesced[(service_slug, scope)] += 1
+        logger.info(
+            f"Coalesced WATHQ call {service_slug}{endpoint} "
+            f"(scope={scope}, tenant={tenant_id}, user={user_id})"
+        )
+
+    @staticmethod
+    def coalesced_stats() -> Dict[str, Dict[str, int]]:
+        """Coalesced call counts of this worker, per service and scope."""
+        stats: Dict[str, Dict[str, int]] = {}
+        for (service_slug, scope), count in WathqCallTracker._coalesced.items():
+            stats.setdefault(service_slug, {})[scope] = count
+        return stats
+
     @staticmethod
     def track_call(
         db: Session,
@@ -57,12 +93,13 @@ class WathqCallTracker:
         user_id: int,
         service_slug: str,
         endpoint: str,
-        method: str = "POST"
+        method: str = "POST",
+        request_id: Optional[str] = None
     ):
         """
         Context manager to track WATHQ API calls with timing.
         """
-        return WathqCallContext(db, tenant_id, user_id, service_slug, endpoint, method)
+        return WathqCallContext(db, tenant_id, user_id, service_slug, endpoint, method, request_id)
 
 
 class WathqCallContext:
@@ -77,7 +114,8 @@ class WathqCallContext:
         user_id: int,
         service_slug: str,
         endpoint: str,
-        method: str = "POST"
+        method: str = "POST",
+        request_id: Optional[str] = None
     ):
         self.db = db
         self.tenant_id = tenant_id
@@ -85,6 +123,8 @@ class WathqCallContext:
         self.service_slug = service_slug
         self.endpoint = endpoint
         self.method = method
+        # Becomes the call log id: makes outbox redelivery idempotent
+        self.request_id = request_id or str(uuid.uuid4())
         self.start_time = None
         self.request_data = None
 
@@ -100,33 +140,39 @@ class WathqCallContext:
         """Set the request data."""
         self.request_data = data
 
-    def log_response(self, status_code: int, response_body: Dict[str, Any], service_id: Optional[UUID] = None, full_url: Optional[str] = None):
-        """Log the response data and save offline data if successful."""
+    async def log_response(self, status_code: int, response_body: Dict[str, Any], service_id: Optional[UUID] = None, full_url: Optional[str] = None):
+        """
+        Log the response data and save offline data if successful.
+
+        Both rows go through the outbox (app.services.wathq_outbox) and are
+        written in the background, off the request path.
+        """
         duration_ms = None
         if self.start_time:
             duration_ms = int((time.time() - self.start_time) * 1000)
 
-        WathqCallTracker.log_call(
-            db=self.db,
-            tenant_id=self.tenant_id,
-            user_id=self.user_id,
-            service_slug=self.service_slug,
-            endpoint=self.endpoint,
-            method=self.method,
-            status_code=status_code,
-            response_body=response_body,
-            request_data=self.request_data,
-            duration_ms=duration_ms
-        )
+        call_log = {
+            "tenant_id": self.tenant_id,
+            "user_id": self.user_id,
+            "service_slug": self.service_slug,
+            "endpoint": self.endpoint,
+            "method": self.method,
+            "status_code": status_code,
+            "request_data": self.request_data,
+            "response_body": response_body,
+            "duration_ms": duration_ms
+        }
         
         # Save offline data if successful and service_id provided
         # Only save for tenant users (not management users who have None tenant_id)
+        offline_data = None
         if status_code == 200 and service_id and full_url and self.tenant_id and self.user_id:
-            wathq_offline_data.create_offline_data(
-                db=self.db,
-                service_id=service_id,
-                tenant_id=self.tenant_id,
-                fetched_by=self.user_id,
-                full_external_url=full_url,
-                response_body=response_body
-            )
\ No newline at end of file
+            # Same body as the call log: the outbox stores it once
+            offline_data = {
+                "service_id": service_id,
+                "tenant_id": self.tenant_id,
+                "fetched_by": self.user_id,
+                "full_external_url": full_url
+            }
+
+        await wathq_outbox.append(self.db, self.request_id, call_log, offline_data)
\ No newline at end of file
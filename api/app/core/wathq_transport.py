@@ -0,0 +1,93 @@
+"""
+Shared pooled HTTP transport for WATHQ upstream calls.
+
+All WATHQ clients borrow their ``httpx.AsyncClient`` from here so that
+keep-alive connections to api.wathq.sa are reused across requests instead of
+paying a new TCP+TLS handshake on every call.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.core.wathq_quota import QuotaTransport
+from app.core.wathq_resilience import ResilientTransport
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional ``h2`` package."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class WathqTransport:
+    """
+    Process-wide pool of ``httpx.AsyncClient`` instances.
+
+    One client is kept per (event loop, TLS verification) pair: httpx
+    connections are bound to the loop that opened them, and the commercial
+    registration client talks to WATHQ with certificate verification disabled.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Tuple[int, bool], httpx.AsyncClient] = {}
+        self._http2 = settings.WATHQ_HTTP2 and _http2_available()
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.WATHQ_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.WATHQ_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.WATHQ_HTTP_KEEPALIVE_EXPIRY,
+        )
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            settings.WATHQ_HTTP_TIMEOUT,
+            connect=settings.WATHQ_HTTP_CONNECT_TIMEOUT,
+            pool=settings.WATHQ_HTTP_POOL_TIMEOUT,
+        )
+
+    def get_client(self, verify: bool = True) -> httpx.AsyncClient:
+        """Return the pooled client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        key = (id(loop), verify)
+
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            # Every request takes an API key quota token (see wathq_quota),
+            # then goes through its service's circuit breaker and concurrency
+            # limit (see wathq_resilience)
+            transport = QuotaTransport(
+                ResilientTransport(
+                    httpx.AsyncHTTPTransport(
+                        verify=verify, http2=self._http2, limits=self.limits
+                    )
+                )
+            )
+            client = httpx.AsyncClient(transport=transport, timeout=self.timeout)
+            self._clients[key] = client
+            logger.debug(
+                f"Opened WATHQ connection pool (verify={verify}, http2={self._http2})"
+            )
+        return client
+
+    async def aclose(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Close pooled clients owned by ``loop`` (the running loop by default)."""
+        loop_id = id(loop or asyncio.get_running_loop())
+        for key in [k for k in self._clients if k[0] == loop_id]:
+            client = self._clients.pop(key)
+            await client.aclose()
+        logger.debug("Closed WATHQ connection pools")
+
+
+wathq_transport = WathqTransport()
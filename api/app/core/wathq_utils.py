@@ -6,7 +6,8 @@ from typing import Optional
 from sqlalchemy.orm import Session
 from uuid import UUID
 
-from app.models.service import TenantService, Service
+from app.core.wathq_metadata import wathq_metadata
+from app.models.service import TenantService
 
 
 def get_tenant_wathq_key(
@@ -38,25 +39,20 @@ def get_tenant_wathq_key_by_slug(
 ) -> Optional[str]:
     """
     Get the WATHQ API key for a specific tenant and service by slug.
+
+    Memoized per worker, see app.core.wathq_metadata.
     """
-    tenant_service = (
-        db.query(TenantService)
-        .join(Service)
-        .filter(
-            TenantService.tenant_id == tenant_id,
-            Service.slug == service_slug,
-            TenantService.is_active == True,
-            TenantService.is_approved == True
-        )
-        .first()
-    )
-    
-    return tenant_service.wathq_api_key if tenant_service else None
+    tenant_service = wathq_metadata.tenant_service(db, tenant_id, service_slug)
+    if not tenant_service or not (tenant_service["is_active"] and tenant_service["is_approved"]):
+        return None
+    return tenant_service["api_key"]
 
 
 def get_service_id_by_slug(db: Session, service_slug: str) -> Optional[UUID]:
     """
     Get service ID by slug.
+
+    Memoized per worker, see app.core.wathq_metadata.
     """
-    service = db.query(Service).filter(Service.slug == service_slug).first()
-    return service.id if service else None
\ No newline at end of file
+    service = wathq_metadata.service(db, service_slug)
+    return service["service_id"] if service else None
\ No newline at end of file
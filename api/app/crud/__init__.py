@@ -12,6 +12,7 @@ from .crud_tenant import tenant
 from .crud_user import user
 from .crud_wathq_call_log import wathq_call_log
 from .crud_wathq_offline_data import wathq_offline_data
+from .crud_wathq_response_blob import wathq_response_blob
 from .crud_cr_request import cr_request
 from .crud_pdf_template import (
     generated_pdf,
@@ -46,6 +47,7 @@ __all__ = [
     "management_user_profile",
     "wathq_call_log",
     "wathq_offline_data",
+    "wathq_response_blob",
     "cr_request",
     "pdf_template",
     "pdf_template_version",
@@ -8,6 +8,7 @@ from uuid import UUID
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_
 
+from app.core.wathq_metadata import wathq_metadata
 from app.crud.base import CRUDBase
 from app.models.service import Service, TenantService
 from app.models.user import User
@@ -113,6 +114,7 @@ class CRUDTenantService(
             existing.wathq_api_key = wathq_api_key
             db.commit()
             db.refresh(existing)
+            wathq_metadata.invalidate(tenant_id)
             return existing
 
         tenant_service = TenantService(
@@ -126,6 +128,7 @@ class CRUDTenantService(
         db.add(tenant_service)
         db.commit()
         db.refresh(tenant_service)
+        wathq_metadata.invalidate(tenant_id)
         return tenant_service
 
     def approve_tenant_service(
@@ -144,6 +147,7 @@ class CRUDTenantService(
             tenant_service.approved_at = func.now()
             db.commit()
             db.refresh(tenant_service)
+            wathq_metadata.invalidate(tenant_service.tenant_id)
             return tenant_service
         return None
 
@@ -2,8 +2,9 @@
 CRUD operations for WATHQ call logs.
 """
 
+from datetime import datetime
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import desc
 
 from app.crud.base import CRUDBase
@@ -13,29 +14,46 @@ from app.schemas.wathq_call_log import WathqCallLogCreate, WathqCallLogUpdate
 
 class CRUDWathqCallLog(CRUDBase[WathqCallLog, WathqCallLogCreate, WathqCallLogUpdate]):
 
+    @staticmethod
+    def _filter_fetched_at(
+        query, fetched_from: Optional[datetime], fetched_to: Optional[datetime]
+    ):
+        """Bound fetched_at so PostgreSQL only scans the matching monthly partitions."""
+        if fetched_from:
+            query = query.filter(WathqCallLog.fetched_at >= fetched_from)
+        if fetched_to:
+            query = query.filter(WathqCallLog.fetched_at < fetched_to)
+        return query
+
     def get_by_tenant(
-        self, db: Session, *, tenant_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, *, tenant_id: int, skip: int = 0, limit: int = 100,
+        fetched_from: Optional[datetime] = None, fetched_to: Optional[datetime] = None
     ) -> List[WathqCallLog]:
-        """Get call logs for a specific tenant."""
+        """Get call logs for a specific tenant, optionally within a fetched_at range."""
+        query = db.query(WathqCallLog).filter(WathqCallLog.tenant_id == tenant_id)
+        query = self._filter_fetched_at(query, fetched_from, fetched_to)
+
         return (
-            db.query(WathqCallLog)
-            .filter(WathqCallLog.tenant_id == tenant_id)
-            .order_by(desc(WathqCallLog.fetched_at))
+            query.order_by(desc(WathqCallLog.fetched_at))
             .offset(skip)
             .limit(limit)
+            .options(selectinload(WathqCallLog.response_blob))
             .all()
         )
 
     def get_by_user(
-        self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100
+        self, db: Session, *, user_id: int, skip: int = 0, limit: int = 100,
+        fetched_from: Optional[datetime] = None, fetched_to: Optional[datetime] = None
     ) -> List[WathqCallLog]:
-        """Get call logs for a specific user."""
+        """Get call logs for a specific user, optionally within a fetched_at range."""
+        query = db.query(WathqCallLog).filter(WathqCallLog.user_id == user_id)
+        query = self._filter_fetched_at(query, fetched_from, fetched_to)
+
         return (
-            db.query(WathqCallLog)
-            .filter(WathqCallLog.user_id == user_id)
-            .order_by(desc(WathqCallLog.fetched_at))
+            query.order_by(desc(WathqCallLog.fetched_at))
             .offset(skip)
             .limit(limit)
+            .options(selectinload(WathqCallLog.response_blob))
             .all()
         )
 
@@ -53,6 +71,31 @@ class CRUDWathqCallLog(CRUDBase[WathqCallLog, WathqCallLogCreate, WathqCallLogUp
             query.order_by(desc(WathqCallLog.fetched_at))
             .offset(skip)
             .limit(limit)
+            .options(selectinload(WathqCallLog.response_blob))
+            .all()
+        )
+
+    def get_latest_successes(
+        self, db: Session, *, service_slug: str, endpoints: List[str],
+        tenant_id: Optional[int], language: str, fetched_from: datetime
+    ) -> List[WathqCallLog]:
+        """
+        Latest successful call per endpoint since ``fetched_from``, for one
+        tenant (or management, when tenant_id is None) and response language.
+        """
+        query = db.query(WathqCallLog).filter(
+            WathqCallLog.service_slug == service_slug,
+            WathqCallLog.endpoint.in_(endpoints),
+            WathqCallLog.status_code == 200,
+            WathqCallLog.tenant_id == tenant_id if tenant_id else WathqCallLog.tenant_id.is_(None),
+            WathqCallLog.request_data["params"]["language"].as_string() == language,
+        )
+        query = self._filter_fetched_at(query, fetched_from, None)
+
+        return (
+            query.distinct(WathqCallLog.endpoint)
+            .order_by(WathqCallLog.endpoint, desc(WathqCallLog.fetched_at))
+            .options(selectinload(WathqCallLog.response_blob))
             .all()
         )
 
@@ -73,7 +116,13 @@ class CRUDWathqCallLog(CRUDBase[WathqCallLog, WathqCallLogCreate, WathqCallLogUp
 
     def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[WathqCallLog]:
         """Get all call logs."""
-        return db.query(WathqCallLog).offset(skip).limit(limit).all()
+        return (
+            db.query(WathqCallLog)
+            .options(selectinload(WathqCallLog.response_blob))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
 
 
 wathq_call_log = CRUDWathqCallLog(WathqCallLog)
@@ -2,14 +2,14 @@
 CRUD operations for WATHQ External Data.
 """
 
-from typing import Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any, List
 from datetime import datetime, timedelta
 from uuid import UUID
 import hashlib
 import json
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 
 from app.crud.base import CRUDBase
 from app.models.wathq_external_data import WathqExternalData
@@ -24,14 +24,28 @@ class CRUDWathqExternalData(CRUDBase[WathqExternalData, WathqExternalDataCreate,
         service_id: UUID,
         tenant_id: Optional[int],
         user_id: int,
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        scope: str = "user",
+        api_key: Optional[str] = None
     ) -> str:
-        """Generate a unique cache key for the request."""
+        """
+        Generate a unique cache key for the request.
+
+        ``scope`` decides who shares the entry: "user" (only the requesting
+        user), "tenant" (every user of the tenant) or "api_key" (every caller
+        using the same WATHQ API key, across tenants).
+        """
+        if scope == "api_key":
+            owner = ["key", hashlib.sha256((api_key or "").encode()).hexdigest()]
+        elif scope == "tenant":
+            owner = [str(tenant_id) if tenant_id else "global", "tenant"]
+        else:
+            owner = [str(tenant_id) if tenant_id else "global", str(user_id)]
+        
         # Create a deterministic string from parameters
         key_parts = [
             str(service_id),
-            str(tenant_id) if tenant_id else "global",
-            str(user_id),
+            *owner,
             json.dumps(params, sort_keys=True) if params else "{}"
         ]
         key_string = "|".join(key_parts)
@@ -45,10 +59,12 @@ class CRUDWathqExternalData(CRUDBase[WathqExternalData, WathqExternalDataCreate,
         service_id: UUID,
         tenant_id: Optional[int],
         user_id: int,
-        params: Optional[Dict[str, Any]] = None
+        params: Optional[Dict[str, Any]] = None,
+        scope: str = "user",
+        api_key: Optional[str] = None
     ) -> Optional[WathqExternalData]:
         """Get cached data if available and not expired."""
-        cache_key = self.generate_cache_key(service_id, tenant_id, user_id, params)
+        cache_key = self.generate_cache_key(service_id, tenant_id, user_id, params, scope, api_key)
         
         # Query for non-expired cache entry
         cached_entry = db.query(WathqExternalData).filter(
@@ -69,11 +85,20 @@ class CRUDWathqExternalData(CRUDBase[WathqExternalData, WathqExternalDataCreate,
         data: Dict[str, Any],
         params: Optional[Dict[str, Any]] = None,
         status_code: int = 200,
-        ttl_seconds: int = 3600
+        ttl_seconds: int = 3600,
+        hard_ttl_seconds: Optional[int] = None,
+        scope: str = "user",
+        api_key: Optional[str] = None
     ) -> WathqExternalData:
-        """Save external API data to cache."""
-        cache_key = self.generate_cache_key(service_id, tenant_id, user_id, params)
-        expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        """
+        Save external API data to cache.
+
+        ``ttl_seconds`` is how long the entry is fresh; it is kept (served as
+        stale) until ``hard_ttl_seconds``, when given. ``scope`` and
+        ``api_key`` as in generate_cache_key.
+        """
+        cache_key = self.generate_cache_key(service_id, tenant_id, user_id, params, scope, api_key)
+        expires_at = datetime.utcnow() + timedelta(seconds=hard_ttl_seconds or ttl_seconds)
         
         # Check if entry exists
         existing = db.query(WathqExternalData).filter(
@@ -154,6 +179,71 @@ class CRUDWathqExternalData(CRUDBase[WathqExternalData, WathqExternalDataCreate,
         
         return query.offset(skip).limit(limit).all()
     
+    def get_cache_keys(
+        self,
+        db: Session,
+        user_id: Optional[int] = None,
+        tenant_id: Optional[int] = None,
+        service_id: Optional[UUID] = None
+    ) -> List[str]:
+        """Cache keys of the entries written by a user / for a tenant, optionally for one service."""
+        query = db.query(WathqExternalData.cache_key)
+        if user_id is not None:
+            query = query.filter(WathqExternalData.user_id == user_id)
+        if tenant_id is not None:
+            query = query.filter(WathqExternalData.tenant_id == tenant_id)
+        if service_id:
+            query = query.filter(WathqExternalData.service_id == service_id)
+        return [cache_key for (cache_key,) in query.all()]
+    
+    def rehash_cache_keys(
+        self,
+        db: Session,
+        key_for: Callable[[WathqExternalData], str]
+    ) -> Dict[str, int]:
+        """
+        Re-key every live entry with ``key_for`` (e.g. after a cache scope change).
+        
+        Entries that now share a key are merged: the most recently written one
+        is kept and the others are deleted. Expired entries are dropped.
+        """
+        expired = self.clear_expired_cache(db)
+        
+        rows = (
+            db.query(WathqExternalData)
+            .order_by(
+                func.coalesce(WathqExternalData.updated_at, WathqExternalData.created_at).desc()
+            )
+            .all()
+        )
+        kept: Dict[str, WathqExternalData] = {}
+        duplicates = []
+        for row in rows:
+            new_key = key_for(row)
+            if new_key in kept:
+                duplicates.append(row)
+            else:
+                kept[new_key] = row
+        
+        # Delete first: a kept row may move onto the key of a deleted one
+        for row in duplicates:
+            db.delete(row)
+        db.flush()
+        
+        rehashed = 0
+        for new_key, row in kept.items():
+            if row.cache_key != new_key:
+                row.cache_key = new_key
+                rehashed += 1
+        db.commit()
+        
+        return {
+            "expired_deleted": expired,
+            "rehashed": rehashed,
+            "merged_deleted": len(duplicates),
+            "unchanged": len(kept) - rehashed
+        }
+    
     def clear_expired_cache(self, db: Session) -> int:
         """Clear all expired cache entries."""
         expired_count = db.query(WathqExternalData).filter(
@@ -2,15 +2,85 @@
 CRUD operations for WATHQ offline data.
 """
 
-from typing import List, Dict, Any
+import re
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlparse
 from uuid import UUID
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, desc, or_
 
 from app.crud.base import CRUDBase
+from app.crud.crud_wathq_response_blob import wathq_response_blob
 from app.models.wathq_offline_data import WathqOfflineData
 from app.schemas.wathq_offline_data import WathqOfflineDataCreate, WathqOfflineDataUpdate
 
+IDENTIFIER_COLUMNS = ("cr_number", "cr_national_number", "deed_number", "poa_code")
+
+# WATHQ URL path -> identifier in its first captured segment ("cr": number or
+# unified national number, told apart by the leading 7 of national numbers)
+_URL_IDENTIFIERS = (
+    (re.compile(r"/commercial-registration/crNationalNumber/([^/]+)"), "cr_number"),
+    (re.compile(r"/commercial-registration/(?:fullinfo|info|branches|status|capital|managers|owners)/([^/]+)"), "cr"),
+    (re.compile(r"/company-contract/(?:info|management|manager)/([^/]+)"), "cr_national_number"),
+    (re.compile(r"/real-estate/deed/([^/]+)"), "deed_number"),
+    (re.compile(r"/attorney/info/([^/]+)"), "poa_code"),
+    (re.compile(r"/national/address/info/([^/]+)"), "cr_number"),
+)
+
+
+def _first(*values: Any) -> Optional[str]:
+    for value in values:
+        if value not in (None, ""):
+            return str(value)
+    return None
+
+
+def extract_identifiers(full_external_url: str, response_body: Any) -> Dict[str, Optional[str]]:
+    """
+    Business identifiers of an offline copy, for the indexed lookup columns.
+
+    Taken from the response body where WATHQ returns them (same fields the
+    sync mappers read), else from the identifier in the URL path.
+    """
+    identifiers: Dict[str, Optional[str]] = dict.fromkeys(IDENTIFIER_COLUMNS)
+
+    path = urlparse(full_external_url).path
+    for pattern, column in _URL_IDENTIFIERS:
+        match = pattern.search(path)
+        if match:
+            value = match.group(1)
+            if column == "cr":
+                column = "cr_national_number" if value.startswith("7") else "cr_number"
+            identifiers[column] = value
+            break
+
+    if isinstance(response_body, dict):
+        entity = response_body.get("entity") or {}
+        deed_details = response_body.get("deedDetails") or {}
+        if not isinstance(entity, dict):
+            entity = {}
+        if not isinstance(deed_details, dict):
+            deed_details = {}
+        identifiers["cr_number"] = _first(
+            response_body.get("crNumber"), entity.get("crNumber"), identifiers["cr_number"]
+        )
+        identifiers["cr_national_number"] = _first(
+            response_body.get("crNationalNumber"), entity.get("crNationalNumber"),
+            identifiers["cr_national_number"]
+        )
+        if identifiers["deed_number"] is not None or deed_details:
+            identifiers["deed_number"] = _first(
+                deed_details.get("deedNumber"), response_body.get("deedNumber"), identifiers["deed_number"]
+            )
+        if identifiers["poa_code"] is not None:
+            identifiers["poa_code"] = _first(response_body.get("code"), identifiers["poa_code"])
+
+    # Values longer than their column are not identifiers we can look up
+    for column, length in (("cr_number", 20), ("cr_national_number", 20), ("deed_number", 50), ("poa_code", 50)):
+        if identifiers[column] is not None and len(identifiers[column]) > length:
+            identifiers[column] = None
+    return identifiers
+
 
 class CRUDWathqOfflineData(CRUDBase[WathqOfflineData, WathqOfflineDataCreate, WathqOfflineDataUpdate]):
 
@@ -30,7 +100,8 @@ class CRUDWathqOfflineData(CRUDBase[WathqOfflineData, WathqOfflineDataCreate, Wa
             tenant_id=tenant_id,
             fetched_by=fetched_by,
             full_external_url=full_external_url,
-            response_body=response_body
+            response_body_hash=wathq_response_blob.store(db, response_body),
+            **extract_identifiers(full_external_url, response_body)
         )
         db.add(offline_data)
         db.commit()
@@ -45,6 +116,7 @@ class CRUDWathqOfflineData(CRUDBase[WathqOfflineData, WathqOfflineDataCreate, Wa
             db.query(WathqOfflineData)
             .filter(WathqOfflineData.tenant_id == tenant_id)
             .order_by(desc(WathqOfflineData.fetched_at))
+            .options(selectinload(WathqOfflineData.response_blob))
             .offset(skip)
             .limit(limit)
             .all()
@@ -63,6 +135,7 @@ class CRUDWathqOfflineData(CRUDBase[WathqOfflineData, WathqOfflineDataCreate, Wa
                 )
             )
             .order_by(desc(WathqOfflineData.fetched_at))
+            .options(selectinload(WathqOfflineData.response_blob))
             .offset(skip)
             .limit(limit)
             .all()
@@ -81,11 +154,93 @@ class CRUDWathqOfflineData(CRUDBase[WathqOfflineData, WathqOfflineDataCreate, Wa
                 )
             )
             .order_by(desc(WathqOfflineData.fetched_at))
+            .options(selectinload(WathqOfflineData.response_blob))
             .offset(skip)
             .limit(limit)
             .all()
         )
 
+    def search_by_identifiers(
+        self,
+        db: Session,
+        *,
+        identifiers: Dict[str, str],
+        tenant_id: Optional[int] = None,
+        management_user_id: Optional[int] = None,
+        match_any: bool = False,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[WathqOfflineData]:
+        """
+        Offline data by business identifier (IDENTIFIER_COLUMNS), for a tenant
+        or, when tenant_id is None, a management user.
+
+        All given identifiers must match, or any of them with ``match_any``;
+        each is served by its partial (identifier, fetched_at) index.
+        """
+        conditions = [getattr(WathqOfflineData, column) == value for column, value in identifiers.items()]
+        owner = (
+            WathqOfflineData.tenant_id == tenant_id
+            if tenant_id is not None
+            else WathqOfflineData.management_user_id == management_user_id
+        )
+        return (
+            db.query(WathqOfflineData)
+            .filter(owner, or_(*conditions) if match_any else and_(*conditions))
+            .order_by(desc(WathqOfflineData.fetched_at))
+            .options(selectinload(WathqOfflineData.response_blob))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def backfill_identifiers(self, db: Session, batch_size: int = 500) -> int:
+        """
+        Extract the identifiers of rows written before the columns existed.
+
+        Walks rows without any identifier in id order, one transaction per
+        batch; returns the number of rows that got identifiers.
+        """
+        updated = 0
+        after = None
+        while True:
+            query = (
+                db.query(WathqOfflineData)
+                .filter(*(getattr(WathqOfflineData, column).is_(None) for column in IDENTIFIER_COLUMNS))
+                .options(selectinload(WathqOfflineData.response_blob))
+                .order_by(WathqOfflineData.id)
+            )
+            if after is not None:
+                query = query.filter(WathqOfflineData.id > after)
+            rows = query.limit(batch_size).all()
+            if not rows:
+                return updated
+
+            for row in rows:
+                identifiers = extract_identifiers(row.full_external_url, row.response_body)
+                if any(identifiers.values()):
+                    for column, value in identifiers.items():
+                        setattr(row, column, value)
+                    updated += 1
+            after = rows[-1].id
+            db.commit()
+
+    def get_latest_by_url(
+        self, db: Session, *, tenant_id: int, full_external_url: str
+    ) -> Optional[WathqOfflineData]:
+        """Get the most recent offline copy of a WATHQ URL for a tenant."""
+        return (
+            db.query(WathqOfflineData)
+            .filter(
+                and_(
+                    WathqOfflineData.tenant_id == tenant_id,
+                    WathqOfflineData.full_external_url == full_external_url
+                )
+            )
+            .order_by(desc(WathqOfflineData.fetched_at))
+            .first()
+        )
+
     def get_all(self, db: Session, skip: int = 0, limit: int = 100) -> List[WathqOfflineData]:
         """Get all offline data."""
         return db.query(WathqOfflineData).offset(skip).limit(limit).all()
@@ -0,0 +1,106 @@
+"""
+CRUD operations for WATHQ response blobs.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.models.wathq_response_blob import WathqResponseBlob
+from app.schemas.wathq_response_blob import WathqResponseBlobCreate, WathqResponseBlobUpdate
+
+# A blob referenced within this window is never garbage collected
+_REFERENCE_GRACE = timedelta(days=1)
+
+
+def canonical_json(body: Any) -> str:
+    """Key-sorted, whitespace-free JSON: equal bodies give equal text."""
+    return json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def hash_body(body: Any) -> str:
+    return hashlib.sha256(canonical_json(body).encode("utf-8")).hexdigest()
+
+
+class CRUDWathqResponseBlob(CRUDBase[WathqResponseBlob, WathqResponseBlobCreate, WathqResponseBlobUpdate]):
+
+    def store_many(self, db: Session, bodies: List[Any]) -> List[str]:
+        """
+        Store response bodies (once per distinct body) and return their hashes.
+
+        Does not commit: the caller inserts the referencing rows in the same
+        transaction.
+        """
+        hashes = []
+        rows: Dict[str, Dict[str, Any]] = {}
+        for body in bodies:
+            canonical = canonical_json(body)
+            body_hash = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+            hashes.append(body_hash)
+            if body_hash not in rows:
+                rows[body_hash] = {"hash": body_hash, "body": body, "size_bytes": len(canonical)}
+
+        if rows:
+            stmt = insert(WathqResponseBlob)
+            db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[WathqResponseBlob.hash],
+                    set_={"last_referenced_at": func.now()},
+                    # Mostly a no-op: refresh the GC guard at most hourly
+                    where=WathqResponseBlob.last_referenced_at < func.now() - text("interval '1 hour'"),
+                ),
+                # Sorted so concurrent writers lock existing blobs in the same order
+                [rows[body_hash] for body_hash in sorted(rows)],
+            )
+        return hashes
+
+    def store(self, db: Session, body: Any) -> str:
+        """Store one response body; returns its hash (see store_many)."""
+        return self.store_many(db, [body])[0]
+
+    def delete_unreferenced(self, db: Session) -> int:
+        """Delete blobs no call log or offline row references any more."""
+        result = db.execute(
+            text(
+                "DELETE FROM wathq_response_blobs b "
+                "WHERE b.last_referenced_at < :cutoff "
+                "AND NOT EXISTS (SELECT 1 FROM wathq_call_logs l WHERE l.response_body_hash = b.hash) "
+                "AND NOT EXISTS (SELECT 1 FROM wathq_offline_data o WHERE o.response_body_hash = b.hash)"
+            ),
+            {"cutoff": datetime.now(timezone.utc) - _REFERENCE_GRACE},
+        )
+        db.commit()
+        return result.rowcount or 0
+
+    def storage_stats(self, db: Session) -> Dict[str, Any]:
+        """Distinct bodies stored vs bodies referenced (what inline copies would take)."""
+        blobs, blob_bytes, stored_bytes = db.query(
+            func.count(WathqResponseBlob.hash),
+            func.coalesce(func.sum(WathqResponseBlob.size_bytes), 0),
+            # Compressed size on disk (before TOAST)
+            func.coalesce(func.sum(func.octet_length(WathqResponseBlob.body)), 0),
+        ).one()
+        referenced = db.execute(
+            text(
+                "SELECT count(*), coalesce(sum(b.size_bytes), 0) FROM ("
+                "SELECT response_body_hash FROM wathq_call_logs "
+                "UNION ALL SELECT response_body_hash FROM wathq_offline_data"
+                ") r JOIN wathq_response_blobs b ON b.hash = r.response_body_hash"
+            )
+        ).one()
+        return {
+            "blobs": blobs,
+            "blob_bytes": int(blob_bytes),
+            "stored_bytes": int(stored_bytes),
+            "references": referenced[0],
+            "referenced_bytes": int(referenced[1]),
+        }
+
+
+wathq_response_blob = CRUDWathqResponseBlob(WathqResponseBlob)
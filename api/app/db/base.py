@@ -13,9 +13,12 @@ from app.models.management_user_profile import ManagementUserProfile  # noqa
 from app.models.service import Service, TenantService  # noqa
 from app.models.notification import Notification  # noqa
 from app.models.api_request_counter import ApiRequestCounter, ApiRequestSummary  # noqa
+from app.models.processing_watermark import ProcessingWatermark  # noqa
+from app.models.wathq_sync_job import WathqSyncJob  # noqa
 from app.models.pdf_template import PdfTemplate, PdfTemplateVersion, GeneratedPdf  # noqa
 from app.models.wathq_call_log import WathqCallLog  # noqa
 from app.models.wathq_offline_data import WathqOfflineData  # noqa
+from app.models.wathq_response_blob import WathqResponseBlob  # noqa
 from app.models.wathq_commercial_registration import CommercialRegistration  # noqa
 from app.models.wathq_capital_info import CapitalInfo  # noqa
 from app.models.wathq_cr_entity_character import CREntityCharacter  # noqa
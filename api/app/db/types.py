@@ -0,0 +1,86 @@
+"""
+Custom column types.
+"""
+
+import json
+import zlib
+from typing import Any, Optional
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, zlib is used instead
+    zstandard = None
+
+# First byte of a stored payload: how the JSON after it is encoded
+CODEC_TAGS = {"none": 0, "zlib": 1, "zstd": 2}
+_CODECS_BY_TAG = {tag: codec for codec, tag in CODEC_TAGS.items()}
+
+
+def active_codec() -> str:
+    """The codec new payloads are written with (zstd falls back to zlib when not installed)."""
+    codec = settings.WATHQ_PAYLOAD_CODEC
+    if codec == "zstd" and zstandard is None:
+        return "zlib"
+    return codec
+
+
+def encode_payload(value: Any, codec: Optional[str] = None) -> bytes:
+    """JSON-encode and compress a payload into its tagged storage form."""
+    data = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    codec = codec or active_codec()
+    if len(data) < settings.WATHQ_PAYLOAD_MIN_COMPRESS_BYTES:
+        # Not worth a compression frame
+        codec = "none"
+
+    if codec == "zstd":
+        data = zstandard.ZstdCompressor(level=settings.WATHQ_PAYLOAD_COMPRESSION_LEVEL).compress(data)
+    elif codec == "zlib":
+        data = zlib.compress(data, min(settings.WATHQ_PAYLOAD_COMPRESSION_LEVEL, 9))
+    return bytes([CODEC_TAGS[codec]]) + data
+
+
+def payload_codec(stored: bytes) -> str:
+    """Codec a stored payload was written with."""
+    return _CODECS_BY_TAG[stored[0]]
+
+
+def decode_payload(stored: bytes) -> Any:
+    """Inverse of encode_payload."""
+    codec = payload_codec(stored)
+    data = memoryview(stored)[1:]
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed payloads")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "zlib":
+        data = zlib.decompress(data)
+    return json.loads(bytes(data))
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON document stored as compressed bytea.
+
+    For large payloads that are only ever read back whole, never queried
+    inside by SQL. Reads and writes look like a JSON column; the codec
+    (WATHQ_PAYLOAD_CODEC) is recorded per value, so it can change without
+    rewriting existing rows.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return encode_payload(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return decode_payload(bytes(value))
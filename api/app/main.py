@@ -21,11 +21,19 @@ from app.api.v1.api import api_router
 from app.core.config import settings
 from app.core.logging import setup_logging
 from app.core.multitenancy import tenant_identification_middleware
+from app.core.wathq_logger import wathq_log_pipeline
+from app.core.wathq_metadata import wathq_metadata
+from app.core.wathq_transport import wathq_transport
 from app.crud.crud_management_user_profile import management_user_profile
 from app.db.session import SessionLocal
 from app.middleware.request_counter import RequestCounterMiddleware
 from app.models.management_user import ManagementUser
 from app.schemas.management_user_profile import ManagementUserProfileCreate
+from app.services.pdf_render_pool import pdf_render_pool
+from app.services.reference_data import reference_data
+from app.services.request_counter_writer import request_counter_writer
+from app.services.wathq_outbox import wathq_outbox
+from app.services.wathq_sync_job_service import sync_progress_relay
 
 logger = logging.getLogger(__name__)
 
@@ -113,6 +121,14 @@ def create_application() -> FastAPI:
     @application.on_event("startup")
     async def startup_event():
         """Initialize default management user profiles for tenant 1."""
+        request_counter_writer.start()
+        sync_progress_relay.start()
+        pdf_render_pool.start()
+        reference_data.start()
+        wathq_metadata.start()
+        wathq_outbox.start()
+        wathq_log_pipeline.start()
+
         try:
             db = SessionLocal()
             try:
@@ -146,6 +162,19 @@ def create_application() -> FastAPI:
                 f"Error initializing management user profiles: {str(e)}", exc_info=True
             )
 
+    # Shutdown event to flush background writers and release pooled connections
+    @application.on_event("shutdown")
+    async def shutdown_event():
+        """Drain queued request counters, close shared WATHQ HTTP pools and stop PDF renderers."""
+        await sync_progress_relay.stop()
+        await reference_data.stop()
+        await wathq_metadata.stop()
+        await wathq_outbox.stop()
+        await request_counter_writer.stop()
+        await wathq_transport.aclose()
+        pdf_render_pool.shutdown()
+        wathq_log_pipeline.stop()
+
     # Root endpoint
     @application.get("/")
     async def read_root():
@@ -9,8 +9,8 @@ from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
-from app.db.session import SessionLocal
 from app.services.request_counter_service import request_counter_service
+from app.services.request_counter_writer import request_counter_writer
 from app.models.api_request_counter import RequestType
 
 
@@ -51,19 +51,18 @@ class RequestCounterMiddleware(BaseHTTPMiddleware):
         # Calculate response time
         response_time_ms = int((time.time() - start_time) * 1000)
         
-        # Track the request asynchronously (don't block the response)
-        await self._track_request(request, response, response_time_ms)
+        # Queue the request for the batched writer (doesn't block the response)
+        self._track_request(request, response, response_time_ms)
         
         return response
     
-    async def _track_request(
+    def _track_request(
         self,
         request: Request,
         response: Response,
         response_time_ms: int
     ):
-        """Track the request in the database."""
-        db = SessionLocal()
+        """Queue the request for the batched request counter writer."""
         try:
             # Determine request type
             path = str(request.url.path)
@@ -122,26 +121,25 @@ class RequestCounterMiddleware(BaseHTTPMiddleware):
                     except (json.JSONDecodeError, AttributeError):
                         pass
             
-            # Track the request
-            request_counter_service.track_request(
-                db=db,
-                request=request,
-                response=response,
-                response_time_ms=response_time_ms,
-                request_type=request_type,
-                user=user,
-                management_user=management_user,
-                service_slug=service_slug,
-                is_cached=is_cached,
-                error_message=error_message,
-                request_params=request_params
+            # Queue the request; the writer bulk-inserts rows in the background
+            request_counter_writer.submit(
+                request_counter_service.build_counter_values(
+                    request=request,
+                    response=response,
+                    response_time_ms=response_time_ms,
+                    request_type=request_type,
+                    user=user,
+                    management_user=management_user,
+                    service_slug=service_slug,
+                    is_cached=is_cached,
+                    error_message=error_message,
+                    request_params=request_params
+                )
             )
             
         except Exception as e:
             # Don't let tracking errors affect the response
             print(f"Error tracking request: {str(e)}")
-        finally:
-            db.close()
     
     def _sanitize_params(self, params: dict) -> dict:
         """Sanitize sensitive parameters."""
@@ -19,9 +19,12 @@ from .api_request_counter import (
     ApiRequestSummary,
     RequestType,
 )
+from .processing_watermark import ProcessingWatermark
+from .wathq_sync_job import WathqSyncJob
 from .pdf_template import GeneratedPdf, PdfTemplate, PdfTemplateVersion
 from .wathq_call_log import WathqCallLog
 from .wathq_offline_data import WathqOfflineData
+from .wathq_response_blob import WathqResponseBlob
 from .wathq_commercial_registration import CommercialRegistration
 from .wathq_capital_info import CapitalInfo
 from .wathq_cr_entity_character import CREntityCharacter
@@ -47,6 +50,7 @@ __all__ = [
     "TenantService",
     "WathqCallLog",
     "WathqOfflineData",
+    "WathqResponseBlob",
     "Notification",
     "NotificationCategory",
     "NotificationStatus",
@@ -54,6 +58,8 @@ __all__ = [
     "ApiRequestCounter",
     "ApiRequestSummary",
     "RequestType",
+    "ProcessingWatermark",
+    "WathqSyncJob",
     "PdfTemplate",
     "PdfTemplateVersion",
     "GeneratedPdf",
@@ -4,7 +4,7 @@ API Request Counter model for tracking internal and external API calls.
 
 import uuid
 from enum import Enum
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, JSON, Boolean, Numeric
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, Integer, String, Text, JSON, Boolean, Numeric
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -22,6 +22,9 @@ class RequestType(str, Enum):
 class ApiRequestCounter(Base):
     """
     Model to track and count API requests for analytics.
+
+    Range-partitioned by month on ``created_at``; the database primary key
+    is ``(id, created_at)``.
     """
 
     __tablename__ = "api_request_counters"
@@ -60,7 +63,7 @@ class ApiRequestCounter(Base):
     is_rate_limited = Column(Boolean, default=False)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     
     # Relationships
     user = relationship("User", foreign_keys=[user_id])
@@ -76,6 +79,9 @@ class ApiRequestSummary(Base):
     """
 
     __tablename__ = "api_request_summaries"
+    __table_args__ = (
+        Index("ix_api_request_summaries_type_start", "period_type", "period_start"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -88,6 +94,7 @@ class ApiRequestSummary(Base):
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     endpoint = Column(String, nullable=True, index=True)
+    method = Column(String, nullable=True)
     service_id = Column(UUID(as_uuid=True), ForeignKey("services.id"), nullable=True, index=True)
     
     # Counters
@@ -102,7 +109,9 @@ class ApiRequestSummary(Base):
     avg_response_time_ms = Column(Numeric(10, 2), nullable=True)
     max_response_time_ms = Column(Integer, nullable=True)
     min_response_time_ms = Column(Integer, nullable=True)
-    total_response_size_bytes = Column(Integer, nullable=True)
+    total_response_size_bytes = Column(BigInteger, nullable=True)
+    total_response_time_ms = Column(BigInteger, default=0)  # Sum, so buckets can be merged
+    last_request_at = Column(DateTime(timezone=True), nullable=True)
     
     # Rate limiting
     rate_limited_requests = Column(Integer, default=0)
@@ -1,7 +1,8 @@
 from sqlalchemy import Column, String, Integer, DateTime, func
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from app.db.base_class import Base
+from app.db.types import CompressedJSON
 
 
 class CrRequest(Base):
@@ -11,7 +12,7 @@ class CrRequest(Base):
     url = Column(String(500), nullable=False)
     cr_number = Column(String(50), nullable=False, index=True)
     language = Column(String(10), nullable=False)
-    response = Column(JSONB, nullable=True)
+    response = Column(CompressedJSON, nullable=True)
     status_number = Column(Integer, nullable=True, index=True)
     status_text = Column(String(100), nullable=True)
     
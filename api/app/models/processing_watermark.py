@@ -0,0 +1,26 @@
+"""
+Processing watermark model for incremental background jobs.
+"""
+
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class ProcessingWatermark(Base):
+    """
+    High-water mark of an incremental job (rollups, log syncs, ...).
+
+    Each job owns one row identified by ``name``. ``watermark_at`` is the
+    timestamp up to which data has been processed; ``watermark_id`` breaks
+    ties between rows sharing the same timestamp for keyset pagination.
+    """
+
+    __tablename__ = "processing_watermarks"
+
+    name = Column(String, primary_key=True)
+    watermark_at = Column(DateTime(timezone=True), nullable=True)
+    watermark_id = Column(String, nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -27,6 +27,7 @@ class Tenant(Base):
     logo = Column(String, nullable=True)  # Logo URL/path
     is_active = Column(Boolean, default=True)
     max_users = Column(Integer, default=100)  # User limit per tenant
+    log_retention_days = Column(Integer, nullable=True)  # Call log/request counter retention; None = LOG_RETENTION_DAYS
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -2,8 +2,8 @@
 WATHQ API call logging model.
 """
 
-from sqlalchemy import Column, DateTime, Integer, String, JSON, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, DateTime, Index, Integer, String, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import uuid
@@ -14,9 +14,17 @@ from app.db.base_class import Base
 class WathqCallLog(Base):
     """
     Model to track all WATHQ external API calls.
+
+    The table is range-partitioned by month on ``fetched_at`` (see
+    PartitionMaintenanceService), so its database primary key is
+    ``(id, fetched_at)``; ``id`` alone is still unique in practice.
     """
 
     __tablename__ = "wathq_call_logs"
+    __table_args__ = (
+        # Keyset pagination for the incremental sync (service, fetched_at, id)
+        Index("ix_wathq_call_logs_sync_keyset", "service_slug", "fetched_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True, index=True)  # Nullable for management users
@@ -26,12 +34,24 @@ class WathqCallLog(Base):
     endpoint = Column(String, nullable=False)  # WATHQ endpoint called
     method = Column(String, nullable=False, default="POST")  # HTTP method
     status_code = Column(Integer, nullable=False)  # HTTP response status
-    request_data = Column(JSON, nullable=True)  # Request payload
-    response_body = Column(JSON, nullable=False)  # Response data
-    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    request_data = Column(JSONB, nullable=True)  # Request payload (filtered on, e.g. language)
+    response_body_hash = Column(String(64), nullable=False, index=True)  # -> wathq_response_blobs
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     duration_ms = Column(Integer, nullable=True)  # Request duration in milliseconds
 
     # Relationships
     tenant = relationship("Tenant")
     user = relationship("User")
-    management_user = relationship("ManagementUser")
\ No newline at end of file
+    management_user = relationship("ManagementUser")
+    # Loaded on first access of response_body only
+    response_blob = relationship(
+        "WathqResponseBlob",
+        primaryjoin="foreign(WathqCallLog.response_body_hash) == WathqResponseBlob.hash",
+        lazy="select",
+        viewonly=True,
+    )
+
+    @property
+    def response_body(self):
+        """Response data, read from its content-addressed blob."""
+        return self.response_blob.body if self.response_blob is not None else None
\ No newline at end of file
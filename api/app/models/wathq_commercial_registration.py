@@ -2,7 +2,7 @@
 Commercial Registration model for Wathq schema.
 """
 
-from sqlalchemy import Boolean, Column, Date, DateTime, Integer, Numeric, String, JSON, func, ForeignKey
+from sqlalchemy import Boolean, Column, Date, DateTime, Integer, Numeric, String, JSON, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -18,7 +18,7 @@ class CommercialRegistration(Base):
     __table_args__ = {'schema': 'wathq'}
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    log_id = Column(UUID(as_uuid=True), ForeignKey('wathq_call_logs.id'), nullable=True, index=True)  # Link to the call log
+    log_id = Column(UUID(as_uuid=True), nullable=True, index=True)  # Link to the call log (no FK: wathq_call_logs is partitioned)
     cr_number = Column(String(20), nullable=False, index=True)  # Removed unique constraint to allow historical records
     cr_national_number = Column(String(20), nullable=True)
     version_no = Column(Integer, nullable=True)
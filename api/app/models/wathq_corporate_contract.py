@@ -33,8 +33,8 @@ class CorporateContract(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     log_id = Column(
-        UUID(as_uuid=True), ForeignKey("wathq_call_logs.id"), nullable=True, index=True
-    )
+        UUID(as_uuid=True), nullable=True, index=True
+    )  # wathq_call_logs.id; no FK because the log table is partitioned
     fetched_at = Column(DateTime(timezone=True), nullable=True)
     contract_id = Column(Integer, nullable=True)
     contract_copy_number = Column(Integer, nullable=True)
@@ -22,8 +22,8 @@ class Employee(Base):
 
     employee_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     log_id = Column(
-        UUID(as_uuid=True), ForeignKey("wathq_call_logs.id"), nullable=True, index=True
-    )
+        UUID(as_uuid=True), nullable=True, index=True
+    )  # wathq_call_logs.id; no FK because the log table is partitioned
     fetched_at = Column(DateTime(timezone=True), nullable=True)
     name = Column(String(255), nullable=True, index=True)
     nationality = Column(String(100), nullable=True, index=True)
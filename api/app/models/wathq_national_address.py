@@ -11,7 +11,6 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     JSON,
-    ForeignKey,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
@@ -31,8 +30,8 @@ class Address(Base):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     log_id = Column(
-        UUID(as_uuid=True), ForeignKey("wathq_call_logs.id"), nullable=True, index=True
-    )
+        UUID(as_uuid=True), nullable=True, index=True
+    )  # wathq_call_logs.id; no FK because the log table is partitioned
     fetched_at = Column(DateTime(timezone=True), nullable=True)
     pk_address_id = Column(String(50), nullable=True, index=True)
     title = Column(String(255), nullable=True)
@@ -2,7 +2,7 @@
 WATHQ offline data storage model.
 """
 
-from sqlalchemy import Column, DateTime, Integer, Text, JSON, ForeignKey
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, ForeignKey
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -14,9 +14,25 @@ from app.db.base_class import Base
 class WathqOfflineData(Base):
     """
     Model to store WATHQ API responses for offline access.
+
+    The business identifiers a response is about are extracted when the row
+    is written (see crud_wathq_offline_data.extract_identifiers) into
+    indexed columns, so lookups by CR number, deed number etc. are index
+    seeks instead of pattern scans over full_external_url.
     """
 
     __tablename__ = "wathq_offline_data"
+    __table_args__ = (
+        # Lookups by business identifier, latest copies first; only rows that carry it
+        Index("ix_wathq_offline_data_cr_number_fetched_at", "cr_number", "fetched_at",
+              postgresql_where="cr_number IS NOT NULL"),
+        Index("ix_wathq_offline_data_cr_national_number_fetched_at", "cr_national_number", "fetched_at",
+              postgresql_where="cr_national_number IS NOT NULL"),
+        Index("ix_wathq_offline_data_deed_number_fetched_at", "deed_number", "fetched_at",
+              postgresql_where="deed_number IS NOT NULL"),
+        Index("ix_wathq_offline_data_poa_code_fetched_at", "poa_code", "fetched_at",
+              postgresql_where="poa_code IS NOT NULL"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     service_id = Column(UUID(as_uuid=True), ForeignKey("services.id"), nullable=False, index=True)
@@ -24,11 +40,27 @@ class WathqOfflineData(Base):
     fetched_by = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # Nullable for management users
     management_user_id = Column(Integer, ForeignKey("management_users.id"), nullable=True, index=True)  # For management user requests
     full_external_url = Column(Text, nullable=False)
-    response_body = Column(JSON, nullable=False)
+    response_body_hash = Column(String(64), nullable=False, index=True)  # -> wathq_response_blobs
+    cr_number = Column(String(20), nullable=True)
+    cr_national_number = Column(String(20), nullable=True)  # Unified number (7xxxxxxxxx)
+    deed_number = Column(String(50), nullable=True)
+    poa_code = Column(String(50), nullable=True)  # Power of attorney code
     fetched_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     # Relationships
     service = relationship("Service")
     tenant = relationship("Tenant")
     user = relationship("User")
-    management_user = relationship("ManagementUser")
\ No newline at end of file
+    management_user = relationship("ManagementUser")
+    # Loaded on first access of response_body only
+    response_blob = relationship(
+        "WathqResponseBlob",
+        primaryjoin="foreign(WathqOfflineData.response_body_hash) == WathqResponseBlob.hash",
+        lazy="select",
+        viewonly=True,
+    )
+
+    @property
+    def response_body(self):
+        """Response data, read from its content-addressed blob."""
+        return self.response_blob.body if self.response_blob is not None else None
\ No newline at end of file
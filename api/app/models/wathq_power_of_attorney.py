@@ -32,8 +32,8 @@ class PowerOfAttorney(Base):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     log_id = Column(
-        UUID(as_uuid=True), ForeignKey("wathq_call_logs.id"), nullable=True, index=True
-    )
+        UUID(as_uuid=True), nullable=True, index=True
+    )  # wathq_call_logs.id; no FK because the log table is partitioned
     fetched_at = Column(DateTime(timezone=True), nullable=True)
     code = Column(String(50), nullable=False, index=True)
     status = Column(String(50), nullable=True)
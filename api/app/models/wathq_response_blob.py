@@ -0,0 +1,31 @@
+"""
+Content-addressed storage of WATHQ response bodies.
+"""
+
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+from app.db.types import CompressedJSON
+
+
+class WathqResponseBlob(Base):
+    """
+    One row per distinct WATHQ response body, keyed by the SHA-256 of its
+    canonical JSON (see crud_wathq_response_blob.hash_body).
+
+    Call logs and offline data reference bodies by hash instead of storing
+    their own copy, so repeat lookups of unchanged records add no body bytes.
+    Blobs are immutable. There is no foreign key: detached log partitions
+    keep referencing their blobs; unreferenced blobs are removed by the
+    partition maintenance once the referencing rows are dropped.
+    """
+
+    __tablename__ = "wathq_response_blobs"
+
+    hash = Column(String(64), primary_key=True)  # sha256 hex of the canonical JSON
+    body = Column(CompressedJSON, nullable=False)  # Only ever read whole
+    size_bytes = Column(Integer, nullable=False)  # Canonical JSON length (uncompressed)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Bumped (at most hourly) when a new row references the blob; guards GC
+    last_referenced_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
@@ -0,0 +1,43 @@
+"""
+WATHQ sync job model for background call log syncs.
+"""
+
+import uuid
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class WathqSyncJob(Base):
+    """
+    One background run of a WATHQ call log sync.
+
+    Progress counters are incremented atomically by the chunk tasks working
+    on the job in parallel; ``errors`` keeps the per-log failures (capped at
+    WATHQ_SYNC_JOB_MAX_ERRORS, ``error_count`` has the full count).
+    """
+
+    __tablename__ = "wathq_sync_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    service_slug = Column(String(100), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="pending", index=True)  # pending, running, completed, failed
+    full_resync = Column(Boolean, nullable=False, default=False)
+    requested_by = Column(Integer, ForeignKey("management_users.id"), nullable=True)
+
+    total_logs = Column(Integer, nullable=False, default=0)
+    total_chunks = Column(Integer, nullable=False, default=0)
+    processed_logs = Column(Integer, nullable=False, default=0)
+    completed_chunks = Column(Integer, nullable=False, default=0)
+    synced_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    errors = Column(JSONB, nullable=False, server_default=text("'[]'::jsonb"))
+    message = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
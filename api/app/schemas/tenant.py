@@ -18,6 +18,7 @@ class TenantBase(BaseModel):
     logo: str | None = None  # Logo URL/path
     is_active: bool | None = True
     max_users: int | None = 100
+    log_retention_days: int | None = Field(None, ge=1)  # None uses the global default
 
 
 # Properties to receive via API on creation
@@ -64,9 +64,11 @@ class WathqServiceResponse(BaseModel):
     service: str
     data: Dict[str, Any]
     cached: bool = Field(..., description="Whether data was from cache or fresh")
+    cache_status: Optional[str] = Field(None, description="fresh, stale (refresh in progress), negative (cached not-found) or miss")
     cache_expires_at: Optional[datetime] = None
     status: str = Field("success", description="Response status")
     message: Optional[str] = None
+    duration_ms: Optional[int] = Field(None, description="Time spent on this item (bulk calls)")
 
 
 class WathqBulkServiceRequest(BaseModel):
@@ -28,6 +28,10 @@ class WathqOfflineDataUpdate(BaseModel):
 
 class WathqOfflineDataInDBBase(WathqOfflineDataBase):
     id: UUID
+    cr_number: Optional[str] = None
+    cr_national_number: Optional[str] = None
+    deed_number: Optional[str] = None
+    poa_code: Optional[str] = None
     fetched_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
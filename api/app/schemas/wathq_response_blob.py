@@ -0,0 +1,15 @@
+"""
+Pydantic schemas for WATHQ response blobs.
+"""
+
+from typing import Any, Dict, List, Union
+
+from pydantic import BaseModel
+
+
+class WathqResponseBlobCreate(BaseModel):
+    body: Union[Dict[str, Any], List[Any]]
+
+
+class WathqResponseBlobUpdate(BaseModel):
+    pass
@@ -0,0 +1,343 @@
+"""
+Normalization of WATHQ /fullinfo commercial registration payloads.
+
+A payload is flattened into plain row dicts for commercial_registrations and
+its child tables, and whole chunks of payloads are written with a handful of
+multi-row INSERT statements (one per table, using RETURNING to learn the
+generated ids) instead of one ORM object and flush per row.
+"""
+
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.orm import Session
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+# Child tables keyed on cr_id, in insert order: (payload key, model)
+_CR_CHILD_TABLES = [
+    ("entity_characters", models.CREntityCharacter),
+    ("activities", models.CRActivity),
+    ("stocks", models.CRStock),
+]
+
+# Child tables with their own children: (payload key, model, grandchild model, grandchild FK)
+_CR_PARENT_CHILD_TABLES = [
+    ("estores", models.CREstore, models.CREstoreActivity, "estore_id"),
+    ("parties", models.CRParty, models.CRPartyPartnership, "party_id"),
+    ("managers", models.CRManager, models.CRManagerPosition, "manager_id"),
+    ("liquidators", models.CRLiquidator, models.CRLiquidatorPosition, "liquidator_id"),
+]
+
+
+def _obj(value: Any) -> Dict:
+    return value if isinstance(value, dict) else {}
+
+
+def _list(value: Any) -> List[Dict]:
+    return [item for item in value if isinstance(item, dict)] if isinstance(value, list) else []
+
+
+def _gregorian(value: Any) -> Optional[date]:
+    """Parse a yyyy-mm-dd date, ignoring anything else."""
+    if isinstance(value, str) and value:
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _person_row(cr_number: str, person: Dict) -> Dict:
+    """Columns shared by managers and liquidators."""
+    identity = _obj(person.get("identity"))
+    nationality = _obj(person.get("nationality"))
+    return {
+        "cr_number": cr_number,
+        "name": person.get("name"),
+        "type_id": person.get("typeId"),
+        "type_name": person.get("typeName"),
+        "identity_id": identity.get("id"),
+        "identity_type_id": identity.get("typeId"),
+        "identity_type_name": identity.get("typeName"),
+        "nationality_id": nationality.get("id"),
+        "nationality_name": nationality.get("name"),
+    }
+
+
+def _positions(person: Dict) -> List[Dict]:
+    return [
+        {"position_id": p.get("id"), "position_name": p.get("name")}
+        for p in _list(person.get("positions"))
+    ]
+
+
+class CRNormalizer:
+    """Maps /fullinfo payloads into the wathq.* commercial registration tables."""
+
+    @staticmethod
+    def build_rows(cr_data: Dict, log: models.WathqCallLog) -> Dict[str, Any]:
+        """
+        Flatten one /fullinfo payload into row dicts.
+
+        Child rows carry ``cr_number`` but not ``cr_id``, which is only known
+        once the parent row is inserted. Tables with their own children hold
+        ``(row, grandchild_rows)`` pairs.
+        """
+        cr_number = str(cr_data.get("crNumber") or cr_data.get("cr_number"))
+        entity_type = _obj(cr_data.get("entityType"))
+        status = _obj(cr_data.get("status"))
+        contact_info = _obj(cr_data.get("contactInfo"))
+        fiscal_year = _obj(cr_data.get("fiscalYear"))
+        management = _obj(cr_data.get("management"))
+        capital = _obj(cr_data.get("capital"))
+
+        def status_date(key: str) -> Dict:
+            # Sent at the top level by /fullinfo, nested under status by older responses
+            return _obj(cr_data.get(key) or status.get(key))
+
+        confirmation = status_date("confirmationDate")
+        reactivation = status_date("reactivationDate")
+        suspension = status_date("suspensionDate")
+        deletion = status_date("deletionDate")
+
+        cr = {
+            "log_id": log.id,
+            "cr_number": cr_number,
+            "cr_national_number": cr_data.get("crNationalNumber"),
+            "version_no": cr_data.get("versionNo"),
+            "fetched_at": log.fetched_at,
+            "name": cr_data.get("name"),
+            "name_lang_id": cr_data.get("nameLangId"),
+            "name_lang_desc": cr_data.get("nameLangDesc"),
+            "cr_capital": cr_data.get("crCapital"),
+            "company_duration": cr_data.get("companyDuration"),
+            "is_main": cr_data.get("isMain"),
+            "issue_date_gregorian": _gregorian(cr_data.get("issueDateGregorian")),
+            "issue_date_hijri": cr_data.get("issueDateHijri"),
+            "main_cr_national_number": cr_data.get("mainCrNationalNumber"),
+            "main_cr_number": cr_data.get("mainCrNumber"),
+            "in_liquidation_process": cr_data.get("inLiquidationProcess"),
+            "has_ecommerce": cr_data.get("hasEcommerce"),
+            "headquarter_city_id": cr_data.get("headquarterCityId"),
+            "headquarter_city_name": cr_data.get("headquarterCityName"),
+            "is_license_based": cr_data.get("isLicenseBased"),
+            "license_issuer_national_number": cr_data.get("licenseIssuerNationalNumber"),
+            "license_issuer_name": cr_data.get("licenseIssuerName"),
+            "partners_nationality_id": cr_data.get("partnersNationalityId"),
+            "partners_nationality_name": (
+                cr_data.get("partnersNationalityName") or cr_data.get("PartnersNationalityName")
+            ),
+            "entity_type_id": entity_type.get("id"),
+            "entity_type_name": entity_type.get("name"),
+            "entity_form_id": entity_type.get("formId"),
+            "entity_form_name": entity_type.get("formName"),
+            "status_id": status.get("id"),
+            "status_name": status.get("name"),
+            "confirmation_date_gregorian": _gregorian(confirmation.get("gregorian")),
+            "confirmation_date_hijri": confirmation.get("hijri"),
+            "reactivation_date_gregorian": _gregorian(reactivation.get("gregorian")),
+            "reactivation_date_hijri": reactivation.get("hijri"),
+            "suspension_date_gregorian": _gregorian(suspension.get("gregorian")),
+            "suspension_date_hijri": suspension.get("hijri"),
+            "deletion_date_gregorian": _gregorian(deletion.get("gregorian")),
+            "deletion_date_hijri": deletion.get("hijri"),
+            "contact_phone": contact_info.get("phoneNo"),
+            "contact_mobile": contact_info.get("mobileNo"),
+            "contact_email": contact_info.get("email"),
+            "contact_website": contact_info.get("websiteUrl"),
+            "fiscal_is_first": fiscal_year.get("isFirst"),
+            "fiscal_calendar_type_id": fiscal_year.get("calendarTypeId"),
+            "fiscal_calendar_type_name": fiscal_year.get("calendarTypeName"),
+            "fiscal_end_month": fiscal_year.get("endMonth"),
+            "fiscal_end_day": fiscal_year.get("endDay"),
+            "fiscal_end_year": fiscal_year.get("endYear"),
+            "mgmt_structure_id": management.get("structureId"),
+            "mgmt_structure_name": management.get("structureName"),
+            "request_body": log.request_data,
+        }
+
+        capital_info = None
+        if capital:
+            contribution = _obj(capital.get("contributionCapital"))
+            stock_capital = _obj(capital.get("stockCapital"))
+            capital_info = {
+                "cr_number": cr_number,
+                "currency_id": capital.get("currencyId"),
+                "currency_name": capital.get("currencyName"),
+                "contrib_type_id": contribution.get("typeId"),
+                "contrib_type_name": contribution.get("typeName"),
+                "contrib_cash": contribution.get("cashCapital"),
+                "contrib_in_kind": contribution.get("inKindCapital"),
+                "contrib_value": contribution.get("contributionValue"),
+                "total_cash_contribution": contribution.get("totalCashContribution"),
+                "total_in_kind_contribution": contribution.get("totalInKindContribution"),
+                "stock_type_id": stock_capital.get("typeId"),
+                "stock_type_name": stock_capital.get("typeName"),
+                "stock_capital": stock_capital.get("capital"),
+                "stock_announced_capital": stock_capital.get("announcedCapital"),
+                "stock_paid_capital": stock_capital.get("paidCapital"),
+                "stock_cash_capital": stock_capital.get("cashCapital"),
+                "stock_in_kind_capital": stock_capital.get("inKindCapital"),
+            }
+            stocks = _list(stock_capital.get("stocks"))
+        else:
+            stocks = []
+
+        parties = []
+        for party in _list(cr_data.get("parties")):
+            identity = _obj(party.get("identity"))
+            share = _obj(party.get("partnerShare"))
+            parties.append((
+                {
+                    "cr_number": cr_number,
+                    "name": party.get("name"),
+                    "type_id": party.get("typeId"),
+                    "type_name": party.get("typeName"),
+                    "identity_id": identity.get("id"),
+                    "identity_type_id": identity.get("typeId"),
+                    "identity_type_name": identity.get("typeName"),
+                    "share_cash_count": share.get("cashContributionCount"),
+                    "share_in_kind_count": share.get("inKindContributionCount"),
+                    "share_total_count": share.get("totalContributionCount"),
+                },
+                [
+                    {"partnership_id": p.get("id"), "partnership_name": p.get("name")}
+                    for p in _list(party.get("partnership"))
+                ],
+            ))
+
+        return {
+            "cr": cr,
+            "capital_info": capital_info,
+            "entity_characters": [
+                {"cr_number": cr_number, "character_id": c.get("id"), "character_name": c.get("name")}
+                for c in _list(entity_type.get("characters"))
+            ],
+            "activities": [
+                {"cr_number": cr_number, "activity_id": a.get("id"), "activity_name": a.get("name")}
+                for a in _list(cr_data.get("activities"))
+            ],
+            "stocks": [
+                {
+                    "cr_number": cr_number,
+                    "stock_count": s.get("count"),
+                    "stock_value": s.get("value"),
+                    "type_id": s.get("typeId"),
+                    "type_name": s.get("typeName"),
+                    "class_reference_id": s.get("classReferenceID"),
+                    "class_name": s.get("className"),
+                }
+                for s in stocks
+            ],
+            "estores": [
+                (
+                    {
+                        "cr_number": cr_number,
+                        "auth_platform_url": e.get("authenticationPlatformUrl"),
+                        "store_url": e.get("storeUrl"),
+                    },
+                    [
+                        {"activity_id": a.get("id"), "activity_name": a.get("name")}
+                        for a in _list(e.get("storeActivities"))
+                    ],
+                )
+                for e in _list(_obj(cr_data.get("eCommerce")).get("eStore"))
+            ],
+            "parties": parties,
+            "managers": [
+                (_person_row(cr_number, m), _positions(m))
+                for m in _list(management.get("managers"))
+            ],
+            "liquidators": [
+                (_person_row(cr_number, liquidator), _positions(liquidator))
+                for liquidator in _list(cr_data.get("liquidators"))
+            ],
+        }
+
+    @staticmethod
+    def write_batch(
+        db: Session, items: List[Tuple[models.WathqCallLog, Dict]]
+    ) -> List[int]:
+        """
+        Insert a commercial registration, with all its child rows, per
+        ``(log, payload)`` item and return the new registration ids.
+
+        Every table is written with one multi-row INSERT for the whole batch.
+        capital_info is keyed on cr_number, so it keeps the most recent capital
+        of each registration: existing rows are replaced and, within the
+        batch, the last item for a cr_number wins. The registrations that
+        lose their capital row get a new ``updated_at``.
+        """
+        if not items:
+            return []
+
+        built = [CRNormalizer.build_rows(cr_data, log) for log, cr_data in items]
+
+        cr_ids = db.execute(
+            insert(models.CommercialRegistration).returning(
+                models.CommercialRegistration.id, sort_by_parameter_order=True
+            ),
+            [rows["cr"] for rows in built]
+        ).scalars().all()
+
+        capital_rows: Dict[str, Dict] = {}
+        for cr_id, rows in zip(cr_ids, built):
+            if rows["capital_info"]:
+                capital_rows[rows["cr"]["cr_number"]] = {**rows["capital_info"], "cr_id": cr_id}
+        if capital_rows:
+            db.execute(
+                delete(models.CapitalInfo).where(models.CapitalInfo.cr_number.in_(list(capital_rows)))
+            )
+            db.execute(insert(models.CapitalInfo), list(capital_rows.values()))
+            # Older registrations of these CR numbers just lost their capital
+            # row to the new version: bump their version so renders cached
+            # from them (see rendered_artifact_cache) are not served again
+            db.execute(
+                update(models.CommercialRegistration)
+                .where(
+                    models.CommercialRegistration.cr_number.in_(list(capital_rows)),
+                    models.CommercialRegistration.id.notin_(cr_ids),
+                )
+                .values(updated_at=func.now())
+            )
+
+        for key, model in _CR_CHILD_TABLES:
+            child_rows = [
+                {**row, "cr_id": cr_id}
+                for cr_id, rows in zip(cr_ids, built)
+                for row in rows[key]
+            ]
+            if child_rows:
+                db.execute(insert(model), child_rows)
+
+        for key, model, grandchild_model, foreign_key in _CR_PARENT_CHILD_TABLES:
+            pairs = [
+                ({**row, "cr_id": cr_id}, grandchildren)
+                for cr_id, rows in zip(cr_ids, built)
+                for row, grandchildren in rows[key]
+            ]
+            if not pairs:
+                continue
+            child_ids = db.execute(
+                insert(model).returning(model.id, sort_by_parameter_order=True),
+                [row for row, _ in pairs]
+            ).scalars().all()
+            grandchild_rows = [
+                {**grandchild, foreign_key: child_id}
+                for child_id, (_, grandchildren) in zip(child_ids, pairs)
+                for grandchild in grandchildren
+            ]
+            if grandchild_rows:
+                db.execute(insert(grandchild_model), grandchild_rows)
+
+        logger.debug(f"Normalized {len(cr_ids)} commercial registrations")
+        return list(cr_ids)
+
+
+# Singleton instance
+cr_normalizer = CRNormalizer()
@@ -0,0 +1,195 @@
+"""
+Maintenance of the monthly partitions behind the high-volume log tables.
+
+``wathq_call_logs`` and ``api_request_counters`` are range-partitioned by
+month. This service keeps partitions created ahead of time and enforces the
+retention policy: partitions older than every tenant's retention are detached
+(or dropped) in one cheap DDL statement, while tenants with a shorter policy
+than the longest one have their rows deleted from the older partitions.
+
+Response bodies live in the shared wathq_response_blobs table; when removed
+partitions are dropped (not kept detached), blobs nothing references any
+more are deleted afterwards.
+"""
+
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.crud_wathq_response_blob import wathq_response_blob
+from app.models.tenant import Tenant
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> partition key column
+PARTITIONED_TABLES = {
+    "wathq_call_logs": "fetched_at",
+    "api_request_counters": "created_at",
+}
+
+_PARTITION_SUFFIX = re.compile(r"_y(\d{4})m(\d{2})$")
+
+
+def month_start(dt: datetime) -> datetime:
+    """First instant of the month containing ``dt`` (UTC)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(dt: datetime, months: int) -> datetime:
+    """Shift a month start by ``months``."""
+    index = dt.year * 12 + dt.month - 1 + months
+    return dt.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    """e.g. wathq_call_logs_y2025m11"""
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+class PartitionMaintenanceService:
+    """Creates, detaches and prunes monthly log partitions."""
+
+    @staticmethod
+    def list_partitions(db: Session, table: str) -> List[Tuple[str, datetime]]:
+        """Monthly partitions currently attached to ``table``, oldest first."""
+        rows = db.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table"
+            ),
+            {"table": table}
+        ).scalars().all()
+
+        partitions = []
+        for name in rows:
+            match = _PARTITION_SUFFIX.search(name)
+            if match:
+                month = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+                partitions.append((name, month))
+        return sorted(partitions, key=lambda p: p[1])
+
+    @staticmethod
+    def ensure_partitions(
+        db: Session,
+        table: str,
+        months_ahead: int = settings.LOG_PARTITION_MONTHS_AHEAD,
+        now: Optional[datetime] = None
+    ) -> List[str]:
+        """Create the current month's partition and ``months_ahead`` more."""
+        current = month_start(now or datetime.now(timezone.utc))
+        existing = {name for name, _ in PartitionMaintenanceService.list_partitions(db, table)}
+
+        created = []
+        for offset in range(months_ahead + 1):
+            lo = add_months(current, offset)
+            name = partition_name(table, lo)
+            if name in existing:
+                continue
+            hi = add_months(lo, 1)
+            try:
+                db.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{lo.isoformat()}') TO ('{hi.isoformat()}')"
+                ))
+                db.commit()
+                created.append(name)
+                logger.info(f"Created partition {name}")
+            except Exception as e:
+                # Usually rows for this month already sit in the default partition
+                db.rollback()
+                logger.error(f"Failed to create partition {name}: {e}")
+        return created
+
+    @staticmethod
+    def apply_retention(
+        db: Session,
+        table: str,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Enforce per-tenant retention on ``table``.
+
+        Whole partitions are only removed once they are older than the longest
+        retention in force; shorter tenant policies (and the default policy,
+        when some tenant keeps data longer) are applied with row deletes that
+        partition pruning confines to the old partitions.
+        """
+        column = PARTITIONED_TABLES[table]
+        now = now or datetime.now(timezone.utc)
+
+        policies = dict(
+            db.query(Tenant.id, Tenant.log_retention_days).filter(
+                Tenant.log_retention_days.isnot(None)
+            ).all()
+        )
+        default_days = settings.LOG_RETENTION_DAYS
+        longest_days = max([default_days, *policies.values()])
+        partition_cutoff = now - timedelta(days=longest_days)
+
+        # 1. Partitions entirely past every policy
+        removed = []
+        for name, month in PartitionMaintenanceService.list_partitions(db, table):
+            if add_months(month, 1) > partition_cutoff:
+                break
+            db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            if settings.LOG_RETENTION_ACTION == "drop":
+                db.execute(text(f"DROP TABLE {name}"))
+            db.commit()
+            removed.append(name)
+            logger.info(f"Retention: {settings.LOG_RETENTION_ACTION} partition {name}")
+
+        # 2. Row-level deletes for shorter policies
+        deleted = 0
+        for tenant_id, days in policies.items():
+            if days < longest_days:
+                result = db.execute(
+                    text(f"DELETE FROM {table} WHERE tenant_id = :tenant_id AND {column} < :cutoff"),
+                    {"tenant_id": tenant_id, "cutoff": now - timedelta(days=days)}
+                )
+                deleted += result.rowcount or 0
+
+        if default_days < longest_days:
+            # Tenants without a policy, plus management calls (no tenant)
+            result = db.execute(
+                text(
+                    f"DELETE FROM {table} "
+                    f"WHERE (tenant_id IS NULL OR NOT (tenant_id = ANY(:policy_tenants))) "
+                    f"AND {column} < :cutoff"
+                ),
+                {"policy_tenants": list(policies), "cutoff": now - timedelta(days=default_days)}
+            )
+            deleted += result.rowcount or 0
+
+        db.commit()
+        if deleted:
+            logger.info(f"Retention: deleted {deleted} rows from {table}")
+
+        return {"removed_partitions": removed, "deleted_rows": deleted}
+
+    @staticmethod
+    def run_maintenance(db: Session) -> Dict[str, Any]:
+        """Create upcoming partitions and apply retention for every table."""
+        summary = {}
+        for table in PARTITIONED_TABLES:
+            created = PartitionMaintenanceService.ensure_partitions(db, table)
+            retention = PartitionMaintenanceService.apply_retention(db, table)
+            summary[table] = {"created_partitions": created, **retention}
+        if settings.LOG_RETENTION_ACTION == "drop":
+            # Detached partitions keep referencing their blobs
+            summary["wathq_response_blobs"] = {
+                "deleted_blobs": wathq_response_blob.delete_unreferenced(db)
+            }
+        return summary
+
+
+# Singleton instance
+partition_maintenance_service = PartitionMaintenanceService()
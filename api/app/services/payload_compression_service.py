@@ -0,0 +1,113 @@
+"""
+Re-encoding of compressed WATHQ payload columns.
+
+Columns of type app.db.types.CompressedJSON record the codec of every value,
+so changing WATHQ_PAYLOAD_CODEC (or installing zstandard) only affects new
+writes. This backfill brings existing rows to the configured codec: after the
+migration that introduced the columns (which stores everything uncompressed),
+after a codec change, or with WATHQ_PAYLOAD_CODEC=none before a downgrade.
+
+Rows are walked in primary key order, one short transaction per batch.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.types import CODEC_TAGS, active_codec, decode_payload, encode_payload
+
+logger = logging.getLogger(__name__)
+
+# Table -> (primary key column, CompressedJSON column)
+COMPRESSED_COLUMNS: Dict[str, Tuple[str, str]] = {
+    "wathq_response_blobs": ("hash", "body"),
+    "cr_requests": ("id", "response"),
+}
+
+
+class PayloadCompressionService:
+    """Brings stored payloads to the configured codec."""
+
+    @staticmethod
+    def _stale_filter(column: str, codec: str) -> str:
+        """Rows whose stored codec differs from what encode_payload would write now."""
+        if codec == "none":
+            return f"get_byte({column}, 0) <> 0"
+        # Uncompressed values below the size threshold are already as intended
+        return (
+            f"get_byte({column}, 0) <> {CODEC_TAGS[codec]} AND NOT "
+            f"(get_byte({column}, 0) = 0 AND octet_length({column}) <= "
+            f"{settings.WATHQ_PAYLOAD_MIN_COMPRESS_BYTES})"
+        )
+
+    def count_stale(self, db: Session) -> Dict[str, int]:
+        """Rows per table still to re-encode."""
+        codec = active_codec()
+        return {
+            table: db.execute(
+                text(f"SELECT count(*) FROM {table} WHERE {column} IS NOT NULL "
+                     f"AND {self._stale_filter(column, codec)}")
+            ).scalar()
+            for table, (_, column) in COMPRESSED_COLUMNS.items()
+        }
+
+    def recompress_table(
+        self,
+        db: Session,
+        table: str,
+        batch_size: int = 500,
+        limit: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Re-encode one table's stale payloads.
+
+        Returns rows rewritten and the stored bytes before and after.
+        """
+        key, column = COMPRESSED_COLUMNS[table]
+        codec = active_codec()
+        stale = self._stale_filter(column, codec)
+        summary = {"rows": 0, "bytes_before": 0, "bytes_after": 0}
+
+        after = None
+        while limit is None or summary["rows"] < limit:
+            query = f"SELECT {key}, {column} FROM {table} WHERE {column} IS NOT NULL AND {stale}"
+            params = {"limit": batch_size}
+            if after is not None:
+                query += f" AND {key} > :after"
+                params["after"] = after
+            query += f" ORDER BY {key} LIMIT :limit"
+            rows = db.execute(text(query), params).fetchall()
+            if not rows:
+                break
+
+            updates: List[Dict[str, object]] = []
+            for row_key, stored in rows:
+                stored = bytes(stored)
+                encoded = encode_payload(decode_payload(stored), codec)
+                updates.append({"key": row_key, "value": encoded})
+                summary["bytes_before"] += len(stored)
+                summary["bytes_after"] += len(encoded)
+
+            db.execute(text(f"UPDATE {table} SET {column} = :value WHERE {key} = :key"), updates)
+            db.commit()
+            summary["rows"] += len(updates)
+            after = rows[-1][0]
+
+        logger.info(f"Re-encoded {summary['rows']} {table}.{column} payloads as {codec}")
+        return summary
+
+    def recompress_all(
+        self, db: Session, batch_size: int = 500, limit: Optional[int] = None
+    ) -> Dict[str, Dict[str, int]]:
+        """Re-encode every compressed payload column; summary per table."""
+        return {
+            table: self.recompress_table(db, table, batch_size=batch_size, limit=limit)
+            for table in COMPRESSED_COLUMNS
+        }
+
+
+# Singleton instance
+payload_compression_service = PayloadCompressionService()
@@ -0,0 +1,182 @@
+"""
+Bounded, non-blocking PDF rendering for the export endpoints.
+
+WeasyPrint renders are CPU bound and hold the GIL, so running them inside an
+``async def`` handler stalls every other request on the worker. They run here
+in a small pool of long-lived processes instead. Each process imports
+WeasyPrint (and its Pango/fontconfig stack) once, and keeps the stylesheets
+and web fonts the templates link to (Google Fonts) in memory after the first
+fetch, so later renders neither re-download nor re-parse them.
+
+wkhtmltopdf (pdfkit) already renders in a child process of its own, so those
+calls only need to leave the event loop: they run in threads, under the same
+concurrency limit.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Per-process state of a render worker
+_url_cache: Dict[str, Dict[str, Any]] = {}
+_URL_CACHE_MAX_ENTRIES = 256
+
+
+def _caching_url_fetcher(url: str, *args, **kwargs) -> Dict[str, Any]:
+    """WeasyPrint url_fetcher that keeps remote stylesheets and fonts in memory."""
+    from weasyprint import default_url_fetcher
+
+    cached = _url_cache.get(url)
+    if cached is not None:
+        return dict(cached)
+
+    result = default_url_fetcher(url, *args, **kwargs)
+    if url.startswith("data:"):
+        # Inline images are unique per document; nothing to reuse
+        return result
+
+    if "file_obj" in result:
+        file_obj = result.pop("file_obj")
+        try:
+            result["string"] = file_obj.read()
+        finally:
+            file_obj.close()
+    if len(_url_cache) < _URL_CACHE_MAX_ENTRIES:
+        _url_cache[url] = result
+    return dict(result)
+
+
+def _init_worker(preload_urls: tuple) -> None:
+    """Import WeasyPrint and warm the font/stylesheet cache (runs once per process)."""
+    try:
+        from weasyprint import HTML
+
+        links = "".join(f'<link rel="stylesheet" href="{url}">' for url in preload_urls)
+        HTML(
+            string=f"<html><head>{links}</head><body>وثق</body></html>",
+            url_fetcher=_caching_url_fetcher,
+        ).write_pdf()
+    except Exception as e:
+        # Renders still work, they just fetch on first use
+        logger.warning(f"PDF render worker warm-up failed: {e}")
+
+
+def _ping() -> None:
+    """No-op task, submitted to make the pool spawn its workers."""
+
+
+def _render_weasyprint(
+    html: str, pdf_options: Dict[str, Any], base_url: Optional[str]
+) -> bytes:
+    from weasyprint import HTML
+
+    return HTML(
+        string=html, encoding="utf-8", base_url=base_url, url_fetcher=_caching_url_fetcher
+    ).write_pdf(**pdf_options)
+
+
+def _render_wkhtmltopdf(html: str, options: Dict[str, Any]) -> bytes:
+    import pdfkit
+
+    return pdfkit.from_string(html, False, options=options)
+
+
+class PDFRenderPool:
+    """Process pool plus concurrency limit shared by every PDF export."""
+
+    def __init__(
+        self,
+        workers: int = settings.PDF_RENDER_WORKERS,
+        max_concurrency: int = settings.PDF_RENDER_MAX_CONCURRENCY,
+        max_tasks_per_worker: int = settings.PDF_RENDER_MAX_TASKS_PER_WORKER,
+    ):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Metrics
+        self.rendered = 0
+        self.failed = 0
+        self.waiting = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(tuple(settings.PDF_RENDER_PRELOAD_URLS),),
+                max_tasks_per_child=self.max_tasks_per_worker or None,
+            )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def start(self) -> None:
+        """Spawn the render processes ahead of the first request."""
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(_ping)
+        logger.info(
+            f"PDF render pool started (workers={self.workers}, "
+            f"max_concurrency={self.max_concurrency})"
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, executor, fn, *args) -> bytes:
+        self.waiting += 1
+        async with self._get_semaphore():
+            self.waiting -= 1
+            try:
+                loop = asyncio.get_running_loop()
+                pdf_bytes = await loop.run_in_executor(executor, fn, *args)
+            except Exception:
+                self.failed += 1
+                raise
+        self.rendered += 1
+        return pdf_bytes
+
+    async def render_html(
+        self,
+        html: str,
+        pdf_options: Optional[Dict[str, Any]] = None,
+        base_url: Optional[str] = None,
+    ) -> bytes:
+        """Render HTML with WeasyPrint in a warm worker process."""
+        return await self._run(
+            self._get_executor(), _render_weasyprint, html, pdf_options or {}, base_url
+        )
+
+    async def render_wkhtmltopdf(self, html: str, options: Dict[str, Any]) -> bytes:
+        """Render HTML with wkhtmltopdf (pdfkit) without blocking the event loop."""
+        return await self._run(None, _render_wkhtmltopdf, html, options)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "running": self._executor is not None,
+            "waiting": self.waiting,
+            "rendered": self.rendered,
+            "failed": self.failed,
+        }
+
+
+# Singleton instance
+pdf_render_pool = PDFRenderPool()
@@ -0,0 +1,315 @@
+"""
+In-memory reference data: the WATHQ lookup lists.
+
+The lookup endpoints (cities, activities, nationalities, entity types, the
+company contract and attorney lookups, ...) return lists that almost never
+change. They are kept here as in-memory data shared by every route, together
+with their JSON encoding, so serving one is a dictionary read and costs no
+WATHQ quota.
+
+A snapshot of every lookup lives in Redis, with a content hash per lookup and
+a combined version:
+
+- The ``refresh_reference_data`` Celery beat task re-fetches the lookups from
+  WATHQ on a schedule and writes only the ones whose hash changed.
+- API workers load the snapshot at startup (so they start warm) and a small
+  background task reloads it whenever the combined version moves.
+- A lookup missing from both memory and the snapshot is fetched once, on
+  first use, and added to the snapshot for the other workers.
+
+The WATHQ lookup endpoints take no language parameter; every entry carries
+both ``nameAr`` and ``nameEn``, so one copy per lookup serves both languages.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "wathq:reference_data"
+VERSION_KEY = "wathq:reference_data:version"
+
+LookupLoader = Callable[[Session], Awaitable[Any]]
+
+
+def _cr_lookup(method: str) -> LookupLoader:
+    async def load(db: Session) -> Any:
+        from app.wathq.commercial_registration.client import WathqClient
+
+        client = WathqClient(api_key=settings.WATHQ_API_KEY, db=db, tenant_id=None, user_id=None)
+        return await getattr(client, method)()
+
+    return load
+
+
+def _company_contract_lookup(method: str) -> LookupLoader:
+    async def load(db: Session) -> Any:
+        from app.wathq.company_contract.client import WathqCompanyContractClient
+
+        return await getattr(WathqCompanyContractClient(settings.WATHQ_API_KEY), method)()
+
+    return load
+
+
+async def _attorney_lookup(db: Session) -> Any:
+    from app.wathq.attorney.client import attorney_client
+
+    return (await attorney_client.get_lookup()).model_dump()
+
+
+# Lookup name -> loader
+LOOKUPS: Dict[str, LookupLoader] = {
+    "commercial-registration/status": _cr_lookup("get_status_lookup"),
+    "commercial-registration/entityType": _cr_lookup("get_entity_type_lookup"),
+    "commercial-registration/companyForm": _cr_lookup("get_company_form_lookup"),
+    "commercial-registration/companyCharacter": _cr_lookup("get_company_character_lookup"),
+    "commercial-registration/relation": _cr_lookup("get_relation_lookup"),
+    "commercial-registration/managerPositions": _cr_lookup("get_manager_positions_lookup"),
+    "commercial-registration/identifierType": _cr_lookup("get_identifier_type_lookup"),
+    "commercial-registration/managementStructure": _cr_lookup("get_management_structure_lookup"),
+    "commercial-registration/partnerType": _cr_lookup("get_partner_type_lookup"),
+    "commercial-registration/partnershipType": _cr_lookup("get_partnership_type_lookup"),
+    "commercial-registration/nationalities": _cr_lookup("get_nationalities_lookup"),
+    "commercial-registration/activities": _cr_lookup("get_activities_lookup"),
+    "commercial-registration/cities": _cr_lookup("get_cities_lookup"),
+    "commercial-registration/currencies": _cr_lookup("get_currencies_lookup"),
+    "company-contract/articleParts": _company_contract_lookup("get_article_parts_lookup"),
+    "company-contract/partnerDecision": _company_contract_lookup("get_partner_decision_lookup"),
+    "company-contract/exerciseMethod": _company_contract_lookup("get_exercise_method_lookup"),
+    "attorney/lookup": _attorney_lookup,
+}
+
+
+def _encode(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _version(encoded: bytes) -> str:
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class ReferenceDataService:
+    """Process-wide store of WATHQ lookup lists, backed by a Redis snapshot."""
+
+    def __init__(self, check_interval: float = settings.REFERENCE_DATA_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._data: Dict[str, Any] = {}
+        self._json: Dict[str, bytes] = {}
+        self._versions: Dict[str, str] = {}
+        self._snapshot_version: Optional[str] = None
+        self._redis: Dict[int, Any] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.hits = 0
+        self.upstream_loads = 0
+        self.snapshot_loads = 0
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    async def get(self, name: str) -> Any:
+        """Lookup data by name, e.g. ``"commercial-registration/cities"``."""
+        await self._ensure_loaded(name)
+        return self._data[name]
+
+    async def get_json(self, name: str) -> bytes:
+        """The lookup's JSON encoding, ready to be sent as a response body."""
+        await self._ensure_loaded(name)
+        return self._json[name]
+
+    async def _ensure_loaded(self, name: str) -> None:
+        if name in self._data:
+            self.hits += 1
+            return
+        if name not in LOOKUPS:
+            raise KeyError(f"Unknown reference data: {name}")
+
+        # Cold: one request loads it, concurrent ones wait for that load
+        async with self._locks.setdefault(name, asyncio.Lock()):
+            if name in self._data:
+                self.hits += 1
+                return
+
+            # Another worker may have loaded it since our last snapshot read
+            await self.load_snapshot()
+            if name in self._data:
+                self.hits += 1
+                return
+
+            from app.db.session import SessionLocal
+
+            db = SessionLocal()
+            try:
+                data = await LOOKUPS[name](db)
+            finally:
+                db.close()
+            self.upstream_loads += 1
+            self._store(name, data)
+            await self._publish({name: self._json[name]})
+
+    def _store(self, name: str, data: Any, encoded: Optional[bytes] = None) -> None:
+        encoded = encoded if encoded is not None else _encode(data)
+        self._data[name] = data
+        self._json[name] = encoded
+        self._versions[name] = _version(encoded)
+
+    # ------------------------------------------------------------------
+    # Snapshot
+    # ------------------------------------------------------------------
+
+    async def load_snapshot(self) -> bool:
+        """Replace the in-memory lookups with the Redis snapshot if its version moved."""
+        try:
+            redis = self._get_redis()
+            version = await redis.get(VERSION_KEY)
+            if version is None or version.decode() == self._snapshot_version:
+                return False
+            entries = await redis.hgetall(SNAPSHOT_KEY)
+        except Exception as e:
+            logger.warning(f"Reference data snapshot unavailable: {e}")
+            return False
+
+        for field, raw in entries.items():
+            name = field.decode()
+            if name not in LOOKUPS:
+                continue
+            entry = json.loads(raw)
+            if entry["version"] == self._versions.get(name):
+                continue
+            encoded = entry["data"].encode("utf-8")
+            self._store(name, json.loads(encoded), encoded)
+        self._snapshot_version = version.decode()
+        self.snapshot_loads += 1
+        logger.info(
+            f"Loaded reference data snapshot {self._snapshot_version[:12]} "
+            f"({len(self._data)} lookups)"
+        )
+        return True
+
+    async def _publish(self, changed: Dict[str, bytes]) -> None:
+        """Write changed lookups to the snapshot and move its version."""
+        if not changed:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        try:
+            redis = self._get_redis()
+            await redis.hset(
+                SNAPSHOT_KEY,
+                mapping={
+                    name: json.dumps(
+                        {"version": _version(encoded), "fetched_at": now, "data": encoded.decode("utf-8")}
+                    )
+                    for name, encoded in changed.items()
+                },
+            )
+            versions = await redis.hgetall(SNAPSHOT_KEY)
+            combined = _version(
+                "".join(
+                    f"{field.decode()}:{json.loads(raw)['version']}"
+                    for field, raw in sorted(versions.items())
+                ).encode("utf-8")
+            )
+            await redis.set(VERSION_KEY, combined)
+            self._snapshot_version = combined
+        except Exception as e:
+            logger.warning(f"Failed to write reference data snapshot: {e}")
+
+    async def refresh(self, db: Session) -> Dict[str, str]:
+        """
+        Re-fetch every lookup from WATHQ and publish the ones that changed.
+
+        Returns a per-lookup outcome: ``changed``, ``unchanged`` or ``failed``.
+        """
+        await self.load_snapshot()
+
+        outcome: Dict[str, str] = {}
+        changed: Dict[str, bytes] = {}
+        for name, loader in LOOKUPS.items():
+            try:
+                data = await loader(db)
+            except Exception as e:
+                # Keep serving the previous version
+                logger.error(f"Failed to refresh reference data {name}: {e}")
+                outcome[name] = "failed"
+                continue
+            self.upstream_loads += 1
+            encoded = _encode(data)
+            if _version(encoded) == self._versions.get(name):
+                outcome[name] = "unchanged"
+                continue
+            self._store(name, data, encoded)
+            changed[name] = encoded
+            outcome[name] = "changed"
+
+        await self._publish(changed)
+        return outcome
+
+    # ------------------------------------------------------------------
+    # Background reload (API workers)
+    # ------------------------------------------------------------------
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Load the snapshot and keep following it, on the running event loop."""
+        if self.is_running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self.is_running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.load_snapshot()
+            await asyncio.sleep(self.check_interval)
+
+    def _get_redis(self):
+        """redis.asyncio client for the running event loop."""
+        import redis.asyncio as aredis
+
+        loop_id = id(asyncio.get_running_loop())
+        client = self._redis.get(loop_id)
+        if client is None:
+            client = aredis.Redis.from_url(settings.REDIS_URL)
+            self._redis[loop_id] = client
+        return client
+
+    async def aclose(self) -> None:
+        """Close the Redis client of the running event loop."""
+        client = self._redis.pop(id(asyncio.get_running_loop()), None)
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lookups": len(self._data),
+            "snapshot_version": self._snapshot_version,
+            "hits": self.hits,
+            "upstream_loads": self.upstream_loads,
+            "snapshot_loads": self.snapshot_loads,
+        }
+
+
+# Singleton instance
+reference_data = ReferenceDataService()
@@ -0,0 +1,275 @@
+"""
+Content-addressed cache for rendered PDFs and HTML previews.
+
+A rendered artifact is fully determined by the record version it was built
+from, the template file and the render options, so its cache key is a hash of
+exactly those: output kind, record type, id and version (``updated_at``), the
+template file's content hash and the options (plus the day, as the templates
+print the export date). Nothing is ever updated in
+place; a new record version or an edited template simply produces a new key,
+and the superseded entries age out through size-based eviction.
+
+Two tiers:
+    memory  LRU of recent artifacts, per API worker, bounded in bytes
+    disk    files under RENDER_CACHE_DIR, shared by the workers of a host,
+            bounded in bytes (least recently used files are evicted first)
+
+Entries live under ``<record type>/<record id>/`` so everything cached for a
+record can be dropped at once when it is edited or deleted.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Evict down to this fraction of the limit, so eviction does not run on every write
+_EVICT_TO = 0.9
+
+
+class RenderedArtifactCache:
+    """Two-tier (memory LRU + disk) cache of rendered export artifacts."""
+
+    def __init__(
+        self,
+        directory: str = settings.RENDER_CACHE_DIR,
+        memory_max_bytes: int = settings.RENDER_CACHE_MEMORY_MAX_BYTES,
+        disk_max_bytes: int = settings.RENDER_CACHE_DISK_MAX_BYTES,
+    ):
+        self.directory = Path(directory)
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        # template path -> (mtime_ns, size, sha256 of the content)
+        self._template_hashes: Dict[str, Tuple[int, int, str]] = {}
+        # Disk usage is measured on first write, then tracked (approximately,
+        # other workers write too) until the next eviction re-measures it
+        self._disk_bytes: Optional[int] = None
+        self._disk_lock = threading.Lock()
+
+        # Metrics
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def template_hash(self, template_path: Path) -> str:
+        """sha256 of a template file, recomputed only when the file changes."""
+        stat = os.stat(template_path)
+        cached = self._template_hashes.get(str(template_path))
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+
+        digest = hashlib.sha256(Path(template_path).read_bytes()).hexdigest()
+        self._template_hashes[str(template_path)] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    @staticmethod
+    def record_version(record: Any) -> str:
+        """Version stamp of a database record: when it was last written."""
+        for attr in ("updated_at", "fetched_at", "created_at"):
+            value = getattr(record, attr, None)
+            if value is not None:
+                return value.isoformat()
+        return ""
+
+    def make_key(
+        self,
+        kind: str,
+        record_type: str,
+        record_id: Any,
+        record: Any,
+        template_path: Path,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Cache key of one rendered artifact, in the form
+        ``<record type>/<record id>/<digest>``.
+
+        Args:
+            kind: Output kind ("pdf" or "html")
+            record_type: Record type, e.g. "commercial_registration"
+            record_id: Id the record is exported by (the route's path id)
+            record: The database record being rendered
+            template_path: Template file the artifact is rendered from
+            options: Render options (e.g. wkhtmltopdf options)
+        """
+        material = json.dumps(
+            {
+                "kind": kind,
+                "record_type": record_type,
+                "record_id": str(record_id),
+                "version": self.record_version(record),
+                "template": self.template_hash(template_path),
+                "options": options or {},
+                # The templates print the export date
+                "date": date.today().isoformat(),
+            },
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.sha256(material.encode("utf-8")).hexdigest()
+        return f"{record_type}/{record_id}/{digest}"
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Cached artifact for ``key``, or None."""
+        content = self._memory.get(key)
+        if content is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return content
+
+        content = await asyncio.to_thread(self._read_disk, key)
+        if content is None:
+            self.misses += 1
+            return None
+
+        self.disk_hits += 1
+        self._remember(key, content)
+        return content
+
+    async def put(self, key: str, content: bytes) -> None:
+        """Store an artifact in both tiers; a disk failure never fails the export."""
+        self._remember(key, content)
+        await asyncio.to_thread(self._write_disk, key, content)
+
+    def invalidate_record(self, record_type: str, record_ids: Iterable[Any]) -> None:
+        """Drop every cached artifact of the given records (edited or deleted)."""
+        prefixes = tuple(f"{record_type}/{record_id}/" for record_id in record_ids)
+        if not prefixes:
+            return
+
+        # Called from sync endpoints too (threadpool): iterate over a snapshot
+        for key in [key for key in list(self._memory) if key.startswith(prefixes)]:
+            content = self._memory.pop(key, None)
+            if content is not None:
+                self._memory_bytes -= len(content)
+
+        for prefix in prefixes:
+            record_dir = self.directory / prefix
+            if record_dir.is_dir():
+                with self._disk_lock:
+                    self._disk_bytes = None
+                shutil.rmtree(record_dir, ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # Memory tier
+    # ------------------------------------------------------------------
+
+    def _remember(self, key: str, content: bytes) -> None:
+        if len(content) > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = content
+        self._memory_bytes += len(content)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    # ------------------------------------------------------------------
+    # Disk tier (runs in worker threads)
+    # ------------------------------------------------------------------
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self.directory / key
+        try:
+            content = path.read_bytes()
+            # Mark as recently used for eviction
+            os.utime(path)
+            return content
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read cached render {key}: {e}")
+            return None
+
+    def _write_disk(self, key: str, content: bytes) -> None:
+        path = self.directory / key
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_bytes(content)
+            # Atomic: readers see either no file or the whole artifact
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cached render {key}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+            else:
+                self._disk_bytes += len(content)
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+
+    def _disk_files(self) -> List[Tuple[float, int, Path]]:
+        """(mtime, size, path) of every cached file."""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".tmp"):
+                    # A write in progress
+                    continue
+                path = Path(root) / name
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _evict_disk(self) -> None:
+        """Delete least recently used files until the tier is back under its limit."""
+        files = sorted(self._disk_files(), key=lambda f: f[0])
+        total = sum(size for _, size, _ in files)
+        target = self.disk_max_bytes * _EVICT_TO
+        removed = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self._disk_bytes = total
+        logger.info(f"Evicted {removed} cached renders ({total} bytes left on disk)")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_bytes": self._disk_bytes,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+# Singleton instance
+rendered_artifact_cache = RenderedArtifactCache()
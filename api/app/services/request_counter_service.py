@@ -3,9 +3,10 @@ Service for tracking and analyzing API requests.
 """
 
 from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from uuid import UUID
 import logging
+import uuid
 
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, desc, Integer
@@ -25,6 +26,7 @@ from app.schemas.api_request_counter import (
     DashboardStats,
     RequestDetails
 )
+from app.services.request_rollup_service import request_rollup_service
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +34,54 @@ logger = logging.getLogger(__name__)
 class RequestCounterService:
     """Service for managing API request counters and analytics."""
     
+    @staticmethod
+    def build_counter_values(
+        request: Request,
+        response: Response,
+        response_time_ms: int,
+        request_type: str = RequestType.INTERNAL,
+        user: Optional[User] = None,
+        management_user: Optional[ManagementUser] = None,
+        service_id: Optional[UUID] = None,
+        service_slug: Optional[str] = None,
+        is_cached: bool = False,
+        error_message: Optional[str] = None,
+        request_params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the column values for an ApiRequestCounter row.
+        
+        Every key is always present so rows can be bulk-inserted together.
+        The timestamp is captured here rather than at insert time because
+        rows may be written in batches some time after the request.
+        """
+        # Determine success based on status code
+        is_successful = 200 <= response.status_code < 400
+        
+        return {
+            "id": uuid.uuid4(),
+            "request_type": request_type,
+            "endpoint": str(request.url.path),
+            "method": request.method,
+            "user_id": user.id if user else None,
+            "tenant_id": user.tenant_id if user and hasattr(user, 'tenant_id') else None,
+            "management_user_id": management_user.id if management_user else None,
+            "service_id": service_id,
+            "service_slug": service_slug,
+            "ip_address": request.client.host if request.client else None,
+            "user_agent": request.headers.get("User-Agent", "")[:500],  # Limit length
+            "request_params": request_params,
+            "request_size": int(request.headers.get("Content-Length", 0)),
+            "response_status": response.status_code,
+            "response_time_ms": response_time_ms,
+            "response_size": int(response.headers.get("Content-Length", 0)),
+            "error_message": error_message,
+            "is_successful": is_successful,
+            "is_cached": is_cached,
+            "is_rate_limited": response.status_code == 429,
+            "created_at": datetime.now(timezone.utc),
+        }
+    
     @staticmethod
     def track_request(
         db: Session,
@@ -48,7 +98,10 @@ class RequestCounterService:
         request_params: Optional[Dict[str, Any]] = None
     ) -> ApiRequestCounter:
         """
-        Track an API request.
+        Track an API request synchronously.
+        
+        The middleware uses the batched request_counter_writer instead; this
+        remains for callers that need the persisted row back.
         
         Args:
             db: Database session
@@ -65,36 +118,20 @@ class RequestCounterService:
             request_params: Sanitized request parameters
         """
         try:
-            # Extract request details
-            endpoint = str(request.url.path)
-            method = request.method
-            ip_address = request.client.host if request.client else None
-            user_agent = request.headers.get("User-Agent", "")[:500]  # Limit length
-            
-            # Determine success based on status code
-            is_successful = 200 <= response.status_code < 400
-            
-            # Create counter entry
             counter = ApiRequestCounter(
-                request_type=request_type,
-                endpoint=endpoint,
-                method=method,
-                user_id=user.id if user else None,
-                tenant_id=user.tenant_id if user and hasattr(user, 'tenant_id') else None,
-                management_user_id=management_user.id if management_user else None,
-                service_id=service_id,
-                service_slug=service_slug,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                request_params=request_params,
-                request_size=int(request.headers.get("Content-Length", 0)),
-                response_status=response.status_code,
-                response_time_ms=response_time_ms,
-                response_size=int(response.headers.get("Content-Length", 0)),
-                error_message=error_message,
-                is_successful=is_successful,
-                is_cached=is_cached,
-                is_rate_limited=(response.status_code == 429)
+                **RequestCounterService.build_counter_values(
+                    request=request,
+                    response=response,
+                    response_time_ms=response_time_ms,
+                    request_type=request_type,
+                    user=user,
+                    management_user=management_user,
+                    service_id=service_id,
+                    service_slug=service_slug,
+                    is_cached=is_cached,
+                    error_message=error_message,
+                    request_params=request_params
+                )
             )
             
             db.add(counter)
@@ -137,8 +174,19 @@ class RequestCounterService:
         else:
             start_time = None
         
-        # Build query
-        query = db.query(ApiRequestCounter)
+        # Aggregate entirely in SQL: one row back regardless of period size
+        query = db.query(
+            func.count(ApiRequestCounter.id).label('total'),
+            func.sum(ApiRequestCounter.is_successful.cast(Integer)).label('successful'),
+            func.sum(ApiRequestCounter.is_cached.cast(Integer)).label('cached'),
+            func.sum((ApiRequestCounter.request_type == RequestType.EXTERNAL).cast(Integer)).label('external'),
+            func.sum((ApiRequestCounter.request_type == RequestType.INTERNAL).cast(Integer)).label('internal'),
+            func.avg(ApiRequestCounter.response_time_ms).label('avg_response'),
+            func.max(ApiRequestCounter.response_time_ms).label('max_response'),
+            func.min(ApiRequestCounter.response_time_ms).label('min_response'),
+            func.count(func.distinct(ApiRequestCounter.user_id)).label('unique_users'),
+            func.count(func.distinct(ApiRequestCounter.endpoint)).label('unique_endpoints')
+        )
         
         if start_time:
             query = query.filter(ApiRequestCounter.created_at >= start_time)
@@ -149,56 +197,27 @@ class RequestCounterService:
         if service_id:
             query = query.filter(ApiRequestCounter.service_id == service_id)
         
-        # Get all records for aggregation
-        records = query.all()
-        
-        if not records:
-            return ApiRequestStats(
-                period=period,
-                total_requests=0,
-                successful_requests=0,
-                failed_requests=0,
-                cached_requests=0,
-                external_requests=0,
-                internal_requests=0,
-                avg_response_time_ms=0,
-                max_response_time_ms=0,
-                min_response_time_ms=0,
-                cache_hit_rate=0,
-                success_rate=0,
-                unique_users=0,
-                unique_endpoints=0
-            )
+        r = query.one()
         
-        # Calculate statistics
-        total = len(records)
-        successful = sum(1 for r in records if r.is_successful)
-        failed = total - successful
-        cached = sum(1 for r in records if r.is_cached)
-        external = sum(1 for r in records if r.request_type == RequestType.EXTERNAL)
-        internal = sum(1 for r in records if r.request_type == RequestType.INTERNAL)
-        
-        response_times = [r.response_time_ms for r in records]
-        avg_response = sum(response_times) / len(response_times) if response_times else 0
-        
-        unique_users = len(set(r.user_id for r in records if r.user_id))
-        unique_endpoints = len(set(r.endpoint for r in records))
+        total = r.total or 0
+        successful = r.successful or 0
+        cached = r.cached or 0
         
         return ApiRequestStats(
             period=period,
             total_requests=total,
             successful_requests=successful,
-            failed_requests=failed,
+            failed_requests=total - successful,
             cached_requests=cached,
-            external_requests=external,
-            internal_requests=internal,
-            avg_response_time_ms=round(avg_response, 2),
-            max_response_time_ms=max(response_times) if response_times else 0,
-            min_response_time_ms=min(response_times) if response_times else 0,
+            external_requests=r.external or 0,
+            internal_requests=r.internal or 0,
+            avg_response_time_ms=round(float(r.avg_response or 0), 2),
+            max_response_time_ms=r.max_response or 0,
+            min_response_time_ms=r.min_response or 0,
             cache_hit_rate=round((cached / total * 100) if total > 0 else 0, 2),
             success_rate=round((successful / total * 100) if total > 0 else 0, 2),
-            unique_users=unique_users,
-            unique_endpoints=unique_endpoints
+            unique_users=r.unique_users or 0,
+            unique_endpoints=r.unique_endpoints or 0
         )
     
     @staticmethod
@@ -217,38 +236,24 @@ class RequestCounterService:
         else:
             start_time = now - timedelta(days=30)
         
-        # Query for endpoint statistics
-        query = db.query(
-            ApiRequestCounter.endpoint,
-            ApiRequestCounter.method,
-            func.count(ApiRequestCounter.id).label('total_calls'),
-            func.sum(ApiRequestCounter.is_successful.cast(Integer)).label('success_count'),
-            func.avg(ApiRequestCounter.response_time_ms).label('avg_response'),
-            func.sum(ApiRequestCounter.is_cached.cast(Integer)).label('cached_count'),
-            func.max(ApiRequestCounter.created_at).label('last_called')
-        ).filter(
-            ApiRequestCounter.created_at >= start_time
-        ).group_by(
-            ApiRequestCounter.endpoint,
-            ApiRequestCounter.method
-        ).order_by(
-            desc('total_calls')
-        ).limit(limit)
-        
-        results = query.all()
+        # Read from hourly/daily rollups plus the raw tail past the watermark
+        results = request_rollup_service.aggregate(
+            db, start_time, group_by=("endpoint", "method")
+        )
+        results.sort(key=lambda r: r["total_requests"], reverse=True)
         
         stats = []
-        for r in results:
-            success_rate = (r.success_count / r.total_calls * 100) if r.total_calls > 0 else 0
+        for r in results[:limit]:
+            success_rate = (r["successful_requests"] / r["total_requests"] * 100) if r["total_requests"] > 0 else 0
             stats.append(EndpointStats(
-                endpoint=r.endpoint,
-                method=r.method,
-                total_calls=r.total_calls,
+                endpoint=r["endpoint"],
+                method=r["method"],
+                total_calls=r["total_requests"],
                 success_rate=round(success_rate, 2),
-                avg_response_time_ms=round(r.avg_response or 0, 2),
-                cached_calls=r.cached_count or 0,
-                failed_calls=r.total_calls - (r.success_count or 0),
-                last_called=r.last_called
+                avg_response_time_ms=round(r["avg_response_time_ms"], 2),
+                cached_calls=r["cached_requests"],
+                failed_calls=r["total_requests"] - r["successful_requests"],
+                last_called=r["last_request_at"]
             ))
         
         return stats
@@ -398,37 +403,23 @@ class RequestCounterService:
         now = datetime.utcnow()
         start_time = now - timedelta(hours=hours)
         
-        # Build base query
-        query = db.query(
-            func.date_trunc('hour', ApiRequestCounter.created_at).label('hour'),
-            func.count(ApiRequestCounter.id).label('request_count'),
-            func.sum(ApiRequestCounter.is_successful.cast(Integer)).label('success_count'),
-            func.avg(ApiRequestCounter.response_time_ms).label('avg_response'),
-            func.sum((ApiRequestCounter.request_type == RequestType.EXTERNAL).cast(Integer)).label('external_count'),
-            func.sum((ApiRequestCounter.request_type == RequestType.INTERNAL).cast(Integer)).label('internal_count'),
-            func.sum(ApiRequestCounter.is_cached.cast(Integer)).label('cached_count')
-        ).filter(
-            ApiRequestCounter.created_at >= start_time
+        # Hourly rollups plus the raw tail past the watermark
+        results = request_rollup_service.aggregate(
+            db, start_time, group_by=("hour",), tenant_id=tenant_id
         )
-        
-        if tenant_id:
-            query = query.filter(ApiRequestCounter.tenant_id == tenant_id)
-        
-        query = query.group_by('hour').order_by('hour')
-        
-        results = query.all()
+        results.sort(key=lambda r: r["hour"])
         
         timeline = []
         for r in results:
             timeline.append(RequestTimeline(
-                timestamp=r.hour,
-                request_count=r.request_count,
-                success_count=r.success_count or 0,
-                failed_count=r.request_count - (r.success_count or 0),
-                avg_response_time_ms=round(r.avg_response or 0, 2),
-                external_count=r.external_count or 0,
-                internal_count=r.internal_count or 0,
-                cached_count=r.cached_count or 0
+                timestamp=r["hour"],
+                request_count=r["total_requests"],
+                success_count=r["successful_requests"],
+                failed_count=r["total_requests"] - r["successful_requests"],
+                avg_response_time_ms=round(r["avg_response_time_ms"], 2),
+                external_count=r["external_requests"],
+                internal_count=r["internal_requests"],
+                cached_count=r["cached_requests"]
             ))
         
         return timeline
@@ -510,41 +501,20 @@ class RequestCounterService:
         week_start = now - timedelta(days=7)
         month_start = now - timedelta(days=30)
         
-        # Get request counts
-        total_today = db.query(ApiRequestCounter).filter(
-            ApiRequestCounter.created_at >= today_start
-        ).count()
-        
-        total_week = db.query(ApiRequestCounter).filter(
-            ApiRequestCounter.created_at >= week_start
-        ).count()
+        # Totals come from rollups, so they cost the same however much history exists
+        today_stats = request_rollup_service.totals(db, today_start)
+        week_stats = request_rollup_service.totals(db, week_start)
+        month_stats = request_rollup_service.totals(db, month_start)
         
-        total_month = db.query(ApiRequestCounter).filter(
-            ApiRequestCounter.created_at >= month_start
-        ).count()
-        
-        # Get performance metrics
-        today_stats = db.query(
-            func.avg(ApiRequestCounter.response_time_ms).label('avg_response'),
-            func.sum(ApiRequestCounter.is_successful.cast(Integer)).label('success_count'),
-            func.sum(ApiRequestCounter.is_cached.cast(Integer)).label('cached_count')
-        ).filter(
-            ApiRequestCounter.created_at >= today_start
-        ).first()
-        
-        week_stats = db.query(
-            func.sum(ApiRequestCounter.is_successful.cast(Integer)).label('success_count'),
-            func.sum(ApiRequestCounter.is_cached.cast(Integer)).label('cached_count'),
-            func.count(ApiRequestCounter.id).label('total_count')
-        ).filter(
-            ApiRequestCounter.created_at >= week_start
-        ).first()
+        total_today = today_stats["total_requests"]
+        total_week = week_stats["total_requests"]
+        total_month = month_stats["total_requests"]
         
         # Calculate rates
-        success_rate_today = (today_stats.success_count / total_today * 100) if total_today > 0 else 0
-        success_rate_week = (week_stats.success_count / week_stats.total_count * 100) if week_stats.total_count > 0 else 0
-        cache_hit_rate_today = (today_stats.cached_count / total_today * 100) if total_today > 0 else 0
-        cache_hit_rate_week = (week_stats.cached_count / week_stats.total_count * 100) if week_stats.total_count > 0 else 0
+        success_rate_today = (today_stats["successful_requests"] / total_today * 100) if total_today > 0 else 0
+        success_rate_week = (week_stats["successful_requests"] / total_week * 100) if total_week > 0 else 0
+        cache_hit_rate_today = (today_stats["cached_requests"] / total_today * 100) if total_today > 0 else 0
+        cache_hit_rate_week = (week_stats["cached_requests"] / total_week * 100) if total_week > 0 else 0
         
         # Get top metrics
         top_endpoints = RequestCounterService.get_endpoint_stats(db, limit=5, period="today")
@@ -554,51 +524,34 @@ class RequestCounterService:
         # Get timeline
         hourly_timeline = RequestCounterService.get_request_timeline(db, hours=24)
         
-        # Get slow endpoints (avg response > 1000ms)
-        slow_endpoints_query = db.query(
-            ApiRequestCounter.endpoint,
-            func.avg(ApiRequestCounter.response_time_ms).label('avg_response'),
-            func.count(ApiRequestCounter.id).label('count')
-        ).filter(
-            ApiRequestCounter.created_at >= today_start
-        ).group_by(
-            ApiRequestCounter.endpoint
-        ).having(
-            func.avg(ApiRequestCounter.response_time_ms) > 1000
-        ).order_by(
-            desc('avg_response')
-        ).limit(5)
+        # Per-endpoint totals for today, shared by the slow/failing lists
+        today_endpoints = request_rollup_service.aggregate(
+            db, today_start, group_by=("endpoint",)
+        )
         
+        # Get slow endpoints (avg response > 1000ms)
         slow_endpoints = [
             {
-                "endpoint": r.endpoint,
-                "avg_response_time_ms": round(r.avg_response, 2),
-                "request_count": r.count
+                "endpoint": r["endpoint"],
+                "avg_response_time_ms": round(r["avg_response_time_ms"], 2),
+                "request_count": r["total_requests"]
             }
-            for r in slow_endpoints_query.all()
-        ]
+            for r in sorted(
+                today_endpoints, key=lambda r: r["avg_response_time_ms"], reverse=True
+            )
+            if r["avg_response_time_ms"] > 1000
+        ][:5]
         
         # Get failing endpoints (success rate < 90%)
-        failing_endpoints_query = db.query(
-            ApiRequestCounter.endpoint,
-            func.count(ApiRequestCounter.id).label('total'),
-            func.sum(ApiRequestCounter.is_successful.cast(Integer)).label('success')
-        ).filter(
-            ApiRequestCounter.created_at >= today_start
-        ).group_by(
-            ApiRequestCounter.endpoint
-        ).having(
-            func.sum(ApiRequestCounter.is_successful.cast(Integer)) < func.count(ApiRequestCounter.id) * 0.9
-        ).limit(5)
-        
         failing_endpoints = [
             {
-                "endpoint": r.endpoint,
-                "success_rate": round((r.success / r.total * 100) if r.total > 0 else 0, 2),
-                "failed_count": r.total - (r.success or 0)
+                "endpoint": r["endpoint"],
+                "success_rate": round(r["successful_requests"] / r["total_requests"] * 100, 2),
+                "failed_count": r["total_requests"] - r["successful_requests"]
             }
-            for r in failing_endpoints_query.all()
-        ]
+            for r in today_endpoints
+            if r["successful_requests"] < r["total_requests"] * 0.9
+        ][:5]
         
         # Get rate limited users
         rate_limited_query = db.query(
@@ -626,16 +579,11 @@ class RequestCounterService:
         yesterday_start = today_start - timedelta(days=1)
         yesterday_end = today_start
         
-        yesterday_avg = db.query(
-            func.avg(ApiRequestCounter.response_time_ms)
-        ).filter(
-            and_(
-                ApiRequestCounter.created_at >= yesterday_start,
-                ApiRequestCounter.created_at < yesterday_end
-            )
-        ).scalar() or 0
+        yesterday_avg = request_rollup_service.totals(
+            db, yesterday_start, yesterday_end
+        )["avg_response_time_ms"]
         
-        today_avg = today_stats.avg_response or 0
+        today_avg = today_stats["avg_response_time_ms"]
         
         if yesterday_avg > 0:
             if today_avg > yesterday_avg * 1.1:
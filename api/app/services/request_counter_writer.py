@@ -0,0 +1,180 @@
+"""
+Asynchronous batched writer for API request counters.
+
+The request counter middleware hands rows to this writer instead of opening a
+database session per request. Rows are buffered in a bounded in-process queue
+and bulk-inserted by a background flusher, either when a batch fills up or
+when the flush interval elapses.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.api_request_counter import ApiRequestCounter
+
+logger = logging.getLogger(__name__)
+
+
+class RequestCounterWriter:
+    """Bounded queue plus background bulk-insert flusher for counter rows."""
+
+    def __init__(
+        self,
+        max_queue_size: int = settings.REQUEST_COUNTER_QUEUE_SIZE,
+        batch_size: int = settings.REQUEST_COUNTER_BATCH_SIZE,
+        flush_interval: float = settings.REQUEST_COUNTER_FLUSH_INTERVAL,
+    ):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # Metrics
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_ms = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start the background flusher on the running event loop."""
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(
+            f"Request counter writer started (batch={self.batch_size}, "
+            f"interval={self.flush_interval}s, queue={self.max_queue_size})"
+        )
+
+    async def stop(self) -> None:
+        """Stop accepting rows and drain everything still queued."""
+        if not self.is_running:
+            return
+        self._stopping = True
+        await self._task
+        self._task = None
+        logger.info(
+            f"Request counter writer stopped (written={self.written}, "
+            f"dropped={self.dropped}, failed={self.failed})"
+        )
+
+    def submit(self, values: Dict[str, Any]) -> bool:
+        """
+        Queue a counter row without blocking.
+
+        Returns False when the row was dropped because the queue is full
+        (backpressure) or the writer is shutting down.
+        """
+        if self._stopping:
+            self.dropped += 1
+            return False
+        if not self.is_running:
+            self.start()
+        try:
+            self._queue.put_nowait(values)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(
+                    f"Request counter queue full ({self.max_queue_size}); "
+                    f"{self.dropped} rows dropped so far"
+                )
+            return False
+        self.enqueued += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Writer metrics for monitoring."""
+        return {
+            "running": self.is_running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self.max_queue_size,
+            "batch_size": self.batch_size,
+            "flush_interval_seconds": self.flush_interval,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_flush_ms": self.last_flush_ms,
+            "last_error": self.last_error,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            if batch:
+                await self._flush(batch)
+            if self._stopping and self._queue.empty():
+                break
+
+    async def _collect_batch(self) -> List[Dict[str, Any]]:
+        """Gather rows until the batch is full or the flush interval passes."""
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            if self._stopping:
+                # Draining: take whatever is left without waiting
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                # Wake up periodically so stop() is noticed promptly
+                batch.append(
+                    await asyncio.wait_for(self._queue.get(), min(remaining, 0.5))
+                )
+            except asyncio.TimeoutError:
+                continue
+
+        return batch
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        start = time.monotonic()
+        try:
+            await asyncio.to_thread(self._write_batch, batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(batch)
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.error(f"Failed to write {len(batch)} request counters: {e}")
+        finally:
+            self.last_flush_ms = int((time.monotonic() - start) * 1000)
+
+    @staticmethod
+    def _write_batch(batch: List[Dict[str, Any]]) -> None:
+        """Bulk-insert one batch in a single transaction (runs in a thread)."""
+        db = SessionLocal()
+        try:
+            db.execute(insert(ApiRequestCounter), batch)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+# Singleton instance
+request_counter_writer = RequestCounterWriter()
@@ -0,0 +1,426 @@
+"""
+Incremental rollups of API request counters.
+
+A periodic Celery task summarises raw ``api_request_counters`` rows into
+hourly and daily ``api_request_summaries`` buckets per tenant, service,
+endpoint and method, advancing a watermark as it goes. Analytics queries then
+read the buckets and only scan the raw rows that fall outside them (the tail
+newer than the watermark plus a partial first hour), so their cost no longer
+grows with the amount of history.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Integer, func, insert, literal, literal_column, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.api_request_counter import ApiRequestCounter, ApiRequestSummary, RequestType
+from app.models.processing_watermark import ProcessingWatermark
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_WATERMARK = "api_request_rollup"
+
+HOURLY = "hourly"
+DAILY = "daily"
+
+# Metrics every aggregation returns, and how buckets are merged
+SUM_FIELDS = (
+    "total_requests",
+    "successful_requests",
+    "cached_requests",
+    "external_requests",
+    "internal_requests",
+    "rate_limited_requests",
+    "total_response_time_ms",
+)
+MAX_FIELDS = ("max_response_time_ms", "last_request_at")
+MIN_FIELDS = ("min_response_time_ms",)
+
+
+def _utc(dt: datetime) -> datetime:
+    """Treat naive datetimes (datetime.utcnow()) as UTC."""
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def _floor_hour(dt: datetime) -> datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(dt: datetime) -> datetime:
+    floor = _floor_hour(dt)
+    return floor if floor == dt else floor + timedelta(hours=1)
+
+
+def _floor_day(dt: datetime) -> datetime:
+    return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ceil_day(dt: datetime) -> datetime:
+    floor = _floor_day(dt)
+    return floor if floor == dt else floor + timedelta(days=1)
+
+
+def _utc_trunc(field: str, column):
+    """date_trunc in UTC regardless of the session time zone."""
+    return func.timezone("UTC", func.date_trunc(field, func.timezone("UTC", column)))
+
+
+def _raw_groups() -> Dict[str, Any]:
+    return {
+        "tenant_id": ApiRequestCounter.tenant_id,
+        "service_id": ApiRequestCounter.service_id,
+        "endpoint": ApiRequestCounter.endpoint,
+        "method": ApiRequestCounter.method,
+        "hour": _utc_trunc("hour", ApiRequestCounter.created_at),
+    }
+
+
+def _summary_groups() -> Dict[str, Any]:
+    return {
+        "tenant_id": ApiRequestSummary.tenant_id,
+        "service_id": ApiRequestSummary.service_id,
+        "endpoint": ApiRequestSummary.endpoint,
+        "method": ApiRequestSummary.method,
+        "hour": ApiRequestSummary.period_start,
+    }
+
+
+def _raw_metrics() -> List[Any]:
+    c = ApiRequestCounter
+    return [
+        func.count(c.id).label("total_requests"),
+        func.sum(c.is_successful.cast(Integer)).label("successful_requests"),
+        func.sum(c.is_cached.cast(Integer)).label("cached_requests"),
+        func.sum((c.request_type == RequestType.EXTERNAL).cast(Integer)).label("external_requests"),
+        func.sum((c.request_type == RequestType.INTERNAL).cast(Integer)).label("internal_requests"),
+        func.sum(c.is_rate_limited.cast(Integer)).label("rate_limited_requests"),
+        func.sum(c.response_time_ms).label("total_response_time_ms"),
+        func.max(c.response_time_ms).label("max_response_time_ms"),
+        func.min(c.response_time_ms).label("min_response_time_ms"),
+        func.max(c.created_at).label("last_request_at"),
+    ]
+
+
+def _summary_metrics() -> List[Any]:
+    s = ApiRequestSummary
+    return [
+        func.sum(s.total_requests).label("total_requests"),
+        func.sum(s.successful_requests).label("successful_requests"),
+        func.sum(s.cached_requests).label("cached_requests"),
+        func.sum(s.external_requests).label("external_requests"),
+        func.sum(s.internal_requests).label("internal_requests"),
+        func.sum(s.rate_limited_requests).label("rate_limited_requests"),
+        func.sum(s.total_response_time_ms).label("total_response_time_ms"),
+        func.max(s.max_response_time_ms).label("max_response_time_ms"),
+        func.min(s.min_response_time_ms).label("min_response_time_ms"),
+        func.max(s.last_request_at).label("last_request_at"),
+    ]
+
+
+class RequestRollupService:
+    """Builds and reads hourly/daily request summaries."""
+
+    # ------------------------------------------------------------------
+    # Writing rollups
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def get_watermark(db: Session) -> Optional[datetime]:
+        """End of the last fully rolled-up hour, or None if nothing is rolled up."""
+        return db.query(ProcessingWatermark.watermark_at).filter(
+            ProcessingWatermark.name == ROLLUP_WATERMARK
+        ).scalar()
+
+    @staticmethod
+    def roll_up(
+        db: Session,
+        now: Optional[datetime] = None,
+        chunk_hours: int = 24
+    ) -> int:
+        """
+        Roll every closed hour past the watermark into summaries.
+
+        Hours younger than REQUEST_ROLLUP_GRACE_SECONDS are left alone so rows
+        still buffered by the request counter writer land before their hour is
+        summarised. Work is committed in chunks of ``chunk_hours`` so a first
+        run over a large backlog does not hold one huge transaction.
+
+        Returns the number of hours rolled up.
+        """
+        now = _utc(now or datetime.now(timezone.utc))
+        target = _floor_hour(now - timedelta(seconds=settings.REQUEST_ROLLUP_GRACE_SECONDS))
+        rolled_hours = 0
+
+        while True:
+            # Row lock serialises concurrent runs of the beat task
+            state = db.query(ProcessingWatermark).filter(
+                ProcessingWatermark.name == ROLLUP_WATERMARK
+            ).with_for_update().first()
+            if state is None:
+                state = ProcessingWatermark(name=ROLLUP_WATERMARK)
+                db.add(state)
+                db.flush()
+
+            lo = state.watermark_at
+            if lo is None:
+                first = db.query(func.min(ApiRequestCounter.created_at)).scalar()
+                lo = _floor_hour(_utc(first)) if first else target
+
+            if lo >= target:
+                state.watermark_at = lo
+                db.commit()
+                break
+
+            hi = min(lo + timedelta(hours=chunk_hours), target)
+            RequestRollupService._rollup_hourly(db, lo, hi)
+            RequestRollupService._rollup_daily(db, _floor_day(lo), _ceil_day(hi))
+            state.watermark_at = hi
+            db.commit()
+
+            rolled_hours += int((hi - lo).total_seconds() // 3600)
+            logger.info(f"Rolled up API request counters {lo.isoformat()} -> {hi.isoformat()}")
+
+        return rolled_hours
+
+    @staticmethod
+    def _rollup_hourly(db: Session, lo: datetime, hi: datetime) -> None:
+        """Rebuild hourly buckets for [lo, hi) from raw counters."""
+        c = ApiRequestCounter
+        db.query(ApiRequestSummary).filter(
+            ApiRequestSummary.period_type == HOURLY,
+            ApiRequestSummary.period_start >= lo,
+            ApiRequestSummary.period_start < hi
+        ).delete(synchronize_session=False)
+
+        hour = _utc_trunc("hour", c.created_at)
+        rows = select(
+            hour,
+            hour + literal_column("interval '1 hour'"),
+            literal(HOURLY),
+            c.tenant_id,
+            c.service_id,
+            c.endpoint,
+            c.method,
+            *_raw_metrics(),
+            (func.count(c.id) - func.sum(c.is_successful.cast(Integer))),
+            func.sum(c.response_size),
+            func.count(func.distinct(c.user_id)),
+            func.count(func.distinct(c.ip_address)),
+        ).where(
+            c.created_at >= lo,
+            c.created_at < hi
+        ).group_by(
+            hour, c.tenant_id, c.service_id, c.endpoint, c.method
+        )
+
+        db.execute(
+            insert(ApiRequestSummary).from_select(
+                RequestRollupService._summary_columns(), rows
+            )
+        )
+
+    @staticmethod
+    def _rollup_daily(db: Session, lo: datetime, hi: datetime) -> None:
+        """Rebuild daily buckets for [lo, hi) from the hourly ones."""
+        s = ApiRequestSummary
+        db.query(ApiRequestSummary).filter(
+            ApiRequestSummary.period_type == DAILY,
+            ApiRequestSummary.period_start >= lo,
+            ApiRequestSummary.period_start < hi
+        ).delete(synchronize_session=False)
+
+        day = _utc_trunc("day", s.period_start)
+        rows = select(
+            day,
+            day + literal_column("interval '1 day'"),
+            literal(DAILY),
+            s.tenant_id,
+            s.service_id,
+            s.endpoint,
+            s.method,
+            *_summary_metrics(),
+            func.sum(s.failed_requests),
+            func.sum(s.total_response_size_bytes),
+            # Distinct counts cannot be merged; keep the busiest hour as a floor
+            func.max(s.unique_users),
+            func.max(s.unique_ips),
+        ).where(
+            s.period_type == HOURLY,
+            s.period_start >= lo,
+            s.period_start < hi
+        ).group_by(
+            day, s.tenant_id, s.service_id, s.endpoint, s.method
+        )
+
+        db.execute(
+            insert(ApiRequestSummary).from_select(
+                RequestRollupService._summary_columns(), rows
+            )
+        )
+
+    @staticmethod
+    def _summary_columns() -> List[str]:
+        """Target columns matching the SELECT lists of the rollup statements."""
+        return [
+            "period_start",
+            "period_end",
+            "period_type",
+            "tenant_id",
+            "service_id",
+            "endpoint",
+            "method",
+            *SUM_FIELDS,
+            "max_response_time_ms",
+            "min_response_time_ms",
+            "last_request_at",
+            "failed_requests",
+            "total_response_size_bytes",
+            "unique_users",
+            "unique_ips",
+        ]
+
+    # ------------------------------------------------------------------
+    # Reading rollups
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _segments(
+        start: datetime,
+        end: datetime,
+        watermark: Optional[datetime],
+        use_daily: bool = True
+    ) -> List[Tuple[str, datetime, datetime]]:
+        """
+        Split [start, end) into raw, hourly and daily pieces.
+
+        Raw rows cover the partial hour at the start and anything newer than
+        the watermark; whole days come from daily buckets and the remaining
+        whole hours from hourly buckets.
+        """
+        if watermark is None or watermark <= start:
+            return [("raw", start, end)]
+
+        rolled_end = min(watermark, end)
+        h0 = _ceil_hour(start)
+        if h0 >= rolled_end:
+            return [("raw", start, end)]
+
+        segments = []
+        if start < h0:
+            segments.append(("raw", start, h0))
+
+        d0, d1 = _ceil_day(h0), _floor_day(rolled_end)
+        if use_daily and d0 < d1:
+            if h0 < d0:
+                segments.append((HOURLY, h0, d0))
+            segments.append((DAILY, d0, d1))
+            if d1 < rolled_end:
+                segments.append((HOURLY, d1, rolled_end))
+        else:
+            segments.append((HOURLY, h0, rolled_end))
+
+        if rolled_end < end:
+            segments.append(("raw", rolled_end, end))
+        return segments
+
+    @staticmethod
+    def aggregate(
+        db: Session,
+        start: datetime,
+        end: Optional[datetime] = None,
+        group_by: Iterable[str] = (),
+        tenant_id: Optional[int] = None,
+        service_id: Optional[UUID] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Aggregate request metrics over [start, end) using rollups where possible.
+
+        ``group_by`` accepts tenant_id, service_id, endpoint, method and hour.
+        Returns one dict per group with the SUM/MAX/MIN metric fields plus
+        ``avg_response_time_ms``.
+        """
+        group_by = tuple(group_by)
+        start = _utc(start)
+        end = _utc(end or datetime.now(timezone.utc))
+        watermark = RequestRollupService.get_watermark(db)
+
+        merged: Dict[tuple, Dict[str, Any]] = {}
+        for source, lo, hi in RequestRollupService._segments(
+            start, end, watermark, use_daily="hour" not in group_by
+        ):
+            if source == "raw":
+                model, groups, metrics = ApiRequestCounter, _raw_groups(), _raw_metrics()
+                time_column = ApiRequestCounter.created_at
+            else:
+                model, groups, metrics = ApiRequestSummary, _summary_groups(), _summary_metrics()
+                time_column = ApiRequestSummary.period_start
+
+            keys = [groups[g].label(g) for g in group_by]
+            query = db.query(*keys, *metrics).filter(time_column >= lo, time_column < hi)
+            if source != "raw":
+                query = query.filter(ApiRequestSummary.period_type == source)
+            if tenant_id:
+                query = query.filter(model.tenant_id == tenant_id)
+            if service_id:
+                query = query.filter(model.service_id == service_id)
+            if keys:
+                query = query.group_by(*[groups[g] for g in group_by])
+
+            for row in query.all():
+                values = dict(row._mapping)
+                if not values["total_requests"]:
+                    continue
+                key = tuple(values[g] for g in group_by)
+                acc = merged.get(key)
+                if acc is None:
+                    merged[key] = values
+                    continue
+                for field in SUM_FIELDS:
+                    acc[field] = (acc[field] or 0) + (values[field] or 0)
+                for field in MAX_FIELDS:
+                    if values[field] is not None and (acc[field] is None or values[field] > acc[field]):
+                        acc[field] = values[field]
+                for field in MIN_FIELDS:
+                    if values[field] is not None and (acc[field] is None or values[field] < acc[field]):
+                        acc[field] = values[field]
+
+        results = list(merged.values())
+        for r in results:
+            for field in SUM_FIELDS:
+                r[field] = int(r[field] or 0)
+            r["avg_response_time_ms"] = (
+                r["total_response_time_ms"] / r["total_requests"] if r["total_requests"] else 0
+            )
+        return results
+
+    @staticmethod
+    def totals(
+        db: Session,
+        start: datetime,
+        end: Optional[datetime] = None,
+        tenant_id: Optional[int] = None,
+        service_id: Optional[UUID] = None
+    ) -> Dict[str, Any]:
+        """Ungrouped aggregate; zeroed when there were no requests."""
+        rows = RequestRollupService.aggregate(
+            db, start, end, tenant_id=tenant_id, service_id=service_id
+        )
+        if rows:
+            return rows[0]
+        empty = {field: 0 for field in SUM_FIELDS}
+        empty.update(
+            max_response_time_ms=None,
+            min_response_time_ms=None,
+            last_request_at=None,
+            avg_response_time_ms=0,
+        )
+        return empty
+
+
+# Singleton instance
+request_rollup_service = RequestRollupService()
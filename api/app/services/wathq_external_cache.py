@@ -0,0 +1,226 @@
+"""
+Two-tier cache for WATHQ external service responses.
+
+    L1  Redis, shared by all workers; entries expire with their cache entry
+    L2  the wathq_external_data table, the durable copy
+
+Every entry is fresh until ``fresh_until`` and kept until ``expires_at``;
+in between it may be served stale while it is refreshed. Entries can also be
+negative (a cached WATHQ 404), see ``status_code``.
+
+Both tiers use the same cache key (``wathq:external:<cache key>`` in Redis),
+whose scope (user, tenant or API key) decides who shares an entry; see
+CRUDWathqExternalData.generate_cache_key.
+
+Reads try L1 first and only query Postgres on an L1 miss, refilling L1 from
+the row they find. Writes go through to both tiers. Clearing a user's or a
+tenant's cache drops the L1 keys of the deleted rows too. A Redis outage only
+costs the L1 tier.
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import delete_cached, delete_keys, get_cached, set_cached
+from app.crud.crud_wathq_external_data import wathq_external_data
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "wathq:external"
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class WathqExternalCache:
+    """Redis L1 in front of the wathq_external_data (Postgres) cache."""
+
+    def __init__(self):
+        # Metrics
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        # Hits on an entry another user fetched: upstream calls saved by sharing
+        self.shared_hits = 0
+
+    @staticmethod
+    def make_key(
+        service_id: UUID,
+        tenant_id: Optional[int],
+        user_id: int,
+        params: Optional[Dict[str, Any]],
+        scope: str = "user",
+        api_key: Optional[str] = None
+    ) -> str:
+        cache_key = wathq_external_data.generate_cache_key(
+            service_id, tenant_id, user_id, params, scope, api_key
+        )
+        return f"{KEY_PREFIX}:{cache_key}"
+
+    async def get(
+        self,
+        db: Session,
+        service_id: UUID,
+        tenant_id: Optional[int],
+        user_id: int,
+        params: Optional[Dict[str, Any]] = None,
+        scope: str = "user",
+        api_key: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Cached ``{"data", "status_code", "fresh_until", "expires_at"}`` for a request, or None."""
+        key = self.make_key(service_id, tenant_id, user_id, params, scope, api_key)
+        try:
+            raw = await get_cached(key)
+        except Exception as e:
+            logger.warning(f"WATHQ L1 cache unavailable: {e}")
+            raw = None
+        if raw is not None:
+            self.l1_hits += 1
+            entry = json.loads(raw)
+            if entry.get("fetched_by") != user_id:
+                self.shared_hits += 1
+            return {
+                "data": entry["data"],
+                "status_code": entry["status_code"],
+                "fetched_by": entry.get("fetched_by"),
+                "fresh_until": datetime.fromisoformat(entry["fresh_until"]),
+                "expires_at": datetime.fromisoformat(entry["expires_at"]),
+            }
+
+        cached = wathq_external_data.get_cached_data(
+            db=db,
+            service_id=service_id,
+            tenant_id=tenant_id,
+            user_id=user_id,
+            params=params,
+            scope=scope,
+            api_key=api_key
+        )
+        if cached is None:
+            self.misses += 1
+            return None
+
+        self.l2_hits += 1
+        if cached.user_id != user_id:
+            self.shared_hits += 1
+        entry = {
+            "data": cached.data,
+            "status_code": cached.status_code or 200,
+            "fetched_by": cached.user_id,
+            "fresh_until": _aware(cached.updated_at or cached.created_at)
+            + timedelta(seconds=cached.ttl_seconds or 0),
+            "expires_at": _aware(cached.expires_at),
+        }
+        await self._set_l1(key, entry)
+        return entry
+
+    async def put(
+        self,
+        db: Session,
+        service_id: UUID,
+        tenant_id: Optional[int],
+        user_id: int,
+        data: Dict[str, Any],
+        params: Optional[Dict[str, Any]] = None,
+        status_code: int = 200,
+        ttl_seconds: int = 3600,
+        hard_ttl_seconds: Optional[int] = None,
+        scope: str = "user",
+        api_key: Optional[str] = None
+    ) -> datetime:
+        """
+        Write a response through to both tiers; returns its expiry.
+
+        Fresh for ``ttl_seconds``, then kept as stale until ``hard_ttl_seconds``.
+        """
+        row = wathq_external_data.save_external_data(
+            db=db,
+            service_id=service_id,
+            tenant_id=tenant_id,
+            user_id=user_id,
+            data=data,
+            params=params,
+            status_code=status_code,
+            ttl_seconds=ttl_seconds,
+            hard_ttl_seconds=hard_ttl_seconds,
+            scope=scope,
+            api_key=api_key
+        )
+        expires_at = _aware(row.expires_at)
+        await self._set_l1(
+            f"{KEY_PREFIX}:{row.cache_key}",
+            {
+                "data": data,
+                "status_code": status_code,
+                "fetched_by": user_id,
+                "fresh_until": datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds),
+                "expires_at": expires_at,
+            },
+        )
+        return expires_at
+
+    async def clear_user(self, db: Session, user_id: int, service_id: Optional[UUID] = None) -> int:
+        """Delete the entries a user fetched from both tiers; returns the row count."""
+        cache_keys = wathq_external_data.get_cache_keys(db, user_id=user_id, service_id=service_id)
+        count = wathq_external_data.clear_user_cache(db=db, user_id=user_id, service_id=service_id)
+        await self.invalidate(cache_keys)
+        return count
+
+    async def clear_tenant(self, db: Session, tenant_id: int, service_id: Optional[UUID] = None) -> int:
+        """Delete a tenant's entries from both tiers; returns the row count."""
+        cache_keys = wathq_external_data.get_cache_keys(db, tenant_id=tenant_id, service_id=service_id)
+        count = wathq_external_data.clear_tenant_cache(db=db, tenant_id=tenant_id, service_id=service_id)
+        await self.invalidate(cache_keys)
+        return count
+
+    async def invalidate(self, cache_keys: Optional[List[str]] = None) -> int:
+        """Drop the given entries from L1 (every entry when None)."""
+        try:
+            if cache_keys is None:
+                return await delete_cached(f"{KEY_PREFIX}:*")
+            deleted = 0
+            for start in range(0, len(cache_keys), 500):
+                deleted += await delete_keys(
+                    [f"{KEY_PREFIX}:{key}" for key in cache_keys[start:start + 500]]
+                )
+            return deleted
+        except Exception as e:
+            logger.error(f"Failed to invalidate WATHQ L1 cache: {e}")
+            return 0
+
+    async def _set_l1(self, key: str, entry: Dict[str, Any]) -> None:
+        ttl = int((entry["expires_at"] - datetime.now(timezone.utc)).total_seconds())
+        if ttl <= 0:
+            return
+        try:
+            await set_cached(
+                key,
+                json.dumps(
+                    {
+                        **entry,
+                        "fresh_until": entry["fresh_until"].isoformat(),
+                        "expires_at": entry["expires_at"].isoformat(),
+                    }
+                ),
+                ttl,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to write WATHQ L1 cache: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "shared_hits": self.shared_hits,
+        }
+
+
+# Singleton instance
+wathq_external_cache = WathqExternalCache()
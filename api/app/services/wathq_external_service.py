@@ -3,20 +3,42 @@ Service layer for WATHQ external API integration.
 Handles caching, external API calls, and data management.
 """
 
+import asyncio
 import httpx
+import time
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
+from urllib.parse import urlparse
+from uuid import UUID
 import logging
 
+from sqlalchemy import Text, cast, func
 from sqlalchemy.orm import Session
 
 from app.models.user import User
 from app.models.service import Service
 from app.models.wathq_call_log import WathqCallLog
+from app.models.wathq_external_data import WathqExternalData
 from app.crud.crud_wathq_external_data import wathq_external_data
+from app.services.wathq_external_cache import wathq_external_cache
 from app.core.config import settings
+from app.core.wathq_metadata import wathq_metadata
+from app.core.wathq_resilience import wathq_resilience
+from app.core.wathq_transport import wathq_transport
+from app.core.wathq_utils import get_tenant_wathq_key_by_slug
 
 logger = logging.getLogger(__name__)
 
+# Service slug -> WATHQ API endpoint (under WATHQ_API_BASE_URL)
+SERVICE_ENDPOINTS = {
+    "commercial-registration": "/commercial/verify",
+    "real-estate": "/realestate/property",
+    "employee-verification": "/employment/verify",
+    "company-contract": "/contracts/verify",
+    "attorney-services": "/legal/attorney",
+    "national-address": "/address/verify"
+}
+
 
 class WathqExternalService:
     """Service for handling WATHQ external API calls with caching."""
@@ -24,34 +46,37 @@ class WathqExternalService:
     def __init__(self):
         self.base_url = settings.WATHQ_API_BASE_URL if hasattr(settings, 'WATHQ_API_BASE_URL') else "https://api.wathq.sa/v1"
         self.timeout = 30  # seconds
+        # Breaker and concurrency limit per service for these endpoints too
+        base_path = urlparse(self.base_url).path.rstrip("/")
+        for slug, endpoint in SERVICE_ENDPOINTS.items():
+            wathq_resilience.register_prefix(f"{base_path}{endpoint}", slug)
+        # Background refreshes of stale entries, by cache key (one per entry)
+        self._refreshing: Dict[str, asyncio.Task] = {}
+    
+    @staticmethod
+    def _cache_policy(service_slug: str) -> Dict[str, int]:
+        """soft_ttl / hard_ttl / negative_ttl (seconds) of a service's cache entries."""
+        return {
+            **settings.WATHQ_CACHE_DEFAULT_POLICY,
+            **settings.WATHQ_CACHE_POLICIES.get(service_slug, {})
+        }
+    
+    @staticmethod
+    def _cache_scope(service_slug: str) -> str:
+        """Who shares a service's cache entries: "user", "tenant" or "api_key"."""
+        return settings.WATHQ_CACHE_SCOPES.get(service_slug, settings.WATHQ_CACHE_DEFAULT_SCOPE)
         
     def _get_service_endpoint(self, service_slug: str) -> str:
         """Get the external API endpoint for a service."""
-        # Map service slugs to WATHQ API endpoints
-        endpoints = {
-            "commercial-registration": "/commercial/verify",
-            "real-estate": "/realestate/property",
-            "employee-verification": "/employment/verify",
-            "company-contract": "/contracts/verify",
-            "attorney-services": "/legal/attorney",
-            "national-address": "/address/verify"
-        }
-        return endpoints.get(service_slug, f"/{service_slug}")
+        return SERVICE_ENDPOINTS.get(service_slug, f"/{service_slug}")
     
     def _get_api_key(self, db: Session, user: User, service: Service) -> Optional[str]:
         """Get the appropriate API key for the service."""
-        # Check for tenant-specific API key
+        # Check for tenant-specific API key (memoized, see app.core.wathq_metadata)
         if user.tenant_id:
-            from app.models.service import TenantService
-            tenant_service = db.query(TenantService).filter(
-                TenantService.tenant_id == user.tenant_id,
-                TenantService.service_id == service.id,
-                TenantService.is_active == True,
-                TenantService.is_approved == True
-            ).first()
-            
-            if tenant_service and tenant_service.wathq_api_key:
-                return tenant_service.wathq_api_key
+            api_key = get_tenant_wathq_key_by_slug(db, user.tenant_id, service.slug)
+            if api_key:
+                return api_key
         
         # Fallback to system API key
         return settings.WATHQ_API_KEY if hasattr(settings, 'WATHQ_API_KEY') else None
@@ -61,7 +86,8 @@ class WathqExternalService:
         endpoint: str,
         params: Dict[str, Any],
         api_key: str,
-        method: str = "GET"
+        method: str = "GET",
+        tenant_id: Optional[int] = None
     ) -> tuple[Dict[str, Any], int]:
         """Make actual call to external WATHQ API."""
         headers = {
@@ -71,26 +97,33 @@ class WathqExternalService:
         
         url = f"{self.base_url}{endpoint}"
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            try:
-                if method == "GET":
-                    response = await client.get(url, params=params, headers=headers)
-                elif method == "POST":
-                    response = await client.post(url, json=params, headers=headers)
-                else:
-                    raise ValueError(f"Unsupported method: {method}")
-                
-                return response.json(), response.status_code
-                
-            except httpx.TimeoutException:
-                logger.error(f"Timeout calling WATHQ API: {url}")
-                return {"error": "API timeout", "message": "External service timeout"}, 504
-            except httpx.RequestError as e:
-                logger.error(f"Error calling WATHQ API: {url} - {str(e)}")
-                return {"error": "API error", "message": str(e)}, 503
-            except Exception as e:
-                logger.error(f"Unexpected error calling WATHQ API: {str(e)}")
-                return {"error": "Internal error", "message": str(e)}, 500
+        client = wathq_transport.get_client()
+        extensions = {"wathq_tenant_id": tenant_id}
+        try:
+            if method == "GET":
+                response = await client.get(
+                    url, params=params, headers=headers, timeout=self.timeout,
+                    extensions=extensions
+                )
+            elif method == "POST":
+                response = await client.post(
+                    url, json=params, headers=headers, timeout=self.timeout,
+                    extensions=extensions
+                )
+            else:
+                raise ValueError(f"Unsupported method: {method}")
+            
+            return response.json(), response.status_code
+            
+        except httpx.TimeoutException:
+            logger.error(f"Timeout calling WATHQ API: {url}")
+            return {"error": "API timeout", "message": "External service timeout"}, 504
+        except httpx.RequestError as e:
+            logger.error(f"Error calling WATHQ API: {url} - {str(e)}")
+            return {"error": "API error", "message": str(e)}, 503
+        except Exception as e:
+            logger.error(f"Unexpected error calling WATHQ API: {str(e)}")
+            return {"error": "Internal error", "message": str(e)}, 500
     
     def _log_api_call(
         self,
@@ -120,31 +153,44 @@ class WathqExternalService:
             logger.error(f"Failed to log API call: {str(e)}")
             db.rollback()
     
-    async def get_service_data(
+    def _get_api_keys(self, db: Session, user: User, services: List[Service]) -> Dict[UUID, Optional[str]]:
+        """API key per service for the user, resolved in one query (see _get_api_key)."""
+        tenant_keys = {}
+        if user.tenant_id and services:
+            # Memoized, see app.core.wathq_metadata
+            assignments = wathq_metadata.tenant_services(
+                db, user.tenant_id, [service.slug for service in services]
+            )
+            tenant_keys = {
+                slug: meta["api_key"]
+                for slug, meta in assignments.items()
+                if meta and meta["is_active"] and meta["is_approved"] and meta["api_key"]
+            }
+
+        system_key = settings.WATHQ_API_KEY if hasattr(settings, 'WATHQ_API_KEY') else None
+        return {service.id: tenant_keys.get(service.slug, system_key) for service in services}
+
+    async def _get_local_result(
         self,
         db: Session,
         user: User,
+        service: Optional[Service],
         service_slug: str,
-        params: Optional[Dict[str, Any]] = None,
-        force_refresh: bool = False
-    ) -> Dict[str, Any]:
+        params: Optional[Dict[str, Any]],
+        force_refresh: bool,
+        api_key: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
         """
-        Get data from WATHQ service with caching.
+        Result that needs no external call: an unknown or inactive service,
+        or a cache hit. None when the external API has to be called.
         
-        Args:
-            db: Database session
-            user: Current user
-            service_slug: Service to call
-            params: Service-specific parameters
-            force_refresh: Force fetch from external API
-            
-        Returns:
-            Dict containing the service response
+        ``api_key`` is the key the call would use; it addresses the cache
+        entry of services cached per API key.
         """
-        # Get service details
-        service = db.query(Service).filter(Service.slug == service_slug).first()
         if not service:
             return {
+                "service": service_slug,
+                "data": {},
                 "status": "error",
                 "message": f"Service '{service_slug}' not found",
                 "cached": False
@@ -153,6 +199,8 @@ class WathqExternalService:
         # Check if service is active
         if not service.is_active:
             return {
+                "service": service_slug,
+                "data": {},
                 "status": "error",
                 "message": f"Service '{service_slug}' is not active",
                 "cached": False
@@ -160,47 +208,128 @@ class WathqExternalService:
         
         # Check cache first (unless force refresh)
         if not force_refresh:
-            cached_data = wathq_external_data.get_cached_data(
+            cached_data = await wathq_external_cache.get(
                 db=db,
                 service_id=service.id,
                 tenant_id=user.tenant_id,
                 user_id=user.id,
-                params=params
+                params=params,
+                scope=self._cache_scope(service_slug),
+                api_key=api_key
             )
             
             if cached_data:
                 # Log the cached response
                 self._log_api_call(
                     db, user, service, params or {},
-                    cached_data.data, 200, True
+                    cached_data["data"], cached_data["status_code"], True
                 )
                 
+                if cached_data["status_code"] == 404:
+                    # WATHQ recently answered "not found" for these params
+                    return {
+                        "service": service_slug,
+                        "data": cached_data["data"],
+                        "cached": True,
+                        "cache_status": "negative",
+                        "cache_expires_at": cached_data["expires_at"],
+                        "status": "error",
+                        "message": "External API returned status 404"
+                    }
+                
+                cache_status = "fresh"
+                if cached_data["fresh_until"] <= datetime.now(timezone.utc):
+                    # Serve it now, refresh it behind the response
+                    cache_status = "stale"
+                    self._schedule_refresh(user, service, params, api_key)
+                
                 return {
                     "service": service_slug,
-                    "data": cached_data.data,
+                    "data": cached_data["data"],
                     "cached": True,
-                    "cache_expires_at": cached_data.expires_at,
+                    "cache_status": cache_status,
+                    "cache_expires_at": cached_data["expires_at"],
                     "status": "success"
                 }
-        
-        # Get API key
-        api_key = self._get_api_key(db, user, service)
-        if not api_key:
-            return {
-                "status": "error",
-                "message": "No API key configured for this service",
-                "cached": False
-            }
-        
-        # Call external API
-        endpoint = self._get_service_endpoint(service_slug)
-        response_data, status_code = await self._call_external_api(
-            endpoint, params or {}, api_key
+        return None
+
+    def _schedule_refresh(
+        self,
+        user: User,
+        service: Service,
+        params: Optional[Dict[str, Any]],
+        api_key: Optional[str] = None
+    ) -> None:
+        """Refresh a stale entry in the background, once at a time per entry."""
+        key = wathq_external_cache.make_key(
+            service.id, user.tenant_id, user.id, params, self._cache_scope(service.slug), api_key
         )
+        if key in self._refreshing:
+            return
+        task = asyncio.get_running_loop().create_task(
+            # Plain values only: the request's session and ORM objects end with the request
+            self._refresh(key, user.id, user.tenant_id, service.id, params)
+        )
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(
+        self,
+        key: str,
+        user_id: int,
+        tenant_id: Optional[int],
+        service_id: UUID,
+        params: Optional[Dict[str, Any]]
+    ) -> None:
+        from app.db.session import SessionLocal
+        
+        db = SessionLocal()
+        try:
+            service = db.get(Service, service_id)
+            user = User(id=user_id, tenant_id=tenant_id)
+            api_key = self._get_api_key(db, user, service)
+            if not api_key:
+                return
+            response_data, status_code = await self._call_external_api(
+                self._get_service_endpoint(service.slug), params or {}, api_key,
+                tenant_id=tenant_id
+            )
+            await self._save_external_result(
+                db, user, service, service.slug, params, response_data, status_code, api_key
+            )
+        except Exception as e:
+            logger.error(f"Background refresh of WATHQ cache entry {key} failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _no_api_key_result(self, service_slug: str) -> Dict[str, Any]:
+        return {
+            "service": service_slug,
+            "data": {},
+            "status": "error",
+            "message": "No API key configured for this service",
+            "cached": False
+        }
+
+    async def _save_external_result(
+        self,
+        db: Session,
+        user: User,
+        service: Service,
+        service_slug: str,
+        params: Optional[Dict[str, Any]],
+        response_data: Dict[str, Any],
+        status_code: int,
+        api_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Cache and log an external API response and build the service result."""
+        policy = self._cache_policy(service_slug)
+        scope = self._cache_scope(service_slug)
         
-        # Save to cache if successful
+        # Save to cache if successful (written through to Redis and Postgres)
         if status_code == 200:
-            cached_entry = wathq_external_data.save_external_data(
+            expires_at = await wathq_external_cache.put(
                 db=db,
                 service_id=service.id,
                 tenant_id=user.tenant_id,
@@ -208,7 +337,10 @@ class WathqExternalService:
                 data=response_data,
                 params=params,
                 status_code=status_code,
-                ttl_seconds=service.cache_ttl if hasattr(service, 'cache_ttl') else 3600
+                ttl_seconds=policy["soft_ttl"],
+                hard_ttl_seconds=policy["hard_ttl"],
+                scope=scope,
+                api_key=api_key
             )
             
             # Log the API call
@@ -221,10 +353,26 @@ class WathqExternalService:
                 "service": service_slug,
                 "data": response_data,
                 "cached": False,
-                "cache_expires_at": cached_entry.expires_at,
+                "cache_status": "miss",
+                "cache_expires_at": expires_at,
                 "status": "success"
             }
         else:
+            if status_code == 404 and policy["negative_ttl"] > 0:
+                # Remember "not found" so repeated bad lookups skip WATHQ
+                await wathq_external_cache.put(
+                    db=db,
+                    service_id=service.id,
+                    tenant_id=user.tenant_id,
+                    user_id=user.id,
+                    data=response_data,
+                    params=params,
+                    status_code=status_code,
+                    ttl_seconds=policy["negative_ttl"],
+                    scope=scope,
+                    api_key=api_key
+                )
+            
             # Log the failed API call
             self._log_api_call(
                 db, user, service, params or {},
@@ -235,52 +383,232 @@ class WathqExternalService:
                 "service": service_slug,
                 "data": response_data,
                 "cached": False,
+                "cache_status": "miss",
                 "status": "error",
                 "message": f"External API returned status {status_code}"
             }
+
+    async def get_service_data(
+        self,
+        db: Session,
+        user: User,
+        service_slug: str,
+        params: Optional[Dict[str, Any]] = None,
+        force_refresh: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Get data from WATHQ service with caching.
+        
+        Args:
+            db: Database session
+            user: Current user
+            service_slug: Service to call
+            params: Service-specific parameters
+            force_refresh: Force fetch from external API
+            
+        Returns:
+            Dict containing the service response
+        """
+        # Get service details
+        service = db.query(Service).filter(Service.slug == service_slug).first()
+        
+        # Get API key (it also addresses entries cached per API key)
+        api_key = self._get_api_key(db, user, service) if service else None
+        result = await self._get_local_result(
+            db, user, service, service_slug, params, force_refresh, api_key
+        )
+        if result is not None:
+            return result
+        
+        if not api_key:
+            return self._no_api_key_result(service_slug)
+        
+        # Call external API
+        endpoint = self._get_service_endpoint(service_slug)
+        response_data, status_code = await self._call_external_api(
+            endpoint, params or {}, api_key, tenant_id=user.tenant_id
+        )
+        
+        return await self._save_external_result(
+            db, user, service, service_slug, params, response_data, status_code, api_key
+        )
     
     async def get_bulk_service_data(
         self,
         db: Session,
         user: User,
-        service_requests: List[Dict[str, Any]]
+        service_requests: List[Dict[str, Any]],
+        services: Optional[Dict[str, Service]] = None
     ) -> Dict[str, Any]:
         """
         Get data from multiple WATHQ services.
         
+        Services and API keys are resolved up front, then the external calls
+        run concurrently (at most WATHQ_BULK_MAX_CONCURRENCY at a time, each
+        bounded by WATHQ_BULK_CALL_TIMEOUT). Database work stays sequential on
+        the one session: cache lookups before the calls, cache writes and call
+        logs after them, in request order.
+        
         Args:
             db: Database session
             user: Current user
             service_requests: List of service requests
+            services: Already loaded services by slug (loaded here if omitted)
             
         Returns:
-            Dict containing all service responses
+            Dict containing all service responses, in request order
         """
-        results = []
-        successful = 0
-        failed = 0
+        if services is None:
+            slugs = {request.get("service_slug") for request in service_requests}
+            services = {
+                service.slug: service
+                for service in db.query(Service).filter(Service.slug.in_(slugs)).all()
+            }
+        api_keys = self._get_api_keys(db, user, list(services.values()))
         
-        for request in service_requests:
-            result = await self.get_service_data(
-                db=db,
-                user=user,
-                service_slug=request.get("service_slug"),
-                params=request.get("params"),
-                force_refresh=request.get("force_refresh", False)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(service_requests)
+        pending = []
+        for index, request in enumerate(service_requests):
+            start = time.monotonic()
+            service_slug = request.get("service_slug")
+            service = services.get(service_slug)
+            params = request.get("params")
+            result = await self._get_local_result(
+                db, user, service, service_slug, params, request.get("force_refresh", False),
+                api_keys.get(service.id) if service else None
             )
-            
-            results.append(result)
-            
-            if result.get("status") == "success":
-                successful += 1
+            if result is None and not api_keys.get(service.id):
+                result = self._no_api_key_result(service_slug)
+            if result is not None:
+                result["duration_ms"] = int((time.monotonic() - start) * 1000)
+                results[index] = result
             else:
-                failed += 1
+                pending.append((index, service, service_slug, params, api_keys[service.id]))
+        
+        semaphore = asyncio.Semaphore(settings.WATHQ_BULK_MAX_CONCURRENCY)
         
+        async def call(service_slug: str, params: Optional[Dict[str, Any]], api_key: str):
+            async with semaphore:
+                start = time.monotonic()
+                try:
+                    response = await asyncio.wait_for(
+                        self._call_external_api(
+                            self._get_service_endpoint(service_slug), params or {}, api_key,
+                            tenant_id=user.tenant_id
+                        ),
+                        settings.WATHQ_BULK_CALL_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    logger.error(f"Bulk call to {service_slug} exceeded {settings.WATHQ_BULK_CALL_TIMEOUT}s")
+                    response = {"error": "API timeout", "message": "External service timeout"}, 504
+                return response, time.monotonic() - start
+        
+        responses = await asyncio.gather(
+            *(call(service_slug, params, api_key) for _, _, service_slug, params, api_key in pending)
+        )
+        
+        for (index, service, service_slug, params, api_key), ((response_data, status_code), elapsed) in zip(
+            pending, responses
+        ):
+            result = await self._save_external_result(
+                db, user, service, service_slug, params, response_data, status_code, api_key
+            )
+            result["duration_ms"] = int(elapsed * 1000)
+            results[index] = result
+        
+        successful = sum(1 for result in results if result.get("status") == "success")
         return {
             "results": results,
             "total_requested": len(service_requests),
             "successful": successful,
-            "failed": failed
+            "failed": len(service_requests) - successful
+        }
+    
+    def rehash_cache_keys(self, db: Session) -> Dict[str, int]:
+        """
+        Re-key every cache entry under its service's current cache scope.
+        
+        Run after changing WATHQ_CACHE_SCOPES: entries that now share a key
+        (e.g. several users of a tenant who fetched the same record) are
+        merged into one. The Redis tier must be flushed afterwards.
+        """
+        from app.models.service import TenantService
+        
+        slugs = {service.id: service.slug for service in db.query(Service).all()}
+        tenant_keys = {
+            (ts.tenant_id, ts.service_id): ts.wathq_api_key
+            for ts in db.query(TenantService).filter(
+                TenantService.is_active == True,
+                TenantService.is_approved == True
+            ).all()
+            if ts.wathq_api_key
+        }
+        system_key = settings.WATHQ_API_KEY if hasattr(settings, 'WATHQ_API_KEY') else None
+        
+        def key_for(row: WathqExternalData) -> str:
+            return wathq_external_data.generate_cache_key(
+                row.service_id,
+                row.tenant_id,
+                row.user_id,
+                row.request_params,
+                self._cache_scope(slugs.get(row.service_id, "")),
+                tenant_keys.get((row.tenant_id, row.service_id), system_key)
+            )
+        
+        return wathq_external_data.rehash_cache_keys(db, key_for)
+    
+    def cache_efficiency(self, db: Session) -> Dict[str, Any]:
+        """
+        How much duplicate upstream traffic the cache scopes leave.
+        
+        Per service, live entries are grouped by tenant and request params:
+        every entry beyond the first of a group is a WATHQ call made for data
+        the tenant already had cached (only possible under the "user" scope).
+        """
+        groups = (
+            db.query(
+                WathqExternalData.service_id.label("service_id"),
+                func.count(WathqExternalData.id).label("entries")
+            )
+            .filter(WathqExternalData.expires_at > datetime.utcnow())
+            .group_by(
+                WathqExternalData.service_id,
+                WathqExternalData.tenant_id,
+                cast(WathqExternalData.request_params, Text)
+            )
+            .subquery()
+        )
+        rows = (
+            db.query(
+                Service.slug,
+                func.count().label("distinct_requests"),
+                func.sum(groups.c.entries).label("entries")
+            )
+            .join(groups, Service.id == groups.c.service_id)
+            .group_by(Service.slug)
+            .all()
+        )
+        
+        services = []
+        for row in rows:
+            entries = int(row.entries)
+            services.append({
+                "slug": row.slug,
+                "scope": self._cache_scope(row.slug),
+                "entries": entries,
+                "distinct_requests": row.distinct_requests,
+                "duplicate_entries": entries - row.distinct_requests
+            })
+        
+        total_entries = sum(service["entries"] for service in services)
+        duplicates = sum(service["duplicate_entries"] for service in services)
+        return {
+            "default_scope": settings.WATHQ_CACHE_DEFAULT_SCOPE,
+            "services": services,
+            "duplicate_entries": duplicates,
+            "duplicate_rate": f"{(duplicates / total_entries * 100) if total_entries else 0:.2f}%",
+            # This worker's hits on entries fetched by another user
+            "shared_hits": wathq_external_cache.stats()["shared_hits"]
         }
 
 
@@ -0,0 +1,402 @@
+"""
+Transactional outbox for WATHQ call logs and offline data.
+
+Tracking a WATHQ call used to cost two database transactions (the call log,
+then the offline copy) before the response went back to the caller. The hot
+path now appends both rows as one entry to a Redis stream and returns; a
+background consumer in the API workers reads the stream through a consumer
+group and bulk-inserts each batch in one transaction.
+
+Delivery is at least once: an entry is acknowledged (and deleted) only after
+its batch committed, and entries left pending by a consumer that died are
+reclaimed after WATHQ_OUTBOX_CLAIM_IDLE_MS. Redelivery is harmless because
+the rows carry their own keys, derived from the request id: call logs whose
+id is already stored are skipped, offline rows are inserted with ON CONFLICT
+DO NOTHING. (Two consumers writing the same entry at once would need a batch
+transaction longer than the claim idle time.)
+
+fetched_at is left to the database default, i.e. the time the row is
+inserted, not queued: the incremental sync (wathq_sync_engine) only settles
+the last WATHQ_SYNC_SETTLE_SECONDS of call logs, and a queued row stamped
+earlier could land behind its watermark.
+
+If Redis is unreachable or slow (WATHQ_OUTBOX_REDIS_TIMEOUT), or the outbox
+is disabled, the rows are written synchronously, as before, so a call is
+never left unlogged.
+
+Response bodies are stored as content-addressed blobs (wathq_response_blobs);
+an entry carries the body once, in its call log, and the offline row shares
+its blob.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.crud_wathq_offline_data import extract_identifiers
+from app.crud.crud_wathq_response_blob import wathq_response_blob
+from app.db.session import SessionLocal
+from app.models.wathq_call_log import WathqCallLog
+from app.models.wathq_offline_data import WathqOfflineData
+
+logger = logging.getLogger(__name__)
+
+GROUP = "writers"
+
+# Columns that need converting back from their JSON form
+_UUID_COLUMNS = ("id", "service_id")
+
+# Allowed clock difference between Redis (entry ids) and the database (fetched_at)
+_CLOCK_SKEW = timedelta(minutes=5)
+
+
+def _encode(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: str(value) if isinstance(value, (uuid.UUID, datetime)) else value
+        for key, value in row.items()
+    }
+
+
+def _decode(row: Dict[str, Any]) -> Dict[str, Any]:
+    row = dict(row)
+    for key in _UUID_COLUMNS:
+        if row.get(key) is not None:
+            row[key] = uuid.UUID(row[key])
+    return row
+
+
+def _entry_time(entry_id: Any) -> datetime:
+    """When an entry was added: the millisecond part of its stream id."""
+    if isinstance(entry_id, bytes):
+        entry_id = entry_id.decode()
+    return datetime.fromtimestamp(int(entry_id.split("-")[0]) / 1000, tz=timezone.utc)
+
+
+class WathqOutbox:
+    """Redis stream of pending call log / offline data rows plus its consumer."""
+
+    def __init__(
+        self,
+        stream: str = settings.WATHQ_OUTBOX_STREAM,
+        batch_size: int = settings.WATHQ_OUTBOX_BATCH_SIZE,
+    ):
+        self.stream = stream
+        self.batch_size = batch_size
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
+        self._task: Optional[asyncio.Task] = None
+        # Producer clients, one per event loop
+        self._redis: Dict[int, Any] = {}
+
+        # Metrics
+        self.appended = 0
+        self.direct_writes = 0
+        self.written = 0
+        self.batches = 0
+        self.reclaimed = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.last_flush_ms = 0
+        self.last_error: Optional[str] = None
+
+    # ------------------------------------------------------------------
+    # Producer (hot path)
+    # ------------------------------------------------------------------
+
+    def _get_redis(self):
+        """redis.asyncio client for the running event loop, with short timeouts."""
+        import redis.asyncio as aredis
+
+        loop_id = id(asyncio.get_running_loop())
+        client = self._redis.get(loop_id)
+        if client is None:
+            client = aredis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=settings.WATHQ_OUTBOX_REDIS_TIMEOUT,
+                socket_connect_timeout=settings.WATHQ_OUTBOX_REDIS_TIMEOUT,
+            )
+            self._redis[loop_id] = client
+        return client
+
+    async def append(
+        self,
+        db: Session,
+        request_id: str,
+        call_log: Dict[str, Any],
+        offline_data: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Queue the rows of one tracked call.
+
+        ``request_id`` becomes the call log id (and seeds the offline data
+        id), which is what makes redelivered entries idempotent. The offline
+        row, if any, gets the call log's response body.
+        """
+        request_uuid = uuid.UUID(request_id)
+        call_log = {**call_log, "id": request_uuid}
+        if offline_data is not None:
+            offline_data = {**offline_data, "id": uuid.uuid5(request_uuid, "offline_data")}
+
+        if settings.WATHQ_OUTBOX_ENABLED:
+            try:
+                entry = {"call_log": json.dumps(_encode(call_log), default=str)}
+                if offline_data is not None:
+                    entry["offline_data"] = json.dumps(_encode(offline_data), default=str)
+                await self._get_redis().xadd(self.stream, entry)
+                self.appended += 1
+                return
+            except Exception as e:
+                logger.warning(f"WATHQ outbox unavailable, writing call log directly: {e}")
+
+        self._write_direct(db, call_log, offline_data)
+
+    def _write_direct(
+        self,
+        db: Session,
+        call_log: Dict[str, Any],
+        offline_data: Optional[Dict[str, Any]]
+    ) -> None:
+        try:
+            self._insert_rows(db, [(None, call_log, offline_data)])
+            db.commit()
+            self.direct_writes += 1
+        except Exception:
+            db.rollback()
+            raise
+
+    # ------------------------------------------------------------------
+    # Consumer (API workers)
+    # ------------------------------------------------------------------
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start consuming the outbox on the running event loop."""
+        if self.is_running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop consuming; unacknowledged entries stay pending for the next consumer."""
+        if not self.is_running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        import redis.asyncio as aredis
+
+        while True:
+            client = aredis.Redis.from_url(settings.REDIS_URL)
+            try:
+                try:
+                    await client.xgroup_create(self.stream, GROUP, id="0", mkstream=True)
+                except aredis.ResponseError as e:
+                    if "BUSYGROUP" not in str(e):
+                        raise
+                logger.info(f"Consuming WATHQ outbox {self.stream} as {self.consumer}")
+
+                while True:
+                    # Entries a dead (or failed) consumer left unacknowledged first
+                    _, claimed, *_ = await client.xautoclaim(
+                        self.stream, GROUP, self.consumer,
+                        min_idle_time=settings.WATHQ_OUTBOX_CLAIM_IDLE_MS,
+                        start_id="0-0", count=self.batch_size
+                    )
+                    if claimed:
+                        self.reclaimed += len(claimed)
+                        await self._process(client, claimed)
+                        continue
+
+                    response = await client.xreadgroup(
+                        GROUP, self.consumer, {self.stream: ">"},
+                        count=self.batch_size, block=settings.WATHQ_OUTBOX_BLOCK_MS
+                    )
+                    for _, entries in response or []:
+                        await self._process(client, entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"WATHQ outbox consumer failed, reconnecting: {e}")
+                await asyncio.sleep(5)
+            finally:
+                await client.aclose()
+
+    async def _process(self, client, entries: List[Tuple[bytes, Dict[bytes, bytes]]]) -> None:
+        """Write a batch of entries and acknowledge the ones that are stored."""
+        rows = []  # (entry id, call log, offline data or None)
+        dropped = []
+        for entry_id, fields in entries:
+            if not fields:
+                # Deleted while pending; nothing left to write
+                dropped.append(entry_id)
+                continue
+            try:
+                offline_data = fields.get(b"offline_data")
+                rows.append(
+                    (
+                        entry_id,
+                        _decode(json.loads(fields[b"call_log"])),
+                        _decode(json.loads(offline_data)) if offline_data else None,
+                    )
+                )
+            except Exception as e:
+                # Unreadable entries are dropped, not retried forever
+                logger.error(f"Dropping malformed WATHQ outbox entry {entry_id}: {e}")
+                self.failed += 1
+                dropped.append(entry_id)
+
+        start = time.monotonic()
+        try:
+            if rows:
+                self.duplicates += await asyncio.to_thread(self._write_batch, rows)
+        except (IntegrityError, DataError) as e:
+            # A row the database rejects: store the rest one entry at a time
+            logger.error(f"WATHQ outbox batch rejected, writing entries one by one: {e}")
+            stored = []
+            for row in rows:
+                try:
+                    self.duplicates += await asyncio.to_thread(self._write_batch, [row])
+                    stored.append(row)
+                except (IntegrityError, DataError) as row_error:
+                    logger.error(f"Dropping WATHQ outbox entry {row[0]}: {row_error}")
+                    self.failed += 1
+                    dropped.append(row[0])
+            rows = stored
+        except Exception as e:
+            # Left pending: reclaimed and retried after WATHQ_OUTBOX_CLAIM_IDLE_MS
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.error(f"Failed to write {len(rows)} WATHQ outbox entries: {e}")
+            rows = []
+        finally:
+            self.last_flush_ms = int((time.monotonic() - start) * 1000)
+
+        done = [row[0] for row in rows] + dropped
+        if done:
+            await client.xack(self.stream, GROUP, *done)
+            await client.xdel(self.stream, *done)
+        if rows:
+            self.written += len(rows)
+            self.batches += 1
+
+    @staticmethod
+    def _write_batch(rows: List[Tuple[bytes, Dict[str, Any], Optional[Dict[str, Any]]]]) -> int:
+        """Bulk-insert one batch in a single transaction (runs in a thread); returns duplicates skipped."""
+        db = SessionLocal()
+        try:
+            duplicates = WathqOutbox._insert_rows(db, rows)
+            db.commit()
+            return duplicates
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _insert_rows(
+        db: Session, rows: List[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]
+    ) -> int:
+        """
+        Insert call logs and offline rows, their bodies as blobs (no commit).
+
+        Offline rows get their lookup identifiers extracted here, on the
+        consumer rather than the request path. Entries (entry id set) whose
+        call log is already stored are skipped; returns how many.
+        """
+        duplicates = 0
+        redelivered = [
+            (entry_id, call_log) for entry_id, call_log, _ in rows if entry_id is not None
+        ]
+        if redelivered:
+            # fetched_at is at least the entry's time: prunes the partitions searched
+            since = min(_entry_time(entry_id) for entry_id, _ in redelivered) - _CLOCK_SKEW
+            stored = {
+                row_id
+                for (row_id,) in db.query(WathqCallLog.id).filter(
+                    WathqCallLog.id.in_([call_log["id"] for _, call_log in redelivered]),
+                    WathqCallLog.fetched_at >= since,
+                )
+            }
+            if stored:
+                duplicates = len(stored)
+                rows = [row for row in rows if row[1]["id"] not in stored]
+                if not rows:
+                    return duplicates
+
+        hashes = wathq_response_blob.store_many(
+            db, [call_log["response_body"] for _, call_log, _ in rows]
+        )
+        call_logs = []
+        offline_rows = []
+        for (_, call_log, offline_data), body_hash in zip(rows, hashes):
+            call_logs.append(
+                {
+                    **{key: value for key, value in call_log.items() if key != "response_body"},
+                    "response_body_hash": body_hash,
+                }
+            )
+            if offline_data is not None:
+                offline_rows.append(
+                    {
+                        **{key: value for key, value in offline_data.items() if key != "response_body"},
+                        **extract_identifiers(offline_data["full_external_url"], call_log["response_body"]),
+                        "response_body_hash": body_hash,
+                    }
+                )
+
+        if call_logs:
+            db.execute(insert(WathqCallLog).on_conflict_do_nothing(), call_logs)
+        if offline_rows:
+            db.execute(insert(WathqOfflineData).on_conflict_do_nothing(), offline_rows)
+        return duplicates
+
+    async def pending(self) -> Dict[str, Any]:
+        """Entries not yet written: stream length and unacknowledged deliveries."""
+        import redis.asyncio as aredis
+
+        client = aredis.Redis.from_url(settings.REDIS_URL)
+        try:
+            length = await client.xlen(self.stream)
+            try:
+                summary = await client.xpending(self.stream, GROUP)
+            except aredis.ResponseError:
+                summary = {"pending": 0}
+            return {"stream_length": length, "unacknowledged": summary["pending"]}
+        finally:
+            await client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.WATHQ_OUTBOX_ENABLED,
+            "consuming": self.is_running,
+            "appended": self.appended,
+            "direct_writes": self.direct_writes,
+            "written": self.written,
+            "batches": self.batches,
+            "reclaimed": self.reclaimed,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "last_flush_ms": self.last_flush_ms,
+            "last_error": self.last_error,
+        }
+
+
+# Singleton instance
+wathq_outbox = WathqOutbox()
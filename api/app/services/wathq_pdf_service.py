@@ -19,6 +19,8 @@ from jinja2 import Environment, FileSystemLoader, Template
 from utils.wcr_pdf_helpers import PDFHelper
 from weasyprint import HTML
 
+from app.services.pdf_render_pool import pdf_render_pool
+
 
 class WathqPDFService:
     """Enhanced service for generating WATHQ PDF documents"""
@@ -65,17 +67,21 @@ class WathqPDFService:
                 status_code=500, detail=f"PDF generation failed: {str(e)}"
             )
 
-    def generate_pdf_response(
-        self,
-        data: WathqPDFData,
-        filename: Optional[str] = None,
-        template_name: Optional[str] = None,
-    ) -> Response:
-        """Generate PDF and return as FastAPI Response"""
-        pdf_bytes = self.generate_pdf_bytes(data, template_name)
+    async def generate_pdf_bytes_async(
+        self, data: WathqPDFData, template_name: Optional[str] = None
+    ) -> bytes:
+        """Generate PDF bytes in the render pool, without blocking the event loop"""
+        try:
+            html_content = self.preview_html(data, template_name)
+            return await pdf_render_pool.render_html(html_content, data.pdf_options)
 
-        filename = filename or f"{data.document_title}.pdf"
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"PDF generation failed: {str(e)}"
+            )
 
+    @staticmethod
+    def _pdf_response(pdf_bytes: bytes, filename: str) -> Response:
         return Response(
             content=pdf_bytes,
             media_type="application/pdf",
@@ -85,6 +91,26 @@ class WathqPDFService:
             },
         )
 
+    def generate_pdf_response(
+        self,
+        data: WathqPDFData,
+        filename: Optional[str] = None,
+        template_name: Optional[str] = None,
+    ) -> Response:
+        """Generate PDF and return as FastAPI Response"""
+        pdf_bytes = self.generate_pdf_bytes(data, template_name)
+        return self._pdf_response(pdf_bytes, filename or f"{data.document_title}.pdf")
+
+    async def generate_pdf_response_async(
+        self,
+        data: WathqPDFData,
+        filename: Optional[str] = None,
+        template_name: Optional[str] = None,
+    ) -> Response:
+        """Generate PDF in the render pool and return as FastAPI Response"""
+        pdf_bytes = await self.generate_pdf_bytes_async(data, template_name)
+        return self._pdf_response(pdf_bytes, filename or f"{data.document_title}.pdf")
+
     def preview_html(
         self, data: WathqPDFData, template_name: Optional[str] = None
     ) -> str:
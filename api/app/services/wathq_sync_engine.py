@@ -0,0 +1,306 @@
+"""
+Incremental sync of WATHQ call logs into the normalized wathq.* tables.
+
+Each service keeps a high-water mark ``(fetched_at, id)`` of the last call log
+it has consumed. A sync run streams only the logs past that mark in
+keyset-paginated chunks, and skips logs that already have a normalized row
+(matched on ``log_id``) with a NOT EXISTS anti-join, so its cost scales with
+the amount of new data instead of the full log history.
+
+Background jobs split the pending logs into keyset ranges with
+``plan_chunks`` and sync the ranges in parallel with ``run_range``, moving
+the watermark only once every range is done.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import exists, tuple_
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.models.processing_watermark import ProcessingWatermark
+from app.models.wathq_call_log import WathqCallLog
+
+logger = logging.getLogger(__name__)
+
+# Keyset position of a call log: (fetched_at, id)
+LogKey = Tuple[datetime, UUID]
+
+
+def encode_log_key(key: Optional[LogKey]) -> Optional[List[str]]:
+    """JSON-friendly form of a log key, for passing ranges to Celery tasks."""
+    if key is None:
+        return None
+    return [key[0].isoformat(), str(key[1])]
+
+
+def decode_log_key(value: Optional[List[str]]) -> Optional[LogKey]:
+    if value is None:
+        return None
+    return datetime.fromisoformat(value[0]), UUID(value[1])
+
+
+class SyncDataError(Exception):
+    """A call log whose response cannot be mapped; it is reported and skipped."""
+
+
+class WathqSyncEngine:
+    """
+    Watermark-driven sync of one WATHQ service's call logs.
+
+    ``process_log(db, log)`` maps a single call log into normalized rows. It
+    runs inside a savepoint, so a failing log never aborts the chunk; raise
+    SyncDataError for logs whose payload is unusable.
+
+    ``process_batch(db, logs)``, when given, writes a whole chunk at once and
+    returns the errors of the logs it skipped. If it raises, the chunk is
+    rolled back and retried log by log through ``process_log``, which isolates
+    the offending log.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        service_slug: str,
+        target_model: Any,
+        process_log: Callable[[Session, WathqCallLog], None],
+        endpoint_pattern: Optional[str] = None,
+        chunk_size: int = settings.WATHQ_SYNC_CHUNK_SIZE,
+        process_batch: Optional[
+            Callable[[Session, List[WathqCallLog]], List[Dict[str, str]]]
+        ] = None,
+    ):
+        self.db = db
+        self.service_slug = service_slug
+        self.target_model = target_model
+        self.process_log = process_log
+        self.endpoint_pattern = endpoint_pattern
+        self.chunk_size = chunk_size
+        self.process_batch = process_batch
+
+    @property
+    def watermark_name(self) -> str:
+        return f"wathq_sync:{self.service_slug}"
+
+    def _lock_watermark(self) -> ProcessingWatermark:
+        """Fetch (creating if needed) and lock this service's watermark row."""
+        state = self.db.query(ProcessingWatermark).filter(
+            ProcessingWatermark.name == self.watermark_name
+        ).with_for_update().first()
+        if state is None:
+            state = ProcessingWatermark(name=self.watermark_name)
+            self.db.add(state)
+            self.db.flush()
+        return state
+
+    def _settled_before(self) -> datetime:
+        # Logs younger than this may still have concurrent, not yet committed
+        # neighbours with an earlier fetched_at; leave them for the next run
+        return datetime.now(timezone.utc) - timedelta(
+            seconds=settings.WATHQ_SYNC_SETTLE_SECONDS
+        )
+
+    def _pending_query(self, after: Optional[LogKey], query=None):
+        """Unsynced logs of this service past ``after`` (unordered)."""
+        already_synced = exists().where(self.target_model.log_id == WathqCallLog.id)
+
+        if query is None:
+            query = self.db.query(WathqCallLog)
+        query = query.filter(
+            WathqCallLog.status_code == 200,
+            WathqCallLog.service_slug == self.service_slug,
+            ~already_synced
+        )
+        if self.endpoint_pattern:
+            query = query.filter(WathqCallLog.endpoint.like(self.endpoint_pattern))
+        if after is not None:
+            query = query.filter(tuple_(WathqCallLog.fetched_at, WathqCallLog.id) > after)
+        return query
+
+    def _next_chunk(
+        self,
+        after_at: Optional[datetime],
+        after_id: Optional[UUID],
+        settled_before: datetime
+    ) -> List[WathqCallLog]:
+        """Next page of unsynced logs ordered by (fetched_at, id)."""
+        after = (after_at, after_id) if after_at is not None else None
+        return self._pending_query(after).filter(
+            WathqCallLog.fetched_at < settled_before
+        ).order_by(
+            WathqCallLog.fetched_at, WathqCallLog.id
+        ).options(
+            selectinload(WathqCallLog.response_blob)
+        ).limit(self.chunk_size).all()
+
+    def _process_logs(self, logs: List[WathqCallLog]) -> Tuple[int, List[Dict[str, str]]]:
+        """Normalize a page of logs; returns (synced count, errors)."""
+        batch_errors = self._process_chunk_batch(logs)
+        if batch_errors is not None:
+            return len(logs) - len(batch_errors), batch_errors
+
+        synced = 0
+        errors: List[Dict[str, str]] = []
+        for log in logs:
+            savepoint = self.db.begin_nested()
+            try:
+                self.process_log(self.db, log)
+                savepoint.commit()
+                synced += 1
+            except SyncDataError as e:
+                savepoint.rollback()
+                errors.append({"log_id": str(log.id), "error": str(e)})
+            except Exception as e:
+                savepoint.rollback()
+                logger.exception(f"Failed to sync {self.service_slug} log {log.id}")
+                errors.append({"log_id": str(log.id), "error": f"{type(e).__name__}: {e}"})
+        return synced, errors
+
+    def _process_chunk_batch(self, logs: List[WathqCallLog]) -> Optional[List[Dict[str, str]]]:
+        """Write a chunk through ``process_batch``; None means fall back to per-log."""
+        if self.process_batch is None:
+            return None
+
+        savepoint = self.db.begin_nested()
+        try:
+            batch_errors = self.process_batch(self.db, logs)
+            savepoint.commit()
+            return batch_errors
+        except Exception as e:
+            savepoint.rollback()
+            logger.warning(
+                f"Batch sync of {len(logs)} {self.service_slug} logs failed, "
+                f"retrying one by one: {type(e).__name__}: {e}"
+            )
+            return None
+
+    def run(self, full_resync: bool = False) -> Dict[str, Any]:
+        """
+        Sync every new call log and advance the watermark chunk by chunk.
+
+        With ``full_resync`` the watermark is ignored and the whole history is
+        scanned (still skipping logs that were already synced), which retries
+        logs that previously failed.
+        """
+        settled_before = self._settled_before()
+
+        scanned = 0
+        synced = 0
+        errors: List[Dict[str, str]] = []
+        after_at: Optional[datetime] = None
+        after_id: Optional[UUID] = None
+
+        while True:
+            # Re-read under lock each chunk so concurrent runs never overlap
+            state = self._lock_watermark()
+            if not full_resync and state.watermark_at is not None:
+                after_at, after_id = state.watermark_at, UUID(state.watermark_id)
+
+            logs = self._next_chunk(after_at, after_id, settled_before)
+            if not logs:
+                self.db.commit()
+                break
+
+            scanned += len(logs)
+            chunk_synced, chunk_errors = self._process_logs(logs)
+            synced += chunk_synced
+            errors.extend(chunk_errors)
+
+            last = logs[-1]
+            after_at, after_id = last.fetched_at, last.id
+            last_key = (last.fetched_at, str(last.id))
+            if state.watermark_at is None or last_key > (state.watermark_at, state.watermark_id):
+                state.watermark_at, state.watermark_id = last_key
+
+            self.db.commit()
+            # Processed logs and their normalized rows are no longer needed
+            self.db.expunge_all()
+
+            if len(logs) < self.chunk_size:
+                break
+
+        watermark = self.db.query(ProcessingWatermark).filter(
+            ProcessingWatermark.name == self.watermark_name
+        ).first()
+        logger.info(
+            f"Synced {synced}/{scanned} new {self.service_slug} call logs "
+            f"({len(errors)} errors)"
+        )
+
+        return {
+            "success": True,
+            "message": f"Synced {synced} records from {scanned} new call logs",
+            "synced_count": synced,
+            "total_logs": scanned,
+            "errors": errors,
+            "watermark": {
+                "fetched_at": watermark.watermark_at.isoformat() if watermark and watermark.watermark_at else None,
+                "log_id": watermark.watermark_id if watermark else None,
+            },
+        }
+
+    def plan_chunks(self, full_resync: bool = False) -> Tuple[List[Tuple[Optional[LogKey], LogKey, int]], int]:
+        """
+        Split the pending logs into keyset ranges that can be synced in parallel.
+
+        Only the (fetched_at, id) keys are read. Returns ``(chunks, total)``
+        where each chunk is ``(after, upto, count)``: the logs with
+        ``after < key <= upto``. The watermark is not touched; call
+        ``advance_watermark`` once every chunk has been synced.
+        """
+        settled_before = self._settled_before()
+
+        after: Optional[LogKey] = None
+        state = self.db.query(ProcessingWatermark).filter(
+            ProcessingWatermark.name == self.watermark_name
+        ).first()
+        if not full_resync and state is not None and state.watermark_at is not None:
+            after = (state.watermark_at, UUID(state.watermark_id))
+
+        chunks: List[Tuple[Optional[LogKey], LogKey, int]] = []
+        total = 0
+        while True:
+            keys = self._pending_query(
+                after, self.db.query(WathqCallLog.fetched_at, WathqCallLog.id)
+            ).filter(
+                WathqCallLog.fetched_at < settled_before
+            ).order_by(
+                WathqCallLog.fetched_at, WathqCallLog.id
+            ).limit(self.chunk_size).all()
+            if not keys:
+                break
+
+            upto = (keys[-1].fetched_at, keys[-1].id)
+            chunks.append((after, upto, len(keys)))
+            total += len(keys)
+            after = upto
+
+            if len(keys) < self.chunk_size:
+                break
+
+        self.db.commit()
+        return chunks, total
+
+    def run_range(self, after: Optional[LogKey], upto: LogKey) -> Dict[str, Any]:
+        """Sync the unsynced logs with ``after < (fetched_at, id) <= upto``."""
+        logs = self._pending_query(after).filter(
+            tuple_(WathqCallLog.fetched_at, WathqCallLog.id) <= upto
+        ).order_by(
+            WathqCallLog.fetched_at, WathqCallLog.id
+        ).all()
+
+        synced, errors = self._process_logs(logs) if logs else (0, [])
+        self.db.commit()
+        self.db.expunge_all()
+        return {"scanned": len(logs), "synced": synced, "errors": errors}
+
+    def advance_watermark(self, key: LogKey) -> None:
+        """Move the watermark forward to ``key`` (never backwards)."""
+        state = self._lock_watermark()
+        new_key = (key[0], str(key[1]))
+        if state.watermark_at is None or new_key > (state.watermark_at, state.watermark_id):
+            state.watermark_at, state.watermark_id = new_key
+        self.db.commit()
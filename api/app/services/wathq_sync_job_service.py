@@ -0,0 +1,239 @@
+"""
+Bookkeeping and progress reporting for background WATHQ sync jobs.
+
+Sync endpoints create a WathqSyncJob and enqueue it on Celery; the worker
+tasks update its counters as chunks finish and publish every change on a
+Redis pub/sub channel. Workers run in other processes than the API, so the
+API runs a small relay that subscribes to the channel and forwards progress
+to the requesting management user over the notifications WebSocket.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import case, cast, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.wathq_sync_job import WathqSyncJob
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("pending", "running")
+
+
+class WathqSyncJobService:
+    """Creates sync jobs, records their progress and publishes it."""
+
+    _redis = None
+
+    @staticmethod
+    def to_dict(job: WathqSyncJob, include_errors: bool = True) -> Dict[str, Any]:
+        """Serialize a job for the status endpoint and progress messages."""
+        if job.total_logs:
+            progress = round(job.processed_logs / job.total_logs * 100, 1)
+        else:
+            progress = 100.0 if job.status == "completed" else 0.0
+
+        data = {
+            "job_id": str(job.id),
+            "service_slug": job.service_slug,
+            "status": job.status,
+            "full_resync": job.full_resync,
+            "requested_by": job.requested_by,
+            "total_logs": job.total_logs,
+            "processed_logs": job.processed_logs,
+            "total_chunks": job.total_chunks,
+            "completed_chunks": job.completed_chunks,
+            "synced_count": job.synced_count,
+            "error_count": job.error_count,
+            "progress": progress,
+            "message": job.message,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }
+        if include_errors:
+            data["errors"] = job.errors or []
+        return data
+
+    @staticmethod
+    def create_job(
+        db: Session, service_slug: str, full_resync: bool, requested_by: Optional[int]
+    ) -> WathqSyncJob:
+        """Create a pending job."""
+        job = WathqSyncJob(
+            service_slug=service_slug,
+            status="pending",
+            full_resync=full_resync,
+            requested_by=requested_by,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def get_job(db: Session, job_id: UUID) -> Optional[WathqSyncJob]:
+        return db.query(WathqSyncJob).filter(WathqSyncJob.id == job_id).first()
+
+    @staticmethod
+    def get_active_job(
+        db: Session, service_slug: str, exclude_id: Optional[UUID] = None
+    ) -> Optional[WathqSyncJob]:
+        """The service's pending or running job, if any."""
+        query = db.query(WathqSyncJob).filter(
+            WathqSyncJob.service_slug == service_slug,
+            WathqSyncJob.status.in_(ACTIVE_STATUSES)
+        )
+        if exclude_id is not None:
+            query = query.filter(WathqSyncJob.id != exclude_id)
+        return query.order_by(WathqSyncJob.created_at.desc()).first()
+
+    @staticmethod
+    def list_jobs(
+        db: Session, service_slug: Optional[str] = None, limit: int = 20
+    ) -> List[WathqSyncJob]:
+        query = db.query(WathqSyncJob)
+        if service_slug:
+            query = query.filter(WathqSyncJob.service_slug == service_slug)
+        return query.order_by(WathqSyncJob.created_at.desc()).limit(limit).all()
+
+    @staticmethod
+    def mark_running(db: Session, job_id: UUID, total_logs: int, total_chunks: int) -> None:
+        db.execute(
+            update(WathqSyncJob).where(WathqSyncJob.id == job_id).values(
+                status="running",
+                total_logs=total_logs,
+                total_chunks=total_chunks,
+                started_at=datetime.now(timezone.utc),
+            )
+        )
+        db.commit()
+        WathqSyncJobService.publish(db, job_id)
+
+    @staticmethod
+    def record_chunk(
+        db: Session,
+        job_id: UUID,
+        processed: int,
+        synced: int,
+        errors: List[Dict[str, Any]]
+    ) -> None:
+        """Add one finished chunk's counts and errors to the job (atomic)."""
+        new_errors = cast(json.dumps(errors), JSONB)
+        db.execute(
+            update(WathqSyncJob).where(WathqSyncJob.id == job_id).values(
+                processed_logs=WathqSyncJob.processed_logs + processed,
+                completed_chunks=WathqSyncJob.completed_chunks + 1,
+                synced_count=WathqSyncJob.synced_count + synced,
+                error_count=WathqSyncJob.error_count + len(errors),
+                errors=case(
+                    (
+                        WathqSyncJob.error_count < settings.WATHQ_SYNC_JOB_MAX_ERRORS,
+                        WathqSyncJob.errors.op("||")(new_errors),
+                    ),
+                    else_=WathqSyncJob.errors,
+                ),
+            )
+        )
+        db.commit()
+        WathqSyncJobService.publish(db, job_id)
+
+    @staticmethod
+    def finish(db: Session, job_id: UUID, status: str, message: str) -> None:
+        db.execute(
+            update(WathqSyncJob).where(WathqSyncJob.id == job_id).values(
+                status=status,
+                message=message,
+                finished_at=datetime.now(timezone.utc),
+            )
+        )
+        db.commit()
+        WathqSyncJobService.publish(db, job_id)
+
+    @staticmethod
+    def publish(db: Session, job_id: UUID) -> None:
+        """Publish the job's current state; a Redis outage never fails the sync."""
+        job = WathqSyncJobService.get_job(db, job_id)
+        if job is None:
+            return
+        try:
+            if WathqSyncJobService._redis is None:
+                import redis
+
+                WathqSyncJobService._redis = redis.Redis.from_url(settings.REDIS_URL)
+            WathqSyncJobService._redis.publish(
+                settings.WATHQ_SYNC_PROGRESS_CHANNEL,
+                json.dumps(WathqSyncJobService.to_dict(job, include_errors=False)),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to publish progress of sync job {job_id}: {e}")
+
+
+class SyncProgressRelay:
+    """Forwards sync job progress from Redis to management user WebSockets."""
+
+    def __init__(self, channel: str = settings.WATHQ_SYNC_PROGRESS_CHANNEL):
+        self.channel = channel
+        self._task: Optional[asyncio.Task] = None
+        self.forwarded = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start relaying on the running event loop."""
+        if self.is_running:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self.is_running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        import redis.asyncio as aredis
+
+        from app.api.v1.endpoints.ws_notifications import manager
+
+        while True:
+            client = aredis.Redis.from_url(settings.REDIS_URL)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                logger.info(f"Relaying sync job progress from {self.channel}")
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    if data.get("requested_by") is not None:
+                        await manager.send_to_management_user(
+                            data["requested_by"], {"type": "sync_progress", "data": data}
+                        )
+                        self.forwarded += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Sync progress relay failed, reconnecting: {e}")
+                await asyncio.sleep(5)
+            finally:
+                await pubsub.aclose()
+                await client.aclose()
+
+
+# Singleton instances
+wathq_sync_job_service = WathqSyncJobService()
+sync_progress_relay = SyncProgressRelay()
@@ -2,10 +2,10 @@
 HTTP client for Wathq Attorney API.
 """
 
-import httpx
 from typing import Optional
 
 from app.core.config import settings
+from app.core.wathq_transport import wathq_transport
 from .schemas import LookupResponse, AttorneyInfoResponse
 
 
@@ -19,13 +19,13 @@ class WathqAttorneyClient:
 
     async def get_lookup(self) -> LookupResponse:
         """Get attorney texts lookup data."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/lookup",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return LookupResponse(**response.json())
+        client = wathq_transport.get_client()
+        response = await client.get(
+            f"{self.base_url}/lookup",
+            headers=self.headers
+        )
+        response.raise_for_status()
+        return LookupResponse(**response.json())
 
     async def get_attorney_info(
         self, 
@@ -40,14 +40,14 @@ class WathqAttorneyClient:
         if agent_id:
             params["agentId"] = agent_id
             
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/info/{code}",
-                headers=self.headers,
-                params=params
-            )
-            response.raise_for_status()
-            return AttorneyInfoResponse(**response.json())
+        client = wathq_transport.get_client()
+        response = await client.get(
+            f"{self.base_url}/info/{code}",
+            headers=self.headers,
+            params=params
+        )
+        response.raise_for_status()
+        return AttorneyInfoResponse(**response.json())
 
 
 attorney_client = WathqAttorneyClient()
\ No newline at end of file
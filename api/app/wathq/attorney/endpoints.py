@@ -3,9 +3,10 @@ FastAPI endpoints for Wathq Attorney API.
 """
 
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
 from app.core.guards import require_management_user
+from app.services.reference_data import reference_data
 from .client import attorney_client
 from .schemas import LookupResponse, AttorneyInfoResponse
 
@@ -18,7 +19,10 @@ async def get_attorney_lookup(
 ):
     """Get attorney texts lookup data."""
     try:
-        return await attorney_client.get_lookup()
+        return Response(
+            content=await reference_data.get_json("attorney/lookup"),
+            media_type="application/json"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
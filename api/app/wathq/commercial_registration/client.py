@@ -3,14 +3,21 @@ HTTP client for Wathq Commercial Registration API with call tracking.
 """
 
 import httpx
+import logging
 import uuid
 import time
 from typing import Optional, Dict, Any
 from sqlalchemy.orm import Session
 
+from app.core.wathq_resilience import WathqUpstreamUnavailable
+from app.core.wathq_single_flight import wathq_single_flight
 from app.core.wathq_tracker import WathqCallTracker
+from app.core.wathq_transport import wathq_transport
 from app.core.wathq_utils import get_service_id_by_slug
 from app.core.wathq_logger import WathqAPILogger, WathqRequestStatus
+from app.crud.crud_wathq_offline_data import wathq_offline_data
+
+logger = logging.getLogger(__name__)
 
 
 class WathqClient:
@@ -36,6 +43,43 @@ class WathqClient:
         }
     
     async def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Make HTTP request to Wathq API, coalescing identical concurrent calls."""
+        key = wathq_single_flight.make_key(self.api_key, self.service_slug, endpoint, params)
+        try:
+            result, coalesced = await wathq_single_flight.run(
+                key, lambda: self._call_wathq(endpoint, params)
+            )
+        except WathqUpstreamUnavailable:
+            offline = self._offline_fallback(endpoint)
+            if offline is None:
+                raise
+            return offline
+        if coalesced:
+            WathqCallTracker.record_coalesced(
+                tenant_id=self.tenant_id,
+                user_id=self.user_id,
+                service_slug=self.service_slug,
+                endpoint=endpoint,
+                scope=coalesced
+            )
+        return result
+
+    def _offline_fallback(self, endpoint: str) -> Optional[Dict[str, Any]]:
+        """Last stored response for this URL, served while WATHQ is failing fast."""
+        if not self.tenant_id:
+            return None
+        offline = wathq_offline_data.get_latest_by_url(
+            self.db, tenant_id=self.tenant_id, full_external_url=f"{self.base_url}{endpoint}"
+        )
+        if offline is None:
+            return None
+        logger.warning(
+            f"WATHQ {self.service_slug} unavailable, serving offline copy of {endpoint} "
+            f"from {offline.fetched_at}"
+        )
+        return offline.response_body
+
+    async def _call_wathq(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Make HTTP request to Wathq API with tracking."""
         # Generate unique request ID
         request_id = str(uuid.uuid4())
@@ -47,7 +91,8 @@ class WathqClient:
             user_id=self.user_id,
             service_slug=self.service_slug,
             endpoint=endpoint,
-            method="GET"
+            method="GET",
+            request_id=request_id
         ) as tracker:
             
             tracker.set_request_data({"params": params or {}})
@@ -65,47 +110,60 @@ class WathqClient:
             )
             
             try:
-                async with httpx.AsyncClient(verify=False) as client:
-                    url = f"{self.base_url}{endpoint}"
-                    response = await client.get(
-                        url,
-                        headers=self.headers,
-                        params=params or {},
-                        timeout=30.0
-                    )
-                    
-                    response_data = response.json()
-                    response_time_ms = int((time.time() - start_time) * 1000)
-                    response_size = len(str(response_data))
-                    
-                    # Get service ID for offline storage
-                    service_id = get_service_id_by_slug(self.db, self.service_slug)
-                    full_url = f"{self.base_url}{endpoint}"
-                    
-                    tracker.log_response(
-                        status_code=response.status_code,
-                        response_body=response_data,
-                        service_id=service_id,
-                        full_url=full_url
-                    )
-                    
-                    # Log successful response
-                    WathqAPILogger.log_response(
-                        request_id=request_id,
-                        service=self.service_slug,
-                        endpoint=endpoint,
-                        status_code=response.status_code,
-                        response_time_ms=response_time_ms,
-                        response_size_bytes=response_size,
-                        status=WathqRequestStatus.SUCCESS,
-                        response_body=response_data,
-                        user_id=self.user_id,
-                        tenant_id=self.tenant_id
-                    )
-                    
-                    response.raise_for_status()
-                    return response_data
+                client = wathq_transport.get_client(verify=False)
+                url = f"{self.base_url}{endpoint}"
+                response = await client.get(
+                    url,
+                    headers=self.headers,
+                    params=params or {},
+                    extensions={"wathq_tenant_id": self.tenant_id}
+                )
+                
+                response_data = response.json()
+                response_time_ms = int((time.time() - start_time) * 1000)
+                response_size = len(response.content)
+                
+                # Get service ID for offline storage
+                service_id = get_service_id_by_slug(self.db, self.service_slug)
+                full_url = f"{self.base_url}{endpoint}"
+                
+                await tracker.log_response(
+                    status_code=response.status_code,
+                    response_body=response_data,
+                    service_id=service_id,
+                    full_url=full_url
+                )
+                
+                # Log successful response
+                WathqAPILogger.log_response(
+                    request_id=request_id,
+                    service=self.service_slug,
+                    endpoint=endpoint,
+                    status_code=response.status_code,
+                    response_time_ms=response_time_ms,
+                    response_size_bytes=response_size,
+                    status=WathqRequestStatus.SUCCESS,
+                    response_body=response_data,
+                    user_id=self.user_id,
+                    tenant_id=self.tenant_id
+                )
+                
+                response.raise_for_status()
+                return response_data
                     
+            except WathqUpstreamUnavailable as e:
+                # Rejected locally, nothing was sent: no call to log or bill
+                WathqAPILogger.log_error(
+                    request_id=request_id,
+                    service=self.service_slug,
+                    endpoint=endpoint,
+                    error_type="WathqUpstreamUnavailable",
+                    error_message=str(e),
+                    user_id=self.user_id,
+                    tenant_id=self.tenant_id
+                )
+                raise
+
             except httpx.TimeoutException as e:
                 response_time_ms = int((time.time() - start_time) * 1000)
                 WathqAPILogger.log_error(
@@ -118,7 +176,7 @@ class WathqClient:
                     tenant_id=self.tenant_id
                 )
                 error_response = {"error": str(e), "type": "TimeoutException"}
-                tracker.log_response(504, error_response)
+                await tracker.log_response(504, error_response)
                 raise
                 
             except httpx.HTTPStatusError as e:
@@ -139,14 +197,14 @@ class WathqClient:
                     endpoint=endpoint,
                     status_code=status_code,
                     response_time_ms=response_time_ms,
-                    response_size_bytes=len(str(e.response.text)),
+                    response_size_bytes=len(e.response.content),
                     status=status,
                     error_message=str(e),
                     user_id=self.user_id,
                     tenant_id=self.tenant_id
                 )
                 error_response = {"error": str(e), "type": "HTTPStatusError"}
-                tracker.log_response(status_code, error_response)
+                await tracker.log_response(status_code, error_response)
                 raise
                 
             except Exception as e:
@@ -171,7 +229,7 @@ class WathqClient:
                     user_id=self.user_id,
                     tenant_id=self.tenant_id
                 )
-                tracker.log_response(status_code, error_response)
+                await tracker.log_response(status_code, error_response)
                 raise
     
     async def get_full_info(self, cr_id: str, language: str = "ar") -> Dict[str, Any]:
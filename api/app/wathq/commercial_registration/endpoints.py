@@ -2,16 +2,20 @@
 FastAPI endpoints for Wathq Commercial Registration API.
 """
 
-from typing import Any, List
-from fastapi import APIRouter, HTTPException, Query, Depends
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
 from sqlalchemy.orm import Session
 
 from app.api import deps
 from app.api.management_deps import get_current_active_management_user
 from app.core.config import settings
 from app.core.wathq_utils import get_tenant_wathq_key_by_slug
+from app.crud.crud_wathq_call_log import wathq_call_log
 from app.models import User
 from app.models.management_user import ManagementUser
+from app.services.reference_data import reference_data
 from app.wathq.commercial_registration.client import WathqClient
 from app.wathq.commercial_registration import schemas
 
@@ -278,6 +282,128 @@ async def get_owners(
         raise HTTPException(status_code=400, detail=error_msg)
 
 
+# Dossier part -> WathqClient method (the part name is also the WATHQ endpoint)
+DOSSIER_PARTS = {
+    "fullinfo": "get_full_info",
+    "branches": "get_branches",
+    "capital": "get_capital",
+    "managers": "get_managers",
+    "owners": "get_owners",
+    "status": "get_status",
+}
+
+
+async def _build_dossier(
+    client: WathqClient,
+    db: Session,
+    cr_id: str,
+    language: str,
+    parts: Optional[str],
+    max_age: int
+) -> Dict[str, Any]:
+    """
+    Fetch the selected sub-resources of one CR and merge them.
+    
+    Parts successfully fetched by the same tenant (or management) within
+    ``max_age`` seconds are served from the call log; the rest are fetched
+    from WATHQ concurrently through the one client.
+
+    Call logs are written through the outbox (app.services.wathq_outbox), so
+    a call made in the last moments (longer while the outbox is backed up)
+    may not be in the log yet: a "cache" part is then an older copy than the
+    latest call, though still within ``max_age``, or the part is fetched
+    again.
+    """
+    selected = [p.strip() for p in parts.split(",") if p.strip()] if parts else list(DOSSIER_PARTS)
+    unknown = [p for p in selected if p not in DOSSIER_PARTS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown dossier parts: {', '.join(unknown)}. Valid parts: {', '.join(DOSSIER_PARTS)}"
+        )
+    
+    now = datetime.now(timezone.utc)
+    result: Dict[str, schemas.DossierPart] = {}
+    if max_age > 0:
+        # Endpoint -> part, matched exactly rather than parsed from the path
+        endpoint_parts = {f"/{part}/{cr_id}": part for part in selected}
+        logs = wathq_call_log.get_latest_successes(
+            db,
+            service_slug=client.service_slug,
+            endpoints=list(endpoint_parts),
+            tenant_id=client.tenant_id,
+            language=language,
+            fetched_from=now - timedelta(seconds=max_age)
+        )
+        for log in logs:
+            part = endpoint_parts.get(log.endpoint)
+            if part is None:
+                continue
+            result[part] = schemas.DossierPart(
+                data=log.response_body,
+                source="cache",
+                fetched_at=log.fetched_at,
+                age_seconds=int((now - log.fetched_at).total_seconds())
+            )
+    
+    missing = [part for part in selected if part not in result]
+    fetched = await asyncio.gather(
+        *(getattr(client, DOSSIER_PARTS[part])(cr_id, language) for part in missing),
+        return_exceptions=True
+    )
+    fetched_at = datetime.now(timezone.utc)
+    for part, data in zip(missing, fetched):
+        if isinstance(data, Exception):
+            result[part] = schemas.DossierPart(source="error", error=str(data))
+        else:
+            result[part] = schemas.DossierPart(
+                data=data, source="wathq", fetched_at=fetched_at, age_seconds=0
+            )
+    
+    errors = [result[part].error for part in selected if result[part].source == "error"]
+    if len(errors) == len(selected):
+        if any("401" in error or "Unauthorized" in error for error in errors):
+            raise HTTPException(
+                status_code=401,
+                detail="WATHQ API authentication failed. Please verify your API key is valid and has the required permissions."
+            )
+        raise HTTPException(status_code=400, detail=errors[0])
+    
+    return {
+        "cr_id": cr_id,
+        "language": language,
+        "parts": {part: result[part] for part in selected}
+    }
+
+
+@router.get("/dossier/{cr_id}", response_model=schemas.Dossier)
+async def get_dossier(
+    cr_id: str,
+    language: str = Query("ar", regex="^(ar|en)$"),
+    parts: Optional[str] = Query(None, description="Comma-separated parts (fullinfo, branches, capital, managers, owners, status); all when omitted"),
+    max_age: int = Query(settings.WATHQ_DOSSIER_MAX_AGE, ge=0, description="Serve parts fetched within this many seconds from cache (0 = always fetch)"),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user)
+) -> Any:
+    """Retrieve several parts of a commercial registration in one call (tenant users)."""
+    client = get_wathq_client_for_tenant_user(db=db, current_user=current_user)
+    return await _build_dossier(client, db, cr_id, language, parts, max_age)
+
+
+@router.get("/management/dossier/{cr_id}", response_model=schemas.Dossier)
+async def get_dossier_management(
+    cr_id: str,
+    language: str = Query("ar", regex="^(ar|en)$"),
+    parts: Optional[str] = Query(None, description="Comma-separated parts (fullinfo, branches, capital, managers, owners, status); all when omitted"),
+    max_age: int = Query(settings.WATHQ_DOSSIER_MAX_AGE, ge=0, description="Serve parts fetched within this many seconds from cache (0 = always fetch)"),
+    db: Session = Depends(deps.get_db),
+    current_user: ManagementUser = Depends(get_current_active_management_user)
+) -> Any:
+    """Retrieve several parts of a commercial registration in one call (management users)."""
+    client = get_wathq_client_for_management_user(db=db, current_user=current_user)
+    return await _build_dossier(client, db, cr_id, language, parts, max_age)
+
+
 @router.get("/related/{identity_id}/{id_type}", response_model=schemas.Related)
 async def get_related(
     identity_id: str,
@@ -349,12 +475,14 @@ async def get_cr_national_number(
 # Lookup endpoints
 @router.get("/lookup/status", response_model=List[schemas.Lookup])
 async def get_status_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all status lookups."""
     try:
-        result = await client.get_status_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/status"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
@@ -367,12 +495,14 @@ async def get_status_lookup(
 
 @router.get("/lookup/entityType", response_model=List[schemas.Lookup])
 async def get_entity_type_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all entity type lookups."""
     try:
-        result = await client.get_entity_type_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/entityType"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
@@ -385,12 +515,14 @@ async def get_entity_type_lookup(
 
 @router.get("/lookup/companyForm", response_model=List[schemas.Lookup])
 async def get_company_form_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all company form lookups."""
     try:
-        result = await client.get_company_form_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/companyForm"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
@@ -403,12 +535,14 @@ async def get_company_form_lookup(
 
 @router.get("/lookup/companyCharacter", response_model=List[schemas.Lookup])
 async def get_company_character_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all company character lookups."""
     try:
-        result = await client.get_company_character_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/companyCharacter"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
@@ -421,12 +555,14 @@ async def get_company_character_lookup(
 
 @router.get("/lookup/relation", response_model=List[schemas.Lookup])
 async def get_relation_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all commercial registration relation lookups."""
     try:
-        result = await client.get_relation_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/relation"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
@@ -439,12 +575,14 @@ async def get_relation_lookup(
 
 @router.get("/lookup/managerPositions", response_model=List[schemas.Lookup])
 async def get_manager_positions_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all manager positions lookups."""
     try:
-        result = await client.get_manager_positions_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/managerPositions"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
@@ -457,12 +595,14 @@ async def get_manager_positions_lookup(
 
 @router.get("/lookup/identifierType", response_model=List[schemas.Lookup])
 async def get_identifier_type_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all identifier type lookups."""
     try:
-        result = await client.get_identifier_type_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/identifierType"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
@@ -475,12 +615,14 @@ async def get_identifier_type_lookup(
 
 @router.get("/lookup/managementStructure", response_model=List[schemas.Lookup])
 async def get_management_structure_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all management structure lookups."""
     try:
-        result = await client.get_management_structure_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/managementStructure"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
@@ -493,12 +635,14 @@ async def get_management_structure_lookup(
 
 @router.get("/lookup/partnerType", response_model=List[schemas.Lookup])
 async def get_partner_type_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all partner type lookups."""
     try:
-        result = await client.get_partner_type_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/partnerType"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
@@ -511,12 +655,14 @@ async def get_partner_type_lookup(
 
 @router.get("/lookup/partnershipType", response_model=List[schemas.Lookup])
 async def get_partnership_type_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all partnership type lookups."""
     try:
-        result = await client.get_partnership_type_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/partnershipType"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
@@ -529,12 +675,14 @@ async def get_partnership_type_lookup(
 
 @router.get("/lookup/nationalities")
 async def get_nationalities_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all nationalities lookups."""
     try:
-        result = await client.get_nationalities_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/nationalities"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
@@ -547,12 +695,14 @@ async def get_nationalities_lookup(
 
 @router.get("/lookup/activities")
 async def get_activities_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all activities lookups."""
     try:
-        result = await client.get_activities_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/activities"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
@@ -565,12 +715,14 @@ async def get_activities_lookup(
 
 @router.get("/lookup/cities")
 async def get_cities_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all cities lookups."""
     try:
-        result = await client.get_cities_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/cities"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
@@ -583,12 +735,14 @@ async def get_cities_lookup(
 
 @router.get("/lookup/currencies", response_model=List[schemas.Lookup])
 async def get_currencies_lookup(
-    client: WathqClient = Depends(get_wathq_client_for_management_user)
+    current_user: ManagementUser = Depends(get_current_active_management_user)
 ) -> Any:
     """Retrieve all currencies lookups."""
     try:
-        result = await client.get_currencies_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("commercial-registration/currencies"),
+            media_type="application/json"
+        )
     except Exception as e:
         error_msg = str(e)
         if "401" in error_msg or "Unauthorized" in error_msg:
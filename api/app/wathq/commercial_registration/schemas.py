@@ -2,7 +2,8 @@
 Pydantic schemas for Wathq Commercial Registration API responses.
 """
 
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -161,3 +162,17 @@ class Lookup(BaseModel):
 class ErrorResponse(BaseModel):
     code: str
     message: str
+
+
+class DossierPart(BaseModel):
+    data: Optional[Any] = None
+    source: str  # "cache" (recent call log), "wathq" or "error"
+    fetched_at: Optional[datetime] = None
+    age_seconds: Optional[int] = None
+    error: Optional[str] = None
+
+
+class Dossier(BaseModel):
+    cr_id: str
+    language: str
+    parts: Dict[str, DossierPart]
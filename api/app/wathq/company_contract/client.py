@@ -10,6 +10,9 @@ import httpx
 import logging
 from typing import Optional, Dict, Any, List
 
+from app.core.wathq_resilience import WathqUpstreamUnavailable
+from app.core.wathq_transport import wathq_transport
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,42 +56,48 @@ class WathqCompanyContractClient:
         logger.debug(f"Wathq API request: {method} {url} params={clean_params}")
 
         try:
-            async with httpx.AsyncClient(timeout=self.TIMEOUT) as client:
-                response = await client.request(
-                    method=method, url=url, headers=self.headers, params=clean_params
+            client = wathq_transport.get_client()
+            response = await client.request(
+                method=method,
+                url=url,
+                headers=self.headers,
+                params=clean_params,
+                timeout=self.TIMEOUT,
+            )
+
+            # Handle different error status codes per OpenAPI spec
+            if response.status_code == 400:
+                error_msg = self._extract_error_message(
+                    response, "Bad Request - Invalid parameters"
+                )
+                raise WathqAPIError(400, error_msg)
+            elif response.status_code == 401:
+                raise WathqAPIError(
+                    401, "Unauthorized - Invalid or missing API key"
+                )
+            elif response.status_code == 404:
+                error_msg = self._extract_error_message(
+                    response, "Not Found - CR not found or no contract data"
+                )
+                raise WathqAPIError(404, error_msg)
+            elif response.status_code == 500:
+                raise WathqAPIError(
+                    500, "Internal Server Error - Wathq API unavailable"
+                )
+            elif response.status_code != 200:
+                error_msg = self._extract_error_message(
+                    response, f"HTTP {response.status_code}"
                 )
+                raise WathqAPIError(response.status_code, error_msg)
 
-                # Handle different error status codes per OpenAPI spec
-                if response.status_code == 400:
-                    error_msg = self._extract_error_message(
-                        response, "Bad Request - Invalid parameters"
-                    )
-                    raise WathqAPIError(400, error_msg)
-                elif response.status_code == 401:
-                    raise WathqAPIError(
-                        401, "Unauthorized - Invalid or missing API key"
-                    )
-                elif response.status_code == 404:
-                    error_msg = self._extract_error_message(
-                        response, "Not Found - CR not found or no contract data"
-                    )
-                    raise WathqAPIError(404, error_msg)
-                elif response.status_code == 500:
-                    raise WathqAPIError(
-                        500, "Internal Server Error - Wathq API unavailable"
-                    )
-                elif response.status_code != 200:
-                    error_msg = self._extract_error_message(
-                        response, f"HTTP {response.status_code}"
-                    )
-                    raise WathqAPIError(response.status_code, error_msg)
-
-                return response.json()
+            return response.json()
 
         except httpx.TimeoutException:
             raise WathqAPIError(
                 408, "Request timeout - Wathq API did not respond in time"
             )
+        except WathqUpstreamUnavailable as e:
+            raise WathqAPIError(503, f"Wathq API temporarily unavailable - {e.reason}")
         except httpx.ConnectError:
             raise WathqAPIError(503, "Connection error - Unable to reach Wathq API")
         except WathqAPIError:
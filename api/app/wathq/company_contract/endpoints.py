@@ -4,9 +4,10 @@ FastAPI endpoints for Wathq Company Contract API.
 
 import logging
 from typing import Any, List, Optional
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
 
 from app.core.guards import require_management_user
+from app.services.reference_data import reference_data
 from app.wathq.company_contract.client import WathqCompanyContractClient, WathqAPIError
 from app.wathq.company_contract import schemas
 from app.core.config import settings
@@ -154,12 +155,13 @@ async def get_manager_info(
 @router.get("/lookup/articleParts", response_model=List[schemas.Lookup])
 async def get_article_parts_lookup(
     current_user=Depends(require_management_user()),
-    client: WathqCompanyContractClient = Depends(get_wathq_company_contract_client),
 ) -> Any:
     """Retrieve all article parts lookups."""
     try:
-        result = await client.get_article_parts_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("company-contract/articleParts"),
+            media_type="application/json",
+        )
     except Exception as e:
         raise handle_wathq_error(e)
 
@@ -167,12 +169,13 @@ async def get_article_parts_lookup(
 @router.get("/lookup/partnerDecision", response_model=List[schemas.Lookup])
 async def get_partner_decision_lookup(
     current_user=Depends(require_management_user()),
-    client: WathqCompanyContractClient = Depends(get_wathq_company_contract_client),
 ) -> Any:
     """Retrieve all partner decision lookups."""
     try:
-        result = await client.get_partner_decision_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("company-contract/partnerDecision"),
+            media_type="application/json",
+        )
     except Exception as e:
         raise handle_wathq_error(e)
 
@@ -180,11 +183,12 @@ async def get_partner_decision_lookup(
 @router.get("/lookup/exerciseMethod", response_model=List[schemas.Lookup])
 async def get_exercise_method_lookup(
     current_user=Depends(require_management_user()),
-    client: WathqCompanyContractClient = Depends(get_wathq_company_contract_client),
 ) -> Any:
     """Retrieve all exercise method lookups."""
     try:
-        result = await client.get_exercise_method_lookup()
-        return result
+        return Response(
+            content=await reference_data.get_json("company-contract/exerciseMethod"),
+            media_type="application/json",
+        )
     except Exception as e:
         raise handle_wathq_error(e)
@@ -2,9 +2,8 @@
 HTTP client for Wathq Employee Information API.
 """
 
-import httpx
-
 from app.core.config import settings
+from app.core.wathq_transport import wathq_transport
 from .schemas import EmployeeInfoResponse
 
 
@@ -18,13 +17,13 @@ class WathqEmployeeClient:
 
     async def get_employee_info(self, employee_id: str) -> EmployeeInfoResponse:
         """Get employee information by ID."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/info/{employee_id}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return EmployeeInfoResponse(**response.json())
+        client = wathq_transport.get_client()
+        response = await client.get(
+            f"{self.base_url}/info/{employee_id}",
+            headers=self.headers
+        )
+        response.raise_for_status()
+        return EmployeeInfoResponse(**response.json())
 
 
 employee_client = WathqEmployeeClient()
\ No newline at end of file
@@ -2,10 +2,13 @@
 HTTP client for Wathq Real Estate API with tenant-specific keys and tracking.
 """
 
-import httpx
+from typing import Any, Dict
+
 from sqlalchemy.orm import Session
 
+from app.core.wathq_single_flight import wathq_single_flight
 from app.core.wathq_tracker import WathqCallTracker
+from app.core.wathq_transport import wathq_transport
 from .schemas import DeedResponse, IdType
 
 
@@ -32,9 +35,30 @@ class WathqRealEstateClient:
         id_number: str, 
         id_type: IdType
     ) -> DeedResponse:
-        """Get real estate deed details with tracking."""
+        """Get real estate deed details, coalescing identical concurrent calls."""
         endpoint = f"/deed/{deed_number}/{id_number}/{id_type.value}"
-        
+        request_data = {
+            "deed_number": deed_number,
+            "id_number": id_number,
+            "id_type": id_type.value
+        }
+
+        key = wathq_single_flight.make_key(self.api_key, self.service_slug, endpoint)
+        response_data, coalesced = await wathq_single_flight.run(
+            key, lambda: self._fetch_deed(endpoint, request_data)
+        )
+        if coalesced:
+            WathqCallTracker.record_coalesced(
+                tenant_id=self.tenant_id,
+                user_id=self.user_id,
+                service_slug=self.service_slug,
+                endpoint=endpoint,
+                scope=coalesced
+            )
+        return DeedResponse(**response_data)
+
+    async def _fetch_deed(self, endpoint: str, request_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Call the deed endpoint with tracking."""
         with WathqCallTracker.track_call(
             db=self.db,
             tenant_id=self.tenant_id,
@@ -44,28 +68,23 @@ class WathqRealEstateClient:
             method="GET"
         ) as tracker:
             
-            request_data = {
-                "deed_number": deed_number,
-                "id_number": id_number,
-                "id_type": id_type.value
-            }
             tracker.set_request_data(request_data)
             
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        f"{self.base_url}{endpoint}",
-                        headers=self.headers,
-                        timeout=30.0
-                    )
-                    
-                    response_data = response.json()
-                    tracker.log_response(response.status_code, response_data)
-                    
-                    response.raise_for_status()
-                    return DeedResponse(**response_data)
+                client = wathq_transport.get_client()
+                response = await client.get(
+                    f"{self.base_url}{endpoint}",
+                    headers=self.headers,
+                    extensions={"wathq_tenant_id": self.tenant_id}
+                )
+                
+                response_data = response.json()
+                await tracker.log_response(response.status_code, response_data)
+                
+                response.raise_for_status()
+                return response_data
                     
             except Exception as e:
                 error_response = {"error": str(e), "type": type(e).__name__}
-                tracker.log_response(getattr(e, 'response', {}).get('status_code', 500), error_response)
+                await tracker.log_response(getattr(e, 'response', {}).get('status_code', 500), error_response)
                 raise
\ No newline at end of file
@@ -2,10 +2,10 @@
 HTTP client for Wathq SPL National Address API.
 """
 
-import httpx
 from typing import List
 
 from app.core.config import settings
+from app.core.wathq_transport import wathq_transport
 from .schemas import NationalAddressInfo
 
 
@@ -19,14 +19,14 @@ class WathqSplNationalAddressClient:
 
     async def get_address_info(self, cr_number: str) -> List[NationalAddressInfo]:
         """Get national address information by CR number."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/info/{cr_number}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            data = response.json()
-            return [NationalAddressInfo(**item) for item in data]
+        client = wathq_transport.get_client()
+        response = await client.get(
+            f"{self.base_url}/info/{cr_number}",
+            headers=self.headers
+        )
+        response.raise_for_status()
+        data = response.json()
+        return [NationalAddressInfo(**item) for item in data]
 
 
 spl_national_address_client = WathqSplNationalAddressClient()
\ No newline at end of file
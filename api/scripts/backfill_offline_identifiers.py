@@ -0,0 +1,53 @@
+"""
+Script to fill the business identifier columns of existing WATHQ offline data.
+
+Run once after migration 20251107_offline_identifiers; rows written since
+get their identifiers when they are stored. Safe to re-run: only rows without
+any identifier are visited.
+
+Usage:
+    python scripts/backfill_offline_identifiers.py
+    python scripts/backfill_offline_identifiers.py --batch-size 1000
+"""
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+current_dir = Path(__file__).parent.parent  # Go up one level from scripts/ to backend/
+sys.path.insert(0, str(current_dir))
+
+# Also add the current directory as fallback
+sys.path.insert(0, str(Path(__file__).parent))
+
+import argparse
+
+from app.crud.crud_wathq_offline_data import wathq_offline_data
+from app.db.base import Base  # noqa: F401  (registers every model)
+from app.db.session import SessionLocal
+
+
+def main():
+    """Main function to backfill the offline data identifiers."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per transaction")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print("Backfilling WATHQ offline data identifiers...")
+
+        updated = wathq_offline_data.backfill_identifiers(db, batch_size=args.batch_size)
+        print(f"  Rows with identifiers: {updated}")
+
+        print("WATHQ offline data identifiers backfilled successfully!")
+
+    except Exception as e:
+        print(f"Error during backfill: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
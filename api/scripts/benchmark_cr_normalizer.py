@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Benchmark the batched commercial registration normalizer.
+
+Generates synthetic /fullinfo payloads, then normalizes them into the wathq
+CR tables twice: once the previous way (one ORM object per row, a flush per
+registration and per parent child row to learn generated ids) and once with
+cr_normalizer.write_batch in chunks. Row counts of every table are compared
+after each run.
+
+Usage:
+    python scripts/benchmark_cr_normalizer.py --payloads 5000
+    python scripts/benchmark_cr_normalizer.py --database-url postgresql+psycopg2://... --payloads 5000
+
+By default a temporary SQLite file is used (the wathq schema is mapped onto
+the main database) so the script runs anywhere; point --database-url at a
+scratch PostgreSQL database for representative numbers. Never run it against
+a database you care about: the CR tables are dropped and recreated.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, func, text
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db.base import Base  # noqa: F401  (registers every model)
+from app.services.cr_normalizer import cr_normalizer
+
+CR_TABLES = [
+    models.CommercialRegistration, models.CapitalInfo, models.CREntityCharacter,
+    models.CRActivity, models.CRStock, models.CREstore, models.CREstoreActivity,
+    models.CRParty, models.CRPartyPartnership, models.CRManager,
+    models.CRManagerPosition, models.CRLiquidator, models.CRLiquidatorPosition,
+]
+
+
+def _named(rng, count, prefix):
+    return [{"id": rng.randint(1, 999), "name": f"{prefix} {i}"} for i in range(count)]
+
+
+def _person(rng, i):
+    return {
+        "name": f"Person {i}",
+        "typeId": 1,
+        "typeName": "Saudi",
+        "isLicensed": rng.random() < 0.5,
+        "identity": {"id": str(rng.randint(10**9, 10**10 - 1)), "typeId": 1, "typeName": "National ID"},
+        "nationality": {"id": 113, "name": "Saudi"},
+        "positions": _named(rng, rng.randint(1, 2), "Position"),
+    }
+
+
+def make_payload(rng: random.Random, cr_number: str) -> dict:
+    """A /fullinfo response shaped like the WATHQ API's."""
+    return {
+        "crNationalNumber": "70" + cr_number[2:],
+        "crNumber": cr_number,
+        "versionNo": 1,
+        "name": f"Company {cr_number}",
+        "nameLangId": 1,
+        "crCapital": rng.randint(10, 10000) * 1000,
+        "companyDuration": 99,
+        "isMain": rng.random() < 0.5,
+        "issueDateGregorian": "2002-10-05",
+        "issueDateHijri": "28-07-1423",
+        "hasEcommerce": True,
+        "headquarterCityId": 1,
+        "headquarterCityName": "Riyadh",
+        "PartnersNationalityName": "Saudi",
+        "entityType": {
+            "id": 1, "name": "Company", "formId": 1, "formName": "LLC",
+            "characters": _named(rng, rng.randint(0, 2), "Character"),
+        },
+        "status": {"id": 1, "name": "Active"},
+        "confirmationDate": {"gregorian": "2003-10-05", "hijri": "28-07-1424"},
+        "contactInfo": {"phoneNo": "011256398", "email": "info@example.com"},
+        "eCommerce": {"eStore": [
+            {
+                "authenticationPlatformUrl": "https://auth.example.com",
+                "storeUrl": f"https://store-{cr_number}-{i}.example.com",
+                "storeActivities": [{"id": str(rng.randint(100000, 999999)), "name": "Activity"}],
+            }
+            for i in range(rng.randint(0, 2))
+        ]},
+        "capital": {
+            "currencyId": 1,
+            "currencyName": "SAR",
+            "contributionCapital": {
+                "typeId": 1, "typeName": "Cash", "cashCapital": 75000, "inKindCapital": 75000,
+                "contributionValue": 100, "totalCashContribution": 750, "totalInKindContribution": 750,
+            },
+            "stockCapital": {
+                "typeId": 1, "typeName": "Shares", "capital": 12000, "paidCapital": 12000,
+                "stocks": [
+                    {"count": rng.randint(1, 1000), "value": 10, "typeId": 1, "typeName": "Common",
+                     "classReferenceID": 1, "className": "A"}
+                    for _ in range(rng.randint(0, 2))
+                ],
+            },
+        },
+        "fiscalYear": {"isFirst": True, "calendarTypeId": 1, "endMonth": 12, "endDay": 30},
+        "parties": [
+            {
+                "name": f"Partner {i}",
+                "typeId": 11,
+                "typeName": "Individual",
+                "identity": {"id": str(rng.randint(10**9, 10**10 - 1)), "typeId": 1, "typeName": "National ID"},
+                "partnership": _named(rng, 1, "Partnership"),
+                "partnerShare": {"cashContributionCount": 250, "inKindContributionCount": 250,
+                                 "totalContributionCount": 500},
+            }
+            for i in range(rng.randint(1, 4))
+        ],
+        "management": {
+            "structureId": 3,
+            "structureName": "Board",
+            "managers": [_person(rng, i) for i in range(rng.randint(1, 3))],
+        },
+        "activities": [
+            {"id": str(rng.randint(100000, 999999)), "name": f"Activity {i}"}
+            for i in range(rng.randint(1, 6))
+        ],
+    }
+
+
+def make_items(count: int, seed: int):
+    """(call log stand-in, payload) pairs; about one in ten CR numbers repeats."""
+    rng = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=30)
+    cr_numbers = [str(1010000000 + i) for i in range(int(count * 0.9) or 1)]
+    items = []
+    for i in range(count):
+        log = SimpleNamespace(
+            id=uuid.uuid4(),
+            fetched_at=start + timedelta(seconds=i),
+            request_data={"cr_number": cr_numbers[i % len(cr_numbers)]},
+        )
+        items.append((log, make_payload(rng, cr_numbers[i % len(cr_numbers)])))
+    return items
+
+
+def legacy_write(db, items):
+    """The previous approach: ORM objects added row by row, flushed for ids."""
+    for log, cr_data in items:
+        rows = cr_normalizer.build_rows(cr_data, log)
+        cr = models.CommercialRegistration(**rows["cr"])
+        db.add(cr)
+        db.flush()
+
+        if rows["capital_info"]:
+            existing = db.get(models.CapitalInfo, rows["capital_info"]["cr_number"])
+            if existing is not None:
+                db.delete(existing)
+                db.flush()
+            db.add(models.CapitalInfo(**rows["capital_info"], cr_id=cr.id))
+        for row in rows["entity_characters"]:
+            db.add(models.CREntityCharacter(**row, cr_id=cr.id))
+        for row in rows["activities"]:
+            db.add(models.CRActivity(**row, cr_id=cr.id))
+        for row in rows["stocks"]:
+            db.add(models.CRStock(**row, cr_id=cr.id))
+        for row, activities in rows["estores"]:
+            estore = models.CREstore(**row, cr_id=cr.id)
+            db.add(estore)
+            db.flush()
+            for activity in activities:
+                db.add(models.CREstoreActivity(**activity, estore_id=estore.id))
+        for row, partnerships in rows["parties"]:
+            party = models.CRParty(**row, cr_id=cr.id)
+            db.add(party)
+            db.flush()
+            for partnership in partnerships:
+                db.add(models.CRPartyPartnership(**partnership, party_id=party.id))
+        for row, positions in rows["managers"]:
+            manager = models.CRManager(**row, cr_id=cr.id)
+            db.add(manager)
+            db.flush()
+            for position in positions:
+                db.add(models.CRManagerPosition(**position, manager_id=manager.id))
+        db.flush()
+
+
+def batched_write(db, items, chunk_size):
+    for i in range(0, len(items), chunk_size):
+        cr_normalizer.write_batch(db, items[i:i + chunk_size])
+
+
+def reset_tables(engine):
+    tables = [model.__table__ for model in CR_TABLES]
+    Base.metadata.drop_all(engine, tables=tables)
+    Base.metadata.create_all(engine, tables=tables)
+
+
+def row_counts(db):
+    return {model.__tablename__: db.query(func.count()).select_from(model).scalar() for model in CR_TABLES}
+
+
+def timed(label, engine, write, *args):
+    reset_tables(engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    try:
+        start = time.perf_counter()
+        write(db, *args)
+        db.commit()
+        elapsed = time.perf_counter() - start
+        counts = row_counts(db)
+    finally:
+        db.close()
+    print(f"{label:<10} {elapsed * 1000:10.0f} ms  ({len(args[0]) / elapsed:8.0f} payloads/s)")
+    return elapsed, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Scratch database (default: temporary SQLite file)")
+    parser.add_argument("--payloads", type=int, default=3000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    tmp_path = None
+    if args.database_url:
+        engine = create_engine(args.database_url)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE SCHEMA IF NOT EXISTS wathq"))
+    else:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        engine = create_engine(f"sqlite:///{tmp_path}").execution_options(
+            schema_translate_map={"wathq": None}
+        )
+
+    try:
+        items = make_items(args.payloads, args.seed)
+        child_rows = sum(
+            len(rows) for _, data in items[:100]
+            for rows in (data["activities"], data["parties"], data["management"]["managers"])
+        )
+        print(f"{args.payloads} payloads (~{child_rows // min(100, len(items))} child rows each) "
+              f"on {engine.dialect.name}")
+
+        legacy_time, legacy_counts = timed("row-by-row", engine, legacy_write, items)
+        batch_time, batch_counts = timed("batched", engine, batched_write, items, args.chunk_size)
+
+        print(f"speedup    {legacy_time / batch_time:10.1f}x")
+        if legacy_counts != batch_counts:
+            print("MISMATCH in row counts:")
+            for table in legacy_counts:
+                print(f"  {table}: {legacy_counts[table]} vs {batch_counts[table]}")
+            sys.exit(1)
+        print("row counts match: " + ", ".join(f"{t}={n}" for t, n in batch_counts.items()))
+    finally:
+        reset_tables(engine)
+        engine.dispose()
+        if tmp_path:
+            os.unlink(tmp_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark the storage options for large WATHQ payload columns.
+
+Generates synthetic /fullinfo payloads (see benchmark_cr_normalizer.py) and
+stores them in one scratch table per option: plain json, jsonb (PostgreSQL
+only) and app.db.types.CompressedJSON with each codec (none, zlib, and zstd
+when zstandard is installed). For each option it reports the table size and
+the write and read throughput, reads including JSON decoding/decompression.
+
+Usage:
+    python scripts/benchmark_payload_storage.py --payloads 5000
+    python scripts/benchmark_payload_storage.py --database-url postgresql+psycopg2://... --payloads 20000
+
+By default a temporary SQLite file is used so the script runs anywhere (table
+sizes are then the summed value lengths); point --database-url at a scratch
+PostgreSQL database for representative numbers, where sizes are
+pg_total_relation_size, i.e. including TOAST (which itself compresses large
+json/jsonb values with pglz or lz4). The payload_bench_* tables are dropped
+and recreated.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import JSON, Column, Integer, MetaData, Table, create_engine, func, insert, select, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.core.config import settings
+from app.db.types import CompressedJSON, zstandard
+from benchmark_cr_normalizer import make_payload
+
+
+def options(dialect: str):
+    """(label, column type, codec for CompressedJSON or None)"""
+    result = [("json", JSON(), None)]
+    if dialect == "postgresql":
+        result.append(("jsonb", JSONB(), None))
+    result += [("bytea none", CompressedJSON(), "none"), ("bytea zlib", CompressedJSON(), "zlib")]
+    if zstandard is not None:
+        result.append(("bytea zstd", CompressedJSON(), "zstd"))
+    return result
+
+
+def table_size(conn, table: Table) -> int:
+    if conn.dialect.name == "postgresql":
+        return conn.execute(text(f"SELECT pg_total_relation_size('{table.name}')")).scalar()
+    return conn.execute(select(func.sum(func.length(table.c.payload)))).scalar() or 0
+
+
+def run(engine, label, column_type, payloads, batch_size):
+    table = Table(
+        f"payload_bench_{label.replace(' ', '_')}",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("payload", column_type, nullable=False),
+    )
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+
+    start = time.perf_counter()
+    for offset in range(0, len(payloads), batch_size):
+        with engine.begin() as conn:
+            conn.execute(
+                insert(table),
+                [{"id": offset + i, "payload": payload}
+                 for i, payload in enumerate(payloads[offset:offset + batch_size])],
+            )
+    write_s = time.perf_counter() - start
+
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f"VACUUM ANALYZE {table.name}"))
+
+    start = time.perf_counter()
+    with engine.connect() as conn:
+        read = sum(1 for _ in conn.execute(select(table.c.payload)))
+    read_s = time.perf_counter() - start
+    assert read == len(payloads)
+
+    with engine.connect() as conn:
+        size = table_size(conn, table)
+    table.drop(engine)
+    return size, write_s, read_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Scratch database (default: temporary SQLite file)")
+    parser.add_argument("--payloads", type=int, default=3000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    tmp_path = None
+    database_url = args.database_url
+    if not database_url:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{tmp_path}"
+    engine = create_engine(database_url)
+
+    rng = random.Random(42)
+    payloads = [make_payload(rng, str(1010000000 + i)) for i in range(args.payloads)]
+
+    print(f"{args.payloads} payloads into {engine.url.render_as_string(hide_password=True)}, "
+          f"min compress {settings.WATHQ_PAYLOAD_MIN_COMPRESS_BYTES} B, "
+          f"level {settings.WATHQ_PAYLOAD_COMPRESSION_LEVEL}\n")
+    print(f"{'option':<12}{'size KB':>10}{'B/row':>8}{'write/s':>10}{'read/s':>10}")
+
+    configured_codec = settings.WATHQ_PAYLOAD_CODEC
+    try:
+        for label, column_type, codec in options(engine.dialect.name):
+            if codec:
+                settings.WATHQ_PAYLOAD_CODEC = codec
+            size, write_s, read_s = run(engine, label, column_type, payloads, args.batch_size)
+            print(
+                f"{label:<12}{size / 1024:>10.0f}{size / len(payloads):>8.0f}"
+                f"{len(payloads) / write_s:>10.0f}{len(payloads) / read_s:>10.0f}"
+            )
+    finally:
+        settings.WATHQ_PAYLOAD_CODEC = configured_codec
+        engine.dispose()
+        if tmp_path:
+            os.unlink(tmp_path)
+
+    if zstandard is None:
+        print("\nzstandard is not installed; install it to benchmark the zstd codec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent PDF exports: inline rendering vs. the render pool.
+
+Fires --requests concurrent exports of the commercial registration template
+(rendered from templates/sample-data.json) at one event loop, the way
+concurrent requests hit one API worker, and reports per-export latency,
+throughput and the longest event-loop stall seen by a 10 ms heartbeat task.
+
+Modes:
+    inline  WeasyPrint called synchronously inside the coroutine (the old
+            pdf_service.generate_pdf_bytes behaviour)
+    pool    pdf_render_pool.render_html (warm worker processes)
+
+Usage:
+    python scripts/benchmark_pdf_render.py --requests 40 --workers 4
+
+Needs WeasyPrint's system libraries (Pango); the first pool request also
+fetches the Google Fonts stylesheets the templates link to.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from weasyprint import HTML
+
+from app.services.pdf_render_pool import PDFRenderPool
+from app.services.wathq_pdf_service import pdf_service
+
+TEMPLATE = "commercial_registration_pdf.html"
+
+
+def build_html() -> tuple:
+    sample = json.loads((pdf_service.templates_dir / "sample-data.json").read_text(encoding="utf-8"))
+    pdf_data = pdf_service.create_commercial_registration_pdf(sample)
+    return pdf_service.preview_html(pdf_data, TEMPLATE), pdf_data.pdf_options or {}
+
+
+async def heartbeat(stop: asyncio.Event, stalls: list) -> None:
+    """Measure how late a 10 ms sleep wakes up: the event loop's responsiveness."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        stalls.append(time.perf_counter() - start - 0.01)
+
+
+async def run_mode(mode: str, html: str, options: dict, requests: int, pool: PDFRenderPool) -> dict:
+    async def export_inline() -> float:
+        start = time.perf_counter()
+        HTML(string=html, encoding="utf-8").write_pdf(**options)
+        return time.perf_counter() - start
+
+    async def export_pool() -> float:
+        start = time.perf_counter()
+        await pool.render_html(html, options)
+        return time.perf_counter() - start
+
+    export = export_inline if mode == "inline" else export_pool
+    stop = asyncio.Event()
+    stalls: list = []
+    beat = asyncio.create_task(heartbeat(stop, stalls))
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(export() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await beat
+    latencies = sorted(latencies)
+    return {
+        "mode": mode,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "throughput": requests / elapsed,
+        "max_stall_ms": max(stalls, default=0) * 1000,
+    }
+
+
+async def main_async(args) -> None:
+    html, options = build_html()
+    pool = PDFRenderPool(workers=args.workers, max_concurrency=args.workers)
+    pool.start()
+    # Let the workers boot and warm up before timing
+    await asyncio.gather(*(pool.render_html(html, options) for _ in range(args.workers)))
+
+    print(f"{args.requests} concurrent exports of {TEMPLATE}, pool of {args.workers} workers")
+    print(f"{'mode':<8} {'p50 ms':>9} {'p95 ms':>9} {'exports/s':>10} {'max loop stall ms':>18}")
+    for mode in ("inline", "pool"):
+        r = await run_mode(mode, html, options, args.requests, pool)
+        print(
+            f"{r['mode']:<8} {r['p50_ms']:9.0f} {r['p95_ms']:9.0f} "
+            f"{r['throughput']:10.2f} {r['max_stall_ms']:18.0f}"
+        )
+    pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=4)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
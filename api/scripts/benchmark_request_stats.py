@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Benchmark request_counter_service.get_request_stats against the old version.
+
+Seeds a throwaway api_request_counters table with synthetic rows, then times
+the previous implementation (load every row and aggregate in Python) against
+the current single-query SQL aggregation, for each filter combination, and
+checks that both return identical ApiRequestStats.
+
+Usage:
+    python scripts/benchmark_request_stats.py --rows 200000
+    python scripts/benchmark_request_stats.py --database-url postgresql+psycopg2://... --rows 1000000
+
+By default a temporary SQLite file is used so the script runs anywhere; point
+--database-url at a scratch PostgreSQL database for representative numbers.
+Never run it against a database you care about: the counters table is
+dropped and recreated.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base  # noqa: F401  (registers every model)
+from app.models.api_request_counter import ApiRequestCounter, RequestType
+from app.schemas.api_request_counter import ApiRequestStats
+from app.services.request_counter_service import request_counter_service
+
+ENDPOINTS = [f"/api/v1/wathq/endpoint-{i}" for i in range(40)]
+SERVICE_IDS = [uuid.uuid4() for _ in range(6)]
+
+
+def legacy_get_request_stats(
+    db, period="today", tenant_id=None, user_id=None, service_id=None
+) -> ApiRequestStats:
+    """The pre-aggregation implementation: fetch rows, aggregate in Python."""
+    now = datetime.utcnow()
+    if period == "today":
+        start_time = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    elif period == "week":
+        start_time = now - timedelta(days=7)
+    elif period == "month":
+        start_time = now - timedelta(days=30)
+    else:
+        start_time = None
+
+    query = db.query(ApiRequestCounter)
+    if start_time:
+        query = query.filter(ApiRequestCounter.created_at >= start_time)
+    if tenant_id:
+        query = query.filter(ApiRequestCounter.tenant_id == tenant_id)
+    if user_id:
+        query = query.filter(ApiRequestCounter.user_id == user_id)
+    if service_id:
+        query = query.filter(ApiRequestCounter.service_id == service_id)
+
+    records = query.all()
+    if not records:
+        return ApiRequestStats(
+            period=period, total_requests=0, successful_requests=0,
+            failed_requests=0, cached_requests=0, external_requests=0,
+            internal_requests=0, avg_response_time_ms=0,
+            max_response_time_ms=0, min_response_time_ms=0, cache_hit_rate=0,
+            success_rate=0, unique_users=0, unique_endpoints=0,
+        )
+
+    total = len(records)
+    successful = sum(1 for r in records if r.is_successful)
+    cached = sum(1 for r in records if r.is_cached)
+    external = sum(1 for r in records if r.request_type == RequestType.EXTERNAL)
+    internal = sum(1 for r in records if r.request_type == RequestType.INTERNAL)
+    response_times = [r.response_time_ms for r in records]
+
+    return ApiRequestStats(
+        period=period,
+        total_requests=total,
+        successful_requests=successful,
+        failed_requests=total - successful,
+        cached_requests=cached,
+        external_requests=external,
+        internal_requests=internal,
+        avg_response_time_ms=round(sum(response_times) / len(response_times), 2),
+        max_response_time_ms=max(response_times),
+        min_response_time_ms=min(response_times),
+        cache_hit_rate=round(cached / total * 100, 2),
+        success_rate=round(successful / total * 100, 2),
+        unique_users=len(set(r.user_id for r in records if r.user_id)),
+        unique_endpoints=len(set(r.endpoint for r in records)),
+    )
+
+
+def seed(engine, rows: int, batch_size: int = 10000) -> None:
+    """Recreate the counters table and fill it with rows spread over 60 days."""
+    table = ApiRequestCounter.__table__
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+    request_types = [RequestType.INTERNAL.value, RequestType.EXTERNAL.value, RequestType.CACHED.value]
+
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch_size):
+            batch = []
+            for _ in range(min(batch_size, rows - offset)):
+                status = rng.choice((200, 200, 200, 200, 400, 404, 500))
+                batch.append({
+                    "id": uuid.uuid4(),
+                    "request_type": rng.choice(request_types),
+                    "endpoint": rng.choice(ENDPOINTS),
+                    "method": "GET",
+                    "user_id": rng.choice((None, *range(1, 200))),
+                    "tenant_id": rng.randint(1, 20),
+                    "service_id": rng.choice(SERVICE_IDS),
+                    "response_status": status,
+                    "response_time_ms": rng.randint(5, 3000),
+                    "is_successful": status < 400,
+                    "is_cached": rng.random() < 0.3,
+                    "created_at": now - timedelta(seconds=rng.randint(0, 60 * 86400)),
+                })
+            conn.execute(insert(ApiRequestCounter), batch)
+
+
+def timed(fn, db, **kwargs):
+    start = time.perf_counter()
+    result = fn(db, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(args) -> None:
+    tmp_path = None
+    database_url = args.database_url
+    if not database_url:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{tmp_path}"
+
+    engine = create_engine(database_url)
+    Session = sessionmaker(bind=engine)
+
+    print(f"Seeding {args.rows} rows into {engine.url.render_as_string(hide_password=True)} ...")
+    start = time.perf_counter()
+    seed(engine, args.rows)
+    print(f"Seeded in {time.perf_counter() - start:.1f}s\n")
+
+    cases = [
+        ("all", {}),
+        ("month", {}),
+        ("week", {"tenant_id": 3}),
+        ("month", {"user_id": 7}),
+        ("all", {"service_id": SERVICE_IDS[0]}),
+        ("today", {"tenant_id": 3, "service_id": SERVICE_IDS[1]}),
+    ]
+
+    print(f"{'period':<8}{'filters':<28}{'rows':>10}{'legacy ms':>12}{'sql ms':>10}{'speedup':>9}")
+    try:
+        for period, filters in cases:
+            db = Session()
+            try:
+                legacy, legacy_ms = timed(legacy_get_request_stats, db, period=period, **filters)
+                db.expunge_all()
+                current, sql_ms = timed(
+                    request_counter_service.get_request_stats, db, period=period, **filters
+                )
+            finally:
+                db.close()
+
+            if legacy.model_dump() != current.model_dump():
+                raise SystemExit(
+                    f"Mismatch for {period} {filters}:\n  legacy={legacy}\n  sql={current}"
+                )
+
+            label = ", ".join(k for k in filters) or "-"
+            print(
+                f"{period:<8}{label:<28}{current.total_requests:>10}"
+                f"{legacy_ms:>12.1f}{sql_ms:>10.1f}{legacy_ms / max(sql_ms, 0.001):>8.1f}x"
+            )
+    finally:
+        engine.dispose()
+        if tmp_path:
+            os.unlink(tmp_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--database-url", default=None)
+    main(parser.parse_args())
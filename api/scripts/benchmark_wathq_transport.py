@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared WATHQ HTTP transport against a local stub server.
+
+Compares opening a fresh ``httpx.AsyncClient`` per request (the old client
+behaviour) with the pooled ``wathq_transport`` client, and reports how many
+TCP connections the stub server had to accept in each mode.
+
+Usage:
+    python scripts/benchmark_wathq_transport.py --requests 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from app.core.wathq_transport import wathq_transport
+
+
+class StubWathqHandler(BaseHTTPRequestHandler):
+    """Keep-alive HTTP/1.1 handler returning a small fullinfo-like payload."""
+
+    protocol_version = "HTTP/1.1"
+    handshake_delay = 0.0
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        with StubWathqHandler.lock:
+            StubWathqHandler.connections += 1
+        # Simulate the TCP+TLS handshake cost paid on every new connection
+        time.sleep(self.handshake_delay)
+        super().setup()
+
+    def do_GET(self):
+        body = json.dumps({"crNumber": "1010000000", "name": "stub"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(handshake_ms: float) -> ThreadingHTTPServer:
+    StubWathqHandler.handshake_delay = handshake_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubWathqHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def fresh_client_request(url: str) -> None:
+    async with httpx.AsyncClient() as client:
+        response = await client.get(url, timeout=30.0)
+        response.json()
+
+
+async def pooled_client_request(url: str) -> None:
+    client = wathq_transport.get_client()
+    response = await client.get(url)
+    response.json()
+
+
+async def run_mode(request_fn, url: str, total: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await request_fn(url)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    StubWathqHandler.connections = 0
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "connections": StubWathqHandler.connections,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "throughput_rps": total / elapsed,
+    }
+
+
+async def main(args) -> None:
+    server = start_stub_server(args.handshake_ms)
+    url = f"http://127.0.0.1:{server.server_address[1]}/commercial-registration/fullinfo/1010000000"
+
+    print(f"Stub server at {url}")
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency}, "
+        f"simulated handshake {args.handshake_ms}ms\n"
+    )
+
+    results = {
+        "fresh client": await run_mode(
+            fresh_client_request, url, args.requests, args.concurrency
+        ),
+        "pooled transport": await run_mode(
+            pooled_client_request, url, args.requests, args.concurrency
+        ),
+    }
+    await wathq_transport.aclose()
+    server.shutdown()
+
+    print(f"{'mode':<18}{'connections':>12}{'p50 ms':>10}{'p95 ms':>10}{'req/s':>10}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<18}{r['connections']:>12}{r['p50_ms']:>10.2f}"
+            f"{r['p95_ms']:>10.2f}{r['throughput_rps']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--handshake-ms", type=float, default=20.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,67 @@
+"""
+Script to re-encode stored WATHQ payloads with the configured codec.
+
+Run after migration 20251106_compressed_payloads (which stores existing
+payloads uncompressed), after changing WATHQ_PAYLOAD_CODEC or installing
+zstandard, and with WATHQ_PAYLOAD_CODEC=none before downgrading it.
+
+Usage:
+    python scripts/compress_wathq_payloads.py
+    python scripts/compress_wathq_payloads.py --batch-size 1000 --limit 50000
+    python scripts/compress_wathq_payloads.py --dry-run
+"""
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+current_dir = Path(__file__).parent.parent  # Go up one level from scripts/ to backend/
+sys.path.insert(0, str(current_dir))
+
+# Also add the current directory as fallback
+sys.path.insert(0, str(Path(__file__).parent))
+
+import argparse
+
+from app.db.session import SessionLocal
+from app.db.types import active_codec
+from app.services.payload_compression_service import payload_compression_service
+
+
+def main():
+    """Main function to re-encode the WATHQ payloads."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per transaction")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many rows per table")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the rows to re-encode")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"Re-encoding WATHQ payloads as {active_codec()}...")
+
+        for table, count in payload_compression_service.count_stale(db).items():
+            print(f"  {table}: {count} rows to re-encode")
+        if args.dry_run:
+            return
+
+        summary = payload_compression_service.recompress_all(
+            db, batch_size=args.batch_size, limit=args.limit
+        )
+        for table, result in summary.items():
+            print(
+                f"  {table}: {result['rows']} rows, "
+                f"{result['bytes_before']} -> {result['bytes_after']} bytes"
+            )
+
+        print("WATHQ payloads re-encoded successfully! Run VACUUM to return the space.")
+
+    except Exception as e:
+        print(f"Error during re-encoding: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Script to re-key the WATHQ external data cache after a cache scope change.
+
+Re-keys every entry of wathq_external_data under the scope configured for its
+service (WATHQ_CACHE_SCOPES / WATHQ_CACHE_DEFAULT_SCOPE), merging entries that
+now share a key, then flushes the Redis tier so it refills under the new keys.
+"""
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+current_dir = Path(__file__).parent.parent  # Go up one level from scripts/ to backend/
+sys.path.insert(0, str(current_dir))
+
+# Also add the current directory as fallback
+sys.path.insert(0, str(Path(__file__).parent))
+
+import asyncio
+
+from app.db.session import SessionLocal
+from app.services.wathq_external_cache import wathq_external_cache
+from app.services.wathq_external_service import wathq_external_service
+
+
+def main():
+    """Main function to rehash the WATHQ cache keys."""
+    db = SessionLocal()
+    try:
+        print("Rehashing WATHQ cache keys...")
+
+        result = wathq_external_service.rehash_cache_keys(db)
+        print(f"  Expired entries deleted: {result['expired_deleted']}")
+        print(f"  Entries re-keyed:        {result['rehashed']}")
+        print(f"  Duplicates merged:       {result['merged_deleted']}")
+        print(f"  Entries unchanged:       {result['unchanged']}")
+
+        flushed = asyncio.run(wathq_external_cache.invalidate())
+        print(f"  Redis entries flushed:   {flushed}")
+
+        print("WATHQ cache keys rehashed successfully!")
+
+    except Exception as e:
+        print(f"Error during rehash: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Shared fixtures.
+
+Database tests run against the PostgreSQL database in TEST_DATABASE_URL (the
+code under test relies on PostgreSQL: ON CONFLICT, row value comparisons,
+date_trunc) and are skipped when it points anywhere else. Every table is
+created once per session and emptied after each test. Redis is replaced by
+fakeredis.
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.db.base import Base
+
+
+@pytest.fixture(scope="session")
+def engine():
+    if not settings.TEST_DATABASE_URL.startswith("postgresql"):
+        pytest.skip("TEST_DATABASE_URL is not a PostgreSQL database")
+
+    engine = create_engine(settings.TEST_DATABASE_URL)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE SCHEMA IF NOT EXISTS wathq"))
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    yield factory
+    # Code under test commits: empty every table instead of rolling back
+    tables = ", ".join(
+        f'"{table.schema}"."{table.name}"' if table.schema else f'"{table.name}"'
+        for table in Base.metadata.sorted_tables
+    )
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {tables} CASCADE"))
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+async def fake_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis()
+    yield client
+    await client.flushall()
+    await client.aclose()
@@ -0,0 +1,211 @@
+"""
+Redis outbox for WATHQ call logs and offline data (wathq_outbox), on fakeredis.
+"""
+
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import redis.asyncio as aredis
+
+from app.core.config import settings
+from app.models.service import Service
+from app.models.tenant import Tenant
+from app.models.user import User
+from app.models.wathq_call_log import WathqCallLog
+from app.models.wathq_offline_data import WathqOfflineData
+from app.services import wathq_outbox as outbox_module
+from app.services.wathq_outbox import GROUP, WathqOutbox
+
+CR_BODY = {"crNationalNumber": "7001234567", "crNumber": "1010123456", "name": "Test Co"}
+
+
+@pytest.fixture
+def caller(db):
+    tenant = Tenant(name="Tenant", slug="tenant")
+    db.add(tenant)
+    db.flush()
+    user = User(email="user@example.com", first_name="A", last_name="B", hashed_password="x", tenant_id=tenant.id)
+    service = Service(name="Commercial Registration", slug="commercial-registration")
+    db.add_all([user, service])
+    db.commit()
+    return tenant.id, user.id, service.id
+
+
+@pytest.fixture
+async def outbox(fake_redis, session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "WATHQ_OUTBOX_ENABLED", True)
+    # The consumer writes each batch in its own session
+    monkeypatch.setattr(outbox_module, "SessionLocal", session_factory)
+
+    outbox = WathqOutbox(stream="test:outbox", batch_size=10)
+    outbox._redis[id(asyncio.get_running_loop())] = fake_redis
+    await fake_redis.xgroup_create(outbox.stream, GROUP, id="0", mkstream=True)
+    return outbox
+
+
+def _rows(caller, cr_number="1010123456"):
+    tenant_id, user_id, service_id = caller
+    call_log = {
+        "tenant_id": tenant_id,
+        "user_id": user_id,
+        "service_slug": "commercial-registration",
+        "endpoint": f"/commercial-registration/v2/fullinfo/{cr_number}",
+        "method": "GET",
+        "status_code": 200,
+        "request_data": {"language": "ar"},
+        "response_body": {**CR_BODY, "crNumber": cr_number},
+        "duration_ms": 120,
+    }
+    offline_data = {
+        "service_id": service_id,
+        "tenant_id": tenant_id,
+        "fetched_by": user_id,
+        "full_external_url": f"https://api.wathq.sa/commercial-registration/v2/fullinfo/{cr_number}",
+    }
+    return call_log, offline_data
+
+
+async def _read(redis, outbox, consumer=None):
+    response = await redis.xreadgroup(
+        GROUP, consumer or outbox.consumer, {outbox.stream: ">"}, count=outbox.batch_size
+    )
+    return response[0][1] if response else []
+
+
+async def test_append_then_consume_and_ack(db, caller, outbox, fake_redis):
+    request_ids = [str(uuid.uuid4()) for _ in range(3)]
+    for i, request_id in enumerate(request_ids):
+        await outbox.append(db, request_id, *_rows(caller, f"101012345{i}"))
+    assert outbox.appended == 3
+    # Nothing written on the request path
+    assert db.query(WathqCallLog).count() == 0
+
+    before = datetime.now(timezone.utc)
+    await outbox._process(fake_redis, await _read(fake_redis, outbox))
+    assert outbox.written == 3
+    assert outbox.batches == 1
+
+    logs = db.query(WathqCallLog).order_by(WathqCallLog.endpoint).all()
+    assert sorted(str(log.id) for log in logs) == sorted(request_ids)
+    assert logs[0].response_body == {**CR_BODY, "crNumber": "1010123450"}
+    # Stamped by the database at insert, not when queued
+    assert all(log.fetched_at >= before - timedelta(seconds=1) for log in logs)
+
+    offline = db.query(WathqOfflineData).order_by(WathqOfflineData.cr_number).all()
+    assert [row.cr_number for row in offline] == ["1010123450", "1010123451", "1010123452"]
+    assert offline[0].response_body_hash == logs[0].response_body_hash
+    assert offline[0].id == uuid.uuid5(logs[0].id, "offline_data")
+
+    # Acknowledged and deleted
+    assert await fake_redis.xlen(outbox.stream) == 0
+    assert (await fake_redis.xpending(outbox.stream, GROUP))["pending"] == 0
+
+
+async def test_failed_batch_stays_pending_and_is_reclaimed(db, caller, outbox, fake_redis, monkeypatch):
+    await outbox.append(db, str(uuid.uuid4()), *_rows(caller))
+
+    def broken(rows):
+        raise ConnectionError("database down")
+
+    monkeypatch.setattr(WathqOutbox, "_write_batch", staticmethod(broken))
+    await outbox._process(fake_redis, await _read(fake_redis, outbox))
+    assert outbox.written == 0
+    assert outbox.last_error == "ConnectionError: database down"
+    assert (await fake_redis.xpending(outbox.stream, GROUP))["pending"] == 1
+    monkeypatch.undo()
+
+    # Claimed by another consumer once idle (the idle time is 0 here)
+    _, claimed, *_ = await fake_redis.xautoclaim(
+        outbox.stream, GROUP, "other-consumer", min_idle_time=0, start_id="0-0", count=10
+    )
+    assert len(claimed) == 1
+    await outbox._process(fake_redis, claimed)
+    assert outbox.written == 1
+    assert db.query(WathqCallLog).count() == 1
+    assert await fake_redis.xlen(outbox.stream) == 0
+
+
+async def test_entries_of_a_dead_consumer_are_reclaimed(db, caller, outbox, fake_redis, monkeypatch):
+    await outbox.append(db, str(uuid.uuid4()), *_rows(caller))
+    # Delivered to a consumer that never acknowledges
+    assert len(await _read(fake_redis, outbox, consumer="dead-consumer")) == 1
+
+    # The consumer loop reclaims it first thing
+    monkeypatch.setattr(settings, "WATHQ_OUTBOX_CLAIM_IDLE_MS", 0)
+    monkeypatch.setattr(settings, "WATHQ_OUTBOX_BLOCK_MS", 10)
+    monkeypatch.setattr(aredis.Redis, "from_url", staticmethod(lambda *args, **kwargs: fake_redis))
+    monkeypatch.setattr(fake_redis, "aclose", lambda: asyncio.sleep(0))
+
+    outbox.start()
+    try:
+        for _ in range(100):
+            if outbox.written:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await outbox.stop()
+
+    assert outbox.reclaimed == 1
+    assert outbox.written == 1
+    assert db.query(WathqCallLog).count() == 1
+
+
+async def test_redelivered_entry_is_written_once(db, caller, outbox, fake_redis):
+    await outbox.append(db, str(uuid.uuid4()), *_rows(caller))
+    entries = await _read(fake_redis, outbox)
+    await outbox._process(fake_redis, entries)
+
+    # The same entry again (acknowledgement lost after the commit)
+    entry_id, fields = entries[0]
+    await outbox._process(fake_redis, [(entry_id, fields)])
+    assert outbox.duplicates == 1
+    assert db.query(WathqCallLog).count() == 1
+    assert db.query(WathqOfflineData).count() == 1
+
+
+async def test_malformed_entry_is_dropped(db, caller, outbox, fake_redis):
+    await fake_redis.xadd(outbox.stream, {"call_log": "{not json"})
+    await outbox.append(db, str(uuid.uuid4()), *_rows(caller))
+
+    await outbox._process(fake_redis, await _read(fake_redis, outbox))
+    assert outbox.failed == 1
+    assert outbox.written == 1
+    assert await fake_redis.xlen(outbox.stream) == 0
+
+
+async def test_direct_write_when_redis_unavailable(db, caller, outbox):
+    class Unreachable:
+        async def xadd(self, *args, **kwargs):
+            raise TimeoutError("Timeout reading from socket")
+
+    outbox._redis[id(asyncio.get_running_loop())] = Unreachable()
+    request_id = str(uuid.uuid4())
+    await outbox.append(db, request_id, *_rows(caller))
+
+    assert outbox.appended == 0
+    assert outbox.direct_writes == 1
+    log = db.query(WathqCallLog).one()
+    assert str(log.id) == request_id
+    assert db.query(WathqOfflineData).one().cr_national_number == "7001234567"
+
+
+async def test_direct_write_when_disabled(db, caller, outbox, fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "WATHQ_OUTBOX_ENABLED", False)
+    call_log, _ = _rows(caller)
+    await outbox.append(db, str(uuid.uuid4()), call_log)
+
+    assert outbox.direct_writes == 1
+    assert await fake_redis.xlen(outbox.stream) == 0
+    assert db.query(WathqCallLog).count() == 1
+    assert db.query(WathqOfflineData).count() == 0
+
+
+def test_entry_round_trip():
+    request_id = uuid.uuid4()
+    row = {"id": request_id, "service_id": uuid.uuid4(), "status_code": 200}
+    decoded = outbox_module._decode(json.loads(json.dumps(outbox_module._encode(row))))
+    assert decoded == row
+    assert outbox_module._entry_time(b"1762473600000-0") == datetime(2025, 11, 7, tzinfo=timezone.utc)
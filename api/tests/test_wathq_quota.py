@@ -0,0 +1,113 @@
+"""
+Redis token buckets for WATHQ calls (wathq_quota), on fakeredis with Lua.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.wathq_quota import KEY_PREFIX, WathqQuota, WathqQuotaExceeded, hash_api_key
+
+pytest.importorskip("lupa")
+
+TENANT_KEY = "tenant-own-key"
+
+
+@pytest.fixture
+async def quota(fake_redis, monkeypatch):
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_ENABLED", True)
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_KEY_RATE", 100.0)
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_KEY_BURST", 50)
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_TENANT_RATE", 0.1)
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_TENANT_BURST", 3)
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_TENANT_LIMITS", {})
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_MAX_WAIT", 0.05)
+
+    quota = WathqQuota()
+    quota._redis[id(asyncio.get_running_loop())] = fake_redis
+    return quota
+
+
+async def _take(quota, count, api_key=None, tenant_id=None):
+    """How many of ``count`` calls got a token."""
+    granted = 0
+    for _ in range(count):
+        try:
+            await quota.acquire(api_key or settings.WATHQ_API_KEY, tenant_id=tenant_id)
+            granted += 1
+        except WathqQuotaExceeded:
+            pass
+    return granted
+
+
+async def test_burst_then_rejected(quota, monkeypatch):
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_KEY_RATE", 0.1)
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_KEY_BURST", 5)
+
+    assert await _take(quota, 8, api_key=TENANT_KEY) == 5
+    assert quota.granted == 5
+    assert quota.rejected == 3
+
+
+async def test_waits_for_refill(quota, monkeypatch):
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_KEY_RATE", 20.0)
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_KEY_BURST", 2)
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_MAX_WAIT", 1.0)
+
+    assert await _take(quota, 2, api_key=TENANT_KEY) == 2
+    waited_before = quota.wait_seconds
+
+    # Empty: the next calls wait about 1/rate each instead of failing
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    assert await _take(quota, 2, api_key=TENANT_KEY) == 2
+    assert loop.time() - start >= 0.08
+    assert quota.wait_seconds - waited_before >= 0.08
+    assert quota.rejected == 0
+
+
+async def test_tenants_on_system_key_are_isolated(quota, monkeypatch):
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_KEY_RATE", 0.1)
+
+    # Tenant 1 uses up its share of the system key...
+    assert await _take(quota, 5, tenant_id=1) == 3
+    # ...which leaves tenant 2's share and the key itself untouched
+    assert await _take(quota, 3, tenant_id=2) == 3
+    assert await _take(quota, 5) == 5
+
+    levels = {level["tenant_id"]: level for level in await quota.levels()}
+    assert levels[1]["tokens"] < 1
+    assert levels[2]["tokens"] < 1
+    assert levels[None]["api_key"] == "system"
+    assert levels[None]["tokens"] == pytest.approx(50 - 11, abs=0.1)
+
+
+async def test_own_key_has_no_tenant_bucket(quota):
+    assert quota.buckets(TENANT_KEY, 1) == [
+        (f"{KEY_PREFIX}:{hash_api_key(TENANT_KEY)}", 100.0, 50)
+    ]
+    assert await _take(quota, 10, api_key=TENANT_KEY, tenant_id=1) == 10
+
+
+async def test_tenant_override(quota, monkeypatch):
+    monkeypatch.setattr(settings, "WATHQ_QUOTA_TENANT_LIMITS", {7: {"burst": 6}, 8: {"rate": 0.5}})
+
+    assert quota.tenant_limit(7) == (0.1, 6)
+    assert quota.tenant_limit(8) == (0.5, 3)
+    assert quota.tenant_limit(9) == (0.1, 3)
+
+    assert await _take(quota, 8, tenant_id=7) == 6
+    assert await _take(quota, 8, tenant_id=9) == 3
+    # An override also applies on the tenant's own key
+    assert await _take(quota, 8, api_key=TENANT_KEY, tenant_id=7) == 6
+
+
+async def test_fails_open_without_redis(quota):
+    class Unreachable:
+        async def eval(self, *args):
+            raise ConnectionError("redis down")
+
+    quota._redis[id(asyncio.get_running_loop())] = Unreachable()
+    assert await _take(quota, 3, tenant_id=1) == 3
+    assert quota.unlimited == 3
@@ -0,0 +1,212 @@
+"""
+Circuit breaker and adaptive concurrency limit of WATHQ calls (wathq_resilience).
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import wathq_resilience as resilience
+from app.core.wathq_resilience import (
+    CLOSED,
+    DEFAULT_GUARD,
+    HALF_OPEN,
+    OPEN,
+    AdaptiveLimiter,
+    CircuitBreaker,
+    ServiceGuard,
+    WathqResilience,
+    WathqUpstreamUnavailable,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def _open(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record(False)
+    assert breaker.state == OPEN
+
+
+# ----------------------------------------------------------------------
+# Circuit breaker
+# ----------------------------------------------------------------------
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, open_seconds=30, half_open_probes=1)
+
+    # A success in between resets the count
+    breaker.record(False)
+    breaker.record(False)
+    breaker.record(True)
+    breaker.record(False)
+    assert breaker.state == CLOSED
+
+    breaker.record(False)
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert breaker.trips == 1
+
+    clock.now += 29
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+
+def test_breaker_half_open_probe_success_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=2, open_seconds=30, half_open_probes=2)
+    _open(breaker)
+
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    # Only half_open_probes calls at a time
+    assert not breaker.allow()
+
+    breaker.record(True)
+    assert breaker.state == CLOSED
+    assert breaker.consecutive_failures == 0
+    assert breaker.allow()
+
+
+def test_breaker_half_open_probe_failure_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=2, open_seconds=30, half_open_probes=1)
+    _open(breaker)
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert breaker.trips == 2
+
+    # The open period starts over from the failed probe
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_breaker_release_frees_probe_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=1, open_seconds=10, half_open_probes=1)
+    _open(breaker)
+
+    clock.now += 10
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+
+
+# ----------------------------------------------------------------------
+# AIMD limiter
+# ----------------------------------------------------------------------
+
+async def test_limiter_additive_increase():
+    limiter = AdaptiveLimiter(initial=4, minimum=1, maximum=6, latency_target=1.0, queue_timeout=0.01)
+
+    # About +1 per round of `limit` fast successes
+    for _ in range(4):
+        assert await limiter.acquire()
+        limiter.release(True, 0.1)
+    assert limiter.limit == pytest.approx(5, abs=0.2)
+
+    for _ in range(50):
+        assert await limiter.acquire()
+        limiter.release(True, 0.1)
+    assert limiter.limit == 6
+
+
+async def test_limiter_multiplicative_decrease():
+    limiter = AdaptiveLimiter(initial=16, minimum=2, maximum=32, latency_target=1.0, queue_timeout=0.01)
+
+    assert await limiter.acquire()
+    limiter.release(False)
+    assert limiter.limit == 8
+
+    # A slow success counts as trouble too
+    assert await limiter.acquire()
+    limiter.release(True, 5.0)
+    assert limiter.limit == 4
+
+    for _ in range(3):
+        assert await limiter.acquire()
+        limiter.release(False)
+    assert limiter.limit == 2
+    assert limiter.decreases == 5
+
+    # No outcome (cancelled call): the limit is left alone
+    assert await limiter.acquire()
+    limiter.release()
+    assert limiter.limit == 2
+
+
+async def test_limiter_queues_then_rejects():
+    limiter = AdaptiveLimiter(initial=1, minimum=1, maximum=4, latency_target=1.0, queue_timeout=0.05)
+    assert await limiter.acquire()
+
+    # Times out while the only slot is held
+    assert not await limiter.acquire()
+    assert limiter.rejected == 1
+
+    # Handed the slot when it is released
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    limiter.release(True, 0.1)
+    assert await waiter
+    assert limiter.in_flight == 1
+
+
+# ----------------------------------------------------------------------
+# Guards
+# ----------------------------------------------------------------------
+
+async def test_guard_rejects_while_open(clock):
+    guard = ServiceGuard("commercial-registration")
+    guard.breaker = CircuitBreaker(failure_threshold=2, open_seconds=30, half_open_probes=1)
+    request = httpx.Request("GET", "https://api.wathq.sa/commercial-registration/info/1")
+    sent = []
+
+    async def upstream(request):
+        sent.append(request)
+        return httpx.Response(503, request=request)
+
+    for _ in range(2):
+        assert (await guard.send(request, upstream)).status_code == 503
+    assert guard.breaker.state == OPEN
+    assert guard.limiter.decreases == 2
+
+    with pytest.raises(WathqUpstreamUnavailable) as exc_info:
+        await guard.send(request, upstream)
+    assert exc_info.value.reason == "circuit open"
+    assert len(sent) == 2
+
+
+def test_guard_for_prefixes_and_default():
+    registry = WathqResilience()
+    registry.register_prefix("/v1/deeds", "real-estate-deeds")
+
+    def slug(path):
+        return registry.guard_for(httpx.URL(f"https://api.wathq.sa{path}")).service_slug
+
+    assert slug("/moj/real-estate/deed/1") == "real-estate"
+    assert slug("/v1/deeds/1/info") == "real-estate-deeds"
+    assert slug("/v1/unknown") == DEFAULT_GUARD
+    assert registry.guard_for(httpx.URL("https://api.wathq.sa/v1/x")) is registry.guard_for(
+        httpx.URL("https://api.wathq.sa/other")
+    )
@@ -0,0 +1,166 @@
+"""
+Keyset sync of WATHQ call logs (wathq_sync_engine).
+
+Logs sharing a fetched_at are ordered by id, so the (fetched_at, id)
+watermark can stop and resume inside such a tie; logs still inside the
+settle window are left for a later run.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.models.processing_watermark import ProcessingWatermark
+from app.models.wathq_call_log import WathqCallLog
+from app.models.wathq_commercial_registration import CommercialRegistration
+from app.services.wathq_sync_engine import SyncDataError, WathqSyncEngine
+
+SERVICE = "commercial-registration"
+
+
+def _add_logs(db, fetched_at, count=None, ids=None):
+    ids = sorted(ids or (uuid.uuid4() for _ in range(count)))
+    logs = [
+        WathqCallLog(
+            id=log_id,
+            service_slug=SERVICE,
+            endpoint=f"/commercial-registration/v2/fullinfo/{log_id.hex[:10]}",
+            status_code=200,
+            response_body_hash="0" * 64,
+            fetched_at=fetched_at,
+        )
+        for log_id in ids
+    ]
+    db.add_all(logs)
+    db.commit()
+    return [log.id for log in logs]
+
+
+def _process_log(db, log):
+    if log.endpoint.endswith("bad"):
+        raise SyncDataError("unusable payload")
+    db.add(CommercialRegistration(log_id=log.id, cr_number=log.endpoint.rsplit("/", 1)[1][:10]))
+
+
+def _engine(db, chunk_size=2):
+    return WathqSyncEngine(db, SERVICE, CommercialRegistration, _process_log, chunk_size=chunk_size)
+
+
+def _synced(db):
+    return sorted(log_id for (log_id,) in db.query(CommercialRegistration.log_id))
+
+
+def _watermark(db):
+    state = db.query(ProcessingWatermark).filter(
+        ProcessingWatermark.name == f"wathq_sync:{SERVICE}"
+    ).one()
+    return state.watermark_at, uuid.UUID(state.watermark_id)
+
+
+def test_run_pages_through_a_fetched_at_tie(db):
+    tied_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    ids = _add_logs(db, tied_at, 5)
+
+    # Pages of 2 split the tie; each log is synced exactly once
+    result = _engine(db).run()
+    assert result["synced_count"] == 5
+    assert _synced(db) == ids
+    assert _watermark(db) == (tied_at, ids[-1])
+
+    assert _engine(db).run()["total_logs"] == 0
+
+
+def test_run_resumes_inside_a_tie(db):
+    tied_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    first = _add_logs(db, tied_at, ids=[uuid.UUID(int=n) for n in (10, 20, 30)])
+    _engine(db, chunk_size=10).run()
+    assert _watermark(db) == (tied_at, first[-1])
+
+    # Same fetched_at: ids past the watermark are picked up, a lower one is
+    # behind it (what the settle window keeps from happening)
+    behind, *later = _add_logs(db, tied_at, ids=[uuid.UUID(int=n) for n in (25, 35, 40, 50)])
+    result = _engine(db, chunk_size=2).run()
+    assert result["synced_count"] == 3
+    assert _synced(db) == sorted(first + later)
+    assert behind not in _synced(db)
+    assert _watermark(db) == (tied_at, later[-1])
+
+
+def test_plan_chunks_ranges_are_disjoint_across_a_tie(db):
+    tied_at = datetime.now(timezone.utc) - timedelta(hours=2)
+    ids = _add_logs(db, tied_at, 4) + _add_logs(db, tied_at + timedelta(seconds=1), 3)
+
+    engine = _engine(db, chunk_size=3)
+    chunks, total = engine.plan_chunks()
+    assert total == 7
+    assert [count for _, _, count in chunks] == [3, 3, 1]
+    # The first range ends inside the tie, the second starts right after it
+    assert chunks[0][1] == (tied_at, ids[2])
+    assert chunks[1][0] == chunks[0][1]
+
+    scanned = sum(engine.run_range(after, upto)["scanned"] for after, upto, _ in chunks)
+    assert scanned == 7
+    assert _synced(db) == sorted(ids)
+
+    # The watermark only moves once every range is done, and never backwards
+    engine.advance_watermark(chunks[-1][1])
+    engine.advance_watermark(chunks[0][1])
+    assert _watermark(db) == chunks[-1][1]
+    assert engine.plan_chunks() == ([], 0)
+
+
+def test_logs_in_settle_window_wait_for_late_inserts(db, monkeypatch):
+    now = datetime.now(timezone.utc)
+    settled = _add_logs(db, now - timedelta(minutes=10), 2)
+    recent = _add_logs(db, now - timedelta(seconds=5), 1)
+
+    _engine(db).run()
+    assert _synced(db) == settled
+    assert _watermark(db) == (now - timedelta(minutes=10), settled[-1])
+
+    # Committed late by a slower writer, with an earlier fetched_at than the
+    # log that was too recent: still ahead of the watermark
+    late = _add_logs(db, now - timedelta(seconds=20), 1)
+    monkeypatch.setattr(settings, "WATHQ_SYNC_SETTLE_SECONDS", 0)
+    result = _engine(db).run()
+    assert result["synced_count"] == 2
+    assert _synced(db) == sorted(settled + recent + late)
+
+
+def test_failed_logs_are_retried_by_full_resync(db):
+    fetched_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    good = _add_logs(db, fetched_at, 2)
+    bad = _add_logs(db, fetched_at + timedelta(seconds=1), 1)[0]
+    db.query(WathqCallLog).filter(WathqCallLog.id == bad).update(
+        {WathqCallLog.endpoint: "/commercial-registration/v2/fullinfo/bad"}
+    )
+    db.commit()
+
+    result = _engine(db).run()
+    assert result["synced_count"] == 2
+    assert [error["log_id"] for error in result["errors"]] == [str(bad)]
+    # Past the failed log: an incremental run does not see it again
+    assert _watermark(db)[1] == bad
+    assert _engine(db).run()["total_logs"] == 0
+
+    db.query(WathqCallLog).filter(WathqCallLog.id == bad).update(
+        {WathqCallLog.endpoint: "/commercial-registration/v2/fullinfo/1010000000"}
+    )
+    db.commit()
+    result = _engine(db).run(full_resync=True)
+    assert result["total_logs"] == 1
+    assert _synced(db) == sorted(good + [bad])
+
+
+@pytest.mark.parametrize("status_code", [404, 500])
+def test_unsuccessful_logs_are_not_synced(db, status_code):
+    ids = _add_logs(db, datetime.now(timezone.utc) - timedelta(hours=1), 2)
+    db.query(WathqCallLog).filter(WathqCallLog.id == ids[0]).update(
+        {WathqCallLog.status_code: status_code}
+    )
+    db.commit()
+
+    assert _engine(db).run()["synced_count"] == 1
+    assert _synced(db) == [ids[1]]